@@ -3,14 +3,26 @@ Restaurant Analytics Dashboard - Main Application
 Multi-page setup with Sidebar Navigation
 """
 
+import os
 import dash
-from dash import html, dcc
+import diskcache
+from dash import html, dcc, DiskcacheManager
 import dash_bootstrap_components as dbc
 from dotenv import load_dotenv
+from flask_compress import Compress
+from observability import metrics, profiling
+from data import ingest
+from data.ratingAlerts import configure_alert_log
+from data.reviewSearch import configure_search_database
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Background callbacks (e.g. the streaming AI Assistant) run in worker processes
+# and report progress through this on-disk cache.
+cache_dir = os.getenv("PLATEMATE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+background_callback_manager = DiskcacheManager(diskcache.Cache(cache_dir))
+
 # Initialize Dash app with multi-page support
 app = dash.Dash(
     __name__,
@@ -18,9 +30,36 @@ app = dash.Dash(
     title="Platemate Restaurant Analytics Dashboard",
     suppress_callback_exceptions=True,
     external_stylesheets=[dbc.themes.BOOTSTRAP],
+    background_callback_manager=background_callback_manager,
 )
 server = app.server  # For deployment (e.g. Render, Heroku)
 
+# Compress callback, layout and asset responses. Configured here rather than with
+# Dash(compress=True), which forces gzip only; brotli at a low level is cheap and smaller.
+server.config.update(
+    COMPRESS_ALGORITHM=["br", "gzip"],
+    COMPRESS_BR_LEVEL=int(os.getenv("PLATEMATE_BROTLI_LEVEL", "4")),
+    COMPRESS_LEVEL=6,
+    COMPRESS_MIN_SIZE=500,
+)
+Compress(server)
+
+# Callback timings at /metrics. Each process (gunicorn workers, background
+# callback jobs) writes its snapshot here and the scrape merges them.
+metrics.init_app(app, os.getenv("PLATEMATE_METRICS_DIR", os.path.join(cache_dir, "metrics")))
+
+# Rating drop alerts raised by ingested reviews are appended here (JSON lines)
+configure_alert_log(os.getenv("PLATEMATE_ALERT_LOG", os.path.join(cache_dir, "alerts.jsonl")))
+
+# Review search database (SQLite + FTS5) built from the loaded data and kept current by ingestion
+configure_search_database(os.getenv("PLATEMATE_SEARCH_DB_DIR", os.path.join(cache_dir, "search")))
+
+# POST /api/reviews adds reviews to the loaded data (needs PLATEMATE_ADMIN_TOKEN)
+ingest.init_app(app)
+
+# Opt-in callback profiling (PLATEMATE_PROFILE), browsable at /admin/profiles
+profiling.init_app(app, os.getenv("PLATEMATE_PROFILE_DIR", os.path.join(cache_dir, "profiles")))
+
 # ----------------------------
 # Sidebar for navigation
 # ----------------------------
@@ -79,4 +118,5 @@ except Exception:
 # Run the App
 # ----------------------------
 if __name__ == "__main__":
+    metrics.clear_metrics_dir()
     app.run(debug=True, port=8050)
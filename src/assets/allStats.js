@@ -0,0 +1,47 @@
+/*
+ * Browser-side year slicing for the All Stats chart (components/charts.py).
+ *
+ * The server ships every month's mean ratings once in the "all-stats-store"
+ * dcc.Store as {start: "YYYY-MM", series: {Overall: [...], Taste: [...], ...}},
+ * one value per calendar month from `start` (null where a month has no reviews).
+ * Changing the year rebuilds the traces from that store without a server call.
+ */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    platemate: Object.assign({}, (window.dash_clientside || {}).platemate, {
+        sliceAllStatsYear: function (year, store, figure) {
+            if (!year || !store || !figure) {
+                return window.dash_clientside.no_update;
+            }
+
+            const [startYear, startMonth] = store.start.split("-").map(Number);
+            const overall = store.series.Overall;
+            const months = [];
+            const indices = [];
+            for (let i = 0; i < overall.length; i++) {
+                const monthIndex = startMonth - 1 + i;
+                const monthYear = startYear + Math.floor(monthIndex / 12);
+                // Months without reviews are left out, like the server-side aggregation does
+                if (monthYear !== Number(year) || overall[i] === null) {
+                    continue;
+                }
+                months.push(monthYear + "-" + String((monthIndex % 12) + 1).padStart(2, "0"));
+                indices.push(i);
+            }
+
+            const data = figure.data.map(function (trace) {
+                const values = store.series[trace.name] || [];
+                return Object.assign({}, trace, {
+                    x: months,
+                    y: indices.map(function (i) { return values[i]; }),
+                });
+            });
+
+            const layout = Object.assign({}, figure.layout, {
+                title: Object.assign({}, figure.layout.title, {text: "Ratings Trend Over Time — " + year}),
+                xaxis: Object.assign({}, figure.layout.xaxis, {autorange: true}),
+            });
+
+            return Object.assign({}, figure, {data: data, layout: layout});
+        },
+    }),
+});
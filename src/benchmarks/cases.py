@@ -0,0 +1,123 @@
+"""
+Benchmark cases: one entry per dashboard figure builder.
+
+Each case is a `(setup, run)` pair. `setup()` is untimed and returns the
+arguments for `run`; `run(*args)` is what gets measured. Builders that load
+their own data (everything on the dashboard page) do all their work in
+`run`. loadData() and the indexes built from it are cached, so the runner
+times every case twice: cold, with `reset_caches()` before each run (the
+file is parsed and the joins and indexes are built inside the measurement,
+like the first request after a start or a data reload), and warm, with the
+caches filled (like every later request). The dishStats builders receive a
+pre-filtered DataFrame from the page, so their setup builds merged_df and
+filters it to the most reviewed dish (the worst case).
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+from data.loadData import loadData, clear_cache
+from data.ingest import drop_indexes
+from data.dishes import get_top_rated_dishes
+from data.recentReviews import build_recent_reviews
+from data.reviewerCardinality import build_reviewer_cardinality
+from data.reviewerTimeline import build_reviewer_timeline
+from data.dishPairings import build_dish_cooccurrence
+from data.dishSimilarity import build_dish_similarity
+from data.ratingCube import build_rating_cube
+from data.ratingTrends import build_rating_trends
+from data.ratingAlerts import build_rating_alerts
+from data.reviewAspects import build_review_aspects
+from data.reviewDuplicates import build_review_duplicates
+from components.charts import (
+    create_performance_chart, create_all_stats_over_time_chart, create_review_charts,
+    all_stats_store_data, _build_merged_df,
+)
+from components.customerSatisfactionMetrics.CategoryKPI import create_category_kpi_cards, create_category_kpi_patch
+from components.customerSatisfactionMetrics.ratingDistribution import (
+    create_rating_distribution_chart, create_rating_distribution_patch,
+)
+from components.operationalMetrics.lastTenReviews import create_last_ten_reviews_table
+from components.operationalMetrics.UniqueIndex import create_reviewer_diversity_chart
+from components.operationalMetrics.OvertimeRating import create_average_rating_over_time
+from components.dishStats.dishOverall import create_dish_overall_pie
+from components.dishStats.dishCategoryBreakdown import create_dish_category_breakdown
+from components.dishStats.dishSentiment import create_dish_sentiment_chart
+from components.dishStats.dishOrdersOverTime import create_dish_orders_over_time
+from components.dishStats.dishCustomerReturn import create_dish_customer_return_chart
+from components.dishStats.dishPairings import create_dish_pairings_chart
+from components.dishStats.dishAspects import create_dish_aspects_chart
+
+
+def reset_caches():
+    """Drop the parsed dataset, the memoized aggregates and every maintained index."""
+    clear_cache()
+    drop_indexes()
+
+
+def _no_setup():
+    return ()
+
+
+def _dish_setup():
+    """merged_df as built in pages/dishStats.py, filtered to the busiest dish."""
+    data = loadData()
+    reviews_df = pd.DataFrame(data["reviews"])
+    ratings_df = pd.DataFrame(data["ratings"])
+    menu_df = pd.DataFrame(data["menuItems"])
+    content_df = pd.DataFrame(data["content"])
+
+    merged_df = (
+        reviews_df
+        .merge(ratings_df, left_on="rating_id", right_on="id", suffixes=("_review", "_rating"))
+        .merge(menu_df, left_on="menu_item_id", right_on="id", suffixes=("", "_menu"))
+        .merge(content_df, left_on="content_id", right_on="id", suffixes=("", "_content"))
+    )
+    dish_name = merged_df["name"].value_counts().idxmax()
+    return merged_df[merged_df["name"] == dish_name], dish_name
+
+
+def _dish_pie_setup():
+    """_dish_setup() plus the dish's menu item id, as the dish page passes it (the pie reads the rating cube)."""
+    filtered_df, dish_name = _dish_setup()
+    return filtered_df, dish_name, int(filtered_df["menu_item_id"].iloc[0])
+
+
+CASES = {
+    "performance_chart": (_no_setup, create_performance_chart),
+    "all_stats_over_time_chart": (_no_setup, create_all_stats_over_time_chart),
+    "review_charts": (_no_setup, create_review_charts),
+    "all_stats_store_data": (_no_setup, lambda: all_stats_store_data(_build_merged_df())),
+    "category_kpi_cards[overall]": (lambda: ("overall",), create_category_kpi_cards),
+    "category_kpi_cards[month]": (lambda: ("month",), create_category_kpi_cards),
+    "category_kpi_cards[week]": (lambda: ("week",), create_category_kpi_cards),
+    "category_kpi_patch[month]": (lambda: ("month",), create_category_kpi_patch),
+    "last_ten_reviews_table": (_no_setup, create_last_ten_reviews_table),
+    "recent_reviews_index": (_no_setup, lambda: build_recent_reviews(loadData())),
+    "reviewer_diversity_chart": (_no_setup, create_reviewer_diversity_chart),
+    "reviewer_cardinality_index": (_no_setup, lambda: build_reviewer_cardinality(loadData())),
+    "reviewer_timeline_cohorts": (_no_setup, lambda: build_reviewer_timeline(loadData()).cohorts()),
+    "rating_cube_index": (_no_setup, lambda: build_rating_cube(loadData())),
+    "rating_distribution_chart": (_no_setup, create_rating_distribution_chart),
+    "rating_distribution_patch[2024]": (lambda: ("2024",), create_rating_distribution_patch),
+    "rating_trends_index": (_no_setup, lambda: build_rating_trends(loadData()).series()),
+    "average_rating_over_time": (_no_setup, create_average_rating_over_time),
+    "rating_alerts_replay": (_no_setup, lambda: build_rating_alerts(loadData()).active_alerts()),
+    "dish_overall_pie": (_dish_pie_setup, create_dish_overall_pie),
+    "dish_overall_pie[frame]": (_dish_setup, create_dish_overall_pie),
+    "dish_category_breakdown": (_dish_setup, create_dish_category_breakdown),
+    "dish_sentiment_chart": (_dish_setup, create_dish_sentiment_chart),
+    "dish_orders_over_time": (_dish_setup, create_dish_orders_over_time),
+    "dish_customer_return_chart": (_dish_setup, create_dish_customer_return_chart),
+    "dish_pairings_chart": (_dish_setup, create_dish_pairings_chart),
+    "dish_aspects_chart": (_dish_setup, create_dish_aspects_chart),
+    "review_aspects_index": (_no_setup, lambda: build_review_aspects(loadData()).top_aspects()),
+    "review_duplicates_index": (_no_setup, lambda: build_review_duplicates(loadData()).duplicates()),
+    "dish_cooccurrence_index": (_no_setup, lambda: build_dish_cooccurrence(loadData())),
+    "dish_similarity_index": (_no_setup, lambda: build_dish_similarity(loadData())),
+    "top_rated_dishes": (lambda: (5,), get_top_rated_dishes),
+}
@@ -0,0 +1,201 @@
+"""
+HTTP load test for the production server (gunicorn.conf.py + wsgi.py).
+
+For each worker count it starts gunicorn, fires Dash callback requests from
+--concurrency client processes for --duration seconds, and reports
+throughput and latency percentiles. Comparing the rows shows how throughput
+scales with worker processes (ideally close to linear up to the number of
+cores, since callbacks are CPU bound and each worker has its own GIL).
+
+Every request in the mix is sent once before the clients start and must
+answer 200; a run that sees any failed request exits with status 1, so error
+responses can't pass for throughput.
+
+Usage (from src/):
+    python -m benchmarks.loadtest --workers 1 2 4 8 --concurrency 16 --duration 20
+    python -m benchmarks.loadtest --workers 1 4 --mix kpi --out /tmp/loadtest.json
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import requests
+
+SRC_DIR = Path(__file__).parent.parent
+UPDATE_PATH = "/_dash-update-component"
+
+
+def _update_body(output_id, output_prop, input_id, input_prop, value):
+    return {
+        "output": f"{output_id}.{output_prop}",
+        "outputs": {"id": output_id, "property": output_prop},
+        "inputs": [{"id": input_id, "property": input_prop, "value": value}],
+        "changedPropIds": [f"{input_id}.{input_prop}"],
+        "state": [],
+    }
+
+
+def _page_body(pathname):
+    """The dash.page_container callback that renders a page's layout (what navigating to it requests)."""
+    return {
+        "output": ".._pages_content.children..._pages_store.data..",
+        "outputs": [{"id": "_pages_content", "property": "children"}, {"id": "_pages_store", "property": "data"}],
+        "inputs": [{"id": "_pages_location", "property": "pathname", "value": pathname},
+                   {"id": "_pages_location", "property": "search", "value": ""}],
+        "changedPropIds": ["_pages_location.pathname"],
+        "state": [],
+    }
+
+
+# Callback requests a dashboard user triggers, by name.
+# The all-stats year selector runs in the browser (assets/allStats.js); its server cost is
+# the series shipped with the dashboard layout, so "dashboard_page" stands in for it.
+REQUESTS = {
+    "kpi": [_update_body("category-kpi-cards", "figure", "period-dropdown", "value", period)
+            for period in ("overall", "month", "week")],
+    "dish_cards": [_update_body("dish-cards-container", "children", "dish-tabs", "value", tab)
+                   for tab in ("top", "bottom")],
+    "distribution_year": [_update_body("rating-distribution-chart", "figure", "rating-distribution-year", "value", year)
+                          for year in ("2023", "2024", "2025", "all")],
+    "dashboard_page": [_page_body("/")],
+}
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(workers, threads, port):
+    env = dict(os.environ, PLATEMATE_WORKERS=str(workers), PLATEMATE_THREADS=str(threads),
+               PLATEMATE_BIND=f"127.0.0.1:{port}", PLATEMATE_RELOAD_INTERVAL="0")
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:application"],
+                            cwd=SRC_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/", timeout=2).ok:
+                return proc
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("gunicorn did not become ready within 120s")
+
+
+def _preflight(url, mix):
+    """Send every request once; raise if any does not answer 200."""
+    with requests.Session() as session:
+        for name, body in mix:
+            response = session.post(url, json=body, timeout=60)
+            if response.status_code != 200:
+                raise RuntimeError(f"Request '{name}' ({body['output']}) returned HTTP {response.status_code}: "
+                                   f"{response.text[:300]}")
+
+
+def _client(url, bodies, duration, warmup):
+    """One client process: send requests back to back, return (latencies_s, errors)."""
+    session = requests.Session()
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    for body in itertools.cycle(bodies):
+        now = time.perf_counter()
+        if now - start >= warmup + duration:
+            break
+        try:
+            ok = session.post(url, json=body, timeout=60).status_code == 200
+        except requests.RequestException:
+            ok = False
+        if now - start < warmup:
+            continue
+        if ok:
+            latencies.append(time.perf_counter() - now)
+        else:
+            errors += 1
+    return latencies, errors
+
+
+def _percentile(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else (values[0] if values else 0.0)
+
+
+def run_load(workers, threads, concurrency, duration, warmup, mix):
+    port = _free_port()
+    server = _start_server(workers, threads, port)
+    url = f"http://127.0.0.1:{port}{UPDATE_PATH}"
+    try:
+        _preflight(url, mix)
+        bodies = [body for _, body in mix]
+        with ProcessPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(_client, url, bodies[i % len(bodies):] + bodies[:i % len(bodies)], duration, warmup)
+                       for i in range(concurrency)]
+            results = [f.result() for f in futures]
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+    latencies = [lat for lats, _ in results for lat in lats]
+    errors = sum(err for _, err in results)
+    return {
+        "workers": workers,
+        "threads": threads,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the gunicorn server across worker counts.")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4, multiprocessing.cpu_count()])
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client processes")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds per worker count")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before each run")
+    parser.add_argument("--mix", nargs="+", choices=sorted(REQUESTS), default=sorted(REQUESTS))
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    args = parser.parse_args(argv)
+
+    mix = [(name, body) for name in args.mix for body in REQUESTS[name]]
+    print(f"{multiprocessing.cpu_count()} CPU(s); mix: {', '.join(args.mix)}\n")
+    print(f"{'workers':>7} {'req/s':>8} {'speedup':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+
+    results = []
+    for workers in sorted(set(args.workers)):
+        result = run_load(workers, args.threads, args.concurrency, args.duration, args.warmup, mix)
+        result["speedup"] = round(result["rps"] / results[0]["rps"], 2) if results and results[0]["rps"] else 1.0
+        results.append(result)
+        print(f"{workers:>7} {result['rps']:>8.1f} {result['speedup']:>7.2f}x {result['p50_ms']:>8.1f} "
+              f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['errors']:>7}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"cpus": multiprocessing.cpu_count(), "mix": args.mix, "results": results}, f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+    failed = sum(result["errors"] for result in results)
+    if failed:
+        print(f"\n{failed} request(s) failed (non-200 or no response); throughput above is not comparable")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
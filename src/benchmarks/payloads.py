@@ -0,0 +1,176 @@
+"""
+Payload size report for the time-series figures: before vs after compact encoding and compression.
+
+For each figure it compares
+  before: plain figure JSON as Dash sent it (uncompressed)
+  after:  compact_figure() JSON (typed arrays or rounded floats), brotli-compressed
+and estimates time-to-data on a slow link: transfer at --kbps plus one --rtt,
+plus the browser's JSON.parse time (measured with node when it is installed).
+Plotly's own drawing time needs a real browser and is not included.
+
+It also requests one real callback (dish insights) through the Flask test
+client to confirm the server negotiates brotli/gzip.
+
+Usage (from src/):
+    python -m benchmarks.payloads
+    PLATEMATE_DATA_FILE=.cache/benchmarks/synthetic_100000.json python -m benchmarks.payloads --kbps 1500
+"""
+
+import argparse
+import gzip
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import brotli
+import pandas as pd
+import plotly
+
+from components.figureEncoding import compact_figure, typed_arrays_supported, bundled_plotly_js_version
+
+
+def _figures():
+    from benchmarks.cases import _dish_setup
+    from components.charts import create_all_stats_figure_for_year, create_review_charts, _build_merged_df
+    from components.operationalMetrics.OvertimeRating import create_average_rating_over_time
+    from components.dishStats.dishOrdersOverTime import create_dish_orders_over_time
+
+    merged = _build_merged_df()
+    latest_year = int(pd.to_datetime(merged["timestamp"], errors="coerce").dt.year.max())
+    filtered, dish_name = _dish_setup()
+    return {
+        "all_stats": create_all_stats_figure_for_year(latest_year, merged),
+        "average_rating_over_time": create_average_rating_over_time(),
+        "review_volume": create_review_charts()[1],
+        "dish_orders_over_time": create_dish_orders_over_time(filtered.copy(), dish_name),
+    }
+
+
+def _to_json(obj):
+    return json.dumps(obj, cls=plotly.utils.PlotlyJSONEncoder).encode("utf-8")
+
+
+def _timed(fn, repeat=5):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def _node_parse_ms(payloads):
+    """Median JSON.parse time per payload in node, or None when node isn't available."""
+    node = shutil.which("node")
+    if not node:
+        return None
+    script = (
+        "const fs=require('fs');const files=JSON.parse(process.argv[1]);const out=[];"
+        "for(const f of files){const s=fs.readFileSync(f,'utf8');const t=[];"
+        "for(let i=0;i<15;i++){const a=process.hrtime.bigint();JSON.parse(s);t.push(Number(process.hrtime.bigint()-a)/1e6);}"
+        "t.sort((a,b)=>a-b);out.push(t[7]);}console.log(JSON.stringify(out));"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for i, payload in enumerate(payloads):
+            path = Path(tmp) / f"{i}.json"
+            path.write_bytes(payload)
+            files.append(str(path))
+        out = subprocess.run([node, "-e", script, json.dumps(files)], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def _http_check():
+    import app
+
+    filtered_body = {
+        "output": "dish-insights-container.children",
+        "outputs": {"id": "dish-insights-container", "property": "children"},
+        "inputs": [{"id": "view-stats-btn", "property": "n_clicks", "value": 1}],
+        "state": [{"id": "dish-dropdown", "property": "value", "value": _busiest_dish()}],
+        "changedPropIds": ["view-stats-btn.n_clicks"],
+    }
+    client = app.server.test_client()
+    sizes = {}
+    for encoding in ("identity", "gzip", "br"):
+        response = client.post("/_dash-update-component", json=filtered_body, headers={"Accept-Encoding": encoding})
+        sizes[encoding] = (len(response.get_data()), response.headers.get("Content-Encoding", "identity"))
+    return sizes
+
+
+def _busiest_dish():
+    from benchmarks.cases import _dish_setup
+    return _dish_setup()[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare figure payload sizes before/after compact encoding and compression.")
+    parser.add_argument("--kbps", type=float, default=2000.0, help="Link speed for the transfer estimate (kbit/s)")
+    parser.add_argument("--rtt", type=float, default=80.0, help="Round-trip time added to each transfer (ms)")
+    parser.add_argument("--no-http", action="store_true", help="Skip the live callback compression check")
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    args = parser.parse_args(argv)
+
+    version = bundled_plotly_js_version()
+    mode = "typed arrays (bdata)" if typed_arrays_supported() else "rounded floats"
+    print(f"Bundled plotly.js {'.'.join(map(str, version)) if version else 'unknown'}: compact mode = {mode}")
+    print(f"Transfer estimate at {args.kbps:.0f} kbit/s + {args.rtt:.0f} ms RTT\n")
+
+    rows = []
+    for name, fig in _figures().items():
+        before, before_encode_ms = _timed(lambda: _to_json(fig))
+        after_json, after_encode_ms = _timed(lambda: _to_json(compact_figure(fig)))
+        after, compress_ms = _timed(lambda: brotli.compress(after_json, quality=4))
+        rows.append({
+            "figure": name,
+            "before_bytes": len(before),
+            "before_gzip_bytes": len(gzip.compress(before, 6)),
+            "compact_bytes": len(after_json),
+            "after_bytes": len(after),
+            "before_encode_ms": round(before_encode_ms, 2),
+            "after_encode_ms": round(after_encode_ms + compress_ms, 2),
+            "_payloads": (before, after_json),
+        })
+
+    parse_ms = _node_parse_ms([p for row in rows for p in row["_payloads"]])
+    for i, row in enumerate(rows):
+        row.pop("_payloads")
+        before_parse, after_parse = (parse_ms[2 * i], parse_ms[2 * i + 1]) if parse_ms else (0.0, 0.0)
+        transfer = lambda size: size * 8 / args.kbps + args.rtt  # bytes -> ms
+        row["before_ms"] = round(row["before_encode_ms"] + transfer(row["before_bytes"]) + before_parse, 1)
+        row["after_ms"] = round(row["after_encode_ms"] + transfer(row["after_bytes"]) + after_parse, 1)
+        if parse_ms:
+            row["before_parse_ms"], row["after_parse_ms"] = round(before_parse, 3), round(after_parse, 3)
+
+    print(f"{'figure':<26} {'before B':>9} {'gzip B':>8} {'compact B':>10} {'after (br) B':>13} {'ratio':>6} {'before ms':>10} {'after ms':>9}")
+    for row in rows:
+        print(f"{row['figure']:<26} {row['before_bytes']:>9} {row['before_gzip_bytes']:>8} {row['compact_bytes']:>10} "
+              f"{row['after_bytes']:>13} {row['before_bytes'] / row['after_bytes']:>5.1f}x "
+              f"{row['before_ms']:>10.1f} {row['after_ms']:>9.1f}")
+    if parse_ms is None:
+        print("\n(node not found: browser JSON.parse time not included)")
+
+    report = {"plotly_js": version, "compact_mode": mode, "kbps": args.kbps, "rtt_ms": args.rtt, "figures": rows}
+
+    if not args.no_http:
+        sizes = _http_check()
+        report["dish_insights_callback"] = {enc: {"bytes": size, "content_encoding": got} for enc, (size, got) in sizes.items()}
+        print("\nDish insights callback response:")
+        for encoding, (size, got) in sizes.items():
+            print(f"  Accept-Encoding: {encoding:<8} -> {size:>8} bytes (Content-Encoding: {got})")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Benchmark runner for the dashboard figure builders.
+
+Every (case, size) pair runs in a fresh Python process with PLATEMATE_DATA_FILE
+pointing at a synthetic dataset of that size (generated once with
+data/syntheticData.py and cached), so peak RSS is per case and nothing is
+shared between runs. For each pair it records:
+
+- wall time of the builder (min / median over --repeat runs), cold (caches
+  dropped before each run, see benchmarks/cases.py) and warm (caches filled)
+- peak RSS of the process, and RSS after setup (so the builder's share is visible)
+- peak traced allocation size and the blocks still allocated afterwards
+  (tracemalloc, in a separate untimed run because tracing slows Python down)
+- time and size of serializing the result the way Dash does
+
+Results are written as JSON. With --baseline they are compared against an
+earlier results file and the process exits with status 1 when a metric got
+worse than --threshold (relative) and the absolute noise floor.
+
+Usage (from src/):
+    python -m benchmarks.run --sizes 1k 10k 100k 1M --out benchmarks/baseline.json
+    python -m benchmarks.run --sizes 1k 10k --baseline benchmarks/baseline.json --threshold 0.25
+    python -m benchmarks.run --cases performance_chart dish_sentiment_chart --sizes 100k
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add project root to path
+SRC_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(SRC_DIR))
+
+DEFAULT_SIZES = ["1k", "10k", "100k", "1M"]
+DEFAULT_DATA_DIR = SRC_DIR / ".cache" / "benchmarks"
+
+# Metrics checked against the baseline, with the absolute change below which differences are noise
+COMPARED_METRICS = {
+    "wall_ms_median": 5.0,
+    "wall_cold_ms_median": 5.0,
+    "peak_rss_mb": 20.0,
+    "alloc_peak_mb": 5.0,
+}
+
+RESULT_MARKER = "BENCH_RESULT "
+
+
+def parse_size(text: str) -> int:
+    """'10k' -> 10000, '1M' -> 1000000, '2500' -> 2500."""
+    text = text.strip()
+    multiplier = {"k": 1_000, "K": 1_000, "m": 1_000_000, "M": 1_000_000}.get(text[-1:], 1)
+    number = text[:-1] if multiplier != 1 else text
+    return int(float(number) * multiplier)
+
+
+def ensure_dataset(n_reviews: int, data_dir: Path) -> Path:
+    """Return the path of a synthetic mockData-style JSON file with n_reviews, generating it if needed."""
+    from data.syntheticData import SyntheticDataset, write_json
+
+    path = data_dir / f"synthetic_{n_reviews}.json"
+    if not path.exists():
+        data_dir.mkdir(parents=True, exist_ok=True)
+        print(f"Generating {n_reviews:,} reviews -> {path}")
+        write_json(SyntheticDataset(n_reviews), str(path))
+    return path
+
+
+def _rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(case: str, repeat: int, max_seconds: float) -> dict:
+    """Run one case in this process and return its metrics (called in the worker process)."""
+    import plotly
+    from benchmarks.cases import CASES, reset_caches
+
+    setup, run = CASES[case]
+    args = setup()
+    rss_setup = _rss_mb()
+
+    def timed_runs(cold):
+        timings, result = [], None
+        while len(timings) < repeat:
+            if cold:
+                reset_caches()
+            start = time.perf_counter()
+            result = run(*args)
+            timings.append((time.perf_counter() - start) * 1000)
+            # Very slow cases (1M reviews) don't need many repeats to be meaningful
+            if sum(timings) / 1000 > max_seconds:
+                break
+        return timings, result
+
+    cold_timings, _ = timed_runs(cold=True)
+    timings, result = timed_runs(cold=False)
+    peak_rss = _rss_mb()
+
+    start = time.perf_counter()
+    try:
+        payload = json.dumps(result, cls=plotly.utils.PlotlyJSONEncoder)
+    except TypeError:
+        payload = ""  # index builds return in-memory objects, not a response payload
+    serialize_ms = (time.perf_counter() - start) * 1000
+
+    del result
+    reset_caches()
+    tracemalloc.start()
+    result = run(*args)
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    retained_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+
+    return {
+        "case": case,
+        "runs": len(timings),
+        "wall_ms_min": round(min(timings), 3),
+        "wall_ms_median": round(statistics.median(timings), 3),
+        "cold_runs": len(cold_timings),
+        "wall_cold_ms_min": round(min(cold_timings), 3),
+        "wall_cold_ms_median": round(statistics.median(cold_timings), 3),
+        "rss_setup_mb": round(rss_setup, 1),
+        "peak_rss_mb": round(peak_rss, 1),
+        "alloc_peak_mb": round(alloc_peak / (1024 * 1024), 3),
+        "alloc_retained_blocks": retained_blocks,
+        "serialize_ms": round(serialize_ms, 3),
+        "payload_bytes": len(payload),
+    }
+
+
+def run_case(case: str, size: str, data_file: Path, repeat: int, max_seconds: float, timeout: float) -> dict:
+    """Run one case against one dataset in a separate process."""
+    env = dict(os.environ, PLATEMATE_DATA_FILE=str(data_file))
+    cmd = [sys.executable, "-m", "benchmarks.run", "--worker", case,
+           "--repeat", str(repeat), "--max-seconds", str(max_seconds)]
+    base = {"case": case, "size": size, "reviews": parse_size(size)}
+
+    try:
+        proc = subprocess.run(cmd, cwd=SRC_DIR, env=env, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {**base, "error": f"timeout after {timeout:.0f}s"}
+
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return {**base, **json.loads(line[len(RESULT_MARKER):])}
+
+    stderr = proc.stderr.strip().splitlines()
+    return {**base, "error": stderr[-1] if stderr else f"exit status {proc.returncode}"}
+
+
+def compare(results: list, baseline: dict, threshold: float) -> list:
+    """Return a list of human-readable regressions of `results` against a baseline results file."""
+    previous = {(r["case"], r["size"]): r for r in baseline.get("results", [])}
+    regressions = []
+
+    for result in results:
+        old = previous.get((result["case"], result["size"]))
+        if old is None or "error" in old:
+            continue
+        label = f"{result['case']} @ {result['size']}"
+        if "error" in result:
+            regressions.append(f"{label}: now fails ({result['error']})")
+            continue
+
+        for metric, noise_floor in COMPARED_METRICS.items():
+            before, after = old.get(metric), result.get(metric)
+            if before is None or after is None:
+                continue
+            if after > before * (1 + threshold) and after - before > noise_floor:
+                regressions.append(f"{label}: {metric} {before} -> {after} (+{(after / before - 1) * 100:.0f}%)")
+
+    return regressions
+
+
+def print_table(results: list):
+    print(f"\n{'case':<30} {'size':>5} {'cold ms':>9} {'warm ms':>9} {'peak RSS MB':>12} {'alloc MB':>9} "
+          f"{'payload KB':>11}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['case']:<30} {r['size']:>5}  ERROR: {r['error']}")
+            continue
+        print(f"{r['case']:<30} {r['size']:>5} {r['wall_cold_ms_median']:>9.1f} {r['wall_ms_median']:>9.1f} "
+              f"{r['peak_rss_mb']:>12.1f} {r['alloc_peak_mb']:>9.1f} {r['payload_bytes'] / 1024:>11.1f}")
+
+
+def main(argv=None):
+    from benchmarks.cases import CASES
+
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard figure builders on synthetic data.")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="Dataset sizes, e.g. 1k 10k 100k 1M")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=None, help="Cases to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--max-seconds", type=float, default=30.0, help="Stop repeating once a case has run this long")
+    parser.add_argument("--timeout", type=float, default=1800.0, help="Kill a case after this many seconds")
+    parser.add_argument("--data-dir", default=os.getenv("PLATEMATE_BENCH_DATA_DIR", str(DEFAULT_DATA_DIR)))
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown before failing")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        metrics = measure(args.worker, args.repeat, args.max_seconds)
+        print(RESULT_MARKER + json.dumps(metrics))
+        return 0
+
+    cases = args.cases or list(CASES)
+    results = []
+    for size in args.sizes:
+        data_file = ensure_dataset(parse_size(size), Path(args.data_dir))
+        for case in cases:
+            result = run_case(case, size, data_file, args.repeat, args.max_seconds, args.timeout)
+            results.append(result)
+            status = result.get("error") or (f"{result['wall_cold_ms_median']:.1f} ms cold, "
+                                             f"{result['wall_ms_median']:.1f} ms warm, "
+                                             f"{result['peak_rss_mb']:.0f} MB")
+            print(f"[{size:>4}] {case:<30} {status}")
+
+    print_table(results)
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\nNo regressions against {args.baseline} (threshold {args.threshold:.0%})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+"""
+Resilient wrapper around the Gemini model used by every LLM call site.
+
+LLMClient exposes the same `generate_content(prompt, stream=False)` call as
+google.generativeai.GenerativeModel and adds:
+
+- a hard per-call timeout (the Dash worker stops waiting even if the SDK doesn't)
+- jittered exponential retries for transient errors (timeouts, 429/5xx)
+- a circuit breaker that fails fast while the recent error rate is high
+- a concurrency limiter so a slow endpoint can't tie up every worker
+- latency histograms per call site (sql_generation, final_answer, dish_suggestions)
+
+The backend is pluggable: get_client() uses the offline FakeGenerativeModel
+when PLATEMATE_FAKE_LLM is set, otherwise the real Gemini model.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from components.ai.fake_llm import FakeGenerativeModel
+
+
+MODEL_NAME = "gemini-2.5-flash"
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf"))
+
+# Exception class names (google.api_core and builtins) worth retrying
+_RETRYABLE_ERRORS = {
+    "TimeoutError", "LLMTimeoutError", "ConnectionError", "ConnectionResetError",
+    "DeadlineExceeded", "ServiceUnavailable", "InternalServerError", "ResourceExhausted",
+    "TooManyRequests", "GatewayTimeout", "BadGateway", "Aborted", "Unknown",
+}
+
+
+class LLMTimeoutError(TimeoutError):
+    """The LLM call (or waiting for a concurrency slot) exceeded its timeout."""
+
+
+class CircuitOpenError(RuntimeError):
+    """The circuit breaker is open; the call was rejected without contacting the LLM."""
+
+
+def is_retryable(error: Exception) -> bool:
+    return any(cls.__name__ in _RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker.
+
+    Tracks the outcome of the last `window` calls. Once at least `min_calls`
+    are recorded and the failure ratio reaches `failure_threshold`, the
+    breaker opens and rejects calls for `cooldown` seconds. After that a single
+    trial call is let through (half-open); success closes the breaker again,
+    failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold=0.5, window=20, min_calls=5, cooldown=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self._clock = clock
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        """Raise CircuitOpenError if calls are currently being rejected."""
+        with self._lock:
+            state = self._state()
+            if state == "open" or (state == "half_open" and self._trial_in_flight):
+                raise CircuitOpenError("LLM circuit breaker is open; failing fast")
+            if state == "half_open":
+                self._trial_in_flight = True
+
+    def record(self, success: bool):
+        with self._lock:
+            if self._state() == "half_open":
+                self._trial_in_flight = False
+                if success:
+                    self._opened_at = None
+                    self._outcomes.clear()
+                else:
+                    self._opened_at = self._clock()
+                return
+
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_threshold:
+                self._opened_at = self._clock()
+
+
+class LatencyHistogram:
+    """Cumulative-bucket latency histogram (Prometheus style) for one call site."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, success: bool = True):
+        with self._lock:
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    self.counts[i] += 1
+                    break
+            self.total += seconds
+            self.count += 1
+            if not success:
+                self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            cumulative, running = [], 0
+            for count in self.counts:
+                running += count
+                cumulative.append(running)
+            return {
+                "buckets": list(zip(self.buckets, cumulative)),
+                "sum": self.total,
+                "count": self.count,
+                "errors": self.errors,
+            }
+
+
+# Process-wide latency histograms keyed by call site
+_latency = {}
+_latency_lock = threading.Lock()
+
+
+def latency_histogram(call_site: str) -> LatencyHistogram:
+    with _latency_lock:
+        if call_site not in _latency:
+            _latency[call_site] = LatencyHistogram()
+        return _latency[call_site]
+
+
+def _reset_latency_after_fork():
+    # Forked processes report their own calls only (see observability/metrics.py)
+    global _latency_lock
+    _latency_lock = threading.Lock()
+    _latency.clear()
+
+
+os.register_at_fork(after_in_child=_reset_latency_after_fork)
+
+
+def latency_snapshot():
+    """Return {call_site: histogram snapshot} for every call site seen so far."""
+    with _latency_lock:
+        sites = dict(_latency)
+    return {site: histogram.snapshot() for site, histogram in sites.items()}
+
+
+class LLMClient:
+    """
+    Drop-in replacement for GenerativeModel with timeouts, retries, a circuit
+    breaker, a concurrency limit and per-call-site latency metrics.
+
+    Args:
+        backend: Object with generate_content(prompt, stream=False) (Gemini model or fake)
+        timeout: Seconds to wait for a response (or, when streaming, for each chunk)
+        max_retries: Retries after the first attempt for transient errors
+        backoff_base / backoff_max: Exponential backoff bounds in seconds (full jitter)
+        max_concurrency: Backend calls allowed in flight at once across threads (a call abandoned
+            after a timeout holds its slot until the backend returns)
+        breaker: CircuitBreaker instance (a default one is created if omitted)
+    """
+
+    def __init__(self, backend, timeout=30.0, max_retries=2, backoff_base=0.5, backoff_max=8.0,
+                 max_concurrency=4, breaker=None, sleep=time.sleep):
+        self.backend = backend
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self._sleep = sleep
+
+    def generate_content(self, prompt, stream=False, call_site="default"):
+        """Call the backend; returns a response with `.text`, or an iterator of chunks when streaming."""
+        if stream:
+            return self._stream(prompt, call_site)
+        return self._with_retries(lambda: self._call(prompt, stream=False), call_site)
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _with_retries(self, fn, call_site, record_success=True):
+        # record_success=False leaves recording a successful call to the caller (see _stream)
+        histogram = latency_histogram(call_site)
+        for attempt in range(self.max_retries + 1):
+            self.breaker.before_call()
+            start = time.perf_counter()
+            try:
+                result = fn()
+            except Exception as e:
+                histogram.observe(time.perf_counter() - start, success=False)
+                self.breaker.record(False)
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                print(f"LLM call '{call_site}' failed ({type(e).__name__}: {e}); retry {attempt + 1}/{self.max_retries}")
+                self._sleep(self._backoff(attempt))
+                continue
+            if record_success:
+                histogram.observe(time.perf_counter() - start, success=True)
+                self.breaker.record(True)
+            return result
+
+    def _run_with_timeout(self, fn):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise LLMTimeoutError(f"No free LLM slot within {self.timeout}s")
+        try:
+            future = self._executor.submit(fn)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is freed when the backend call returns, not when we stop waiting for it:
+        # an abandoned call keeps its worker thread, so it must keep counting against the limit
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise LLMTimeoutError(f"LLM call exceeded {self.timeout}s")
+
+    def _call(self, prompt, stream):
+        # Backends take (or ignore) the SDK's request_options themselves
+        request_options = {"timeout": self.timeout}
+        return self._run_with_timeout(
+            lambda: self.backend.generate_content(prompt, stream=stream, request_options=request_options)
+        )
+
+    def _stream(self, prompt, call_site):
+        # Retries are only possible until the first chunk has been handed to the caller.
+        # The latency and breaker outcome cover the whole stream, so a stall or error
+        # after the first chunk still counts as a failed call.
+        started = [None]
+
+        def first_chunk():
+            started[0] = time.perf_counter()
+            iterator = iter(self._call(prompt, stream=True))
+            return iterator, self._run_with_timeout(lambda: next(iterator, None))
+
+        iterator, chunk = self._with_retries(first_chunk, call_site, record_success=False)
+        success = False
+        try:
+            while chunk is not None:
+                yield chunk
+                chunk = self._run_with_timeout(lambda: next(iterator, None))
+            success = True
+        except GeneratorExit:
+            # The caller stopped reading early; the backend itself did not fail
+            success = True
+            raise
+        finally:
+            latency_histogram(call_site).observe(time.perf_counter() - started[0], success=success)
+            self.breaker.record(success)
+
+
+# Process-wide clients keyed by backend (api key or fake)
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key=None) -> LLMClient:
+    """
+    Return the shared LLMClient for this process.
+
+    Uses the offline FakeGenerativeModel when PLATEMATE_FAKE_LLM is set.
+    Tunables: PLATEMATE_LLM_TIMEOUT, PLATEMATE_LLM_MAX_RETRIES, PLATEMATE_LLM_MAX_CONCURRENCY.
+    """
+    fake = bool(os.getenv("PLATEMATE_FAKE_LLM"))
+    key = "fake" if fake else api_key
+
+    with _clients_lock:
+        if key not in _clients:
+            if fake:
+                backend = FakeGenerativeModel(latency=float(os.getenv("PLATEMATE_FAKE_LLM_LATENCY", "0")))
+            else:
+                import google.generativeai as genai
+                genai.configure(api_key=api_key)
+                backend = genai.GenerativeModel(MODEL_NAME)
+
+            _clients[key] = LLMClient(
+                backend,
+                timeout=float(os.getenv("PLATEMATE_LLM_TIMEOUT", "30")),
+                max_retries=int(os.getenv("PLATEMATE_LLM_MAX_RETRIES", "2")),
+                max_concurrency=int(os.getenv("PLATEMATE_LLM_MAX_CONCURRENCY", "4")),
+            )
+        return _clients[key]
@@ -0,0 +1,119 @@
+"""
+Offline stand-in for google.generativeai.GenerativeModel.
+
+Used when PLATEMATE_FAKE_LLM is set so the AI pages (and the RAG pipeline)
+can be exercised without network access or an API key. It mimics the small
+part of the Gemini SDK that the app relies on: `generate_content(prompt)`
+returns an object with a `.text` attribute, and `stream=True` returns an
+iterable of such chunks.
+"""
+
+import json
+import re
+import time
+
+
+# Canned SQL returned for NL → SQL prompts (wrapped in a code fence, like Gemini often does)
+FAKE_SQL = """```sql
+SELECT m.name, ROUND(AVG(r.overall), 2) AS avg_overall, COUNT(*) AS review_count
+FROM reviews rv
+JOIN ratings r ON rv.rating_id = r.id
+JOIN menu_items m ON rv.menu_item_id = m.id
+GROUP BY m.id, m.name
+ORDER BY avg_overall DESC
+LIMIT 5;
+```"""
+
+
+class FakeResponse:
+    """Minimal response/chunk object exposing `.text` like the Gemini SDK."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+FAKE_SUGGESTIONS = [
+    {
+        "title": "Keep the recipe consistent",
+        "description": "(offline fake model) Customers respond to consistency; document the recipe and check plating each shift.",
+        "category": "recipe",
+    },
+    {
+        "title": "Monitor value perception",
+        "description": "(offline fake model) Track value ratings monthly before changing the price so adjustments are based on trends.",
+        "category": "pricing",
+    },
+    {
+        "title": "Offer a sharing size",
+        "description": "(offline fake model) A larger sharing portion could suit groups and lift the portion rating.",
+        "category": "portion",
+    },
+]
+
+
+class FakeGenerativeModel:
+    """
+    Deterministic fake for GenerativeModel.generate_content.
+
+    Args:
+        latency: Seconds to sleep per call (and per streamed chunk) to simulate network time
+        chunk_size: Number of words per streamed chunk
+        errors: Exceptions to raise on the first calls, in order (to exercise retries/circuit breaking)
+    """
+
+    def __init__(self, latency=0.0, chunk_size=3, errors=None):
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.errors = list(errors or [])
+        self.prompts = []
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.prompts.append(prompt)
+        if self.errors:
+            raise self.errors.pop(0)
+        text = self._respond(prompt)
+
+        if not stream:
+            if self.latency:
+                time.sleep(self.latency)
+            return FakeResponse(text)
+
+        return self._stream(text)
+
+    def _stream(self, text):
+        words = text.split(" ")
+        for i in range(0, len(words), self.chunk_size):
+            if self.latency:
+                time.sleep(self.latency)
+            chunk = " ".join(words[i:i + self.chunk_size])
+            # Keep the separating space so concatenated chunks equal the full text
+            if i + self.chunk_size < len(words):
+                chunk += " "
+            yield FakeResponse(chunk)
+
+    def _respond(self, prompt):
+        if "generate a SINGLE SQLite-compatible SQL query" in prompt:
+            return FAKE_SQL
+
+        # Batched dish suggestions: JSON object keyed by the requested dish names
+        match = re.search(r"keys are exactly these dish names:\n\[(.*)\]", prompt)
+        if match:
+            names = json.loads(f"[{match.group(1)}]")
+            return json.dumps({name: FAKE_SUGGESTIONS for name in names})
+
+        if "EXACTLY 3 actionable suggestions" in prompt:
+            return json.dumps(FAKE_SUGGESTIONS)
+
+        # Final-answer prompt: summarise the table that was passed in
+        match = re.search(r"Here is the SQL result table:\n(.*)\n\nExplain", prompt, re.S)
+        table = match.group(1).strip() if match else ""
+        rows = [line for line in table.splitlines()[1:] if line.strip()]
+        if not rows:
+            return "The query returned no rows, so there is nothing to report for this question."
+
+        top = rows[0].split()
+        return (
+            f"**(offline fake model)** The query returned {len(rows)} row(s). "
+            f"The first result is {' '.join(top)}. "
+            "Set GEMINI_API_KEY and unset PLATEMATE_FAKE_LLM for a real answer."
+        )
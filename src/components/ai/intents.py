@@ -0,0 +1,309 @@
+"""
+Local intent matching for the AI assistant.
+
+Common questions (top/bottom dishes, most/least reviewed dishes, average
+rating by category, reviews per month, return-customer rate overall or for one
+dish, reviews mentioning a word and how many do) map directly onto
+fixed aggregations or the review full-text index. These are
+answered with prebuilt parameterized SQL and a templated answer, so only the
+remaining questions need the two Gemini round-trips in rag_answer.
+"""
+
+import re
+import pandas as pd
+from data.reviewSearch import build_count_sql, build_search_sql
+
+
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+
+_DIMENSIONS = ("taste", "portion", "value")
+
+# Largest list a prebuilt intent returns
+MAX_COUNT = 50
+
+# A count only counts next to the ranking word or the noun: "top 5", "5 best", "best 3 dishes", "10 items"
+_COUNT_VALUE = r"(?P<count>\d{1,3}|" + "|".join(_NUMBER_WORDS) + r")"
+_COUNT = re.compile(
+    rf"\b(?:top|bottom|best|worst|highest|lowest|most|least|fewest)\s+{_COUNT_VALUE}\b"
+    rf"|\b{_COUNT_VALUE.replace('count>', 'count2>')}\s+"
+    r"(?:top|bottom|best|worst|highest|lowest|most|least|fewest|dish(?:es)?|items?|menu items?|foods?|meals?|plates?)\b"
+)
+
+# Anything that narrows the question beyond the prebuilt queries goes to the LLM
+_DISQUALIFIERS = re.compile(
+    r"\b(this|last|past|previous|since|before|after|during|between|today|yesterday|week|"
+    r"year|20\d\d|january|february|march|april|may|june|july|august|september|october|"
+    r"november|december|reviewer|customer id|compare|trend|why|where)\b"
+)
+
+_TOP = re.compile(r"\b(top|best|highest|most highly)\b")
+_BOTTOM = re.compile(r"\b(bottom|worst|lowest|least)\b")
+_DISH = re.compile(r"\b(dish|dishes|items?|menu|foods?|meals?|plates?)\b")
+_RATING = re.compile(r"\b(rated|ratings?|scor(e|es|ing)|overall|taste|portion|value|performing)\b")
+_VOLUME = re.compile(
+    r"\b(number of reviews|reviews? counts?|review volume|(most|fewest|least) reviews|"
+    r"(most|least) (reviewed|popular)|popularity)\b"
+)
+_FEWEST = re.compile(r"\b(fewest|least|bottom|lowest)\b")
+# Plural nouns (or verbs) ask for a list; "what is the best dish" asks for one
+_PLURAL = re.compile(r"\b(dishes|items|foods|meals|plates|are|were|ones)\b")
+_CATEGORY_AVG = re.compile(
+    r"\b(average|avg|mean)\b.*\b(by|per|for each|each|across|of all)\b.*\b(categor(y|ies)|dimensions?|aspects?)\b"
+    r"|\btaste\b.*\bportion\b.*\bvalue\b"
+)
+_MONTHLY_COUNT = re.compile(
+    r"\b(how many|number of|count|counts|volume)\b.*\breviews?\b.*\b(per|by|each|every|a) month\b"
+    r"|\breviews? (per|by|each|a) month\b|\bmonthly reviews?\b|\breview (count|volume)s? by month\b"
+)
+_RETURN_RATE = re.compile(
+    r"\b(return|returning|repeat)[- ]?(customer|rate|visit|percentage)s?\b"
+    r"|\b(would|will) (customers )?(return|come back)\b|\bcome back\b"
+)
+# "... return for the X": a return rate for something specific
+_NAMED_OBJECT = re.compile(r"\b(for|after|to|of) (the|a|an|their|our)\b")
+
+_REVIEW_SEARCH = re.compile(
+    r"\breviews?\b.*?\b(mention|mentions|mentioning|containing|contain|contains|saying|says|with the words?)\b\s+"
+    r"(?P<terms>.+?)[?.!]*$"
+)
+_SEARCH_COUNT = re.compile(r"\b(how many|number of|count)\b")
+# Breakdowns of the matches ("per month", "which dishes ...") need GROUP BY: leave them to the LLM
+_SEARCH_GROUPING = re.compile(
+    r"\b(per|by|each|every|which|what) (months?|days?|weeks?|dish(es)?|items?|menu items?|reviewers?)\b"
+)
+
+_RATINGS_JOIN = """
+FROM reviews rv
+JOIN ratings r ON rv.rating_id = r.id
+JOIN menu_items m ON rv.menu_item_id = m.id
+"""
+
+
+def _extract_count(question: str, default: int = 5) -> int:
+    """The list length asked for ("top 5", "three best"), clamped to 1..MAX_COUNT; other numbers are ignored."""
+    match = _COUNT.search(question)
+    if not match:
+        return default
+    value = match.group("count") or match.group("count2")
+    count = int(value) if value.isdigit() else _NUMBER_WORDS[value]
+    return min(max(1, count), MAX_COUNT)
+
+
+def _extract_dimension(question: str) -> str:
+    mentioned = [d for d in _DIMENSIONS if re.search(rf"\b{d}\b", question)]
+    return mentioned[0] if len(mentioned) == 1 else "overall"
+
+
+def _extract_dish(question: str, dish_names) -> str:
+    """The menu item named in the question (longest name wins), or None."""
+    named = [name for name in dish_names if re.search(rf"\b{re.escape(name.lower())}s?\b", question)]
+    return max(named, key=len) if named else None
+
+
+def match_intent(question: str, dish_names=()):
+    """
+    Match a question against the prebuilt intents.
+
+    Args:
+        question: The user's question
+        dish_names: Menu item names, so questions about one dish can be recognised
+
+    Returns:
+        dict with keys 'name', 'sql', 'params' (and intent-specific extras),
+        or None when the question should fall through to Gemini.
+    """
+    if not question:
+        return None
+
+    q = question.lower().strip()
+
+    # Text search is answered from the FTS index. The search terms can be anything,
+    # so the disqualifiers only apply to the rest of the question.
+    search = _REVIEW_SEARCH.search(q)
+    if search:
+        if _DISQUALIFIERS.search(q[:search.start("terms")]) or _SEARCH_GROUPING.search(q):
+            return None
+        # "or" stays: to_fts_query turns it into alternatives
+        terms = re.sub(r"\b(the words?|and)\b", " ", search.group("terms"))
+        terms = " ".join(terms.replace('"', " ").replace("'", " ").split())
+        if terms:
+            if _SEARCH_COUNT.search(q[:search.start("terms")]):
+                sql, params = build_count_sql(terms)
+                return {"name": "review_search_count", "sql": sql, "params": params, "terms": terms}
+            sql, params = build_search_sql(terms, limit=20)
+            return {"name": "review_search", "sql": sql, "params": params, "terms": terms}
+
+    if _DISQUALIFIERS.search(q):
+        return None
+
+    if _MONTHLY_COUNT.search(q):
+        return {
+            "name": "reviews_by_month",
+            "sql": (
+                "SELECT substr(time_stamp, 1, 7) AS month, COUNT(*) AS review_count\n"
+                "FROM reviews\nGROUP BY month\nORDER BY month;"
+            ),
+            "params": (),
+        }
+
+    if _RETURN_RATE.search(q):
+        dish = _extract_dish(q, dish_names)
+        if dish is None and (_DISH.search(q) or _NAMED_OBJECT.search(q)):
+            # Per-dish breakdowns, or a dish we don't know by that name: leave it to the LLM
+            return None
+        return {
+            "name": "return_rate",
+            "sql": (
+                "SELECT COUNT(*) AS total_reviews,\n"
+                "       SUM(return_customer) AS would_return,\n"
+                "       ROUND(100.0 * AVG(return_customer), 1) AS return_rate_pct\n"
+                "FROM ratings r\nJOIN reviews rv ON rv.rating_id = r.id"
+                + ("\nJOIN menu_items m ON rv.menu_item_id = m.id\nWHERE m.name = ?;" if dish else ";")
+            ),
+            "params": (dish,) if dish else (),
+            "dish": dish,
+        }
+
+    if _CATEGORY_AVG.search(q):
+        return {
+            "name": "category_averages",
+            "sql": (
+                "SELECT ROUND(AVG(r.taste), 2) AS taste,\n"
+                "       ROUND(AVG(r.portion), 2) AS portion,\n"
+                "       ROUND(AVG(r.value), 2) AS value,\n"
+                "       ROUND(AVG(r.overall), 2) AS overall\n"
+                "FROM ratings r\nJOIN reviews rv ON rv.rating_id = r.id;"
+            ),
+            "params": (),
+        }
+
+    default_count = 5 if _PLURAL.search(q) else 1
+
+    if _DISH.search(q) and _VOLUME.search(q):
+        fewest = bool(_FEWEST.search(q))
+        count = _extract_count(q, default_count)
+        return {
+            "name": "least_reviewed_dishes" if fewest else "most_reviewed_dishes",
+            "sql": (
+                "SELECT m.name, COUNT(*) AS review_count, ROUND(AVG(r.overall), 2) AS avg_overall"
+                f"{_RATINGS_JOIN}"
+                f"GROUP BY m.id, m.name\nORDER BY review_count {'ASC' if fewest else 'DESC'}, m.name\nLIMIT ?;"
+            ),
+            "params": (count,),
+            "count": count,
+        }
+
+    is_top, is_bottom = bool(_TOP.search(q)), bool(_BOTTOM.search(q))
+    if _DISH.search(q) and _RATING.search(q) and is_top != is_bottom:
+        dimension = _extract_dimension(q)
+        direction = "DESC" if is_top else "ASC"
+        count = _extract_count(q, default_count)
+        return {
+            "name": "top_dishes" if is_top else "bottom_dishes",
+            "sql": (
+                f"SELECT m.name, ROUND(AVG(r.{dimension}), 2) AS avg_{dimension}, COUNT(*) AS review_count"
+                f"{_RATINGS_JOIN}"
+                f"GROUP BY m.id, m.name\nORDER BY avg_{dimension} {direction}, review_count DESC\nLIMIT ?;"
+            ),
+            "params": (count,),
+            "dimension": dimension,
+            "count": count,
+        }
+
+    return None
+
+
+def answer_intent(intent: dict, df: pd.DataFrame) -> str:
+    """Render a templated Markdown answer for a matched intent and its result table."""
+    name = intent["name"]
+
+    if name == "review_search_count":
+        count = int(df.iloc[0]["review_count"]) if not df.empty else 0
+        return f"**{count}** review{'' if count == 1 else 's'} mention{'s' if count == 1 else ''} *{intent['terms']}*."
+
+    if df.empty:
+        if name == "review_search":
+            return f"No reviews mention *{intent['terms']}*."
+        return "There is no review data available to answer this question yet."
+
+    if name in ("top_dishes", "bottom_dishes"):
+        dimension = intent["dimension"]
+        col = f"avg_{dimension}"
+        label = "highest" if name == "top_dishes" else "lowest"
+        if len(df) == 1:
+            row = df.iloc[0]
+            return (
+                f"The {label}-rated dish by average {dimension} rating is **{row['name']}** — "
+                f"{row[col]:.2f} / 5 ({int(row['review_count'])} reviews)."
+            )
+        lines = [
+            f"{i + 1}. **{row['name']}** — {row[col]:.2f} / 5 ({int(row['review_count'])} reviews)"
+            for i, row in df.iterrows()
+        ]
+        return (
+            f"Here are the {len(df)} {label}-rated dishes by average {dimension} rating:\n\n"
+            + "\n".join(lines)
+        )
+
+    if name in ("most_reviewed_dishes", "least_reviewed_dishes"):
+        label = "most" if name == "most_reviewed_dishes" else "least"
+        lines = [
+            f"{i + 1}. **{row['name']}** — {int(row['review_count'])} reviews (average {row['avg_overall']:.2f} / 5)"
+            for i, row in df.iterrows()
+        ]
+        if len(df) == 1:
+            return f"The {label}-reviewed dish is **{df.iloc[0]['name']}** with {int(df.iloc[0]['review_count'])} reviews."
+        return f"Here are the {len(df)} {label}-reviewed dishes:\n\n" + "\n".join(lines)
+
+    if name == "category_averages":
+        row = df.iloc[0]
+        return (
+            "Average ratings across all reviews:\n\n"
+            f"- **Taste:** {row['taste']:.2f} / 5\n"
+            f"- **Portion:** {row['portion']:.2f} / 5\n"
+            f"- **Value:** {row['value']:.2f} / 5\n"
+            f"- **Overall:** {row['overall']:.2f} / 5"
+        )
+
+    if name == "reviews_by_month":
+        busiest = df.loc[df["review_count"].idxmax()]
+        quietest = df.loc[df["review_count"].idxmin()]
+        return (
+            f"Reviews were received over {len(df)} months ({df['month'].iloc[0]} to {df['month'].iloc[-1]}), "
+            f"{int(df['review_count'].sum())} in total and {df['review_count'].mean():.1f} per month on average. "
+            f"The busiest month was **{busiest['month']}** with {int(busiest['review_count'])} reviews and the "
+            f"quietest was **{quietest['month']}** with {int(quietest['review_count'])}."
+        )
+
+    if name == "review_search":
+        lines = [
+            f"- **{row['dish']}** ({row['time_stamp']}, {int(row['overall'])}★): {row['snippet']}"
+            for _, row in df.iterrows()
+        ]
+        return (
+            f"Found {len(df)} review(s) mentioning *{intent['terms']}* (best matches first):\n\n"
+            + "\n".join(lines)
+        )
+
+    if name == "return_rate":
+        row = df.iloc[0]
+        dish = intent.get("dish")
+        if not row["total_reviews"]:
+            return f"There are no reviews of {dish} yet." if dish else "There are no reviews yet."
+        return (
+            f"**{row['return_rate_pct']:.1f}%** of reviewers{f' of the {dish}' if dish else ''} "
+            f"said they would return ({int(row['would_return'])} of {int(row['total_reviews'])} reviews)."
+        )
+
+    return df.to_string(index=False)
+
+
+def display_sql(intent: dict) -> str:
+    """Return the intent's SQL with parameters inlined, for showing to the user."""
+    sql = intent["sql"]
+    for param in intent["params"]:
+        sql = sql.replace("?", repr(param), 1)
+    return f"-- answered locally (intent: {intent['name']})\n{sql}"
@@ -1,7 +1,12 @@
 import sqlite3
-import google.generativeai as genai
+from contextlib import closing
 import pandas as pd
 
+from components.ai.client import LLMClient, get_client
+from components.ai.intents import match_intent, answer_intent, display_sql
+from data.reviewSearch import connect, ensure_fts_index, FTS_SCHEMA
+from observability.metrics import phase
+
 
 # ===========================================
 # 1. Load SQL file → SQLite (persistent)
@@ -57,6 +62,23 @@ def load_sql_db(sql_file: str, db_path: str = None):
     return conn
 
 
+def open_review_db(sql_file: str, db_path: str = None):
+    """
+    The database questions are answered from: by default the search database
+    built from the loaded dataset (kept current by ingestion, see
+    data/reviewSearch.py); with `db_path`, that file loaded from `sql_file`
+    with the full-text index added.
+    """
+    if db_path is None:
+        return connect()
+    return ensure_fts_index(load_sql_db(sql_file, db_path))
+
+
+def dish_names(conn):
+    """Menu item names, for recognising questions about one dish."""
+    return [row[0] for row in conn.execute("SELECT name FROM menu_items")]
+
+
 # ===========================================
 # 2. Extract schema (RAG context)
 # ===========================================
@@ -74,7 +96,8 @@ def extract_schema(sql_file: str):
         if keep and line.strip().endswith(");"):
             keep = False
 
-    return "".join(schema)
+    # The FTS index is created at load time, not in the SQL dump
+    return "".join(schema) + FTS_SCHEMA
 
 
 # ===========================================
@@ -95,7 +118,7 @@ Question: "{question}"
 
 Return only the SQL. No explanation.
 """
-    response = model.generate_content(prompt)
+    response = model.generate_content(prompt, call_site="sql_generation")
     sql = response.text.strip()
 
     # Remove markdown code blocks if present
@@ -112,17 +135,17 @@ Return only the SQL. No explanation.
 # ===========================================
 # 4. Execute SQL → Pandas
 # ===========================================
-def run_sql(conn, sql_query: str):
-    return pd.read_sql_query(sql_query, conn)
+def run_sql(conn, sql_query: str, params=None):
+    return pd.read_sql_query(sql_query, conn, params=params)
 
 
 # ===========================================
 # 5. Gemini → Final Answer (Optional reasoning on data)
 # ===========================================
-def llm_generate_final_answer(question: str, df: pd.DataFrame, model):
+def _final_answer_prompt(question: str, df: pd.DataFrame):
     data_str = df.to_string(index=False)
 
-    prompt = f"""
+    return f"""
 You are a data analyst.
 
 User question:
@@ -134,30 +157,109 @@ Here is the SQL result table:
 Explain the answer in clear natural language.
 """
 
-    response = model.generate_content(prompt)
+
+def llm_generate_final_answer(question: str, df: pd.DataFrame, model):
+    response = model.generate_content(_final_answer_prompt(question, df), call_site="final_answer")
     return response.text
 
 
+def llm_stream_final_answer(question: str, df: pd.DataFrame, model):
+    """Yield the final answer text chunk by chunk as Gemini streams it."""
+    response = model.generate_content(_final_answer_prompt(question, df), stream=True, call_site="final_answer")
+    for chunk in response:
+        text = getattr(chunk, "text", "")
+        if text:
+            yield text
+
+
+# ===========================================
+# 6. Model selection (Gemini or offline fake)
+# ===========================================
+def get_model(api_key: str = None, model=None):
+    """
+    Return the resilient LLM client (timeouts, retries, circuit breaker).
+
+    Uses the shared Gemini client, or the offline fake when PLATEMATE_FAKE_LLM
+    is set. A raw model passed in (e.g. a fake in tests) is wrapped in its own client.
+    """
+    if model is None:
+        return get_client(api_key)
+    if isinstance(model, LLMClient):
+        return model
+    return LLMClient(model)
+
+
 # ===========================================
-# 6. RAG Pipeline (end-to-end)
+# 7. RAG Pipeline (end-to-end)
 # ===========================================
-def rag_answer(question: str, sql_file: str, api_key: str, db_path: str = None):
-    # Init LLM
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel("gemini-2.5-flash")
-
-    # Load SQL DB and schema
-    conn = load_sql_db(sql_file, db_path)
-    schema = extract_schema(sql_file)
-
-    # Stage 1 — NL → SQL
-    sql_query = llm_generate_sql(question, schema, model)
-    print("\n[Generated SQL]\n", sql_query)
-
-    # Stage 2 — Execute SQL
-    df = run_sql(conn, sql_query)
-    print("\n[SQL Results]\n", df)
-
-    # Stage 3 — Structured → Final NL Answer
-    answer = llm_generate_final_answer(question, df, model)
-    return answer
\ No newline at end of file
+def rag_answer_stream(question: str, sql_file: str, api_key: str, db_path: str = None, model=None):
+    """
+    Run the RAG pipeline and yield results as soon as each stage finishes.
+
+    Yields (stage, payload) tuples:
+        ("sql", str)            — the generated SQL query
+        ("table", DataFrame)    — the query result
+        ("answer", str)         — the next chunk of the natural-language answer
+
+    Questions recognised by match_intent are answered locally without Gemini.
+    """
+    with phase("data_load"):
+        conn = open_review_db(sql_file, db_path)
+
+    # Closed when the generator finishes, fails or is closed early by the consumer
+    with closing(conn):
+        intent = match_intent(question, dish_names(conn))
+        if intent is not None:
+            yield "sql", display_sql(intent)
+            with phase("aggregation"):
+                df = run_sql(conn, intent["sql"], intent["params"])
+            yield "table", df
+            yield "answer", answer_intent(intent, df)
+            return
+
+        model = get_model(api_key, model)
+        with phase("data_load"):
+            schema = extract_schema(sql_file)
+
+        with phase("llm"):
+            sql_query = llm_generate_sql(question, schema, model)
+        yield "sql", sql_query
+
+        with phase("aggregation"):
+            df = run_sql(conn, sql_query)
+        yield "table", df
+
+        # Time waiting for each streamed chunk is LLM time; time spent by the consumer is not
+        chunks = llm_stream_final_answer(question, df, model)
+        while True:
+            with phase("llm"):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            yield "answer", chunk
+
+
+def rag_answer(question: str, sql_file: str, api_key: str, db_path: str = None, model=None):
+    # Load SQL DB
+    with closing(open_review_db(sql_file, db_path)) as conn:
+        # Stage 0 — Common questions are answered from prebuilt SQL, no LLM needed
+        intent = match_intent(question, dish_names(conn))
+        if intent is not None:
+            df = run_sql(conn, intent["sql"], intent["params"])
+            return answer_intent(intent, df)
+
+        # Init LLM and schema
+        model = get_model(api_key, model)
+        schema = extract_schema(sql_file)
+
+        # Stage 1 — NL → SQL
+        sql_query = llm_generate_sql(question, schema, model)
+        print("\n[Generated SQL]\n", sql_query)
+
+        # Stage 2 — Execute SQL
+        df = run_sql(conn, sql_query)
+        print("\n[SQL Results]\n", df)
+
+        # Stage 3 — Structured → Final NL Answer
+        answer = llm_generate_final_answer(question, df, model)
+        return answer
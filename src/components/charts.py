@@ -2,20 +2,33 @@
 Chart components using Plotly
 """
 
-import random
-from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
-from faker import Faker
 import plotly.express as px
 import plotly.graph_objects as go
-from data.loadData import loadData
-from dash import dcc, html, Input, Output
+from data.loadData import loadData, cached_on_data
+from data.mockReviews import generate_mock_reviews
+from data.recentReviews import recent_reviews
+from data.reviewDuplicates import flag_duplicates
+from components.figureEncoding import compact_figure
+from components.downsampling import downsample_frame, render_mode, scatter_trace
+from observability.metrics import phase
+from dash import dcc, html, Input, Output, State, ClientsideFunction
 
 
 
 
 # Helper to build merged dataframe from mockData.json
-def _build_merged_df():
+def _build_merged_df(include_duplicates=False):
+    # Callers add columns to the frame, so hand out a copy of the cached join
+    merged = _merged_df_snapshot()
+    if not include_duplicates and "duplicate" in merged.columns:
+        merged = merged[~merged["duplicate"]]
+    return merged.copy()
+
+
+@cached_on_data
+def _merged_df_snapshot():
     data = loadData()
     reviews_df = pd.DataFrame(data.get("reviews", []))
     ratings_df = pd.DataFrame(data.get("ratings", []))
@@ -24,14 +37,17 @@ def _build_merged_df():
 
     # Safe merges — reviews are expected to have rating_id and menu_item_id
     if not reviews_df.empty and not ratings_df.empty and not menu_df.empty:
-        merged = (
-            reviews_df
-            .merge(ratings_df, left_on="rating_id", right_on="id", suffixes=("_review", "_rating"))
-            .merge(menu_df, left_on="menu_item_id", right_on="id", suffixes=("", "_menu"))
-        )
-        # If content exists, merge in text content
-        if not content_df.empty and "content_id" in merged.columns:
-            merged = merged.merge(content_df, left_on="content_id", right_on="id", suffixes=("", "_content"))
+        with phase("aggregation"):
+            merged = (
+                reviews_df
+                .merge(ratings_df, left_on="rating_id", right_on="id", suffixes=("_review", "_rating"))
+                .merge(menu_df, left_on="menu_item_id", right_on="id", suffixes=("", "_menu"))
+            )
+            # If content exists, merge in text content
+            if not content_df.empty and "content_id" in merged.columns:
+                merged = merged.merge(content_df, left_on="content_id", right_on="id", suffixes=("", "_content"))
+            # Near-duplicate reviews stay in the snapshot, flagged; _build_merged_df() leaves them out
+            merged = flag_duplicates(merged)
         return merged
 
     # Fallback empty df
@@ -45,42 +61,27 @@ def create_performance_chart():
     """
     merged = _build_merged_df()
 
-    names = []
-    ratings = []
-    reviews = []
-    colors = []
-
-    if not merged.empty:
-        # Expect merged to contain: name, taste, portion, value, rating_id (or id)
-        # Compute per-dish aggregated ratings
-        # Use the explicit `overall` rating in the ratings table when available
-        grp = merged.groupby("name").agg(
-            overall_mean=("overall", "mean"),
-            review_count=("rating_id", "count")
-        ).reset_index()
-
-        for _, row in grp.iterrows():
-            # prefer the recorded overall mean if present
-            overall = row.get("overall_mean")
-
-            names.append(row["name"])
-            ratings.append(overall)
-            reviews.append(int(row["review_count"]))
-
-            if overall < 3:
-                colors.append("#ef4444")
-            elif overall < 4.2:
-                colors.append("#f59e0b")
-            else:
-                colors.append("#10b981")
-    else:
+    if merged.empty:
         # Fallback: empty dataset
         return go.Figure()
-    
-    # Create figure
+
+    # Expect merged to contain: name, taste, portion, value, rating_id (or id)
+    # Compute per-dish aggregated ratings
+    # Use the explicit `overall` rating in the ratings table when available
+    grp = merged.groupby("name").agg(
+        overall_mean=("overall", "mean"),
+        review_count=("rating_id", "count")
+    ).reset_index()
+
+    names = grp["name"].to_numpy()
+    ratings = grp["overall_mean"].to_numpy()
+    reviews = grp["review_count"].to_numpy()
+    colors = np.select([ratings < 3, ratings < 4.2], ["#ef4444", "#f59e0b"], default="#10b981")
+
+    # Create figure; one marker per dish, so large menus render through WebGL
     fig = go.Figure()
     
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter_trace(len(grp))(
         x=reviews,
         y=ratings,
         mode='markers',
@@ -161,7 +162,9 @@ def create_all_stats_over_time_chart():
     container = html.Div(
         children=[
             html.Div(children=[dropdown], style={"width": "200px", "marginBottom": "12px"}),
-            dcc.Graph(id="all-stats-graph", figure=initial_fig, config={"displayModeBar": False})
+            dcc.Graph(id="all-stats-graph", figure=compact_figure(initial_fig), config={"displayModeBar": False}),
+            # All years' monthly series; the year dropdown slices it in the browser (assets/allStats.js)
+            dcc.Store(id="all-stats-store", data=all_stats_store_data(merged)),
         ]
     )
 
@@ -183,54 +186,16 @@ def create_review_charts():
         elif "Date" in merged.columns:
             merged["Date"] = pd.to_datetime(merged["Date"], errors="coerce")
 
-        # Use recorded overall rating where available
-        if "overall" in merged.columns:
-            merged["Overall Rating"] = merged["overall"]
-        else:
-            # attempt to synthesize if not present
-            merged["Overall Rating"] = merged[[c for c in ["taste", "portion", "value"] if c in merged.columns]].mean(axis=1)
-
-        df_sorted = merged.sort_values(by="Date", ascending=False)
-        last_10_reviews = df_sorted.head(10)
+        # Newest reviews come from the maintained recency index; no sort over the full history
+        last_10_reviews = recent_reviews().latest_frame(10).rename(columns={"timestamp": "Date"})
+        last_10_reviews["Overall Rating"] = last_10_reviews["overall"]
 
         # Reviews per month over time
         merged["YearMonth"] = merged["Date"].dt.to_period("M").astype(str)
         reviews_over_time = merged.groupby("YearMonth").size().reset_index(name="Review Count")
     else:
         # Fallback to synthetic sample data
-        fake = Faker()
-        random.seed(42)
-        Faker.seed(42)
-
-        dishes = [
-            "Margherita Pizza", "Truffle Pasta", "Spicy Tuna Roll", "Caesar Salad",
-            "BBQ Burger", "Avocado Toast", "Lobster Bisque", "Chicken Tikka Masala",
-            "Chocolate Lava Cake", "Sushi Platter", "Steak Frites", "Vegan Bowl"
-        ]
-
-        # Generate reviews
-        reviews = []
-        for _ in range(150):
-            dish = random.choice(dishes)
-            overall = random.randint(3, 5)
-            taste = random.randint(2, 5)
-            texture = random.randint(2, 5)
-            portion = random.randint(2, 5)
-            text = fake.sentence(nb_words=random.randint(10, 20))
-            days_ago = random.randint(0, 3 * 365)
-            date = datetime.now() - timedelta(days=days_ago)
-
-            reviews.append({
-                "Dish": dish,
-                "Overall Rating": overall,
-                "Taste Rating": taste,
-                "Texture Rating": texture,
-                "Price-to-Portion Rating": portion,
-                "Review Text": text,
-                "Date": date
-            })
-
-        df = pd.DataFrame(reviews)
+        df = generate_mock_reviews(150)
         df_sorted = df.sort_values(by="Date", ascending=False)
         last_10_reviews = df_sorted.head(10)
 
@@ -238,13 +203,16 @@ def create_review_charts():
         df["YearMonth"] = df["Date"].dt.to_period("M").astype(str)
         reviews_over_time = df.groupby("YearMonth").size().reset_index(name="Review Count")
 
-    # Line chart
+    # Line chart; long histories are thinned to about one point per pixel, keeping peaks and dips
+    total_periods = len(reviews_over_time)
+    reviews_over_time = downsample_frame(reviews_over_time, "YearMonth", "Review Count", method="minmax")
     line_fig = px.line(
         reviews_over_time,
         x="YearMonth",
         y="Review Count",
         title="📅 Review Volume Over Time",
-        markers=True
+        markers=len(reviews_over_time) == total_periods,
+        render_mode=render_mode(len(reviews_over_time)),
     )
     line_fig.update_layout(
         xaxis_title="Month",
@@ -275,6 +243,7 @@ def create_review_charts():
             "Date": True
         },
         title="⭐ Most Recent 10 Reviews",
+        render_mode=render_mode(len(last_10_reviews)),
     )
     scatter_fig.update_traces(marker=dict(size=12, color="orange"))
     scatter_fig.update_layout(xaxis_title="Date", yaxis_title="Overall Rating")
@@ -282,53 +251,98 @@ def create_review_charts():
     return scatter_fig, line_fig
 
 
-def create_all_stats_figure_for_year(year: int, merged: pd.DataFrame) -> go.Figure:
-    """Utility: return the figure for a specific year (used by callbacks)."""
-    if merged.empty:
-        return go.Figure()
+# Traces of the all-stats chart, in order; partial updates address them by index
+ALL_STATS_SERIES = [("Overall", "#7c3aed"), ("Taste", "#ef4444"), ("Portion", "#3b82f6"), ("Value", "#10b981")]
 
-    # Work on a copy to avoid modifying the original dataframe
-    merged = merged.copy()
 
-    if "timestamp" in merged.columns:
-        merged["Date"] = pd.to_datetime(merged["timestamp"], errors="coerce")
-    elif "Date" in merged.columns:
-        merged["Date"] = pd.to_datetime(merged["Date"], errors="coerce")
-    else:
-        return go.Figure()
+def _all_stats_title(year) -> str:
+    return f"Ratings Trend Over Time — {year}"
 
-    merged["YearMonth"] = merged["Date"].dt.to_period("M").astype(str)
-    merged["Year"] = merged["Date"].dt.year
 
-    # Use explicit overall
-    merged["Overall"] = merged["overall"].astype(float)
+def _monthly_stats(merged: pd.DataFrame):
+    """Monthly mean ratings for all years (YearMonth, Year + one column per series), or None without dates."""
+    with phase("aggregation"):
+        # Work on a copy to avoid modifying the original dataframe
+        merged = merged.copy()
+
+        if "timestamp" in merged.columns:
+            merged["Date"] = pd.to_datetime(merged["timestamp"], errors="coerce")
+        elif "Date" in merged.columns:
+            merged["Date"] = pd.to_datetime(merged["Date"], errors="coerce")
+        else:
+            return None
+
+        merged["YearMonth"] = merged["Date"].dt.to_period("M").astype(str)
+        merged["Year"] = merged["Date"].dt.year
+
+        # Use explicit overall
+        merged["Overall"] = merged["overall"].astype(float)
+
+        agg_cols = {"Overall": ("Overall", "mean")}
+        if "taste" in merged.columns:
+            agg_cols["Taste"] = ("taste", "mean")
+        if "portion" in merged.columns:
+            agg_cols["Portion"] = ("portion", "mean")
+        if "value" in merged.columns:
+            agg_cols["Value"] = ("value", "mean")
+
+        monthly = merged.groupby("YearMonth").agg(**agg_cols).reset_index()
+        for col in ["Overall", "Taste", "Portion", "Value"]:
+            if col not in monthly.columns:
+                monthly[col] = 0
+
+        # YearMonth is YYYY-MM — append day and parse using %Y-%m-%d
+        monthly["Year"] = pd.to_datetime(monthly["YearMonth"] + "-01", format="%Y-%m-%d", errors="coerce").dt.year
+        return monthly.sort_values("YearMonth")
+
+
+def _monthly_stats_for_year(year: int, merged: pd.DataFrame):
+    """Monthly mean ratings for one year, or None without dates."""
+    monthly = _monthly_stats(merged)
+    if monthly is None:
+        return None
+    return monthly[monthly["Year"] == int(year)]
+
+
+def all_stats_store_data(merged: pd.DataFrame):
+    """
+    Every month's mean ratings, compactly encoded for the browser-side year slicer.
+
+    Months are implied by position: {"start": "YYYY-MM", "series": {"Overall": [...], ...}}
+    has one value per calendar month from `start` on (null for months without reviews).
+    """
+    monthly = _monthly_stats(merged) if not merged.empty else None
+    if monthly is None or monthly.empty:
+        return None
+
+    periods = pd.PeriodIndex(monthly["YearMonth"], freq="M")
+    months = pd.period_range(periods.min(), periods.max(), freq="M")
+    dense = monthly.set_index(periods).reindex(months)
+    return {
+        "start": str(months[0]),
+        "series": {
+            name: [None if pd.isna(v) else round(float(v), 3) for v in dense[name]]
+            for name, _ in ALL_STATS_SERIES
+        },
+    }
 
-    agg_cols = {"Overall": ("Overall", "mean")}
-    if "taste" in merged.columns:
-        agg_cols["Taste"] = ("taste", "mean")
-    if "portion" in merged.columns:
-        agg_cols["Portion"] = ("portion", "mean")
-    if "value" in merged.columns:
-        agg_cols["Value"] = ("value", "mean")
 
-    monthly = merged.groupby("YearMonth").agg(**agg_cols).reset_index()
-    for col in ["Overall", "Taste", "Portion", "Value"]:
-        if col not in monthly.columns:
-            monthly[col] = 0
+def create_all_stats_figure_for_year(year: int, merged: pd.DataFrame) -> go.Figure:
+    """Utility: return the figure for a specific year (used by callbacks)."""
+    if merged.empty:
+        return go.Figure()
 
-    # YearMonth is YYYY-MM — append day and parse using %Y-%m-%d
-    monthly["Year"] = pd.to_datetime(monthly["YearMonth"] + "-01", format="%Y-%m-%d", errors="coerce").dt.year
-    df = monthly[monthly["Year"] == int(year)].sort_values("YearMonth")
+    df = _monthly_stats_for_year(year, merged)
+    if df is None:
+        return go.Figure()
 
+    # Always add every series (empty if the year has no data) so patches can address traces by index
     fig = go.Figure()
-    if not df.empty:
-        fig.add_trace(go.Scatter(x=df["YearMonth"], y=df["Overall"], mode="lines+markers", name="Overall", marker=dict(size=6), line=dict(color="#7c3aed")))
-        fig.add_trace(go.Scatter(x=df["YearMonth"], y=df["Taste"], mode="lines+markers", name="Taste", marker=dict(size=6), line=dict(color="#ef4444")))
-        fig.add_trace(go.Scatter(x=df["YearMonth"], y=df["Portion"], mode="lines+markers", name="Portion", marker=dict(size=6), line=dict(color="#3b82f6")))
-        fig.add_trace(go.Scatter(x=df["YearMonth"], y=df["Value"], mode="lines+markers", name="Value", marker=dict(size=6), line=dict(color="#10b981")))
+    for name, color in ALL_STATS_SERIES:
+        fig.add_trace(go.Scatter(x=df["YearMonth"], y=df[name], mode="lines+markers", name=name, marker=dict(size=6), line=dict(color=color)))
 
     fig.update_layout(
-        title={"text": f"Ratings Trend Over Time — {year}", "font": {"size": 16, "color": "#1f2937"}},
+        title={"text": _all_stats_title(year), "font": {"size": 16, "color": "#1f2937"}},
         xaxis_title="Month",
         yaxis_title="Average Rating",
         yaxis=dict(range=[0, 5]),
@@ -354,9 +368,12 @@ def register_all_stats_callbacks(app):
         register_all_stats_callbacks(app)
     """
 
-    @app.callback(Output("all-stats-graph", "figure"), Input("all-stats-year-dropdown", "value"))
-    def _update_all_stats_graph(selected_year):
-        if not selected_year:
-            return go.Figure()
-        return create_all_stats_figure_for_year(selected_year, _build_merged_df())
-
+    # Year changes are handled in the browser from the pre-shipped series: no server round-trip
+    app.clientside_callback(
+        ClientsideFunction(namespace="platemate", function_name="sliceAllStatsYear"),
+        Output("all-stats-graph", "figure"),
+        Input("all-stats-year-dropdown", "value"),
+        State("all-stats-store", "data"),
+        State("all-stats-graph", "figure"),
+        prevent_initial_call=True,
+    )
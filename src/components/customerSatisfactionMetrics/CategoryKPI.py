@@ -1,10 +1,14 @@
+import math
 import pandas as pd
 import plotly.graph_objects as go
+from dash import Patch
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 
 
 from data.loadData import loadData
+from data.reviewDuplicates import without_duplicates
+from observability.metrics import phase
 
 
 def get_color_by_rating(value):
@@ -58,6 +62,47 @@ def filter_data_by_period(reviews_df, ratings_df, period="overall"):
     return merged
 
     
+# Indicator traces in card order; partial updates address them by index
+KPI_CATEGORIES = ["taste", "portion", "value", "overall"]
+
+# Period labels for title
+PERIOD_LABELS = {
+    "overall": "All Time",
+    "month": "This Month",
+    "week": "This Week"
+}
+
+
+def compute_category_averages(period="overall"):
+    """Mean taste / portion / value / overall rating for the period (NaN when it has no reviews)."""
+    data = loadData()
+    # Near-duplicate reviews (data/reviewDuplicates.py) are left out
+    reviews_df = without_duplicates(pd.DataFrame(data["reviews"]))
+    ratings_df = pd.DataFrame(data["ratings"])
+
+    with phase("aggregation"):
+        # Filter data based on period
+        filtered_data = filter_data_by_period(reviews_df, ratings_df, period)
+
+        # Calculate averages from filtered data
+        return {category: filtered_data[category].mean() for category in KPI_CATEGORIES}
+
+
+def create_category_kpi_patch(period="overall"):
+    """Partial update for a period change: only the four values, their colors and the title are sent."""
+    averages = compute_category_averages(period)
+
+    patch = Patch()
+    for i, category in enumerate(KPI_CATEGORIES):
+        value = averages[category]
+        color = get_color_by_rating(value)
+        patch["data"][i]["value"] = None if math.isnan(value) else float(value)
+        patch["data"][i]["number"]["font"]["color"] = color
+        patch["data"][i]["gauge"]["bar"]["color"] = color
+    patch["layout"]["title"]["text"] = f"Satisfaction Metrics - {PERIOD_LABELS[period]}"
+    return patch
+
+
 def create_category_kpi_cards(period="overall"):
     """
     Create KPI cards showing average ratings for selected time period.
@@ -65,25 +110,11 @@ def create_category_kpi_cards(period="overall"):
     Args:
         period: "overall", "month", or "week"
     """
-    data = loadData()
-    reviews_df = pd.DataFrame(data["reviews"])
-    ratings_df = pd.DataFrame(data["ratings"])
-    
-    # Filter data based on period
-    filtered_data = filter_data_by_period(reviews_df, ratings_df, period)
-    
-    # Calculate averages from filtered data
-    taste_avg = filtered_data["taste"].mean()
-    portion_avg = filtered_data["portion"].mean()
-    value_avg = filtered_data["value"].mean()
-    overall_avg = filtered_data["overall"].mean()
-    
-    # Period labels for title
-    period_labels = {
-        "overall": "All Time",
-        "month": "This Month",
-        "week": "This Week"
-    }
+    averages = compute_category_averages(period)
+    taste_avg = averages["taste"]
+    portion_avg = averages["portion"]
+    value_avg = averages["value"]
+    overall_avg = averages["overall"]
     
     # Create subplots for 3 cards
     fig = make_subplots(
@@ -167,7 +198,7 @@ def create_category_kpi_cards(period="overall"):
     
     # Update layout with period in title
     fig.update_layout(
-        title=f"Satisfaction Metrics - {period_labels[period]}",
+        title=f"Satisfaction Metrics - {PERIOD_LABELS[period]}",
         height=400,
         paper_bgcolor="white",
         font={"family": "Arial, sans-serif"},
@@ -0,0 +1,53 @@
+import numpy as np
+import plotly.graph_objects as go
+from data.reviewerTimeline import reviewer_timeline
+
+
+def create_cohort_retention_chart(max_months=12):
+    """
+    Heatmap of monthly acquisition cohorts: the share of each month's new
+    reviewers who came back and reviewed again 1, 2, ... months later.
+
+    Reads the precomputed cohort matrices from data/reviewerTimeline.py, so
+    building it never groups raw reviews.
+    """
+    cohorts = reviewer_timeline().cohorts()
+    if not cohorts.months:
+        return go.Figure(layout={"title": "🔁 Reviewer Retention by Cohort"})
+
+    # Month 0 is always 100%; show returns from month 1 on
+    horizon = min(max_months, cohorts.retention.shape[1] - 1)
+    retention = cohorts.retention[:, 1:horizon + 1] * 100
+    returned = cohorts.active[:, 1:horizon + 1]
+    labels = [f"{month} ({size})" for month, size in zip(cohorts.months, cohorts.sizes)]
+
+    text = np.where(np.isnan(retention), "", np.char.add(np.round(np.nan_to_num(retention)).astype(int).astype(str), "%"))
+
+    fig = go.Figure(
+        data=go.Heatmap(
+            z=retention,
+            x=[f"+{k}" for k in range(1, horizon + 1)],
+            y=labels,
+            text=text,
+            texttemplate="%{text}",
+            customdata=returned,
+            colorscale="Blues",
+            zmin=0,
+            colorbar=dict(title="Returned %"),
+            hovertemplate="<b>Cohort %{y}</b><br>Months later: %{x}<br>"
+                          "Returned: %{customdata} (%{z:.1f}%)<extra></extra>",
+        )
+    )
+
+    median = cohorts.median_interval()
+    subtitle = f"Median time between visits: {median:.0f} days" if median is not None else "No return visits yet"
+    fig.update_layout(
+        title=f"🔁 Reviewer Retention by Cohort<br><sup>{subtitle}</sup>",
+        xaxis_title="Months after first review",
+        yaxis_title="First-review month (new reviewers)",
+        yaxis=dict(autorange="reversed", type="category"),
+        template="plotly_white",
+        height=max(400, 22 * len(labels) + 160),
+    )
+
+    return fig
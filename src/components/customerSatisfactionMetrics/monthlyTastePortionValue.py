@@ -2,13 +2,15 @@
 import pandas as pd
 import plotly.graph_objects as go
 from data.loadData import loadData
+from data.reviewDuplicates import without_duplicates
 
 
 def create_monthly_category_ratings_chart():
     data = loadData()
 
     # Convert reviews and ratings to DataFrames
-    reviews_df = pd.DataFrame(data["reviews"])
+    # Near-duplicate reviews (data/reviewDuplicates.py) are left out
+    reviews_df = without_duplicates(pd.DataFrame(data["reviews"]))
     ratings_df = pd.DataFrame(data["ratings"])
 
     # Merge reviews with ratings
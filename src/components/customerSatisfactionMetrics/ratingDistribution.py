@@ -0,0 +1,86 @@
+import plotly.graph_objects as go
+from dash import Patch
+from data.ratingCube import DIMENSIONS, rating_cube
+
+RATING_COLORS = {1: "#ff4c4c", 2: "#ff9966", 3: "#ffcc66", 4: "#99cc66", 5: "#66cc66"}
+
+
+def _distributions(menu_item_id=None, year=None):
+    """Per-dimension distributions for one dish (None = all) and one year (None = all time)."""
+    start, end = (f"{year}-01", f"{year}-12") if year else (None, None)
+    return rating_cube().distributions(menu_item_id, start, end)
+
+
+def _labels(distributions, year):
+    """Title and per-dimension annotation text (median and share of 4+ ratings)."""
+    reviews = distributions["overall"].total
+    title = f"⭐ Rating Distribution by Category - {year or 'All Time'} ({reviews} reviews)"
+    notes = [
+        f"median {d.median()} · {d.share_at_least(4):.0%} 4+" if d.total else "no reviews"
+        for d in (distributions[dimension] for dimension in DIMENSIONS)
+    ]
+    return title, notes
+
+
+def year_options():
+    """Dropdown options: all time, then every year with dated reviews (newest first)."""
+    return [{"label": "All Time", "value": "all"}] + [
+        {"label": str(year), "value": str(year)} for year in reversed(rating_cube().years)
+    ]
+
+
+def create_rating_distribution_patch(year="all", menu_item_id=None):
+    """Partial update for a year change: only bar lengths, counts, title and annotations are sent."""
+    year = None if year in (None, "all") else int(year)
+    distributions = _distributions(menu_item_id, year)
+    title, notes = _labels(distributions, year)
+
+    patch = Patch()
+    for r in range(5):
+        patch["data"][r]["x"] = [round(distributions[d].shares()[r] * 100, 1) for d in DIMENSIONS]
+        patch["data"][r]["customdata"] = [int(distributions[d].counts[r]) for d in DIMENSIONS]
+    patch["layout"]["title"]["text"] = title
+    for k, note in enumerate(notes):
+        patch["layout"]["annotations"][k]["text"] = note
+    return patch
+
+
+def create_rating_distribution_chart(year=None, menu_item_id=None):
+    """
+    100% stacked bars of the 1-5 rating mix for taste, portion, value and
+    overall, annotated with each category's median and share of 4+ ratings.
+
+    Counts come from the rating cube (data/ratingCube.py), so any dish or year
+    is a sum over a few small arrays rather than a scan of the reviews.
+    """
+    distributions = _distributions(menu_item_id, year)
+    title, notes = _labels(distributions, year)
+    names = [dimension.capitalize() for dimension in DIMENSIONS]
+
+    fig = go.Figure()
+    for r in range(5):
+        fig.add_trace(go.Bar(
+            x=[round(distributions[d].shares()[r] * 100, 1) for d in DIMENSIONS],
+            y=names,
+            orientation="h",
+            name=f"{r + 1} ★",
+            marker_color=RATING_COLORS[r + 1],
+            customdata=[int(distributions[d].counts[r]) for d in DIMENSIONS],
+            hovertemplate=f"<b>%{{y}}</b><br>{r + 1} ★: %{{x}}% (%{{customdata}} reviews)<extra></extra>",
+        ))
+
+    fig.update_layout(
+        title={"text": title},
+        barmode="stack",
+        template="plotly_white",
+        xaxis=dict(title="Share of reviews (%)", range=[0, 100]),
+        yaxis=dict(autorange="reversed"),
+        legend=dict(orientation="h", y=-0.2, x=0.5, xanchor="center", traceorder="normal"),
+        margin=dict(r=170),
+        annotations=[
+            dict(text=note, x=1.01, y=name, xref="paper", yref="y", xanchor="left",
+                 showarrow=False, font=dict(size=12, color="gray"))
+            for note, name in zip(notes, names)
+        ],
+    )
+    return fig
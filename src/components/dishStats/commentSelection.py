@@ -0,0 +1,135 @@
+import math
+import numpy as np
+import pandas as pd
+from data.textSignatures import tokenize, shingles, minhash_permutations, minhash_signature, estimate_jaccard
+
+
+# Rough prompt-token estimate: ~4 characters per token for English text
+CHARS_PER_TOKEN = 4
+
+_PERMUTATIONS = minhash_permutations(num_perm=64)
+
+
+def estimate_tokens(text):
+    return math.ceil(len(str(text)) / CHARS_PER_TOKEN) + 2  # + bullet / newline
+
+
+def _recency_scores(df):
+    """0..1 score, newest review = 1 (reviews without a timestamp score 0)."""
+    if "timestamp" not in df.columns:
+        return np.zeros(len(df))
+    dates = pd.to_datetime(df["timestamp"], errors="coerce")
+    ranks = dates.rank(method="average", na_option="bottom").to_numpy()
+    ranks[dates.isna().to_numpy()] = 0
+    return ranks / max(len(df), 1)
+
+
+def _extremity_scores(df):
+    """0..1 score for how far the review is from neutral (3 stars, or zero polarity)."""
+    if "overall" in df.columns:
+        overall = pd.to_numeric(df["overall"], errors="coerce").fillna(3).to_numpy()
+        return np.abs(overall - 3) / 2
+
+    from data.reviewSentiment import polarity_of
+    return np.abs(polarity_of(df["content"]))
+
+
+def _tfidf_matrix(token_lists):
+    """Row-normalised TF-IDF matrix (dense, comments x vocabulary) plus each comment's summed IDF."""
+    vocab = {}
+    for tokens in token_lists:
+        for token in tokens:
+            vocab.setdefault(token, len(vocab))
+
+    tf = np.zeros((len(token_lists), max(len(vocab), 1)), dtype=np.float32)
+    for row, tokens in enumerate(token_lists):
+        for token in tokens:
+            tf[row, vocab[token]] += 1
+
+    doc_freq = (tf > 0).sum(axis=0)
+    idf = np.log((1 + len(token_lists)) / (1 + doc_freq)) + 1
+    tfidf = tf * idf
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return tfidf / norms, (tf > 0) @ idf
+
+
+def select_representative_comments(
+    reviews_df,
+    token_budget=1500,
+    candidate_pool=300,
+    duplicate_threshold=0.7,
+    weights=(0.4, 0.4, 0.2),
+    diversity=0.5,
+):
+    """
+    Pick a compact, diverse subset of review comments for an LLM prompt.
+
+    Each comment gets a base score from recency, sentiment extremity and how
+    much distinctive (high TF-IDF) vocabulary it carries. From the best
+    `candidate_pool` comments by recency and extremity, comments are chosen
+    greedily, maximal-marginal-relevance style: every pick is penalised by its TF-IDF cosine similarity to comments
+    already chosen, and near-duplicates (MinHash Jaccard >= duplicate_threshold)
+    are skipped, until the token budget is used up.
+
+    Args:
+        reviews_df: Dish reviews with a 'content' column (and optionally 'timestamp', 'overall')
+        token_budget: Approximate number of prompt tokens to spend on comments
+        candidate_pool: How many comments (best by recency and extremity; the newest when there is no 'overall') are considered
+        duplicate_threshold: Estimated Jaccard similarity above which a comment is a near-duplicate
+        weights: (recency, extremity, informativeness) weights for the base score
+        diversity: 0..1, how strongly similarity to already-selected comments is penalised
+
+    Returns:
+        DataFrame of the selected rows (in selection order, most valuable first)
+    """
+    if reviews_df.empty or "content" not in reviews_df.columns:
+        return reviews_df.iloc[0:0]
+
+    df = reviews_df[reviews_df["content"].notna()]
+    df = df[df["content"].astype(str).str.strip() != ""]
+    df = df.drop_duplicates(subset="content").reset_index(drop=True)
+    if df.empty:
+        return df
+
+    # Cheap signals first, so TF-IDF only has to be built for the candidate pool
+    w_recency, w_extremity, w_info = weights
+    if "overall" not in df.columns and len(df) > candidate_pool:
+        # Without star ratings extremity needs TextBlob, so only the newest comments are scored
+        newest = np.argsort(-_recency_scores(df), kind="stable")[:candidate_pool]
+        df = df.iloc[newest].reset_index(drop=True)
+    prior = w_recency * _recency_scores(df) + w_extremity * _extremity_scores(df)
+    order = np.argsort(-prior, kind="stable")[:candidate_pool]
+    df = df.iloc[order].reset_index(drop=True)
+    prior = prior[order]
+
+    token_lists = [tokenize(text) for text in df["content"]]
+    tfidf, idf_mass = _tfidf_matrix(token_lists)
+
+    # Informativeness: how much rare vocabulary a comment carries, relative to the others
+    base = prior + w_info * idf_mass / max(idf_mass.max(), 1)
+
+    signatures = [minhash_signature(shingles(tokens), _PERMUTATIONS) for tokens in token_lists]
+    costs = np.array([estimate_tokens(text) for text in df["content"]])
+
+    selected = []
+    relevance = (1 - diversity) * base
+    max_similarity = np.zeros(len(df), dtype=np.float32)
+    budget = token_budget
+    # Comments still eligible: not picked or skipped yet, and small enough for the remaining budget
+    available = costs <= budget
+
+    while available.any():
+        scores = np.where(available, relevance - diversity * max_similarity, -np.inf)
+        best = int(np.argmax(scores))
+        available[best] = False
+
+        if any(estimate_jaccard(signatures[best], signatures[j]) >= duplicate_threshold for j in selected):
+            continue
+
+        selected.append(best)
+        budget -= costs[best]
+        available &= costs <= budget
+        max_similarity = np.maximum(max_similarity, tfidf @ tfidf[best])
+
+    return df.iloc[selected]
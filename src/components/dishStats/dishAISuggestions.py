@@ -1,10 +1,51 @@
 import os
 import json
-import google.generativeai as genai
+import argparse
 import pandas as pd
+from components.ai.client import LLMClient, get_client
+from components.dishStats.commentSelection import select_representative_comments
 
 
-def generate_dish_suggestions(dish_name, reviews_df, api_key=None):
+SUGGESTION_CATEGORIES = ["recipe", "pricing", "portion", "service", "marketing", "menu"]
+
+
+def _format_comments(reviews_df, token_budget):
+    """Return (comments_text, n_selected, n_total) for a dish's reviews, star rating first when available."""
+    selected = select_representative_comments(reviews_df, token_budget=token_budget)
+    if "overall" in selected.columns:
+        comments_text = "\n".join(
+            f"- ({int(overall)}★) {comment}" for overall, comment in zip(selected["overall"], selected["content"])
+        )
+    else:
+        comments_text = "\n".join(f"- {comment}" for comment in selected["content"])
+    return comments_text, len(selected), int(reviews_df["content"].notna().sum())
+
+
+def _strip_code_fence(response_text):
+    """Remove a surrounding ```json ... ``` markdown block if present."""
+    response_text = response_text.strip()
+    if response_text.startswith("```"):
+        response_text = response_text.split("\n", 1)[1] if "\n" in response_text else response_text[3:]
+        response_text = response_text.rsplit("```", 1)[0].strip()
+    return response_text
+
+
+def validate_suggestions(suggestions):
+    """Raise ValueError unless `suggestions` is a list of exactly 3 well-formed suggestion dicts
+    whose category is one of SUGGESTION_CATEGORIES (the set the prompts ask for)."""
+    if not isinstance(suggestions, list) or len(suggestions) != 3:
+        raise ValueError("Response must be a list of exactly 3 suggestions")
+
+    for suggestion in suggestions:
+        if not isinstance(suggestion, dict) or not all(key in suggestion for key in ["title", "description", "category"]):
+            raise ValueError("Each suggestion must have title, description, and category")
+        if suggestion["category"] not in SUGGESTION_CATEGORIES:
+            raise ValueError(f"Unknown category {suggestion['category']!r}, expected one of {SUGGESTION_CATEGORIES}")
+
+    return suggestions
+
+
+def generate_dish_suggestions(dish_name, reviews_df, api_key=None, token_budget=1500):
     """
     Generate 3 AI-powered suggestions for improving a dish based on reviews and comments.
     
@@ -12,6 +53,7 @@ def generate_dish_suggestions(dish_name, reviews_df, api_key=None):
         dish_name: Name of the dish
         reviews_df: DataFrame with review data (must include 'content' column from merged data)
         api_key: Gemini API key (defaults to env variable if not provided)
+        token_budget: Approximate prompt tokens to spend on the selected comments
     
     Returns:
         List of 3 suggestion dictionaries with keys: 'title', 'description', 'category'
@@ -20,7 +62,7 @@ def generate_dish_suggestions(dish_name, reviews_df, api_key=None):
     if api_key is None:
         api_key = os.getenv("GEMINI_API_KEY")
     
-    if not api_key:
+    if not api_key and not os.getenv("PLATEMATE_FAKE_LLM"):
         return [
             {
                 "title": "API Key Required",
@@ -29,9 +71,8 @@ def generate_dish_suggestions(dish_name, reviews_df, api_key=None):
             }
         ]
     
-    # Configure Gemini
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel("gemini-2.5-flash")
+    # Shared Gemini client (timeouts, retries, circuit breaker)
+    model = get_client(api_key)
     
     # Prepare review comments (column is 'content' not 'comment')
     if reviews_df.empty or 'content' not in reviews_df.columns:
@@ -43,10 +84,10 @@ def generate_dish_suggestions(dish_name, reviews_df, api_key=None):
             }
         ]
     
-    # Get all comments for the dish
-    comments = reviews_df['content'].dropna().tolist()
+    # Pick a compact, diverse, representative subset of the dish's comments
+    comments_text, n_selected, total_comments = _format_comments(reviews_df, token_budget)
     
-    if not comments:
+    if n_selected == 0:
         return [
             {
                 "title": "No Comments Available",
@@ -55,20 +96,17 @@ def generate_dish_suggestions(dish_name, reviews_df, api_key=None):
             }
         ]
     
-    # Prepare the prompt with review comments
-    comments_text = "\n".join([f"- {comment}" for comment in comments[:50]])  # Limit to 50 most recent
-    
     prompt = f"""You are a restaurant consultant analyzing customer feedback for a dish called "{dish_name}".
 
 Based on the following customer comments, provide EXACTLY 3 actionable suggestions to improve the dish's performance.
 
-Customer Comments:
+Customer Comments ({n_selected} representative comments selected from {total_comments}):
 {comments_text}
 
 Return your response as a valid JSON array with exactly 3 objects. Each object must have:
 - "title": A short, specific action (3-8 words, e.g., "Reduce salt level", "Offer customizable toppings")
 - "description": A brief explanation of why this will help (15-30 words)
-- "category": One of ["recipe", "pricing", "portion", "service", "marketing", "menu"]
+- "category": One of {json.dumps(SUGGESTION_CATEGORIES)}
 
 Example format:
 [
@@ -99,26 +137,14 @@ Requirements:
     
     try:
         # Call Gemini API
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
+        response = model.generate_content(prompt, call_site="dish_suggestions")
         
         # Remove markdown code blocks if present
-        if response_text.startswith("```"):
-            response_text = response_text.split("\n", 1)[1] if "\n" in response_text else response_text[3:]
-            response_text = response_text.rsplit("```", 1)[0].strip()
+        response_text = _strip_code_fence(response.text)
         
-        # Parse JSON response
+        # Parse JSON response and validate structure
         suggestions = json.loads(response_text)
-        
-        # Validate structure
-        if not isinstance(suggestions, list) or len(suggestions) != 3:
-            raise ValueError("Response must be a list of exactly 3 suggestions")
-        
-        for suggestion in suggestions:
-            if not all(key in suggestion for key in ["title", "description", "category"]):
-                raise ValueError("Each suggestion must have title, description, and category")
-        
-        return suggestions
+        return validate_suggestions(suggestions)
     
     except json.JSONDecodeError as e:
         print(f"JSON parsing error: {e}")
@@ -141,6 +167,137 @@ Requirements:
         ]
 
 
+def _batched_prompt(dish_comments):
+    """Build one prompt covering several dishes; `dish_comments` maps dish name -> comments text."""
+    sections = "\n\n".join(
+        f"### Dish: {json.dumps(name)}\n{comments_text}" for name, comments_text in dish_comments.items()
+    )
+    dish_keys = ", ".join(json.dumps(name) for name in dish_comments)
+
+    return f"""You are a restaurant consultant analyzing customer feedback for several dishes.
+
+For EACH dish below, provide EXACTLY 3 actionable suggestions to improve that dish's performance,
+based only on that dish's customer comments.
+
+{sections}
+
+Return your response as a single valid JSON object whose keys are exactly these dish names:
+[{dish_keys}]
+
+Each value must be a JSON array with exactly 3 objects. Each object must have:
+- "title": A short, specific action (3-8 words, e.g., "Reduce salt level", "Offer customizable toppings")
+- "description": A brief explanation of why this will help (15-30 words)
+- "category": One of {json.dumps(SUGGESTION_CATEGORIES)}
+
+Example format:
+{{
+  "Dish A": [
+    {{"title": "Reduce salt level", "description": "Multiple customers mentioned the dish is too salty. Reducing sodium by 15-20% could improve satisfaction.", "category": "recipe"}},
+    {{"title": "Keep price the same, monitor results", "description": "Current pricing appears appropriate based on customer value perception. Monitor for 2-3 months.", "category": "pricing"}},
+    {{"title": "Add portion size option", "description": "Some customers want smaller portions. Offer a half-size option at reduced price.", "category": "portion"}}
+  ],
+  "Dish B": [ ... 3 suggestions ... ]
+}}
+
+Requirements:
+- Respond with ONLY the JSON object, no other text
+- Exactly 3 suggestions per dish, and one key per dish listed above
+- Be specific and actionable
+- If a dish's comments are mostly positive, suggest ways to maintain or enhance success
+"""
+
+
+def generate_menu_suggestions(reviews_df, dish_names=None, api_key=None, batch_size=8, max_attempts=3, token_budget=800,
+                              model=None):
+    """
+    Generate suggestions for many dishes with batched Gemini requests.
+
+    Several dishes' comment sets are packed into one structured request that
+    returns a JSON object keyed by dish, so the long instruction and example
+    block is sent once per batch instead of once per dish. Each dish's three
+    suggestions are validated independently; only dishes that are missing or
+    invalid are retried (re-batched), up to `max_attempts` rounds.
+
+    Args:
+        reviews_df: Merged review data for the menu (must include 'name' and 'content')
+        dish_names: Dishes to generate for (defaults to every dish in reviews_df)
+        api_key: Gemini API key (defaults to env variable if not provided)
+        batch_size: Dishes per request
+        max_attempts: Request rounds before a dish is given up on
+        token_budget: Approximate prompt tokens to spend on each dish's comments
+        model: Model to use instead of the shared client (e.g. a fake in tests)
+
+    Returns:
+        Dict mapping dish name -> list of suggestion dicts (an error/info card on failure)
+    """
+    if api_key is None:
+        api_key = os.getenv("GEMINI_API_KEY")
+
+    if dish_names is None:
+        dish_names = sorted(reviews_df["name"].dropna().unique()) if "name" in reviews_df.columns else []
+
+    if model is None:
+        if not api_key and not os.getenv("PLATEMATE_FAKE_LLM"):
+            return {name: generate_dish_suggestions(name, reviews_df.iloc[0:0], api_key) for name in dish_names}
+        model = get_client(api_key)
+    elif not isinstance(model, LLMClient):
+        model = LLMClient(model)
+
+    results = {}
+    pending = {}
+    for name in dish_names:
+        dish_df = reviews_df[reviews_df["name"] == name]
+        comments_text, n_selected, _ = _format_comments(dish_df, token_budget) if "content" in dish_df.columns else ("", 0, 0)
+        if n_selected == 0:
+            results[name] = [
+                {
+                    "title": "No Comments Available",
+                    "description": "This dish has reviews but no written comments to analyze.",
+                    "category": "info"
+                }
+            ]
+        else:
+            pending[name] = comments_text
+
+    for attempt in range(max_attempts):
+        if not pending:
+            break
+
+        names = list(pending)
+        failed = {}
+        for start in range(0, len(names), batch_size):
+            batch = {name: pending[name] for name in names[start:start + batch_size]}
+            try:
+                response = model.generate_content(_batched_prompt(batch), call_site="dish_suggestions")
+                parsed = json.loads(_strip_code_fence(response.text))
+                if not isinstance(parsed, dict):
+                    raise ValueError("Response must be a JSON object keyed by dish name")
+            except Exception as e:
+                print(f"Batched suggestion request failed (attempt {attempt + 1}): {e}")
+                failed.update(batch)
+                continue
+
+            for name, comments_text in batch.items():
+                try:
+                    results[name] = validate_suggestions(parsed.get(name))
+                except ValueError as e:
+                    print(f"Invalid suggestions for {name} (attempt {attempt + 1}): {e}")
+                    failed[name] = comments_text
+
+        pending = failed
+
+    for name in pending:
+        results[name] = [
+            {
+                "title": "Error Generating Suggestions",
+                "description": f"No valid suggestions were returned after {max_attempts} attempts.",
+                "category": "error"
+            }
+        ]
+
+    return {name: results[name] for name in dish_names if name in results}
+
+
 def create_suggestion_card(suggestion, index):
     """
     Create a visual card component for a single suggestion.
@@ -246,3 +403,44 @@ def create_suggestion_card(suggestion, index):
             ),
         ]
     )
+
+
+def _menu_frame():
+    """Reviews merged with ratings, menu and content (duplicates excluded), like the dish page uses."""
+    from data.loadData import loadData
+    from data.reviewDuplicates import without_duplicates
+
+    data = loadData()
+    merged = (
+        pd.DataFrame(data["reviews"])
+        .merge(pd.DataFrame(data["ratings"]), left_on="rating_id", right_on="id", suffixes=("_review", "_rating"))
+        .merge(pd.DataFrame(data["menuItems"]), left_on="menu_item_id", right_on="id", suffixes=("", "_menu"))
+        .merge(pd.DataFrame(data["content"]), left_on="content_id", right_on="id", suffixes=("", "_content"))
+    )
+    return without_duplicates(merged, id_column="id_review")
+
+
+def main(argv=None):
+    """Generate suggestions for the whole menu (or --dishes) in batched requests and write them as JSON."""
+    parser = argparse.ArgumentParser(description="Generate AI suggestions for every dish on the menu.")
+    parser.add_argument("--dishes", nargs="+", default=None, help="dish names (default: every dish)")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--token-budget", type=int, default=800)
+    parser.add_argument("--out", default=None, help="output JSON file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    suggestions = generate_menu_suggestions(
+        _menu_frame(), dish_names=args.dishes, batch_size=args.batch_size,
+        max_attempts=args.max_attempts, token_budget=args.token_budget,
+    )
+    text = json.dumps(suggestions, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+        print(f"Wrote suggestions for {len(suggestions)} dishes to {args.out}")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
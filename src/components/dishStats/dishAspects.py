@@ -0,0 +1,74 @@
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from data.reviewAspects import review_aspects
+
+POLARITY_COLORS = {"negative": "#FF9999", "positive": "#90EE90"}
+
+
+def create_dish_aspects_chart(filtered_df, dish_name, top=8, trend_aspects=3):
+    """
+    What customers say about the dish: the aspects mentioned in the most
+    reviews (e.g. "salty", "small portion", "good value") and, for the top
+    complaints, how their share of reviews moved quarter by quarter.
+
+    Reads the aspect index (data/reviewAspects.py); no review text is scanned here.
+    """
+    title = f"<b>What Customers Mention About {dish_name}</b><br><sup>Share of reviews mentioning each aspect</sup>"
+    if filtered_df.empty or "menu_item_id" not in filtered_df.columns:
+        return go.Figure(layout={"title": title})
+
+    index = review_aspects()
+    menu_item_id = int(filtered_df["menu_item_id"].iloc[0])
+    aspects = index.top_aspects(menu_item_id, n=top)
+    if aspects.empty:
+        fig = go.Figure()
+        fig.update_layout(
+            title=title,
+            template="plotly_white",
+            annotations=[dict(text="No aspects mentioned in this dish's reviews yet", showarrow=False,
+                              xref="paper", yref="paper", x=0.5, y=0.5)],
+        )
+        return fig
+
+    # Trend lines for the most mentioned complaints (or the top aspects if there are none)
+    complaints = aspects[aspects["polarity"] == "negative"]
+    tracked = (complaints if not complaints.empty else aspects)["aspect"].head(trend_aspects).tolist()
+    trend = index.aspect_trend(menu_item_id, tracked, freq="Q")
+
+    fig = make_subplots(rows=1, cols=2, column_widths=[0.45, 0.55], horizontal_spacing=0.15,
+                        subplot_titles=("Top aspects", "Trend by quarter"))
+
+    # Most mentioned on top
+    aspects = aspects.iloc[::-1]
+    fig.add_trace(go.Bar(
+        x=aspects["share"] * 100,
+        y=aspects["aspect"],
+        orientation="h",
+        marker_color=[POLARITY_COLORS[p] for p in aspects["polarity"]],
+        text=[f"{share:.0%}" for share in aspects["share"]],
+        textposition="auto",
+        customdata=aspects[["reviews", "category"]].to_numpy(),
+        hovertemplate="<b>%{y}</b> (%{customdata[1]})<br>%{customdata[0]} reviews · %{x:.1f}%<extra></extra>",
+        showlegend=False,
+    ), row=1, col=1)
+
+    for aspect in tracked:
+        fig.add_trace(go.Scatter(
+            x=trend.index,
+            y=trend[aspect] * 100,
+            mode="lines+markers",
+            name=aspect,
+            customdata=trend["reviews"],
+            hovertemplate=f"<b>{aspect}</b> %{{x}}<br>%{{y:.1f}}% of %{{customdata}} reviews<extra></extra>",
+        ), row=1, col=2)
+
+    fig.update_xaxes(title_text="% of reviews", row=1, col=1)
+    fig.update_yaxes(title_text="% of reviews", rangemode="tozero", row=1, col=2)
+    fig.update_layout(
+        title=title,
+        title_x=0.5,
+        template="plotly_white",
+        legend=dict(orientation="h", y=-0.15, x=0.75, xanchor="center"),
+        margin=dict(t=110),
+    )
+    return fig
@@ -1,9 +1,18 @@
+import numpy as np
 import plotly.express as px
 import pandas as pd
+from data.ratingCube import rating_cube
 
-def create_dish_overall_pie(filtered_df, dish_name):
-    rating_counts = filtered_df["overall"].value_counts().sort_index()
-    df = pd.DataFrame({"Rating": rating_counts.index, "Count": rating_counts.values})
+def create_dish_overall_pie(filtered_df, dish_name, menu_item_id=None):
+    if menu_item_id is not None:
+        # All of the dish's reviews (duplicates excluded, like the page frame): read from the rating cube
+        counts = rating_cube().histogram("overall", menu_item_id).counts
+    else:
+        # Any other selection of reviews is counted from the frame itself
+        ratings = filtered_df["overall"].dropna().round().clip(1, 5).to_numpy(dtype=np.int64)
+        counts = np.bincount(ratings, minlength=6)[1:]
+    df = pd.DataFrame({"Rating": range(1, 6), "Count": counts})
+    df = df[df["Count"] > 0]
 
     fig = px.pie(
         df,
@@ -0,0 +1,49 @@
+import plotly.graph_objects as go
+from data.dishPairings import dish_cooccurrence
+
+
+def create_dish_pairings_chart(filtered_df, dish_name, top=8):
+    """Dishes the same customers also review, ranked by lift (how much more often than chance)."""
+    if filtered_df.empty or "menu_item_id" not in filtered_df.columns:
+        return go.Figure(layout={"title": f"🤝 Often Reviewed Together with {dish_name}"})
+
+    pairings = dish_cooccurrence().pairings(int(filtered_df["menu_item_id"].iloc[0]), top=top)
+    if pairings.empty:
+        fig = go.Figure()
+        fig.update_layout(
+            title=f"🤝 Often Reviewed Together with {dish_name}",
+            template="plotly_white",
+            annotations=[dict(text="Not enough shared reviewers yet", showarrow=False,
+                              xref="paper", yref="paper", x=0.5, y=0.5)],
+        )
+        return fig
+
+    # Strongest pairing on top
+    pairings = pairings.iloc[::-1]
+    colors = ["#2ca02c" if lift >= 1 else "#9ca3af" for lift in pairings["lift"]]
+
+    fig = go.Figure(
+        data=go.Bar(
+            x=pairings["lift"],
+            y=pairings["name"],
+            orientation="h",
+            text=[f"{lift:.1f}× · {n} shared" for lift, n in zip(pairings["lift"], pairings["together"])],
+            textposition="auto",
+            marker=dict(color=colors),
+            customdata=(pairings["confidence"] * 100).round(1),
+            hovertemplate="<b>%{y}</b><br>Lift: %{x:.2f}<br>"
+                          f"%{{customdata}}% of {dish_name} reviewers also reviewed it<extra></extra>",
+        )
+    )
+
+    fig.add_vline(x=1, line_dash="dash", line_color="gray")
+    fig.update_layout(
+        title=f"🤝 Often Reviewed Together with {dish_name}<br>"
+              "<sup>Lift > 1: shared by more customers than chance would predict</sup>",
+        xaxis_title="Lift",
+        yaxis_title="",
+        template="plotly_white",
+        bargap=0.3,
+    )
+
+    return fig
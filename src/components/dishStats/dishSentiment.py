@@ -1,19 +1,21 @@
+import numpy as np
 import plotly.express as px
 import pandas as pd
-from textblob import TextBlob
+from data.reviewSentiment import SENTIMENT_LABELS, polarity_of, review_sentiment, sentiment_bins
 
 def create_dish_sentiment_chart(filtered_df, dish_name):
     if "content" not in filtered_df.columns or filtered_df["content"].isnull().all():
         return px.bar(title=f"No review text available for {dish_name}")
 
-    filtered_df["sentiment"] = filtered_df["content"].apply(lambda x: TextBlob(str(x)).sentiment.polarity)
-    sentiment_counts = pd.cut(
-        filtered_df["sentiment"],
-        bins=[-1, -0.2, 0.2, 1],
-        labels=["Negative", "Neutral", "Positive"]
-    ).value_counts().reindex(["Positive", "Neutral", "Negative"], fill_value=0)
+    # Polarities are computed once per snapshot (data/reviewSentiment.py); frames without
+    # content ids are scored here
+    if "content_id" in filtered_df.columns:
+        labels = review_sentiment().labels(filtered_df["content_id"].to_numpy(dtype=np.int64))
+    else:
+        labels = sentiment_bins(polarity_of(filtered_df["content"]))
+    counts = np.bincount(labels, minlength=len(SENTIMENT_LABELS))
 
-    df = pd.DataFrame({"Sentiment": sentiment_counts.index, "Count": sentiment_counts.values})
+    df = pd.DataFrame({"Sentiment": SENTIMENT_LABELS, "Count": counts})
 
     fig = px.bar(
         df,
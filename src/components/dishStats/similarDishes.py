@@ -0,0 +1,51 @@
+from dash import html
+from data.dishSimilarity import dish_similarity
+
+
+def create_similar_dishes_panel(filtered_df, dish_name, k=5):
+    """Panel of the dishes whose rating profile (means, rating mix, sentiment) is closest to this one."""
+    similar = None
+    if not filtered_df.empty and "menu_item_id" in filtered_df.columns:
+        similar = dish_similarity().similar(int(filtered_df["menu_item_id"].iloc[0]), k=k)
+
+    if similar is None or similar.empty:
+        body = html.P("Not enough reviews to compare this dish yet.", style={"color": "gray"})
+    else:
+        body = html.Div(
+            style={
+                "display": "grid",
+                "gridTemplateColumns": "repeat(auto-fit, minmax(180px, 1fr))",
+                "gap": "15px",
+            },
+            children=[
+                html.Div(
+                    style={
+                        "backgroundColor": "white",
+                        "borderRadius": "10px",
+                        "padding": "15px",
+                        "boxShadow": "0 1px 3px rgba(0,0,0,0.1)",
+                    },
+                    children=[
+                        html.H5(row.name, style={"margin": "0 0 8px 0", "color": "#2c3e50"}),
+                        html.P(f"{row.similarity:.0%} similar", style={"margin": "0", "fontWeight": "bold", "color": "#3498db"}),
+                        html.P(f"⭐ {row.overall:.1f} · {row.reviews} reviews", style={"margin": "4px 0 0 0", "color": "#6b7280"}),
+                    ],
+                )
+                for row in similar.itertuples(index=False)
+            ],
+        )
+
+    return html.Div(
+        style={
+            "backgroundColor": "#f8f9fa",
+            "borderRadius": "12px",
+            "padding": "25px",
+            "marginTop": "30px",
+        },
+        children=[
+            html.H3(f"🍽️ Dishes Like {dish_name}", style={"marginTop": "0", "color": "#2c3e50"}),
+            html.P("Closest rating profiles: average scores, rating mix and review sentiment.",
+                   style={"color": "#6b7280"}),
+            body,
+        ],
+    )
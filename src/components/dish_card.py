@@ -5,6 +5,7 @@ Dish card component
 from dash import html
 import pandas as pd
 from data.loadData import loadData
+from data.reviewDuplicates import without_duplicates
 
 
 def _get_aggregated_stats_for_name(name: str):
@@ -18,7 +19,7 @@ def _get_aggregated_stats_for_name(name: str):
         return None
 
     merged = (
-        reviews_df
+        without_duplicates(reviews_df)
         .merge(ratings_df, left_on="rating_id", right_on="id", suffixes=("_review", "_rating"))
         .merge(menu_df, left_on="menu_item_id", right_on="id", suffixes=("", "_menu"))
     )
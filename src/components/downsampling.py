@@ -0,0 +1,119 @@
+"""
+Keep large charts responsive in the browser.
+
+- Scatter traces switch from SVG to WebGL (Scattergl) above WEBGL_POINT_THRESHOLD points;
+  SVG creates one DOM node per marker and becomes sluggish around a few thousand.
+- Long time series are downsampled on the server to at most MAX_SERIES_POINTS points
+  (about one per horizontal pixel of a dashboard chart), either with
+  Largest-Triangle-Three-Buckets (keeps the visual shape of the line) or
+  min/max bucketing (keeps every peak and trough).
+
+Both limits can be tuned with PLATEMATE_WEBGL_THRESHOLD and PLATEMATE_MAX_SERIES_POINTS.
+"""
+
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+
+WEBGL_POINT_THRESHOLD = int(os.getenv("PLATEMATE_WEBGL_THRESHOLD", "1000"))
+MAX_SERIES_POINTS = int(os.getenv("PLATEMATE_MAX_SERIES_POINTS", "1200"))
+
+
+def use_webgl(n_points: int) -> bool:
+    return n_points > WEBGL_POINT_THRESHOLD
+
+
+def scatter_trace(n_points: int):
+    """go.Scattergl for large traces, go.Scatter otherwise."""
+    return go.Scattergl if use_webgl(n_points) else go.Scatter
+
+
+def render_mode(n_points: int) -> str:
+    """The plotly.express render_mode for a trace with n_points points."""
+    return "webgl" if use_webgl(n_points) else "svg"
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """
+    Indices of the n_out points Largest-Triangle-Three-Buckets keeps from (x, y).
+    x must be increasing and y finite; the first and last points are always kept.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Inner points split into n_out - 2 buckets; one point is picked from each
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third triangle corner
+        if i + 2 < len(edges):
+            next_x, next_y = x[end:edges[i + 2]].mean(), y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        # Twice the triangle area for every candidate in the bucket
+        area = np.abs((x[prev] - next_x) * (y[start:end] - y[prev])
+                      - (x[prev] - x[start:end]) * (next_y - y[prev]))
+        prev = start + int(area.argmax())
+        keep[i + 1] = prev
+    return keep
+
+
+def minmax_indices(y, n_out: int) -> np.ndarray:
+    """
+    Indices of the minimum and maximum of each of (n_out - 2) // 2 equal buckets,
+    plus the first and last point, in order. y must be finite.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    buckets = np.arange(n) * ((n_out - 2) // 2) // n
+    # Sorting by (bucket, value) puts each bucket's min first and max last
+    order = np.lexsort((y, buckets))
+    bounds = np.flatnonzero(np.diff(buckets[order])) + 1
+    firsts = order[np.r_[0, bounds]]
+    lasts = order[np.r_[bounds - 1, n - 1]]
+    return np.unique(np.r_[0, firsts, lasts, n - 1])
+
+
+def downsample_indices(x, y, max_points: int = MAX_SERIES_POINTS, method: str = "lttb") -> np.ndarray:
+    """
+    Row indices to plot so a series has at most max_points points.
+    x may be anything ordered (dates, month labels); only its position is used
+    unless it is numeric or datetime. Points where y is NaN (gaps) are left
+    out once the series is thinned.
+    """
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    finite = np.flatnonzero(np.isfinite(y))
+    if len(finite) < n:
+        return finite[downsample_indices(np.asarray(x)[finite], y[finite], max_points, method)]
+    if method == "minmax":
+        return minmax_indices(y, max_points)
+    if method != "lttb":
+        raise ValueError(f"Unknown downsampling method: {method}")
+
+    x = np.asarray(x)
+    if x.dtype.kind == "M":
+        x = x.astype("datetime64[ns]").astype(np.int64)
+    elif x.dtype.kind not in "iuf":
+        x = np.arange(n)
+    return lttb_indices(x, y, max_points)
+
+
+def downsample_frame(df, x_col: str, y_col: str, max_points: int = MAX_SERIES_POINTS, method: str = "lttb"):
+    """df (sorted by x_col) reduced to at most max_points rows, keeping all of its columns."""
+    if len(df) <= max_points:
+        return df
+    return df.iloc[downsample_indices(df[x_col].to_numpy(), df[y_col].to_numpy(), max_points, method)]
@@ -0,0 +1,103 @@
+"""
+Compact figure payloads for dcc.Graph.
+
+Plotly figures go to the browser as JSON, with every float written out in
+full (3.6666666666666665). compact_figure() turns a figure into the dict
+dcc.Graph receives, with numeric trace arrays made as small as the bundled
+plotly.js allows:
+
+- plotly.js >= 2.28 reads typed arrays sent as {"dtype": "f8", "bdata": <base64>},
+  which is both smaller and faster to decode than text
+- older bundles (dash 2.14 ships plotly.js 2.24) get float arrays rounded to
+  `decimals` places instead, which is invisible at chart resolution
+
+Response compression (gzip/brotli) is set up separately in app.py.
+"""
+
+import base64
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+
+TYPED_ARRAY_MIN_VERSION = (2, 28)
+
+# Trace attributes that hold data arrays worth encoding
+ARRAY_KEYS = ("x", "y", "z", "values", "lat", "lon", "open", "high", "low", "close")
+
+_DTYPES = {"f8": np.float64, "f4": np.float32, "i4": np.int32, "i2": np.int16, "i1": np.int8,
+           "u4": np.uint32, "u2": np.uint16, "u1": np.uint8}
+
+
+@lru_cache(maxsize=1)
+def bundled_plotly_js_version():
+    """(major, minor, patch) of the plotly.js served by dash's dcc, or None if it can't be read."""
+    try:
+        import dash
+        path = os.path.join(os.path.dirname(dash.__file__), "dcc", "plotly.min.js")
+        with open(path, "r", encoding="utf-8") as f:
+            header = f.read(200)
+    except OSError:
+        return None
+    match = re.search(r"plotly\.js v(\d+)\.(\d+)\.(\d+)", header)
+    return tuple(int(part) for part in match.groups()) if match else None
+
+
+def typed_arrays_supported() -> bool:
+    version = bundled_plotly_js_version()
+    return version is not None and version[:2] >= TYPED_ARRAY_MIN_VERSION
+
+
+def _numeric_array(values):
+    """values as a numeric NumPy array, or None for strings, dates, mixed or missing data."""
+    if isinstance(values, (str, dict)) or values is None:
+        return None
+    array = np.asarray(values)
+    if array.dtype.kind not in "iuf" or array.ndim == 0:
+        return None
+    return array
+
+
+def _typed_array(array):
+    if array.dtype.kind == "f":
+        dtype = "f4" if array.dtype == np.float32 else "f8"
+    else:
+        # Smallest integer type that holds the range
+        low, high = (int(array.min()), int(array.max())) if array.size else (0, 0)
+        dtype = next(
+            (name for name in ("i1", "u1", "i2", "u2", "i4", "u4")
+             if np.iinfo(_DTYPES[name]).min <= low and high <= np.iinfo(_DTYPES[name]).max),
+            "f8",
+        )
+    data = np.ascontiguousarray(array, dtype=_DTYPES[dtype])
+    encoded = {"dtype": dtype, "bdata": base64.b64encode(data.tobytes()).decode("ascii")}
+    if data.ndim > 1:
+        # e.g. heatmap z; plotly.js reads the buffer row-major
+        encoded["shape"] = ",".join(str(n) for n in data.shape)
+    return encoded
+
+
+def compact_figure(fig, decimals=3):
+    """
+    Figure as a dict for dcc.Graph, with numeric trace arrays binary-encoded
+    (plotly.js >= 2.28) or float arrays rounded to `decimals` places.
+    """
+    figure = fig.to_plotly_json() if hasattr(fig, "to_plotly_json") else dict(fig)
+    typed = typed_arrays_supported()
+
+    data = []
+    for trace in figure.get("data", []):
+        trace = dict(trace)
+        for key in ARRAY_KEYS:
+            array = _numeric_array(trace.get(key))
+            if array is None:
+                continue
+            if typed:
+                trace[key] = _typed_array(array)
+            elif array.dtype.kind == "f":
+                trace[key] = np.round(array, decimals)
+        data.append(trace)
+
+    figure["data"] = data
+    return figure
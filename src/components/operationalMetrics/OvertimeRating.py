@@ -4,44 +4,41 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from data.loadData import loadData
+from data.ratingCube import rating_cube, DIMENSIONS
+from data.ratingTrends import rating_trends, trend_direction, EWMA_HALFLIFE_DAYS
+from components.downsampling import downsample_frame
+import numpy as np
 
 def create_average_rating_over_time():
     """
     Create an area line chart showing average rating trends over time.
     
     Purpose: Track whether satisfaction is improving or declining.
-    Uses color coding to indicate upward vs downward trends.
+    Monthly averages come from the rating cube (data/ratingCube.py). Markers are
+    colored by the 90-day least-squares trend at the end of each month, and a
+    30-day moving average and an EWMA from data/ratingTrends.py are overlaid,
+    each thinned with LTTB to about one point per pixel for long histories.
 
     """
-    # Load data
-    data = loadData()
-    
-    # Create DataFrames
-    reviews_df = pd.DataFrame(data["reviews"])
-    ratings_df = pd.DataFrame(data["ratings"])
-    
-    # Merge reviews with ratings to get actual rating values
-    df = reviews_df.merge(
-        ratings_df[["id", "overall"]], 
-        left_on="rating_id", 
-        right_on="id", 
-        suffixes=("_review", "_rating")
-    )
-    
-    # Convert timestamp to datetime
-    df["date"] = pd.to_datetime(df["timestamp"], errors="coerce")
-    
-    # Group by month and calculate average rating
-    df["YearMonth"] = df["date"].dt.to_period("M").astype(str)
-    avg_rating_over_time = df.groupby("YearMonth")["overall"].mean().reset_index()
-    avg_rating_over_time.columns = ["Month", "Average Rating"]
-    
-    # Calculate trend: compare each month to previous month
-    avg_rating_over_time["Trend"] = avg_rating_over_time["Average Rating"].diff()
-    avg_rating_over_time["Trend_Direction"] = avg_rating_over_time["Trend"].apply(
-        lambda x: "Improving" if x > 0 else ("Declining" if x < 0 else "Stable")
-    )
+    # Monthly average overall rating from the per-month rating counts
+    cube = rating_cube()
+    counts = cube.counts[:, :, DIMENSIONS.index("overall")].sum(axis=0)
+    totals = counts.sum(axis=1)
+    has_reviews = totals > 0
+    months = pd.PeriodIndex(cube.months, freq="M")[has_reviews]
+    avg_rating_over_time = pd.DataFrame({
+        # Plot each month mid-month so it lines up with the daily trend lines
+        "Month": months.to_timestamp() + pd.Timedelta(days=14),
+        "Average Rating": counts[has_reviews] @ np.arange(1, 6) / totals[has_reviews],
+    })
+
+    # Trend: slope of the daily ratings over the 90 days up to each month end
+    trend = rating_trends().series()
+    month_ends = months.to_timestamp(how="end").normalize()
+    if len(trend):
+        month_ends = month_ends.where(month_ends <= trend.index[-1], trend.index[-1])
+    slopes = trend["slope"].reindex(month_ends).to_numpy()
+    avg_rating_over_time["Trend_Direction"] = trend_direction(slopes)
     
     # Create the figure
     fig = go.Figure()
@@ -55,7 +52,7 @@ def create_average_rating_over_time():
         line=dict(color="#2196F3", width=3),
         fill="tozeroy",
         fillcolor="rgba(33, 150, 243, 0.3)",
-        hovertemplate="<b>%{x}</b><br>Avg Rating: %{y:.2f}<extra></extra>"
+        hovertemplate="<b>%{x|%b %Y}</b><br>Avg Rating: %{y:.2f}<extra></extra>"
     ))
     
     # Add colored markers based on trend
@@ -75,9 +72,31 @@ def create_average_rating_over_time():
             color=colors,
             line=dict(color="white", width=2)
         ),
-        hovertemplate="<b>%{x}</b><br>Avg Rating: %{y:.2f}<br>Trend: %{customdata}<extra></extra>",
+        hovertemplate="<b>%{x|%b %Y}</b><br>Avg Rating: %{y:.2f}<br>Trend: %{customdata}<extra></extra>",
         customdata=avg_rating_over_time["Trend_Direction"]
     ))
+
+    # Smoothed daily trend overlay
+    daily = trend.reset_index()
+    rolling = downsample_frame(daily, "date", "rolling_30")
+    ewma = downsample_frame(daily, "date", "ewma")
+    fig.add_trace(go.Scatter(
+        x=rolling["date"],
+        y=rolling["rolling_30"],
+        mode="lines",
+        name="30-Day Average",
+        line=dict(color="#9C27B0", width=1.5, dash="dot"),
+        hovertemplate="%{x|%b %d, %Y}<br>30-day avg: %{y:.2f}<extra></extra>"
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=ewma["date"],
+        y=ewma["ewma"],
+        mode="lines",
+        name=f"Trend (EWMA, {EWMA_HALFLIFE_DAYS:g}-day half-life)",
+        line=dict(color="#FF9800", width=2.5),
+        hovertemplate="%{x|%b %d, %Y}<br>EWMA: %{y:.2f}<extra></extra>"
+    ))
     
     # Update layout
     fig.update_layout(
@@ -4,39 +4,53 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 # Then your import will work:
-from data.loadData import loadData
-import pandas as pd
-import plotly.express as px
-
-import pandas as pd
+from data.reviewerCardinality import reviewer_cardinality
+from components.customerSatisfactionMetrics.CategoryKPI import PERIOD_LABELS
 import plotly.graph_objects as go
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from dash import Patch
+
 
-from data.loadData import loadData
+def _diversity_labels(diversity, period_label):
+    """Title and annotation text for a diversity slice; estimated counts are marked with ≈."""
+    approx = "" if diversity["exact"] else "≈"
+    title = "Reviewer Diversity: One-Time vs Repeat Reviewers"
+    if period_label:
+        title += f" - {period_label}"
+    annotation = (f"Total Unique Reviewers: {approx}{diversity['unique']}"
+                  f" · Repeat share: {diversity['repeat_share']:.0%}")
+    return title, annotation
 
 
-def create_reviewer_diversity_chart():
+def create_reviewer_diversity_patch(period="overall"):
+    """Partial update for a KPI period change: only the bar values, title and annotation are sent."""
+    diversity = reviewer_cardinality().diversity_for_period(period)
+    title, annotation = _diversity_labels(diversity, PERIOD_LABELS[period])
+
+    patch = Patch()
+    values = [diversity["one_time"], diversity["repeat"]]
+    patch["data"][0]["y"] = values
+    patch["data"][0]["text"] = values
+    patch["layout"]["title"]["text"] = title
+    patch["layout"]["annotations"][0]["text"] = annotation
+    return patch
+
+
+def create_reviewer_diversity_chart(period="overall", menu_item_id=None):
     """
     Create a simple chart showing unique vs repeat reviewers.
     
     Purpose: Shows if feedback is coming from a broad base or a few frequent users.
+    Counts come from the maintained reviewer index (data/reviewerCardinality.py),
+    for a KPI period, optionally narrowed to one menu item. A repeat reviewer has
+    2+ reviews overall.
     
     Returns:
         plotly.graph_objects.Figure: Bar chart comparing unique vs repeat reviewers
     """
-    # Load data
-    data = loadData()
-    reviews_df = pd.DataFrame(data["reviews"])
-    
-    # Count reviews per reviewer
-    reviewer_counts = reviews_df["reviewer_id"].value_counts()
-    
-    # Calculate metrics
-    unique_reviewers = len(reviewer_counts)  # Total number of unique reviewers
-    one_time_reviewers = (reviewer_counts == 1).sum()  # Reviewers with only 1 review
-    repeat_reviewers = (reviewer_counts > 1).sum()  # Reviewers with 2+ reviews
+    diversity = reviewer_cardinality().diversity_for_period(period, menu_item_id=menu_item_id)
+    title, annotation = _diversity_labels(diversity, PERIOD_LABELS[period])
+    one_time_reviewers = diversity["one_time"]  # Reviewers with only 1 review
+    repeat_reviewers = diversity["repeat"]  # Reviewers with 2+ reviews
     
     # Create bar chart
     fig = go.Figure()
@@ -52,7 +66,7 @@ def create_reviewer_diversity_chart():
     
     # Update layout
     fig.update_layout(
-        title="Reviewer Diversity: One-Time vs Repeat Reviewers",
+        title={"text": title},
         xaxis_title="Reviewer Type",
         yaxis_title="Number of Reviewers",
         plot_bgcolor="white",
@@ -61,7 +75,7 @@ def create_reviewer_diversity_chart():
         yaxis=dict(showgrid=True, gridcolor="lightgray"),
         annotations=[
             dict(
-                text=f"Total Unique Reviewers: {unique_reviewers}",
+                text=annotation,
                 xref="paper",
                 yref="paper",
                 x=0.5,
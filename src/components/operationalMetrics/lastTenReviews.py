@@ -1,40 +1,12 @@
 # components/lastTenReviews.py
 
-import pandas as pd
 import plotly.graph_objects as go
-from data.loadData import loadData
+from data.recentReviews import recent_reviews
 
 
 def create_last_ten_reviews_table():
-    data = loadData()
-
-    # Convert reviews and ratings to DataFrames
-    reviews_df = pd.DataFrame(data["reviews"])
-    ratings_df = pd.DataFrame(data["ratings"])
-    menu_items_df = pd.DataFrame(data["menuItems"])
-
-    # Merge reviews with ratings
-    merged_df = reviews_df.merge(
-        ratings_df,
-        left_on="rating_id",
-        right_on="id",
-        suffixes=("_review", "_rating")
-    )
-
-    merged_df = merged_df.merge(
-        menu_items_df,
-        left_on="menu_item_id",
-        right_on="id",
-        suffixes=("", "_menu")
-    )
-
-    # Sort by timestamp (most recent first)
-    merged_df["timestamp"] = pd.to_datetime(merged_df["timestamp"], errors="coerce")
-    merged_df = merged_df.sort_values(by="timestamp", ascending=False)
-    print(merged_df.columns)
-
-    # Select the last 10 reviews
-    last_ten = merged_df.head(10)[
+    # Newest reviews come from the maintained recency index; no sort over the full history
+    last_ten = recent_reviews().latest_frame(10)[
         ["name", "portion", "taste", "value", "overall", "timestamp"]
     ]
 
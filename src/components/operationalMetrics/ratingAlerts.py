@@ -0,0 +1,63 @@
+# components/operationalMetrics/ratingAlerts.py
+
+from dash import dcc, html
+from data.ratingAlerts import rating_alerts
+
+ALERT_REFRESH_MS = 60_000
+
+
+def _alert_row(alert, active):
+    when = alert["timestamp"].strftime("%Y-%m-%d")
+    return html.Li(
+        style={"padding": "10px 0", "borderBottom": "1px solid #e5e7eb"},
+        children=[
+            html.Span("🔴 " if active else "⚪ "),
+            html.Strong(alert["name"]),
+            html.Span(f"  ·  {alert['dimension']}", style={"fontWeight": "bold", "color": "#e74c3c"}),
+            html.Span(
+                f"  ·  {alert['baseline']:.2f} → {alert['recent']:.2f} ({alert['z']:.1f}σ drop)"
+                f"  ·  {'since ' if active else ''}{when}",
+                style={"color": "#6b7280"},
+            ),
+        ],
+    )
+
+
+def create_rating_alerts_list(limit=8):
+    """Active rating drops (largest first) followed by the latest alerts from the detector's history."""
+    detector = rating_alerts()
+    active = detector.active_alerts()
+    recent = detector.recent(limit)
+
+    if not active and not recent:
+        return html.P("No significant rating drops detected.", style={"color": "gray"})
+
+    children = []
+    if active:
+        children.append(html.H5("Active now", style={"marginBottom": "4px", "color": "#2c3e50"}))
+        children.append(html.Ul([_alert_row(a, True) for a in active[:limit]],
+                                style={"listStyle": "none", "paddingLeft": "0"}))
+    if recent:
+        children.append(html.H5("Recent alerts", style={"margin": "12px 0 4px 0", "color": "#2c3e50"}))
+        children.append(html.Ul([_alert_row(a, False) for a in recent],
+                                style={"listStyle": "none", "paddingLeft": "0"}))
+    return html.Div(children)
+
+
+def create_rating_alerts_panel(limit=8):
+    """
+    Create the rating alerts panel: per-dish drops in overall, taste, portion or
+    value flagged by the online detector (data/ratingAlerts.py).
+
+    The list is refreshed by the dashboard callback every ALERT_REFRESH_MS so
+    alerts raised by newly ingested reviews show up without a page reload.
+    """
+    return html.Div(
+        children=[
+            html.H3("🚨 Rating Alerts", style={"marginBottom": "4px", "color": "#1f2937"}),
+            html.P("Dishes whose recent ratings fell well below their usual level.",
+                   style={"color": "#6b7280"}),
+            html.Div(id="rating-alerts-list", children=create_rating_alerts_list(limit)),
+            dcc.Interval(id="rating-alerts-refresh", interval=ALERT_REFRESH_MS),
+        ]
+    )
@@ -0,0 +1,72 @@
+# components/operationalMetrics/reviewSearchBox.py
+
+from dash import dcc, html
+from data.loadData import loadData
+
+
+def create_review_search_box():
+    """
+    Create the review search controls (text, dish filter, date range) and results area.
+
+    The search itself runs in the dashboard callback via data.reviewSearch.search_reviews.
+    """
+    data = loadData()
+    dish_names = sorted(item["name"] for item in data.get("menuItems", []))
+
+    return html.Div(
+        children=[
+            html.H3("🔎 Search Reviews", style={"marginBottom": "12px", "color": "#1f2937"}),
+            html.Div(
+                style={"display": "flex", "flexWrap": "wrap", "gap": "10px", "alignItems": "center"},
+                children=[
+                    dcc.Input(
+                        id="review-search-input",
+                        type="text",
+                        placeholder='e.g. salty, cold, "small portion"',
+                        debounce=True,
+                        style={"flex": "1", "minWidth": "240px", "padding": "8px", "borderRadius": "6px",
+                               "border": "1px solid #d1d5db"},
+                    ),
+                    dcc.Dropdown(
+                        id="review-search-dish",
+                        options=[{"label": name, "value": name} for name in dish_names],
+                        placeholder="All dishes",
+                        style={"width": "220px"},
+                    ),
+                    dcc.DatePickerRange(
+                        id="review-search-dates",
+                        display_format="YYYY-MM-DD",
+                        clearable=True,
+                    ),
+                ],
+            ),
+            html.Div(id="review-search-results", style={"marginTop": "16px"}),
+        ]
+    )
+
+
+def create_review_search_results(results_df, query):
+    """Render search results (best BM25 match first) as a simple list."""
+    if results_df is None or results_df.empty:
+        return html.P(f'No reviews match "{query}".', style={"color": "gray"})
+
+    return html.Div(
+        children=[
+            html.P(f"{len(results_df)} best matches for \"{query}\"", style={"color": "#6b7280"}),
+            html.Ul(
+                style={"listStyle": "none", "paddingLeft": "0"},
+                children=[
+                    html.Li(
+                        style={"padding": "10px 0", "borderBottom": "1px solid #e5e7eb"},
+                        children=[
+                            html.Strong(row["dish"]),
+                            html.Span(f"  ·  {row['time_stamp']}  ·  ⭐ {int(row['overall'])}",
+                                      style={"color": "#6b7280"}),
+                            dcc.Markdown(row["snippet"], style={"marginTop": "4px"}),
+                        ],
+                    )
+                    for _, row in results_df.iterrows()
+                ],
+            ),
+        ]
+    )
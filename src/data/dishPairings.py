@@ -0,0 +1,169 @@
+"""Which dishes the same customers review: sparse co-occurrence and lift.
+
+`DishCooccurrence` builds a binary reviewer x menu item matrix B (scipy.sparse
+CSR, 1 where the reviewer reviewed the dish at least once) and the dish x
+dish co-occurrence matrix C = BᵀB with one sparse product. C[a, b] is the
+number of reviewers who reviewed both a and b and the diagonal holds each
+dish's reviewer count, so for N reviewers
+
+    support(a, b)    = C[a, b] / N
+    confidence(a→b)  = C[a, b] / C[a, a]
+    lift(a, b)       = C[a, b] · N / (C[a, a] · C[b, b])
+
+A lift above 1 means the two dishes share reviewers more often than chance.
+
+Ingested reviews (data/ingest.py) update C incrementally: a reviewer's first
+review of a dish adds one to its row and column for every dish the reviewer
+already reviewed. The increments are batched and added as one sparse matrix on
+the next query. Nothing is ever densified.
+"""
+
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from data.ingest import maintained_index
+from observability.metrics import phase
+
+# Pairs shared by fewer reviewers than this are too noisy to rank by lift
+MIN_TOGETHER = 3
+
+
+class DishCooccurrence:
+    """Reviewer x dish incidence and dish x dish co-occurrence, kept sparse."""
+
+    def __init__(self, reviewer_ids, menu_item_ids, menu_names: Optional[Dict[int, str]] = None):
+        self._lock = threading.Lock()
+        self.menu_names = dict(menu_names or {})
+        reviewer_ids = np.asarray(reviewer_ids, dtype=np.int64)
+        menu_item_ids = np.asarray(menu_item_ids, dtype=np.int64)
+
+        self.dish_ids = np.union1d(np.unique(menu_item_ids), np.array(sorted(self.menu_names), dtype=np.int64))
+        self.reviewer_ids, rows = np.unique(reviewer_ids, return_inverse=True)
+        cols = np.searchsorted(self.dish_ids, menu_item_ids)
+
+        with phase("aggregation"):
+            incidence = sparse.csr_matrix(
+                (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                shape=(len(self.reviewer_ids), len(self.dish_ids)),
+            )
+            incidence.sum_duplicates()
+            incidence.data[:] = 1
+            self.incidence = incidence
+            self.cooccurrence = (incidence.T @ incidence).tocsr()
+
+        self.n_reviewers = len(self.reviewer_ids)
+        # Dishes of reviewers first seen through ingestion, and reviews added to known reviewers
+        self._new_reviewers: Dict[int, set] = {}
+        self._added: Dict[int, set] = {}
+        self._pending = []
+
+    def _col(self, menu_item_id: int) -> Optional[int]:
+        i = int(np.searchsorted(self.dish_ids, menu_item_id))
+        return i if i < len(self.dish_ids) and self.dish_ids[i] == menu_item_id else None
+
+    def _dishes_of(self, reviewer_id: int) -> set:
+        """Columns the reviewer has reviewed so far (caller holds the lock)."""
+        if reviewer_id in self._new_reviewers:
+            return self._new_reviewers[reviewer_id]
+        i = int(np.searchsorted(self.reviewer_ids, reviewer_id))
+        known = set()
+        if i < len(self.reviewer_ids) and self.reviewer_ids[i] == reviewer_id:
+            known = set(self.incidence.indices[self.incidence.indptr[i]:self.incidence.indptr[i + 1]].tolist())
+        return known | self._added.get(reviewer_id, set())
+
+    def add(self, review: Dict) -> None:
+        """Count one joined review (see data/ingest.py)."""
+        reviewer_id, menu_item_id = int(review["reviewer_id"]), int(review["menu_item_id"])
+        if review.get("name"):
+            self.menu_names.setdefault(menu_item_id, review["name"])
+        with self._lock:
+            col = self._col(menu_item_id)
+            if col is None:
+                # Every menu item of the snapshot has a column; new menu items arrive with a data reload
+                return
+
+            if reviewer_id not in self._new_reviewers and not self._is_known(reviewer_id):
+                self.n_reviewers += 1
+                self._new_reviewers[reviewer_id] = set()
+            dishes = self._dishes_of(reviewer_id)
+            if col in dishes:
+                return  # only a reviewer's first review of a dish counts
+
+            for other in dishes:
+                self._pending.append((col, other))
+                self._pending.append((other, col))
+            self._pending.append((col, col))
+            if reviewer_id in self._new_reviewers:
+                self._new_reviewers[reviewer_id].add(col)
+            else:
+                self._added.setdefault(reviewer_id, set()).add(col)
+
+    def _is_known(self, reviewer_id: int) -> bool:
+        i = int(np.searchsorted(self.reviewer_ids, reviewer_id))
+        return i < len(self.reviewer_ids) and self.reviewer_ids[i] == reviewer_id
+
+    def _flush(self) -> None:
+        """Add batched co-occurrence increments to C (caller holds the lock)."""
+        if not self._pending:
+            return
+        rows, cols = np.array(self._pending, dtype=np.int64).T
+        self._pending = []
+        delta = sparse.csr_matrix((np.ones(len(rows), dtype=self.cooccurrence.dtype), (rows, cols)),
+                                  shape=self.cooccurrence.shape)
+        self.cooccurrence = (self.cooccurrence + delta).tocsr()
+
+    def pairings(self, menu_item_id: int, top: int = 8, min_together: int = MIN_TOGETHER) -> pd.DataFrame:
+        """
+        Dishes most often reviewed by the same customers as `menu_item_id`, by lift
+        (ties by shared reviewers). Columns: menu_item_id, name, together, support,
+        confidence, lift.
+        """
+        columns = ["menu_item_id", "name", "together", "support", "confidence", "lift"]
+        with self._lock:
+            self._flush()
+            col = self._col(menu_item_id)
+            if col is None or not self.n_reviewers:
+                return pd.DataFrame(columns=columns)
+            row = self.cooccurrence.getrow(col)
+            diagonal = self.cooccurrence.diagonal()
+            n = self.n_reviewers
+
+        others, together = row.indices, row.data.astype(float)
+        keep = (others != col) & (together >= min_together)
+        others, together = others[keep], together[keep]
+        if not len(others):
+            return pd.DataFrame(columns=columns)
+
+        lift = together * n / (diagonal[col] * diagonal[others])
+        if len(others) > top:
+            candidates = np.argpartition(-lift, top - 1)[:top]
+        else:
+            candidates = np.arange(len(others))
+        order = candidates[np.lexsort((-together[candidates], -lift[candidates]))]
+
+        ids = self.dish_ids[others[order]]
+        return pd.DataFrame({
+            "menu_item_id": ids,
+            "name": [self.menu_names.get(int(d), str(d)) for d in ids],
+            "together": together[order].astype(int),
+            "support": together[order] / n,
+            "confidence": together[order] / diagonal[col],
+            "lift": lift[order],
+        })
+
+
+def build_dish_cooccurrence(data: Dict) -> DishCooccurrence:
+    """Index a loadData()-shaped dataset."""
+    frame = pd.DataFrame(data.get("reviews", []), columns=["reviewer_id", "menu_item_id"])
+    names = {item["id"]: item["name"] for item in data.get("menuItems", [])}
+    return DishCooccurrence(frame["reviewer_id"].to_numpy(), frame["menu_item_id"].to_numpy(), names)
+
+
+@maintained_index
+def dish_cooccurrence(data: Dict) -> DishCooccurrence:
+    """The shared index for the current data snapshot (rebuilt when the data file changes)."""
+    return build_dish_cooccurrence(data)
@@ -0,0 +1,197 @@
+"""Nearest-neighbour index over dish rating profiles ("dishes like this one").
+
+Each dish is described by
+- its mean taste, portion, value and overall rating
+- the share of its overall ratings that are 1, 2, 3, 4 and 5
+- its sentiment mix (positive / neutral / negative review text, the TextBlob
+  polarities of data/reviewSentiment.py that the dish sentiment chart also uses)
+
+Reviews flagged as near-duplicates (data/reviewDuplicates.py) are left out,
+as in the dish cards and the other rating aggregates.
+
+The features are centred on fixed neutral values (3 for a mean, a uniform share
+for a mix), so a dish's vector depends on its own reviews only. Each group is
+weighted equally and rows are scaled to unit length. Cosine similarity to every
+other dish is then one matrix-vector product, and the top k come from
+argpartition. Each dish's neighbour list is cached after its first lookup, so
+repeat lookups are a dictionary hit.
+
+Per-dish sums and counts are kept alongside the matrix. An ingested review
+(data/ingest.py) updates its dish's counts and recomputes that one row. It
+also drops only the cached neighbour lists the change could affect: lists that
+contain the dish, or whose weakest entry it now beats.
+"""
+
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from data.ingest import maintained_index
+from data.reviewDuplicates import is_duplicate_review, without_duplicates
+from data.reviewSentiment import SENTIMENT_LABELS, polarity_of, review_sentiment, sentiment_bins
+from observability.metrics import phase
+
+MEAN_FIELDS = ["taste", "portion", "value", "overall"]
+
+# Dishes with fewer reviews than this are not suggested (their profile is mostly noise)
+MIN_REVIEWS = 3
+# Neighbour lists kept per looked-up dish
+NEIGHBOURS_CACHED = 10
+
+_GROUPS = [(len(MEAN_FIELDS), 3.0, 2.0), (5, 0.2, 1.0), (len(SENTIMENT_LABELS), 1 / 3, 1.0)]  # (size, centre, scale)
+
+
+class DishSimilarity:
+    """Unit-length rating-profile vectors for every dish, updatable one dish at a time."""
+
+    def __init__(self, dish_ids, menu_names: Optional[Dict[int, str]] = None):
+        self._lock = threading.Lock()
+        self.dish_ids = np.asarray(sorted(dish_ids), dtype=np.int64)
+        self.menu_names = dict(menu_names or {})
+        n = len(self.dish_ids)
+        self.review_counts = np.zeros(n, dtype=np.int64)
+        self.sums = np.zeros((n, len(MEAN_FIELDS)))
+        self.histograms = np.zeros((n, 5), dtype=np.int64)
+        self.sentiments = np.zeros((n, len(SENTIMENT_LABELS)), dtype=np.int64)
+        self.vectors = np.zeros((n, sum(size for size, _, _ in _GROUPS)), dtype=np.float32)
+        # row -> (neighbour rows, similarities) for lookups with k <= NEIGHBOURS_CACHED
+        self._neighbours: Dict[int, tuple] = {}
+
+    def _row(self, menu_item_id: int) -> Optional[int]:
+        i = int(np.searchsorted(self.dish_ids, menu_item_id))
+        return i if i < len(self.dish_ids) and self.dish_ids[i] == menu_item_id else None
+
+    def _refresh(self, rows) -> None:
+        """Recompute the normalized vectors of `rows` from their counts."""
+        counts = np.maximum(self.review_counts[rows], 1)[:, None]
+        groups = [self.sums[rows] / counts, self.histograms[rows] / counts, self.sentiments[rows] / counts]
+        parts = [(values - centre) / scale / np.sqrt(size) for values, (size, centre, scale) in zip(groups, _GROUPS)]
+        vectors = np.hstack(parts)
+        vectors[self.review_counts[rows] == 0] = 0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors[rows] = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    def add_reviews(self, menu_item_ids, ratings: np.ndarray, sentiment: np.ndarray) -> None:
+        """
+        Bulk-add reviews: `ratings` is (n, 4) in MEAN_FIELDS order (overall a whole
+        number 1-5), `sentiment` indexes SENTIMENT_LABELS.
+        """
+        if not len(self.dish_ids):
+            return
+        ids = np.asarray(menu_item_ids, dtype=np.int64)
+        rows = np.searchsorted(self.dish_ids, ids)
+        # Reviews of menu items outside the index are skipped
+        known = (rows < len(self.dish_ids)) & (self.dish_ids[np.minimum(rows, len(self.dish_ids) - 1)] == ids)
+        rows, ratings, sentiment = rows[known], np.asarray(ratings, dtype=float)[known], np.asarray(sentiment)[known]
+        overall = np.clip(np.rint(ratings[:, MEAN_FIELDS.index("overall")]).astype(int), 1, 5) - 1
+
+        with self._lock:
+            np.add.at(self.review_counts, rows, 1)
+            np.add.at(self.sums, rows, ratings)
+            np.add.at(self.histograms, (rows, overall), 1)
+            np.add.at(self.sentiments, (rows, sentiment), 1)
+            changed = np.unique(rows)
+            self._refresh(changed)
+            self._invalidate(changed)
+
+    def add(self, review: Dict) -> None:
+        """Count one joined review (see data/ingest.py); duplicates are skipped."""
+        if self._row(int(review["menu_item_id"])) is None or is_duplicate_review(review):
+            return
+        ratings = np.array([[float(review[field]) for field in MEAN_FIELDS]])
+        sentiment = sentiment_bins(polarity_of([review.get("content") or ""]))
+        self.add_reviews([int(review["menu_item_id"])], ratings, sentiment)
+
+    def _top(self, row: int, k: int, min_reviews: int):
+        """(rows, scores) of the k most similar eligible dishes to `row`, best first (caller holds the lock)."""
+        scores = self.vectors @ self.vectors[row]
+        eligible = self.review_counts >= min_reviews
+        eligible[row] = False
+        candidates = np.flatnonzero(eligible)
+        scores = scores[candidates]
+        if len(candidates) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            candidates, scores = candidates[top], scores[top]
+        order = np.argsort(-scores)
+        return candidates[order], scores[order]
+
+    def _invalidate(self, changed: np.ndarray) -> None:
+        """Drop cached neighbour lists that a change to `changed` rows could alter (caller holds the lock)."""
+        for row in changed.tolist():
+            self._neighbours.pop(row, None)
+        if not self._neighbours:
+            return
+        cached = np.fromiter(self._neighbours, dtype=np.int64)
+        lists = np.full((len(cached), NEIGHBOURS_CACHED), -1, dtype=np.int64)
+        weakest = np.full(len(cached), -np.inf)
+        for i, (rows, best) in enumerate(self._neighbours.values()):
+            lists[i, :len(rows)] = rows
+            if len(best) == NEIGHBOURS_CACHED:
+                weakest[i] = best[-1]
+        # Stale if a changed dish was a neighbour (its score moved) or now beats the weakest one
+        contains = np.isin(lists, changed).any(axis=1)
+        beats = ((self.vectors[cached] @ self.vectors[changed].T) > weakest[:, None]).any(axis=1)
+        for row in cached[contains | beats].tolist():
+            del self._neighbours[row]
+
+    def neighbours(self, menu_item_id: int, k: int = 5):
+        """
+        (menu_item_ids, similarities) of the k dishes with the most similar
+        rating profile, best first (cosine similarity, 1 = identical). Served
+        from a per-dish cache after the first lookup.
+        """
+        row = self._row(menu_item_id)
+        if row is None or not self.review_counts[row]:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        with self._lock:
+            if k > NEIGHBOURS_CACHED:
+                rows, scores = self._top(row, k, MIN_REVIEWS)
+            else:
+                cached = self._neighbours.get(row)
+                if cached is None:
+                    cached = self._neighbours[row] = self._top(row, NEIGHBOURS_CACHED, MIN_REVIEWS)
+                rows, scores = cached[0][:k], cached[1][:k]
+        return self.dish_ids[rows], scores
+
+    def similar(self, menu_item_id: int, k: int = 5) -> pd.DataFrame:
+        """neighbours() as a DataFrame: menu_item_id, name, similarity, overall, reviews."""
+        ids, scores = self.neighbours(menu_item_id, k)
+        rows = np.searchsorted(self.dish_ids, ids)
+        counts = self.review_counts[rows]
+        return pd.DataFrame({
+            "menu_item_id": ids,
+            "name": [self.menu_names.get(int(d), str(d)) for d in ids],
+            "similarity": scores.astype(float),
+            "overall": self.sums[rows, MEAN_FIELDS.index("overall")] / np.maximum(counts, 1),
+            "reviews": counts,
+        })
+
+
+def build_dish_similarity(data: Dict) -> DishSimilarity:
+    """Index a loadData()-shaped dataset."""
+    menu = data.get("menuItems", [])
+    index = DishSimilarity([item["id"] for item in menu], {item["id"]: item["name"] for item in menu})
+    reviews = pd.DataFrame(data.get("reviews", []))
+    ratings = pd.DataFrame(data.get("ratings", []))
+    if reviews.empty or ratings.empty:
+        return index
+
+    # Scored once per snapshot and shared with the dish sentiment chart
+    polarity = review_sentiment()
+    with phase("aggregation"):
+        merged = without_duplicates(reviews).merge(ratings, left_on="rating_id", right_on="id",
+                                                   suffixes=("_review", "_rating"))
+        if "content_id" in merged.columns:
+            sentiment = polarity.labels(merged["content_id"].fillna(-1).to_numpy(dtype=np.int64))
+        else:
+            sentiment = np.full(len(merged), SENTIMENT_LABELS.index("Neutral"))
+        index.add_reviews(merged["menu_item_id"].to_numpy(), merged[MEAN_FIELDS].to_numpy(dtype=float), sentiment)
+    return index
+
+
+@maintained_index
+def dish_similarity(data: Dict) -> DishSimilarity:
+    """The shared index for the current data snapshot (rebuilt when the data file changes)."""
+    return build_dish_similarity(data)
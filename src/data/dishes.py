@@ -13,17 +13,20 @@ Returned dish dicts follow the shape expected by the rest of the app:
 }
 """
 
+import copy
 from typing import List, Dict, Optional
 import pandas as pd
-from data.loadData import loadData
+from data.loadData import loadData, cached_on_data
+from data.reviewDuplicates import without_duplicates
+from observability.metrics import phase
 
 
+@cached_on_data
 def _build_aggregated_menu() -> List[Dict]:
     """Return a list of aggregated menu items constructed from mockData.json.
 
-    This function is idempotent and intentionally lightweight — it rebuilds
-    the aggregation on each call (data is small). If you prefer, we can add
-    simple caching later.
+    The result is cached until the data file changes; callers get copies via
+    get_all_dishes().
     """
     data = loadData()
 
@@ -35,22 +38,26 @@ def _build_aggregated_menu() -> List[Dict]:
         # If any piece is missing, fall back to an empty list
         return []
 
-    # Join reviews -> ratings to attribute rating values to menu_item_id
-    merged = reviews.merge(ratings, left_on="rating_id", right_on="id", suffixes=("_review", "_rating"))
-    merged = merged.merge(menu, left_on="menu_item_id", right_on="id", suffixes=("", "_menu"))
-
-    # For each menu item compute mean taste, portion (map to texture), value (map to bangForBuck), and overall mean
-    agg = (
-        merged
-        .groupby(["menu_item_id", "name"], as_index=False)
-        .agg(
-            taste_mean=("taste", "mean"),
-            portion_mean=("portion", "mean"),
-            value_mean=("value", "mean"),
-            overall_mean=("overall", "mean"),
-            review_count=("rating_id", "count"),
+    with phase("aggregation"):
+        # Copy-pasted and bot reviews (data/reviewDuplicates.py) do not count towards dish averages
+        reviews = without_duplicates(reviews)
+
+        # Join reviews -> ratings to attribute rating values to menu_item_id
+        merged = reviews.merge(ratings, left_on="rating_id", right_on="id", suffixes=("_review", "_rating"))
+        merged = merged.merge(menu, left_on="menu_item_id", right_on="id", suffixes=("", "_menu"))
+
+        # For each menu item compute mean taste, portion (map to texture), value (map to bangForBuck), and overall mean
+        agg = (
+            merged
+            .groupby(["menu_item_id", "name"], as_index=False)
+            .agg(
+                taste_mean=("taste", "mean"),
+                portion_mean=("portion", "mean"),
+                value_mean=("value", "mean"),
+                overall_mean=("overall", "mean"),
+                review_count=("rating_id", "count"),
+            )
         )
-    )
 
     dishes: List[Dict] = []
     for row in agg.to_dict(orient="records"):
@@ -95,7 +102,7 @@ def calculate_average_rating(dish: Dict) -> float:
 
 def get_all_dishes() -> List[Dict]:
     """Return the aggregated list of menu items with rating summaries."""
-    return _build_aggregated_menu()
+    return copy.deepcopy(_build_aggregated_menu())
 
 
 def get_top_rated_dishes(count: int = 5) -> List[Dict]:
@@ -0,0 +1,228 @@
+"""Add new reviews to the in-memory dataset and notify incremental indexes.
+
+`ingest_review` appends a review (with its rating and optional content) to the
+dataset returned by `loadData()`, drops the aggregates memoized with
+`cached_on_data` so they are rebuilt with the new row, and passes the joined
+review to every function registered with `subscribe`. Structures that can be
+updated in place (e.g. `data/recentReviews.py`) are declared with
+`maintained_index` instead of being rebuilt.
+
+Subscribers run inside the ingest lock, so every index sees the reviews in id
+order and an index being rebuilt either contains a review or receives it, never
+both. Reviews are posted to /api/reviews (see `init_app`).
+
+Ingested rows live in this process only; they are not written back to the
+data file, so with several gunicorn workers each worker sees its own
+ingestions until the next data reload.
+"""
+
+import hmac
+import os
+import threading
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+from data.loadData import loadData, data_version, invalidate_derived
+
+_subscribers: List[Callable[[Dict], None]] = []
+# (state, lock) of every maintained_index getter, so they can be dropped together
+_index_states: List[Tuple[Dict, threading.Lock]] = []
+# Reentrant: an index build holds it and may use other maintained indexes
+_ingest_lock = threading.RLock()
+# Next free id per table, for the dataset object they were computed from
+_next_ids = {"data": None}
+
+RATING_FIELDS = ("portion", "taste", "value", "overall", "return")
+
+
+def subscribe(callback: Callable[[Dict], None]) -> Callable[[Dict], None]:
+    """Call `callback(review)` with each joined review after it is ingested. Usable as a decorator."""
+    if callback not in _subscribers:
+        _subscribers.append(callback)
+    return callback
+
+
+def unsubscribe(callback: Callable[[Dict], None]) -> None:
+    if callback in _subscribers:
+        _subscribers.remove(callback)
+
+
+def maintained_index(build: Callable[[Dict], object]) -> Callable[[], object]:
+    """
+    Turn `build(data)` into a zero-argument getter for a shared index over the
+    loaded dataset. The index is built on first use and again whenever the data
+    file changes; in between, every ingested review is passed to its `add(review)`.
+    """
+    state = {"version": None, "index": None}
+    lock = threading.Lock()
+    _index_states.append((state, lock))
+
+    @wraps(build)
+    def get():
+        version = data_version()
+        with lock:
+            if state["version"] == version:
+                return state["index"]
+        # Builds exclude ingestion, so no review is both in the build and added after it
+        with _ingest_lock, lock:
+            if state["version"] != version:
+                state["index"] = build(loadData())
+                state["version"] = version
+            return state["index"]
+
+    def on_ingest(review: Dict) -> None:
+        with lock:
+            index = state["index"]
+            if index is not None:
+                index.add(review)
+
+    subscribe(on_ingest)
+    return get
+
+
+def drop_indexes() -> None:
+    """Forget every maintained index; each is rebuilt from loadData() on its next use."""
+    for state, lock in _index_states:
+        with lock:
+            state["version"] = None
+            state["index"] = None
+
+
+def _next_id(data: Dict, table: str) -> int:
+    if _next_ids["data"] is not data:
+        # New snapshot (first ingestion or the data file was reloaded): scan once
+        _next_ids.clear()
+        _next_ids["data"] = data
+    if table not in _next_ids:
+        _next_ids[table] = max((row["id"] for row in data[table]), default=0) + 1
+    next_id = _next_ids[table]
+    _next_ids[table] = next_id + 1
+    return next_id
+
+
+def format_timestamp(when: datetime) -> str:
+    """Timestamps in the dataset are month/day/year, e.g. 8/1/2023."""
+    return f"{when.month}/{when.day}/{when.year}"
+
+
+def joined_review(review: Dict, rating: Dict, menu_name: Optional[str], content: Optional[str],
+                  when: datetime) -> Dict:
+    """The review as subscribers see it: review ids, dish name, ratings, content and a parsed timestamp."""
+    return {
+        "id": review["id"],
+        "rating_id": review["rating_id"],
+        "content_id": review["content_id"],
+        "reviewer_id": review["reviewer_id"],
+        "menu_item_id": review["menu_item_id"],
+        "name": menu_name,
+        **{field: rating.get(field) for field in RATING_FIELDS},
+        "content": content,
+        "timestamp": when,
+    }
+
+
+def ingest_review(reviewer_id: int, menu_item_id: int, ratings: Dict, content: Optional[str] = None,
+                  timestamp: Optional[datetime] = None) -> Dict:
+    """
+    Append one review to the loaded dataset and return it joined (see `joined_review`).
+
+    `ratings` holds portion, taste, value, overall (1-5) and return (bool).
+    `timestamp` defaults to now.
+    """
+    missing = [field for field in RATING_FIELDS if field not in ratings]
+    if missing:
+        raise ValueError(f"Missing rating fields: {', '.join(missing)}")
+
+    when = timestamp or datetime.now()
+    data = loadData()
+    menu_names = {item["id"]: item["name"] for item in data.get("menuItems", [])}
+    if menu_item_id not in menu_names:
+        raise ValueError(f"Unknown menu item: {menu_item_id}")
+
+    with _ingest_lock:
+        rating = {"id": _next_id(data, "ratings"), **{field: ratings[field] for field in RATING_FIELDS}}
+        data["ratings"].append(rating)
+
+        # Every review has a content row (the joins elsewhere are inner joins)
+        content_id = _next_id(data, "content")
+        data["content"].append({"id": content_id, "content": content or ""})
+
+        review = {
+            "id": _next_id(data, "reviews"),
+            "rating_id": rating["id"],
+            "content_id": content_id,
+            "reviewer_id": reviewer_id,
+            "timestamp": format_timestamp(when),
+            "menu_item_id": menu_item_id,
+        }
+        data["reviews"].append(review)
+        invalidate_derived()
+
+        joined = joined_review(review, rating, menu_names[menu_item_id], content or "", when)
+        for callback in list(_subscribers):
+            callback(joined)
+    return joined
+
+
+def snapshot_id() -> str:
+    """Identity of the current data: the data file version and how many reviews were ingested into it."""
+    path, mtime, size = data_version()
+    return f"{path}:{mtime}:{size}:{len(loadData()['reviews'])}"
+
+
+def _parse_review(payload: Dict) -> Dict:
+    """ingest_review arguments from a JSON body; raises ValueError when a field is missing or malformed."""
+    try:
+        ratings = payload["ratings"]
+        arguments = {
+            "reviewer_id": int(payload["reviewer_id"]),
+            "menu_item_id": int(payload["menu_item_id"]),
+            "ratings": {field: ratings[field] for field in RATING_FIELDS},
+            "content": payload.get("content"),
+        }
+    except KeyError as missing:
+        raise ValueError(f"Missing field: {missing.args[0]}") from None
+    except (TypeError, ValueError):
+        raise ValueError("reviewer_id and menu_item_id must be integers, ratings an object") from None
+
+    for field in RATING_FIELDS[:-1]:
+        value = arguments["ratings"][field]
+        if not isinstance(value, int) or isinstance(value, bool) or not 1 <= value <= 5:
+            raise ValueError(f"Rating {field} must be an integer from 1 to 5")
+    arguments["ratings"]["return"] = bool(arguments["ratings"]["return"])
+
+    if payload.get("timestamp"):
+        try:
+            arguments["timestamp"] = datetime.fromisoformat(payload["timestamp"])
+        except (TypeError, ValueError):
+            raise ValueError("timestamp must be an ISO date or datetime") from None
+    return arguments
+
+
+def init_app(app) -> None:
+    """
+    Add POST /api/reviews to a Dash app's Flask server (only when PLATEMATE_ADMIN_TOKEN is set).
+
+    The body is JSON: reviewer_id, menu_item_id, ratings (portion, taste, value,
+    overall 1-5 and return), optional content and an optional ISO timestamp.
+    The token is sent as X-Platemate-Admin-Token. Responds 201 with the joined
+    review, 400 for invalid input and 403 for a missing or wrong token.
+    """
+    from flask import abort, jsonify, request
+    from observability.profiling import ADMIN_TOKEN_HEADER
+
+    token = os.getenv("PLATEMATE_ADMIN_TOKEN", "")
+    if not token:
+        print("Ingest: PLATEMATE_ADMIN_TOKEN is not set, /api/reviews is disabled")
+        return
+
+    @app.server.route("/api/reviews", methods=["POST"])
+    def _post_review():
+        if not hmac.compare_digest(request.headers.get(ADMIN_TOKEN_HEADER, ""), token):
+            abort(403)
+        try:
+            review = ingest_review(**_parse_review(request.get_json(silent=True) or {}))
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+        return jsonify({**review, "timestamp": review["timestamp"].isoformat()}), 201
@@ -1,16 +1,95 @@
 import json
 import pandas as pd
 import os
+import threading
+from functools import wraps
+from observability.metrics import phase
+
+# Parsed dataset and derived aggregates, reused until the data file changes.
+# Under gunicorn (preload_app) these are filled in the master and shared with
+# the forked workers copy-on-write.
+_cache = {"version": None, "data": None}
+_derived = {}
+# Bumped whenever _derived is cleared, so a value computed before that isn't stored after it
+_generation = [0]
+_cache_lock = threading.Lock()
+
+
+def data_file_path():
+    # PLATEMATE_DATA_FILE points at another dataset in the same format
+    # (e.g. one written by data/syntheticData.py for benchmarking)
+    json_path = os.getenv("PLATEMATE_DATA_FILE")
+    if not json_path:
+        # Get the directory of this file
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        json_path = os.path.join(current_dir, "mockData.json")
+    return json_path
+
+
+def data_version(json_path=None):
+    """Identity of the current data snapshot: (path, mtime, size)."""
+    json_path = json_path or data_file_path()
+    stat = os.stat(json_path)
+    return json_path, stat.st_mtime_ns, stat.st_size
+
 
 def loadData():
-    # Get the directory of this file
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    json_path = os.path.join(current_dir, "mockData.json")
+    """Return the parsed dataset. Cached until the file changes, so treat it as read-only."""
+    json_path = data_file_path()
+    version = data_version(json_path)
+    with _cache_lock:
+        if _cache["version"] == version:
+            return _cache["data"]
 
-    with open(json_path, "r") as f:
+    with phase("data_load"), open(json_path, "r") as f:
         data = json.load(f)
-        return data
-    
+
+    with _cache_lock:
+        _cache["version"] = version
+        _cache["data"] = data
+        _derived.clear()
+        _generation[0] += 1
+    return data
+
+
+def clear_cache():
+    """Forget the parsed dataset and every derived aggregate (the next loadData() reads the file again)."""
+    with _cache_lock:
+        _cache["version"] = None
+        _cache["data"] = None
+        _derived.clear()
+        _generation[0] += 1
+
+
+def invalidate_derived():
+    """Drop memoized aggregates after the loaded data was changed in place (see data/ingest.py)."""
+    with _cache_lock:
+        _derived.clear()
+        _generation[0] += 1
+
+
+def cached_on_data(func):
+    """Memoize a zero-argument aggregate of loadData() until the data file changes or a review is ingested."""
+    key = f"{func.__module__}.{func.__qualname__}"
+
+    @wraps(func)
+    def wrapper():
+        version = data_version()
+        with _cache_lock:
+            hit = _derived.get(key)
+            generation = _generation[0]
+        if hit is not None and hit[0] == version:
+            return hit[1]
+
+        value = func()
+        # Only keep the value if nothing was reloaded or ingested while it was computed
+        current = data_version()
+        with _cache_lock:
+            if current == version and _generation[0] == generation:
+                _derived[key] = (version, value)
+        return value
+
+    return wrapper
 
 
 # # Tester for Nafisa
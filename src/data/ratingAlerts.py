@@ -0,0 +1,254 @@
+"""Online detection of rating drops per dish (EWMA control chart) and the alert feed.
+
+For every dish and each of overall / taste / portion / value the detector keeps
+two exponentially weighted averages of the ratings in review order:
+
+- a slow baseline (weight SLOW_ALPHA per review) with an EWMA variance of each
+  rating's deviation from the baseline before it
+- a fast recent average (weight FAST_ALPHA per review)
+
+Both are bias-corrected (decayed sums over decayed weights), so a dish's first
+reviews are averaged plainly instead of being pulled toward a prior. Under a
+steady rating level the fast average has standard deviation
+σ·sqrt(λ / (2 − λ)). An alert starts when it falls more than ALERT_SIGMAS of
+those below the baseline, once the dish has WARMUP_REVIEWS reviews. It clears
+again once the gap is back under CLEAR_SIGMAS, and only then can the same dish
+and dimension alert again.
+
+All state is a handful of (dish, dimension) float arrays. An ingested review
+(data/ingest.py) updates one row of each in constant time. The index build
+replays the dataset in timestamp order, one `lfilter` pass per dish and no
+Python loop over reviews, so it starts with the same state and alert history a
+live detector would have. Reviews without a usable timestamp have no place in
+that order and are skipped, as are reviews flagged as near-duplicates
+(data/reviewDuplicates.py).
+
+Alerts raised by ingested reviews are printed and, when configured
+(PLATEMATE_ALERT_LOG or configure_alert_log), appended to a JSON-lines log.
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from data.ingest import maintained_index
+from data.reviewDuplicates import is_duplicate_review, without_duplicates
+from observability.metrics import phase
+
+DIMENSIONS = ["overall", "taste", "portion", "value"]
+
+SLOW_ALPHA = 0.02
+FAST_ALPHA = 0.1
+WARMUP_REVIEWS = 20
+ALERT_SIGMAS = float(os.getenv("PLATEMATE_ALERT_SIGMAS", "3"))
+CLEAR_SIGMAS = 1.0
+# Floor for the rating spread, so a dish with near-identical ratings doesn't alert on one low review
+MIN_SIGMA = 0.5
+# Alerts kept in memory for the dashboard feed
+HISTORY = 200
+
+_FAST_SPREAD = np.sqrt(FAST_ALPHA / (2 - FAST_ALPHA))
+_alert_log = os.getenv("PLATEMATE_ALERT_LOG")
+
+
+def configure_alert_log(path: Optional[str]) -> None:
+    """Append alerts raised by ingested reviews to `path` (JSON lines); None disables the log."""
+    global _alert_log
+    if path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    _alert_log = path
+
+
+def _log_alert(alert: Dict) -> None:
+    print(f"Rating alert: {alert['name']} {alert['dimension']} fell to {alert['recent']:.2f} "
+          f"(baseline {alert['baseline']:.2f}, {alert['z']:.1f}σ)")
+    if _alert_log:
+        with open(_alert_log, "a", encoding="utf-8") as f:
+            f.write(json.dumps({**alert, "timestamp": str(alert["timestamp"])}) + "\n")
+
+
+def _gap(slow_sum, slow_weight, deviation_sum, fast_sum, fast_weight):
+    """(baseline, recent, z) where z is the baseline-to-recent drop in standard deviations of the recent average."""
+    baseline = slow_sum / slow_weight
+    recent = fast_sum / fast_weight
+    sigma = np.maximum(np.sqrt(deviation_sum / slow_weight), MIN_SIGMA)
+    return baseline, recent, (baseline - recent) / (sigma * _FAST_SPREAD)
+
+
+def _ewma_sums(values: np.ndarray, alpha: float, initial=None):
+    """Decayed running sums of `values` along axis 0, continuing from `initial` (the sums before the first row)."""
+    zi = None if initial is None else ((1 - alpha) * np.asarray(initial, dtype=float))[None, ...]
+    if zi is None:
+        return lfilter([1.0], [1.0, alpha - 1], values, axis=0)
+    return lfilter([1.0], [1.0, alpha - 1], values, axis=0, zi=zi)[0]
+
+
+class RatingAlerts:
+    """Per (dish, dimension) EWMA state, active alerts and the recent alert history."""
+
+    def __init__(self, dish_ids, menu_names: Optional[Dict[int, str]] = None):
+        self._lock = threading.Lock()
+        self.dish_ids = np.asarray(sorted(dish_ids), dtype=np.int64)
+        self._rows = {int(d): i for i, d in enumerate(self.dish_ids)}
+        self.menu_names = dict(menu_names or {})
+        shape = (len(self.dish_ids), len(DIMENSIONS))
+        self.reviews = np.zeros(len(self.dish_ids), dtype=np.int64)
+        self.slow_sum = np.zeros(shape)
+        self.slow_weight = np.zeros(shape)
+        self.deviation_sum = np.zeros(shape)
+        self.fast_sum = np.zeros(shape)
+        self.fast_weight = np.zeros(shape)
+        self.active = np.zeros(shape, dtype=bool)
+        self.since = np.full(shape, np.datetime64("NaT"), dtype="datetime64[s]")
+        self.history = deque(maxlen=HISTORY)
+
+    def _alert(self, row: int, k: int, when, baseline: float, recent: float, z: float, reviews: int) -> Dict:
+        menu_item_id = int(self.dish_ids[row])
+        return {
+            "menu_item_id": menu_item_id,
+            "name": self.menu_names.get(menu_item_id, str(menu_item_id)),
+            "dimension": DIMENSIONS[k],
+            "timestamp": pd.Timestamp(when).to_pydatetime(),
+            "baseline": float(baseline),
+            "recent": float(recent),
+            "drop": float(baseline - recent),
+            "z": float(z),
+            "reviews": int(reviews),
+        }
+
+    def replay(self, menu_item_ids, timestamps, ratings: np.ndarray) -> None:
+        """Feed dated reviews in bulk (any order; sorted by time here). `ratings` is (n, 4) in DIMENSIONS order."""
+        ids = np.asarray(menu_item_ids, dtype=np.int64)
+        when = pd.to_datetime(pd.Series(timestamps), errors="coerce").to_numpy(dtype="datetime64[s]")
+        ratings = np.asarray(ratings, dtype=float)
+        rows = np.searchsorted(self.dish_ids, ids)
+        known = (rows < len(self.dish_ids)) & (self.dish_ids[np.minimum(rows, len(self.dish_ids) - 1)] == ids)
+        keep = known & ~np.isnat(when) & np.isfinite(ratings).all(axis=1)
+        rows, when, ratings = rows[keep], when[keep], ratings[keep]
+        order = np.lexsort((when, rows))
+        rows, when, ratings = rows[order], when[order], ratings[order]
+        bounds = np.flatnonzero(np.diff(rows)) + 1
+
+        alerts = []
+        with self._lock:
+            for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(rows)]):
+                if start < end:
+                    alerts.extend(self._replay_dish(int(rows[start]), when[start:end], ratings[start:end]))
+            alerts.sort(key=lambda alert: alert["timestamp"])
+            self.history.extend(alerts)
+
+    def _replay_dish(self, row: int, when: np.ndarray, x: np.ndarray) -> List[Dict]:
+        """Vectorized equivalent of add() for one dish's reviews in time order (caller holds the lock)."""
+        ones = np.ones_like(x)
+        slow_sum = _ewma_sums(x, SLOW_ALPHA, self.slow_sum[row] if self.reviews[row] else None)
+        slow_weight = _ewma_sums(ones, SLOW_ALPHA, self.slow_weight[row] if self.reviews[row] else None)
+        # Each rating's deviation from the baseline before it (the first rating has none)
+        previous = np.vstack([self.slow_sum[row] / self.slow_weight[row] if self.reviews[row] else x[:1],
+                              slow_sum[:-1] / slow_weight[:-1]])
+        deviation_sum = _ewma_sums((x - previous) ** 2, SLOW_ALPHA, self.deviation_sum[row] if self.reviews[row] else None)
+        fast_sum = _ewma_sums(x, FAST_ALPHA, self.fast_sum[row] if self.reviews[row] else None)
+        fast_weight = _ewma_sums(ones, FAST_ALPHA, self.fast_weight[row] if self.reviews[row] else None)
+        baseline, recent, z = _gap(slow_sum, slow_weight, deviation_sum, fast_sum, fast_weight)
+
+        # Alert state with hysteresis: +1 where an alert starts, -1 where it clears, carried forward
+        counts = self.reviews[row] + np.arange(1, len(x) + 1)
+        ready = (counts >= WARMUP_REVIEWS)[:, None]
+        events = np.where(ready & (z > ALERT_SIGMAS), 1, np.where(~ready | (z < CLEAR_SIGMAS), -1, 0))
+        initial = np.where(self.active[row], 1, -1)
+        events = np.vstack([initial, events])
+        last_event = np.maximum.accumulate(np.where(events != 0, np.arange(len(events))[:, None], 0), axis=0)
+        state = np.take_along_axis(events, last_event, axis=0) > 0
+        onsets = np.argwhere(state[1:] & ~state[:-1])
+
+        alerts = [self._alert(row, k, when[i], baseline[i, k], recent[i, k], z[i, k], counts[i]) for i, k in onsets]
+        for i, k in onsets:
+            self.since[row, k] = when[i]
+
+        self.reviews[row] = counts[-1]
+        self.slow_sum[row], self.slow_weight[row] = slow_sum[-1], slow_weight[-1]
+        self.deviation_sum[row] = deviation_sum[-1]
+        self.fast_sum[row], self.fast_weight[row] = fast_sum[-1], fast_weight[-1]
+        self.active[row] = state[-1]
+        self.since[row, ~state[-1]] = np.datetime64("NaT")
+        return alerts
+
+    def add(self, review: Dict) -> List[Dict]:
+        """Update one joined review (see data/ingest.py); returns (and logs) the alerts it starts."""
+        row = self._rows.get(int(review["menu_item_id"]))
+        when = pd.to_datetime(review.get("timestamp"), errors="coerce")
+        x = np.array([review[dimension] for dimension in DIMENSIONS], dtype=float)
+        if row is None or pd.isna(when) or not np.isfinite(x).all() or is_duplicate_review(review):
+            return []
+        if review.get("name"):
+            self.menu_names.setdefault(int(review["menu_item_id"]), review["name"])
+
+        with self._lock:
+            first = not self.reviews[row]
+            previous = x if first else self.slow_sum[row] / self.slow_weight[row]
+            self.slow_sum[row] = (1 - SLOW_ALPHA) * self.slow_sum[row] + x
+            self.slow_weight[row] = (1 - SLOW_ALPHA) * self.slow_weight[row] + 1
+            self.deviation_sum[row] = (1 - SLOW_ALPHA) * self.deviation_sum[row] + (x - previous) ** 2
+            self.fast_sum[row] = (1 - FAST_ALPHA) * self.fast_sum[row] + x
+            self.fast_weight[row] = (1 - FAST_ALPHA) * self.fast_weight[row] + 1
+            self.reviews[row] += 1
+
+            baseline, recent, z = _gap(self.slow_sum[row], self.slow_weight[row], self.deviation_sum[row],
+                                       self.fast_sum[row], self.fast_weight[row])
+            ready = self.reviews[row] >= WARMUP_REVIEWS
+            starts = ready & (z > ALERT_SIGMAS) & ~self.active[row]
+            clears = ~ready | (z < CLEAR_SIGMAS)
+            self.active[row] = (self.active[row] | starts) & ~clears
+            self.since[row, starts] = np.datetime64(when.to_pydatetime(), "s")
+            self.since[row, ~self.active[row]] = np.datetime64("NaT")
+
+            alerts = [self._alert(row, k, when, baseline[k], recent[k], z[k], self.reviews[row])
+                      for k in np.flatnonzero(starts)]
+            self.history.extend(alerts)
+
+        for alert in alerts:
+            _log_alert(alert)
+        return alerts
+
+    def recent(self, n: int = 10) -> List[Dict]:
+        """The latest n alerts, newest first."""
+        with self._lock:
+            return list(self.history)[::-1][:n]
+
+    def active_alerts(self) -> List[Dict]:
+        """Dish dimensions whose ratings are currently below their baseline, largest drop first."""
+        with self._lock:
+            baseline, recent, z = _gap(self.slow_sum, np.maximum(self.slow_weight, 1e-12), self.deviation_sum,
+                                       self.fast_sum, np.maximum(self.fast_weight, 1e-12))
+            rows, ks = np.nonzero(self.active)
+            alerts = [self._alert(r, k, self.since[r, k], baseline[r, k], recent[r, k], z[r, k], self.reviews[r])
+                      for r, k in zip(rows, ks)]
+        return sorted(alerts, key=lambda alert: -alert["z"])
+
+
+def build_rating_alerts(data: Dict) -> RatingAlerts:
+    """Index a loadData()-shaped dataset."""
+    menu = data.get("menuItems", [])
+    detector = RatingAlerts([item["id"] for item in menu], {item["id"]: item["name"] for item in menu})
+    reviews = pd.DataFrame(data.get("reviews", []))
+    ratings = pd.DataFrame(data.get("ratings", []))
+    if reviews.empty or ratings.empty:
+        return detector
+
+    with phase("aggregation"):
+        reviews = without_duplicates(reviews)
+        merged = reviews.merge(ratings, left_on="rating_id", right_on="id", suffixes=("_review", "_rating"))
+        detector.replay(merged["menu_item_id"].to_numpy(), merged["timestamp"],
+                        merged[DIMENSIONS].to_numpy(dtype=float))
+    return detector
+
+
+@maintained_index
+def rating_alerts(data: Dict) -> RatingAlerts:
+    """The shared detector for the current data snapshot (rebuilt when the data file changes)."""
+    return build_rating_alerts(data)
@@ -0,0 +1,216 @@
+"""Rating distribution cube: counts of every 1-5 rating per dish, month and dimension.
+
+`RatingCube.counts` has shape (dish, month, dimension, 5). Entry
+[d, m, k, r] is how many reviews of dish d in month m gave rating r + 1 for
+DIMENSIONS[k]. Reviews without a usable date go into a separate
+(dish, dimension, 5) array that only all-time queries include.
+
+A histogram for any dish set and month range is then a sum over a small
+integer block. Means, medians, percentiles and the share of 4+ ratings are
+computed from the five counts (`RatingDistribution`), so no chart needs to
+scan reviews. Ingested reviews (data/ingest.py) increment one cell per
+dimension. Reviews flagged as near-duplicates (data/reviewDuplicates.py) are
+not counted.
+"""
+
+import threading
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from data.ingest import maintained_index
+from data.reviewDuplicates import is_duplicate_review, without_duplicates
+from observability.metrics import phase
+
+DIMENSIONS = ["taste", "portion", "value", "overall"]
+RATINGS = np.arange(1, 6)
+
+
+def _month_number(month: Union[str, pd.Timestamp]) -> int:
+    """Months since 1970-01 for 'YYYY-MM' or a timestamp."""
+    period = pd.Period(month, freq="M")
+    return (period.year - 1970) * 12 + period.month - 1
+
+
+class RatingDistribution:
+    """Counts of ratings 1-5 with the summary statistics charts need."""
+
+    def __init__(self, counts: np.ndarray):
+        self.counts = np.asarray(counts, dtype=np.int64)
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def shares(self) -> np.ndarray:
+        return self.counts / self.total if self.total else np.zeros(5)
+
+    def mean(self) -> Optional[float]:
+        return float(self.counts @ RATINGS / self.total) if self.total else None
+
+    def percentile(self, q: float) -> Optional[int]:
+        """Nearest-rank percentile (q in 0-100): the lowest rating covering q% of reviews."""
+        if not self.total:
+            return None
+        cumulative = np.cumsum(self.counts)
+        return int(RATINGS[np.searchsorted(cumulative, max(q / 100 * self.total, 1))])
+
+    def median(self) -> Optional[int]:
+        return self.percentile(50)
+
+    def share_at_least(self, rating: int = 4) -> float:
+        return float(self.counts[rating - 1:].sum() / self.total) if self.total else 0.0
+
+    def summary(self) -> Dict:
+        return {
+            "reviews": self.total,
+            "mean": self.mean(),
+            "median": self.median(),
+            "p25": self.percentile(25),
+            "p75": self.percentile(75),
+            "share_4plus": self.share_at_least(4),
+        }
+
+
+def _accumulate(array: np.ndarray, index) -> None:
+    """array[index] += 1 for every (possibly repeated) index tuple."""
+    cells = np.ravel_multi_index(index, array.shape)
+    flat = array.reshape(-1)  # a view: the cube arrays are C-contiguous
+    if len(cells) > array.size // 8:
+        flat += np.bincount(cells, minlength=array.size).astype(array.dtype)
+    else:
+        np.add.at(flat, cells, 1)
+
+
+class RatingCube:
+    """(dish x month x dimension x rating) count cube with slice queries."""
+
+    def __init__(self, dish_ids: Iterable[int], first_month: int, last_month: int):
+        self._lock = threading.Lock()
+        self.dish_ids = np.asarray(sorted(dish_ids), dtype=np.int64)
+        self.first_month = first_month
+        n_months = max(last_month - first_month + 1, 0)
+        self.counts = np.zeros((len(self.dish_ids), n_months, len(DIMENSIONS), 5), dtype=np.int32)
+        self.undated = np.zeros((len(self.dish_ids), len(DIMENSIONS), 5), dtype=np.int32)
+
+    @property
+    def months(self):
+        """Month labels (YYYY-MM) along the month axis."""
+        return [str(pd.Period(year=1970 + m // 12, month=m % 12 + 1, freq="M"))
+                for m in range(self.first_month, self.first_month + self.counts.shape[1])]
+
+    @property
+    def years(self):
+        """Calendar years covered by the month axis, oldest first."""
+        first = 1970 + self.first_month // 12
+        last = 1970 + (self.first_month + self.counts.shape[1] - 1) // 12
+        return list(range(first, last + 1)) if self.counts.shape[1] else []
+
+    def _rows(self, menu_item_ids) -> np.ndarray:
+        ids = np.atleast_1d(np.asarray(menu_item_ids, dtype=np.int64))
+        rows = np.searchsorted(self.dish_ids, ids)
+        known = (rows < len(self.dish_ids)) & (self.dish_ids[np.minimum(rows, len(self.dish_ids) - 1)] == ids)
+        return np.where(known, rows, -1)
+
+    def _extend_months(self, month: int) -> None:
+        """Grow the month axis to include `month` (caller holds the lock)."""
+        if not self.counts.shape[1]:
+            self.first_month = month
+            self.counts = np.zeros((len(self.dish_ids), 1, len(DIMENSIONS), 5), dtype=np.int32)
+            return
+        before = max(self.first_month - month, 0)
+        after = max(month - (self.first_month + self.counts.shape[1] - 1), 0)
+        if before or after:
+            self.counts = np.pad(self.counts, ((0, 0), (before, after), (0, 0), (0, 0)))
+            self.first_month -= before
+
+    def add_reviews(self, menu_item_ids, months, ratings: np.ndarray) -> None:
+        """
+        Bulk-add reviews: `months` in months since 1970-01 (-1 = undated) and
+        `ratings` an (n, 4) array in DIMENSIONS order with whole ratings 1-5.
+        """
+        rows = self._rows(menu_item_ids)
+        months = np.asarray(months, dtype=np.int64)
+        ratings = np.asarray(ratings, dtype=float)
+        valid = (rows >= 0) & np.isfinite(ratings).all(axis=1)
+        values = np.clip(np.rint(ratings[valid]).astype(np.int64), 1, 5) - 1
+
+        # One (dish, month, dimension, rating) cell per review and dimension
+        n_dims = len(DIMENSIONS)
+        rows = np.repeat(rows[valid], n_dims)
+        months = np.repeat(months[valid], n_dims)
+        dims = np.tile(np.arange(n_dims), int(valid.sum()))
+        values = values.reshape(-1)
+        dated = months >= 0
+
+        with self._lock:
+            if dated.any():
+                self._extend_months(int(months[dated].min()))
+                self._extend_months(int(months[dated].max()))
+            _accumulate(self.counts, (rows[dated], months[dated] - self.first_month, dims[dated], values[dated]))
+            _accumulate(self.undated, (rows[~dated], dims[~dated], values[~dated]))
+
+    def add(self, review: Dict) -> None:
+        """Count one joined review (see data/ingest.py)."""
+        if is_duplicate_review(review):
+            return
+        when = pd.to_datetime(review.get("timestamp"), errors="coerce")
+        month = _month_number(when) if not pd.isna(when) else -1
+        self.add_reviews([review["menu_item_id"]], [month], np.array([[review[d] for d in DIMENSIONS]], dtype=float))
+
+    def histogram(self, dimension: str = "overall", menu_item_ids=None, start: Optional[str] = None,
+                  end: Optional[str] = None) -> RatingDistribution:
+        """
+        Rating counts for one dimension, summed over `menu_item_ids` (one id, a
+        list, or None for every dish) and the months from `start` to `end`
+        ('YYYY-MM', inclusive; None leaves that side open). Undated reviews are
+        only included when both sides are open.
+        """
+        return RatingDistribution(self._slice(menu_item_ids, start, end)[DIMENSIONS.index(dimension)])
+
+    def distributions(self, menu_item_ids=None, start: Optional[str] = None,
+                      end: Optional[str] = None) -> Dict[str, RatingDistribution]:
+        """histogram() for every dimension at once."""
+        block = self._slice(menu_item_ids, start, end)
+        return {dimension: RatingDistribution(block[k]) for k, dimension in enumerate(DIMENSIONS)}
+
+    def _slice(self, menu_item_ids, start, end) -> np.ndarray:
+        """(dimension, 5) counts for a dish set and month range."""
+        with self._lock:
+            if menu_item_ids is None:
+                rows = slice(None)
+            else:
+                rows = self._rows(menu_item_ids)
+                rows = rows[rows >= 0]
+            low = 0 if start is None else max(_month_number(start) - self.first_month, 0)
+            high = self.counts.shape[1] if end is None else max(_month_number(end) - self.first_month + 1, 0)
+            block = self.counts[rows, low:high].sum(axis=(0, 1), dtype=np.int64)
+            if start is None and end is None:
+                block = block + self.undated[rows].sum(axis=0, dtype=np.int64)
+        return block
+
+
+def build_rating_cube(data: Dict) -> RatingCube:
+    """Index a loadData()-shaped dataset."""
+    reviews = pd.DataFrame(data.get("reviews", []))
+    ratings = pd.DataFrame(data.get("ratings", []))
+    dish_ids = [item["id"] for item in data.get("menuItems", [])]
+    if reviews.empty or ratings.empty:
+        return RatingCube(dish_ids, 0, -1)
+
+    with phase("aggregation"):
+        reviews = without_duplicates(reviews)
+        merged = reviews.merge(ratings, left_on="rating_id", right_on="id", suffixes=("_review", "_rating"))
+        dates = pd.to_datetime(merged["timestamp"], errors="coerce")
+        months = np.where(dates.notna(), (dates.dt.year - 1970) * 12 + dates.dt.month - 1, -1).astype(np.int64)
+        dated = months[months >= 0]
+        cube = RatingCube(dish_ids, int(dated.min()) if len(dated) else 0, int(dated.max()) if len(dated) else -1)
+        cube.add_reviews(merged["menu_item_id"].to_numpy(), months, merged[DIMENSIONS].to_numpy(dtype=float))
+    return cube
+
+
+@maintained_index
+def rating_cube(data: Dict) -> RatingCube:
+    """The shared index for the current data snapshot (rebuilt when the data file changes)."""
+    return build_rating_cube(data)
@@ -0,0 +1,276 @@
+"""Daily rating trends: rolling means, EWMA and slopes per dish and overall.
+
+`RatingTrends` puts every dated review on a daily grid and keeps, for all
+dishes together, running (prefix) sums of five per-day quantities:
+
+    n     reviews                     s     sum of overall ratings
+    t·n   day index x reviews         t·s   day index x rating sum
+    t²·n  squared day index x reviews
+
+Any window's statistics then come from two lookups. For days (a, b] the window
+totals N, S, T, TS, TT give
+
+    rolling mean  = S / N
+    slope         = (N·TS − T·S) / (N·TT − T²)   (least squares, stars per day)
+
+so a whole rolling series is a vectorized difference of prefix arrays. The
+exponentially weighted average is review-weighted: decayed rating sums over
+decayed counts, both produced with one first-order `scipy.signal.lfilter` pass
+(half-life EWMA_HALFLIFE_DAYS, decaying over quiet days too).
+
+Per dish only the review count and rating sum of each day with reviews are
+kept (sparse); a dish's prefix sums and EWMA are built on demand when its
+series is asked for, in time linear in the number of days. Dense per-dish
+arrays would take (5 + 2) x dishes x days floats, hundreds of MB for a few
+thousand dishes over a few years.
+
+An ingested review (data/ingest.py) updates its dish's day totals and the
+overall arrays from its day onwards. For a review dated today that is a
+constant amount of work: one prefix cell per quantity and one EWMA step.
+Reviews without a usable date, and reviews flagged as near-duplicates
+(data/reviewDuplicates.py), are not part of any trend.
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from data.ingest import maintained_index
+from data.reviewDuplicates import is_duplicate_review, without_duplicates
+from observability.metrics import phase
+
+WINDOWS = (7, 30, 90)
+SLOPE_WINDOW = 90
+EWMA_HALFLIFE_DAYS = float(os.getenv("PLATEMATE_EWMA_HALFLIFE_DAYS", "14"))
+# Slopes within ± this many stars per 30 days count as "Stable"
+TREND_TOLERANCE = 0.05
+# Fewer reviews than this in the slope window give no slope (NaN)
+MIN_SLOPE_REVIEWS = 10
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+_N, _S, _TN, _TS, _TTN = range(5)
+
+
+def day_numbers(timestamps) -> np.ndarray:
+    """Days since 1970-01-01 for each timestamp (-1 where it cannot be parsed)."""
+    parsed = pd.to_datetime(pd.Series(timestamps), errors="coerce")
+    return np.where(parsed.notna(), (parsed.to_numpy(dtype="datetime64[D]") - _EPOCH).astype(np.int64), -1)
+
+
+def trend_direction(slope) -> np.ndarray:
+    """"Improving" / "Declining" / "Stable" for slopes in stars per 30 days (NaN is "Stable")."""
+    slope = np.asarray(slope, dtype=float)
+    return np.select([slope > TREND_TOLERANCE, slope < -TREND_TOLERANCE], ["Improving", "Declining"], "Stable")
+
+
+class RatingTrends:
+    """Prefix sums and EWMA state on a daily grid for all dishes, plus sparse day totals per dish."""
+
+    def __init__(self, dish_ids, first_day: int, n_days: int, halflife: float = EWMA_HALFLIFE_DAYS):
+        self._lock = threading.Lock()
+        self.dish_ids = np.asarray(sorted(dish_ids), dtype=np.int64)
+        self.decay = 0.5 ** (1 / halflife)
+        self.first_day = first_day
+        self.n_days = max(n_days, 0)
+        # Day index t is counted from a fixed origin so earlier days can be added without rescaling sums
+        self._origin = first_day
+        # _prefix[k, i] = quantity k summed over the first i days of the grid
+        self._prefix = np.zeros((5, self.n_days + 1))
+        # _ewma[0] decayed rating sums, _ewma[1] decayed review counts, per day
+        self._ewma = np.zeros((2, self.n_days))
+        # dish id -> day number -> [reviews, rating sum]
+        self._dish_days: Dict[int, Dict[int, list]] = {}
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        return pd.to_datetime(np.arange(self.first_day, self.first_day + self.n_days) + _EPOCH)
+
+    def _known(self, menu_item_id) -> bool:
+        i = int(np.searchsorted(self.dish_ids, menu_item_id))
+        return i < len(self.dish_ids) and self.dish_ids[i] == menu_item_id
+
+    def _extend(self, low: int, high: int) -> None:
+        """Grow the grid to cover days `low`..`high` (caller holds the lock)."""
+        if not self.n_days:
+            self.first_day, self.n_days, self._origin = low, high - low + 1, low
+            self._prefix = np.zeros((5, self.n_days + 1))
+            self._ewma = np.zeros((2, self.n_days))
+            return
+        before = max(self.first_day - low, 0)
+        after = max(high - (self.first_day + self.n_days - 1), 0)
+        if before:
+            # Nothing happened before the old first day: prefix sums and EWMA state start at zero
+            self._prefix = np.pad(self._prefix, ((0, 0), (before, 0)))
+            self._ewma = np.pad(self._ewma, ((0, 0), (before, 0)))
+            self.first_day -= before
+            self.n_days += before
+        if after:
+            # Quiet new days: totals stay put, the EWMA state keeps decaying
+            self._prefix = np.concatenate([self._prefix, np.repeat(self._prefix[:, -1:], after, axis=1)], axis=1)
+            decays = self.decay ** np.arange(1, after + 1)
+            self._ewma = np.concatenate([self._ewma, self._ewma[:, -1:] * decays], axis=1)
+            self.n_days += after
+
+    def _quantities(self, n: np.ndarray, s: np.ndarray, days: np.ndarray) -> np.ndarray:
+        """The five per-day quantities for review counts `n` and rating sums `s` on `days`."""
+        t = (days - self._origin).astype(float)
+        return np.stack([n, s, t * n, t * s, t * t * n])
+
+    def _ewma_from(self, daily: np.ndarray, previous: np.ndarray) -> np.ndarray:
+        """EWMA state for per-day [rating sums, review counts] continuing from `previous`."""
+        filtered, _ = lfilter([1.0], [1.0, -self.decay], daily, axis=1, zi=(self.decay * previous)[:, None])
+        return filtered
+
+    def add_reviews(self, menu_item_ids, days, overall) -> None:
+        """Bulk-add reviews: `days` since 1970-01-01 (negative = undated, skipped), `overall` ratings."""
+        ids = np.asarray(menu_item_ids, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+        overall = np.asarray(overall, dtype=float)
+        rows = np.searchsorted(self.dish_ids, ids)
+        known = (rows < len(self.dish_ids)) & (self.dish_ids[np.minimum(rows, len(self.dish_ids) - 1)] == ids)
+        keep = known & (days >= 0) & np.isfinite(overall)
+        if not keep.any():
+            return
+        ids, days, overall = ids[keep], days[keep], overall[keep]
+
+        with self._lock:
+            self._extend(int(days.min()), int(days.max()))
+
+            # Sparse per-dish day totals
+            keys, inverse = np.unique((ids << 32) | days, return_inverse=True)
+            counts = np.bincount(inverse, minlength=len(keys))
+            sums = np.bincount(inverse, weights=overall, minlength=len(keys))
+            for key, count, total in zip(keys.tolist(), counts.tolist(), sums.tolist()):
+                cell = self._dish_days.setdefault(key >> 32, {}).setdefault(key & 0xFFFFFFFF, [0, 0.0])
+                cell[0] += count
+                cell[1] += total
+
+            # Overall prefix sums and EWMA from the earliest new day on
+            columns = days - self.first_day
+            start = int(columns.min())
+            span = self.n_days - start
+            n = np.bincount(columns - start, minlength=span).astype(float)
+            s = np.bincount(columns - start, weights=overall, minlength=span)
+            grid_days = np.arange(self.first_day + start, self.first_day + self.n_days)
+            self._prefix[:, start + 1:] += np.cumsum(self._quantities(n, s, grid_days), axis=1)
+            self._refresh_ewma(start)
+
+    def _refresh_ewma(self, start: int) -> None:
+        """Recompute the overall EWMA state from day column `start` on (caller holds the lock)."""
+        daily = np.diff(self._prefix[[_S, _N], start:], axis=1)
+        previous = self._ewma[:, start - 1] if start else np.zeros(2)
+        self._ewma[:, start:] = self._ewma_from(daily, previous)
+
+    def add(self, review: Dict) -> None:
+        """Count one joined review (see data/ingest.py)."""
+        if is_duplicate_review(review):
+            return
+        when = pd.to_datetime(review.get("timestamp"), errors="coerce")
+        day = -1 if pd.isna(when) else int((np.datetime64(when.date(), "D") - _EPOCH).astype(np.int64))
+        self.add_reviews([review["menu_item_id"]], [day], [review["overall"]])
+
+    def _state(self, menu_item_id):
+        """(prefix, ewma) arrays for all dishes, or built from one dish's day totals (caller holds the lock)."""
+        if menu_item_id is None:
+            return self._prefix, self._ewma
+        n, s = np.zeros(self.n_days), np.zeros(self.n_days)
+        cells = self._dish_days.get(int(menu_item_id), {})
+        if cells:
+            columns = np.fromiter(cells.keys(), dtype=np.int64, count=len(cells)) - self.first_day
+            totals = np.array(list(cells.values()), dtype=float)
+            n[columns], s[columns] = totals[:, 0], totals[:, 1]
+        grid_days = np.arange(self.first_day, self.first_day + self.n_days)
+        prefix = np.zeros((5, self.n_days + 1))
+        prefix[:, 1:] = np.cumsum(self._quantities(n, s, grid_days), axis=1)
+        return prefix, self._ewma_from(np.stack([s, n]), np.zeros(2))
+
+    @staticmethod
+    def _window(prefix: np.ndarray, ends: np.ndarray, window: int) -> np.ndarray:
+        """(5, len(ends)) totals over the `window` days ending at each grid column in `ends`."""
+        return prefix[:, ends + 1] - prefix[:, np.maximum(ends + 1 - window, 0)]
+
+    @staticmethod
+    def _slope(totals: np.ndarray) -> np.ndarray:
+        """Least-squares slope in stars per 30 days (NaN without enough reviews or distinct days)."""
+        n, s, tn, ts, ttn = totals
+        denominator = n * ttn - tn * tn
+        with np.errstate(invalid="ignore", divide="ignore"):
+            slope = (n * ts - tn * s) / denominator
+        enough = (n >= MIN_SLOPE_REVIEWS) & (denominator > 1e-9 * np.maximum(n * ttn, 1))
+        return np.where(enough, slope * 30, np.nan)
+
+    def series(self, menu_item_id=None, start=None, end=None) -> pd.DataFrame:
+        """
+        Daily trend series for one dish (None = all dishes), indexed by date:
+        reviews, mean (that day's average), rolling_7 / rolling_30 / rolling_90
+        (review-weighted moving averages), ewma, and slope (SLOPE_WINDOW-day
+        least-squares trend in stars per 30 days). `start` / `end` limit the
+        returned dates; windows still reach back before `start`.
+        """
+        columns = ["reviews", "mean"] + [f"rolling_{w}" for w in WINDOWS] + ["ewma", "slope"]
+        with self._lock:
+            if (menu_item_id is not None and not self._known(menu_item_id)) or not self.n_days:
+                return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name="date"))
+            prefix, ewma = self._state(menu_item_id)
+            dates = self.dates
+            low = 0 if start is None else int(dates.searchsorted(pd.Timestamp(start)))
+            high = self.n_days if end is None else int(dates.searchsorted(pd.Timestamp(end), side="right"))
+            ends = np.arange(low, high)
+
+            with np.errstate(invalid="ignore", divide="ignore"):
+                day = self._window(prefix, ends, 1)
+                frame = {"reviews": day[_N].astype(np.int64), "mean": day[_S] / day[_N]}
+                for window in WINDOWS:
+                    totals = self._window(prefix, ends, window)
+                    frame[f"rolling_{window}"] = totals[_S] / totals[_N]
+                frame["ewma"] = ewma[0, low:high] / ewma[1, low:high]
+                frame["slope"] = self._slope(self._window(prefix, ends, SLOPE_WINDOW))
+        return pd.DataFrame(frame, index=pd.DatetimeIndex(dates[low:high], name="date"))
+
+    def latest(self, menu_item_id=None) -> Dict:
+        """Current trend values (as of the last day on the grid) for one dish or all dishes."""
+        with self._lock:
+            if (menu_item_id is not None and not self._known(menu_item_id)) or not self.n_days:
+                return {}
+            prefix, ewma = self._state(menu_item_id)
+            last = np.array([self.n_days - 1])
+            result = {"date": self.dates[-1]}
+            with np.errstate(invalid="ignore", divide="ignore"):
+                for window in WINDOWS:
+                    totals = self._window(prefix, last, window)
+                    result[f"rolling_{window}"] = float(totals[_S, 0] / totals[_N, 0])
+                result["ewma"] = float(ewma[0, -1] / ewma[1, -1])
+            result["slope"] = float(self._slope(self._window(prefix, last, SLOPE_WINDOW))[0])
+        result["direction"] = str(trend_direction(result["slope"]))
+        return result
+
+
+def build_rating_trends(data: Dict) -> RatingTrends:
+    """Index a loadData()-shaped dataset."""
+    dish_ids = [item["id"] for item in data.get("menuItems", [])]
+    reviews = pd.DataFrame(data.get("reviews", []))
+    ratings = pd.DataFrame(data.get("ratings", []))
+    if reviews.empty or ratings.empty:
+        return RatingTrends(dish_ids, 0, 0)
+
+    with phase("aggregation"):
+        reviews = without_duplicates(reviews)
+        merged = reviews.merge(ratings[["id", "overall"]], left_on="rating_id", right_on="id",
+                               suffixes=("_review", "_rating"))
+        days = day_numbers(merged["timestamp"])
+        dated = days[days >= 0]
+        if not len(dated):
+            return RatingTrends(dish_ids, 0, 0)
+        trends = RatingTrends(dish_ids, int(dated.min()), int(dated.max() - dated.min() + 1))
+        trends.add_reviews(merged["menu_item_id"].to_numpy(), days, merged["overall"].to_numpy(dtype=float))
+    return trends
+
+
+@maintained_index
+def rating_trends(data: Dict) -> RatingTrends:
+    """The shared index for the current data snapshot (rebuilt when the data file changes)."""
+    return build_rating_trends(data)
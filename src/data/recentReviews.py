@@ -0,0 +1,133 @@
+"""Latest-N reviews, kept up to date without sorting the review history.
+
+`RecentReviews` holds the newest `capacity` joined reviews (dish name,
+ratings, content, timestamp) in a bounded min-heap keyed by
+(timestamp, review id), plus one such heap per menu item. Adding a review is
+O(log capacity) and reading the latest n only sorts the heap itself.
+
+`recent_reviews()` returns the shared instance for the loaded dataset. It is
+built once per data snapshot with a linear selection (argpartition) over the
+timestamps, then kept current by `data/ingest.py`.
+
+Environment:
+    PLATEMATE_RECENT_REVIEWS   reviews kept overall and per dish (default 50)
+"""
+
+import heapq
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data.ingest import RATING_FIELDS, maintained_index
+from observability.metrics import phase
+
+DEFAULT_CAPACITY = int(os.getenv("PLATEMATE_RECENT_REVIEWS", "50"))
+
+RECORD_COLUMNS = ["id", "reviewer_id", "menu_item_id", "name", *RATING_FIELDS, "content", "timestamp"]
+
+
+def _sort_key(record: Dict):
+    return pd.Timestamp(record["timestamp"]).value, record["id"]
+
+
+class RecentReviews:
+    """Bounded newest-first view of the reviews, overall and per menu item."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, per_dish: bool = True):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.per_dish = per_dish
+        self._all: List = []
+        self._by_dish: Dict[int, List] = {}
+        self._lock = threading.Lock()
+
+    def _push(self, heap: List, entry) -> None:
+        if len(heap) < self.capacity:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    def add(self, record: Dict) -> None:
+        """Offer one joined review; it is kept if it is among the newest `capacity`."""
+        ts, review_id = _sort_key(record)
+        entry = (ts, review_id, record)
+        with self._lock:
+            self._push(self._all, entry)
+            if self.per_dish:
+                self._push(self._by_dish.setdefault(record["menu_item_id"], []), entry)
+
+    def latest(self, n: Optional[int] = None, menu_item_id: Optional[int] = None) -> List[Dict]:
+        """The newest n reviews (all kept ones by default), newest first, optionally for one menu item."""
+        if menu_item_id is not None and not self.per_dish:
+            raise ValueError("This index was built without per-dish variants")
+        with self._lock:
+            heap = self._all if menu_item_id is None else self._by_dish.get(menu_item_id, [])
+            entries = heapq.nlargest(min(n or self.capacity, self.capacity), heap, key=lambda e: e[:2])
+        return [entry[2] for entry in entries]
+
+    def latest_frame(self, n: Optional[int] = None, menu_item_id: Optional[int] = None) -> pd.DataFrame:
+        """latest() as a DataFrame with RECORD_COLUMNS."""
+        return pd.DataFrame(self.latest(n, menu_item_id), columns=RECORD_COLUMNS)
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+
+def _newest_positions(ts: np.ndarray, ids: np.ndarray, positions: np.ndarray, k: int) -> np.ndarray:
+    """Positions (within `positions`) of the k newest rows by (ts, id), without sorting all of them."""
+    if len(positions) > k:
+        # Everything tied with the k-th newest timestamp is a candidate; the id breaks ties
+        cutoff = np.partition(ts[positions], len(positions) - k)[len(positions) - k]
+        positions = positions[ts[positions] >= cutoff]
+    if len(positions) > k:
+        order = np.lexsort((ids[positions], ts[positions]))[-k:]
+        positions = positions[order]
+    return positions
+
+
+def build_recent_reviews(data: Dict, capacity: int = DEFAULT_CAPACITY, per_dish: bool = True) -> RecentReviews:
+    """Index the newest reviews of a loadData()-shaped dataset."""
+    index = RecentReviews(capacity, per_dish)
+    reviews = pd.DataFrame(data.get("reviews", []))
+    if reviews.empty:
+        return index
+
+    with phase("aggregation"):
+        ts = pd.to_datetime(reviews["timestamp"], errors="coerce")
+        valid = np.flatnonzero(ts.notna().to_numpy())
+        ts = ts.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        ids = reviews["id"].to_numpy()
+
+        selected = [_newest_positions(ts, ids, valid, capacity)]
+        if per_dish:
+            dish_of = reviews["menu_item_id"].to_numpy()[valid]
+            for rows in pd.Series(valid).groupby(dish_of).indices.values():
+                selected.append(_newest_positions(ts, ids, valid[rows], capacity))
+        rows = np.unique(np.concatenate(selected))
+
+        # Join only the selected reviews
+        picked = reviews.iloc[rows].copy()
+        picked["timestamp"] = pd.to_datetime(ts[rows])
+        ratings = pd.DataFrame(data.get("ratings", [])).rename(columns={"id": "rating_id"})
+        menu = pd.DataFrame(data.get("menuItems", [])).rename(columns={"id": "menu_item_id"})
+        picked = picked.merge(ratings[["rating_id", *RATING_FIELDS]], on="rating_id", how="left")
+        picked = picked.merge(menu[["menu_item_id", "name"]], on="menu_item_id", how="left")
+        if data.get("content") and "content_id" in picked.columns:
+            content = pd.DataFrame(data["content"]).rename(columns={"id": "content_id"})
+            picked = picked.merge(content[["content_id", "content"]], on="content_id", how="left")
+        else:
+            picked["content"] = None
+
+    for record in picked[RECORD_COLUMNS].to_dict(orient="records"):
+        index.add(record)
+    return index
+
+
+@maintained_index
+def recent_reviews(data: Dict) -> RecentReviews:
+    """The shared index for the current data snapshot (rebuilt when the data file changes)."""
+    return build_recent_reviews(data)
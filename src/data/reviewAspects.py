@@ -0,0 +1,378 @@
+"""Aspect and keyword index over review text ("how often is this dish called salty?").
+
+Review texts are tokenized once (data/textSignatures.tokenize). Everything after
+that runs on integer arrays:
+
+- every unigram and every adjacent-word bigram gets a term id in one shared
+  vocabulary
+- `term_document` is a sparse (review x term) count matrix (scipy CSR)
+- `dish_terms` is a sparse (dish x term) matrix counting the reviews that use
+  each term at least once
+
+Aspects come from a small lexicon (ASPECTS). Each aspect is a category (taste /
+portion / value), a polarity and the unigrams or bigrams that signal it, e.g.
+"small portion" or "tiny". A term preceded within two words by a negation
+("not salty", "wasn't too cold") does not count. Per dish the index keeps how
+many reviews mention each aspect, overall and per month, so top aspects and
+aspect trends are array lookups.
+
+Ingested reviews (data/ingest.py) are tokenized and tagged on arrival. Their
+rows are batched and added to the sparse matrices on the next query.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from data.ingest import maintained_index
+from data.textSignatures import tokenize
+from observability.metrics import phase
+
+# aspect -> (category, polarity, signal terms)
+ASPECTS = {
+    "salty": ("taste", "negative", ["salty", "oversalted"]),
+    "bland": ("taste", "negative", ["bland", "flavorless", "tasteless", "under seasoned", "no flavor"]),
+    "greasy": ("taste", "negative", ["greasy", "oily"]),
+    "cold": ("taste", "negative", ["cold", "lukewarm"]),
+    "stale": ("taste", "negative", ["stale"]),
+    "overcooked": ("taste", "negative", ["overcooked", "burnt", "burned", "rubbery"]),
+    "dry": ("taste", "negative", ["dry"]),
+    "soggy": ("taste", "negative", ["soggy", "mushy", "mealy", "wilted"]),
+    "delicious": ("taste", "positive", ["delicious", "tasty", "flavorful", "great flavor", "incredible flavor",
+                                        "amazing flavor"]),
+    "fresh": ("taste", "positive", ["fresh"]),
+    "crispy": ("taste", "positive", ["crispy", "crunchy"]),
+    "tender": ("taste", "positive", ["tender", "juicy"]),
+    "well seasoned": ("taste", "positive", ["well seasoned", "perfectly seasoned", "spot on"]),
+    "small portion": ("portion", "negative", ["tiny", "small portion", "tiny portion", "barely enough"]),
+    "generous portion": ("portion", "positive", ["huge", "generous", "massive", "plenty", "leftovers",
+                                                 "big portion", "large portion"]),
+    "overpriced": ("value", "negative", ["overpriced", "expensive", "pricey", "not worth"]),
+    "good value": ("value", "positive", ["great value", "good value", "excellent value", "worth every",
+                                         "affordable", "reasonable price", "great price", "fair price"]),
+}
+ASPECT_NAMES = list(ASPECTS)
+
+NEGATIONS = {"not", "no", "never", "wasn't", "isn't", "weren't", "aren't", "didn't", "don't", "hardly"}
+
+# Left out of top_terms() (common words that say nothing about the dish)
+STOPWORDS = {
+    "a", "an", "and", "the", "of", "to", "in", "on", "for", "with", "was", "is", "it", "it's", "this", "that",
+    "i", "we", "my", "our", "you", "they", "but", "so", "very", "really", "just", "be", "are", "were", "had",
+    "have", "has", "as", "at", "or", "if", "too", "bit", "me", "were", "would", "will", "what", "get", "got",
+    "there", "their", "from", "by", "all", "one", "some", "than", "then", "which", "also", "its", "like",
+}
+
+
+class ReviewAspects:
+    """Shared term vocabulary, sparse term matrices and per-dish aspect counts."""
+
+    def __init__(self, dish_ids: Iterable[int], menu_names: Optional[Dict[int, str]] = None):
+        self._lock = threading.Lock()
+        self.dish_ids = np.asarray(sorted(dish_ids), dtype=np.int64)
+        self.menu_names = dict(menu_names or {})
+
+        # Unigrams map word -> term id, bigrams (first id << 32 | second id) -> term id
+        self.terms: List[str] = []
+        self._unigrams: Dict[str, int] = {}
+        self._bigrams: Dict[int, int] = {}
+        lexicon = [(term, a) for a, name in enumerate(ASPECT_NAMES) for term in ASPECTS[name][2]]
+        lexicon_ids = [self._register(term) for term, _ in lexicon]
+        # Lexicon terms are registered first, so their ids are the lowest
+        self._aspect_of_term = np.full(len(self.terms), -1, dtype=np.int64)
+        self._aspect_of_term[lexicon_ids] = [a for _, a in lexicon]
+        self._negations = np.array(sorted(self._register(word) for word in NEGATIONS), dtype=np.int64)
+
+        n_dishes, n_aspects = len(self.dish_ids), len(ASPECT_NAMES)
+        self.review_ids = np.zeros(0, dtype=np.int64)
+        self.term_document = sparse.csr_matrix((0, len(self.terms)), dtype=np.int32)
+        self.dish_terms = sparse.csr_matrix((n_dishes, len(self.terms)), dtype=np.int64)
+        self.reviews = np.zeros(n_dishes, dtype=np.int64)
+        self.aspect_counts = np.zeros((n_dishes, n_aspects), dtype=np.int64)
+        # Per month (dated reviews only): reviews and aspect mentions
+        self.first_month = 0
+        self.monthly_reviews = np.zeros((n_dishes, 0), dtype=np.int64)
+        self.monthly_aspects = np.zeros((n_dishes, 0, n_aspects), dtype=np.int64)
+        # Batched (review ids, docs, terms) and (dish rows, terms) awaiting _flush
+        self._pending = []
+        self._pending_dish_terms = []
+
+    def _word(self, word: str) -> int:
+        """Term id of a unigram, adding it to the vocabulary if new."""
+        i = self._unigrams.get(word)
+        if i is None:
+            i = self._unigrams[word] = len(self.terms)
+            self.terms.append(word)
+        return i
+
+    def _register(self, term: str) -> int:
+        """Term id of a unigram or bigram, adding it (and its words) to the vocabulary if new."""
+        ids = [self._word(word) for word in term.split()]
+        if len(ids) == 1:
+            return ids[0]
+        key = (ids[0] << 32) | ids[1]
+        if key not in self._bigrams:
+            self._bigrams[key] = len(self.terms)
+            self.terms.append(term)
+        return self._bigrams[key]
+
+    def _dish_rows(self, menu_item_ids) -> np.ndarray:
+        ids = np.atleast_1d(np.asarray(menu_item_ids, dtype=np.int64))
+        rows = np.searchsorted(self.dish_ids, ids)
+        known = (rows < len(self.dish_ids)) & (self.dish_ids[np.minimum(rows, len(self.dish_ids) - 1)] == ids)
+        return np.where(known, rows, -1)
+
+    def _occurrences(self, texts):
+        """(doc, term, negated) for every unigram and bigram occurrence in `texts` (caller holds the lock)."""
+        # Identical texts are tokenized once; words are mapped to term ids once per distinct word
+        text_codes, unique_texts = pd.factorize(pd.Series(texts, dtype=object))
+        token_lists = [tokenize(text) for text in unique_texts]
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+        word_codes, words = pd.factorize(pd.Series([token for tokens in token_lists for token in tokens], dtype=object))
+        ids = np.array([self._word(word) for word in words], dtype=np.int64)[word_codes]
+        texts_of = np.repeat(np.arange(len(token_lists)), lengths)
+
+        # A negation one or two words before a position negates what starts there
+        is_negation = np.isin(ids, self._negations)
+        negated = np.zeros(len(ids), dtype=bool)
+        for back in (1, 2):
+            negated[back:] |= is_negation[:-back] & (texts_of[back:] == texts_of[:-back])
+
+        # Bigrams: adjacent tokens of the same text
+        same = np.flatnonzero(texts_of[1:] == texts_of[:-1])
+        keys, inverse = np.unique((ids[same] << 32) | ids[same + 1], return_inverse=True)
+        bigrams = self._bigrams
+        for key in keys.tolist():
+            if key not in bigrams:
+                bigrams[key] = len(self.terms)
+                self.terms.append(f"{self.terms[key >> 32]} {self.terms[key & 0xFFFFFFFF]}")
+        bigram_ids = np.fromiter((bigrams[key] for key in keys.tolist()), dtype=np.int64, count=len(keys))[inverse]
+
+        # Occurrences per distinct text (grouped by text), then repeated for every review with that text
+        occurrence_text = np.concatenate([texts_of, texts_of[same]])
+        order = np.argsort(occurrence_text, kind="stable")
+        terms = np.concatenate([ids, bigram_ids])[order]
+        negated = np.concatenate([negated, negated[same]])[order]
+        per_text = np.bincount(occurrence_text, minlength=len(token_lists))
+        starts = np.concatenate([[0], np.cumsum(per_text)[:-1]])
+        per_doc = per_text[text_codes]
+        offsets = np.repeat(starts[text_codes] - np.concatenate([[0], np.cumsum(per_doc)[:-1]]), per_doc)
+        picks = offsets + np.arange(int(per_doc.sum()))
+        docs = np.repeat(np.arange(len(text_codes)), per_doc)
+        return docs, terms[picks], negated[picks]
+
+    def _extend_months(self, low: int, high: int) -> None:
+        """Grow the month axis to cover months `low`..`high` (caller holds the lock)."""
+        if not self.monthly_reviews.shape[1]:
+            self.first_month = low
+            n_months = high - low + 1
+            self.monthly_reviews = np.zeros((len(self.dish_ids), n_months), dtype=np.int64)
+            self.monthly_aspects = np.zeros((len(self.dish_ids), n_months, len(ASPECT_NAMES)), dtype=np.int64)
+            return
+        before = max(self.first_month - low, 0)
+        after = max(high - (self.first_month + self.monthly_reviews.shape[1] - 1), 0)
+        if before or after:
+            self.monthly_reviews = np.pad(self.monthly_reviews, ((0, 0), (before, after)))
+            self.monthly_aspects = np.pad(self.monthly_aspects, ((0, 0), (before, after), (0, 0)))
+            self.first_month -= before
+
+    def add_reviews(self, review_ids, menu_item_ids, months, texts) -> None:
+        """Tokenize, tag and count a batch of reviews; `months` counts from 1970-01 (-1 = undated)."""
+        review_ids = np.asarray(review_ids, dtype=np.int64)
+        rows = self._dish_rows(menu_item_ids)
+        months = np.asarray(months, dtype=np.int64)
+        texts = ["" if text is None or (isinstance(text, float) and np.isnan(text)) else text for text in texts]
+
+        with self._lock:
+            docs, terms, negated = self._occurrences(texts)
+            # Rows for the term-document matrix; appended to it on the next query
+            self._pending.append((review_ids, docs, terms))
+
+            # Reviews per dish that use each term, and that mention each aspect (negations excluded)
+            doc_terms = np.unique((docs << 32) | terms)
+            dish_of = rows[doc_terms >> 32]
+            known = dish_of >= 0
+            self._pending_dish_terms.append((dish_of[known], (doc_terms & 0xFFFFFFFF)[known]))
+
+            lexicon = terms < len(self._aspect_of_term)
+            tagged = lexicon & ~negated
+            aspects = self._aspect_of_term[terms[tagged]]
+            hits = np.unique(docs[tagged][aspects >= 0] * len(ASPECT_NAMES) + aspects[aspects >= 0])
+            hit_docs, hit_aspects = hits // len(ASPECT_NAMES), hits % len(ASPECT_NAMES)
+            hit_rows = rows[hit_docs]
+
+            np.add.at(self.reviews, rows[rows >= 0], 1)
+            np.add.at(self.aspect_counts, (hit_rows[hit_rows >= 0], hit_aspects[hit_rows >= 0]), 1)
+
+            dated = (rows >= 0) & (months >= 0)
+            if dated.any():
+                self._extend_months(int(months[dated].min()), int(months[dated].max()))
+                np.add.at(self.monthly_reviews, (rows[dated], months[dated] - self.first_month), 1)
+                hit_months = months[hit_docs]
+                keep = (hit_rows >= 0) & (hit_months >= 0)
+                np.add.at(self.monthly_aspects,
+                          (hit_rows[keep], hit_months[keep] - self.first_month, hit_aspects[keep]), 1)
+
+    def add(self, review: Dict) -> None:
+        """Index one joined review (see data/ingest.py)."""
+        when = pd.to_datetime(review.get("timestamp"), errors="coerce")
+        month = -1 if pd.isna(when) else (when.year - 1970) * 12 + when.month - 1
+        self.add_reviews([review["id"]], [review["menu_item_id"]], [month], [review.get("content") or ""])
+
+    def _flush(self) -> None:
+        """Append batched rows to the sparse matrices (caller holds the lock)."""
+        n_terms = len(self.terms)
+        if self._pending:
+            blocks = [
+                sparse.csr_matrix((np.ones(len(docs), dtype=np.int32), (docs, terms)), shape=(len(review_ids), n_terms))
+                for review_ids, docs, terms in self._pending
+            ]
+            new_ids = [review_ids for review_ids, _, _ in self._pending]
+            self.term_document.resize((self.term_document.shape[0], n_terms))
+            self.term_document = sparse.vstack([self.term_document] + blocks, format="csr")
+            self.review_ids = np.concatenate([self.review_ids] + new_ids)
+            self._pending = []
+        if self._pending_dish_terms:
+            rows, terms = (np.concatenate(parts) for parts in zip(*self._pending_dish_terms))
+            self.dish_terms.resize((len(self.dish_ids), n_terms))
+            delta = sparse.csr_matrix((np.ones(len(rows), dtype=np.int64), (rows, terms)), shape=self.dish_terms.shape)
+            self.dish_terms = (self.dish_terms + delta).tocsr()
+            self._pending_dish_terms = []
+
+    def _term_id(self, term: str) -> Optional[int]:
+        words = tokenize(term)
+        if len(words) == 1:
+            return self._unigrams.get(words[0])
+        if len(words) == 2 and words[0] in self._unigrams and words[1] in self._unigrams:
+            return self._bigrams.get((self._unigrams[words[0]] << 32) | self._unigrams[words[1]])
+        return None
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def top_aspects(self, menu_item_id=None, n: int = 8, polarity: Optional[str] = None) -> pd.DataFrame:
+        """
+        Most mentioned aspects for one dish (None = all dishes). Columns:
+        aspect, category, polarity, reviews (mentioning it), share (of all the
+        dish's reviews).
+        """
+        with self._lock:
+            rows = slice(None) if menu_item_id is None else self._dish_rows(menu_item_id)
+            counts = self.aspect_counts[rows].sum(axis=0)
+            total = int(self.reviews[rows].sum())
+        frame = pd.DataFrame({
+            "aspect": ASPECT_NAMES,
+            "category": [ASPECTS[a][0] for a in ASPECT_NAMES],
+            "polarity": [ASPECTS[a][1] for a in ASPECT_NAMES],
+            "reviews": counts,
+            "share": counts / total if total else np.zeros(len(ASPECT_NAMES)),
+        })
+        if polarity:
+            frame = frame[frame["polarity"] == polarity]
+        frame = frame[frame["reviews"] > 0]
+        return frame.sort_values(["reviews", "aspect"], ascending=[False, True]).head(n).reset_index(drop=True)
+
+    def aspect_trend(self, menu_item_id=None, aspects: Optional[List[str]] = None, freq: str = "M") -> pd.DataFrame:
+        """
+        Share of reviews mentioning each aspect per month (freq "M") or quarter
+        ("Q"), for one dish (None = all dishes). Indexed by period string, one
+        column per aspect plus 'reviews'; periods without reviews are left out.
+        """
+        aspects = aspects or ASPECT_NAMES
+        columns = [ASPECT_NAMES.index(a) for a in aspects]
+        with self._lock:
+            rows = slice(None) if menu_item_id is None else self._dish_rows(menu_item_id)
+            reviews = self.monthly_reviews[rows].sum(axis=0)
+            mentions = self.monthly_aspects[rows][:, :, columns].sum(axis=0)
+            first = self.first_month
+        months = pd.PeriodIndex([pd.Period(year=1970 + m // 12, month=m % 12 + 1, freq="M")
+                                 for m in range(first, first + len(reviews))])
+        counts = pd.DataFrame(mentions, index=months, columns=aspects)
+        counts["reviews"] = reviews
+        if freq != "M":
+            counts = counts.groupby(months.asfreq(freq)).sum()
+        counts = counts[counts["reviews"] > 0]
+        trend = counts[aspects].div(counts["reviews"], axis=0)
+        trend["reviews"] = counts["reviews"]
+        trend.index = pd.Index(trend.index.astype(str), name="period")
+        return trend
+
+    def top_terms(self, menu_item_id=None, n: int = 20, bigrams: Optional[bool] = None) -> pd.DataFrame:
+        """
+        Terms used in the most reviews of one dish (None = all dishes), stop
+        words left out. `bigrams` True / False limits the result to two-word /
+        single-word terms. Columns: term, reviews, share.
+        """
+        with self._lock:
+            self._flush()
+            rows = slice(None) if menu_item_id is None else self._dish_rows(menu_item_id)
+            counts = np.asarray(self.dish_terms[rows].sum(axis=0)).ravel()
+            total = int(self.reviews[rows].sum())
+            terms = self.terms
+        order = np.argsort(-counts, kind="stable")
+        picked = []
+        for i in order:
+            if counts[i] == 0 or len(picked) == n:
+                break
+            words = terms[i].split()
+            if (bigrams is True and len(words) == 1) or (bigrams is False and len(words) == 2):
+                continue
+            if all(word in STOPWORDS for word in words) or words[0] in STOPWORDS or words[-1] in STOPWORDS:
+                continue
+            picked.append(i)
+        return pd.DataFrame({
+            "term": [terms[i] for i in picked],
+            "reviews": counts[picked].astype(int),
+            "share": counts[picked] / total if total else np.zeros(len(picked)),
+        })
+
+    def mentions(self, term: str, menu_item_id=None) -> int:
+        """Number of reviews of one dish (None = all dishes) using `term` (a word, two-word phrase or aspect name)."""
+        with self._lock:
+            rows = slice(None) if menu_item_id is None else self._dish_rows(menu_item_id)
+            if term in ASPECTS:
+                return int(self.aspect_counts[rows, ASPECT_NAMES.index(term)].sum())
+            self._flush()
+            term_id = self._term_id(term)
+            return 0 if term_id is None else int(self.dish_terms[rows, term_id].sum())
+
+    def reviews_mentioning(self, term: str, limit: Optional[int] = None) -> np.ndarray:
+        """Review ids whose text contains `term` (a word or two-word phrase), from the term-document matrix."""
+        with self._lock:
+            self._flush()
+            term_id = self._term_id(term)
+            if term_id is None:
+                return np.zeros(0, dtype=np.int64)
+            docs = self.term_document[:, term_id].nonzero()[0]
+            ids = self.review_ids[docs]
+        return ids[:limit] if limit else ids
+
+
+def build_review_aspects(data: Dict) -> ReviewAspects:
+    """Index a loadData()-shaped dataset."""
+    menu = data.get("menuItems", [])
+    index = ReviewAspects([item["id"] for item in menu], {item["id"]: item["name"] for item in menu})
+    reviews = pd.DataFrame(data.get("reviews", []))
+    content = pd.DataFrame(data.get("content", []))
+    if reviews.empty or content.empty or "content_id" not in reviews.columns:
+        return index
+
+    with phase("aggregation"):
+        merged = reviews.merge(content.rename(columns={"id": "content_id"})[["content_id", "content"]],
+                               on="content_id", how="left")
+        when = pd.to_datetime(merged["timestamp"], errors="coerce")
+        months = np.where(when.notna(), (when.dt.year - 1970) * 12 + when.dt.month - 1, -1)
+        index.add_reviews(merged["id"].to_numpy(), merged["menu_item_id"].to_numpy(), months,
+                          merged["content"].tolist())
+        with index._lock:
+            index._flush()
+    return index
+
+
+@maintained_index
+def review_aspects(data: Dict) -> ReviewAspects:
+    """The shared index for the current data snapshot (rebuilt when the data file changes)."""
+    return build_review_aspects(data)
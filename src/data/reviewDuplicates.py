@@ -0,0 +1,318 @@
+"""Near-duplicate review detection (copy-pasted and bot reviews) with MinHash LSH.
+
+Every review text is shingled into 3-word shingles and reduced to a 64-slot
+MinHash signature (data/textSignatures.py). The fraction of equal slots
+between two signatures estimates the Jaccard similarity of their shingle
+sets.
+
+Signatures are cut into BANDS bands of ROWS slots (locality-sensitive
+hashing). Two texts share a band bucket with probability 1 - (1 - J^ROWS)^BANDS,
+so pairs above DUPLICATE_THRESHOLD almost always collide while dissimilar
+texts rarely do. Each band keeps, per bucket, the earliest review that fell
+into it. A review is only compared with those bucket owners (at most one per
+band). Owners whose estimated Jaccard is within ESTIMATE_MARGIN of
+DUPLICATE_THRESHOLD are checked against the exact Jaccard of the two shingle
+sets (64 slots estimate it to about ±0.05, so the estimate alone both misses
+and invents duplicates), and the review is flagged when the exact value is
+DUPLICATE_THRESHOLD or more. One more bucket is keyed on the whole signature,
+so an exact copy always meets the first review with that text even when other
+texts own its band buckets. There is no pairwise comparison over the corpus.
+The first review of a group of near-identical texts stays unflagged; later
+copies point to it through `duplicate_of`.
+
+Texts with fewer than MIN_TOKENS words ("Great!", "Loved it") are never
+flagged: short reviews repeat naturally.
+
+Ingested reviews (data/ingest.py) are checked on arrival: one signature, a
+dictionary lookup per band and an exact check of the few candidates.
+
+Flagged reviews are left out of every rating aggregate: the dish aggregates
+(data/dishes.py, components/dish_card.py), the chart frames of
+components/charts.py and the dish page, the rating cube, rating trends and
+rating alerts, and the satisfaction charts in
+components/customerSatisfactionMetrics. Reviewer counts, cohorts, dish
+pairings and the text indexes still see every review.
+"""
+
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.ingest import maintained_index
+from data.textSignatures import tokenize, shingle_hashes, minhash_permutations, minhash_signatures, set_jaccard
+from observability.metrics import phase
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+MIN_TOKENS = 5
+DUPLICATE_THRESHOLD = float(os.getenv("PLATEMATE_DUPLICATE_THRESHOLD", "0.8"))
+# Candidates estimated this far below the threshold are still checked exactly
+ESTIMATE_MARGIN = 0.15
+
+_PERMUTATIONS = minhash_permutations(num_perm=NUM_PERM)
+_FNV_PRIME = np.uint64(0x100000001B3)
+
+
+def _band_keys(signatures: np.ndarray) -> np.ndarray:
+    """
+    (n, BANDS + 1) uint64 bucket keys: the ROWS slots of each band mixed into
+    one integer, then one key over the whole signature.
+    """
+    slots = signatures.reshape(len(signatures), BANDS, ROWS).astype(np.uint64)
+    keys = slots[:, :, 0].copy()
+    for row in range(1, ROWS):
+        keys = (keys * _FNV_PRIME) ^ slots[:, :, row]  # wraps around mod 2^64
+    whole = keys[:, 0].copy()
+    for band in range(1, BANDS):
+        whole = (whole * _FNV_PRIME) ^ keys[:, band]
+    return np.column_stack([keys, whole])
+
+
+class _Shingles(NamedTuple):
+    """Shingle hashes of the distinct texts of a batch; `codes` maps each text to its distinct text."""
+    codes: np.ndarray
+    values: np.ndarray
+    lengths: np.ndarray
+    long_enough: np.ndarray
+
+
+def _text_shingles(texts) -> _Shingles:
+    # Identical texts (the usual copy-paste case) are shingled and hashed once
+    codes, unique_texts = pd.factorize(pd.Series(list(texts), dtype=object).fillna(""))
+    token_lists = [tokenize(text) for text in unique_texts]
+    values, lengths = shingle_hashes(token_lists, SHINGLE_SIZE)
+    long_enough = np.array([len(tokens) >= MIN_TOKENS for tokens in token_lists], dtype=bool)
+    return _Shingles(codes, values, lengths, long_enough)
+
+
+class ReviewDuplicates:
+    """MinHash signatures, LSH buckets and the duplicate flag of every indexed review."""
+
+    def __init__(self, threshold: float = DUPLICATE_THRESHOLD):
+        self._lock = threading.Lock()
+        self.threshold = threshold
+        self.size = 0
+        self._review_ids = np.empty(0, dtype=np.int64)
+        self._signatures = np.empty((0, NUM_PERM), dtype=np.uint32)
+        # Text of every row, for the exact check of candidate pairs
+        self._texts: List[str] = []
+        # Bucket owners per band (and for whole signatures): sorted key / row arrays from bulk adds,
+        # dictionaries for single adds
+        self._sorted_keys = [np.empty(0, dtype=np.uint64) for _ in range(BANDS + 1)]
+        self._sorted_rows = [np.empty(0, dtype=np.int64) for _ in range(BANDS + 1)]
+        self._buckets: List[Dict[int, int]] = [{} for _ in range(BANDS + 1)]
+        # review id -> id of the earlier review it duplicates
+        self.duplicate_of: Dict[int, int] = {}
+        self._flagged: Optional[np.ndarray] = None
+
+    def _append(self, review_ids: np.ndarray, signatures: np.ndarray, texts: List[str]) -> np.ndarray:
+        """Store signatures (growing capacity geometrically) and return their rows (caller holds the lock)."""
+        needed = self.size + len(review_ids)
+        if needed > len(self._review_ids):
+            capacity = max(needed, 2 * len(self._review_ids), 1024)
+            self._review_ids = np.resize(self._review_ids, capacity)
+            grown = np.empty((capacity, NUM_PERM), dtype=np.uint32)
+            grown[:self.size] = self._signatures[:self.size]
+            self._signatures = grown
+        rows = np.arange(self.size, needed)
+        self._review_ids[rows] = review_ids
+        self._signatures[rows] = signatures
+        self._texts.extend(texts)
+        self.size = needed
+        return rows
+
+    def _flush(self) -> None:
+        """Move single-add bucket owners into the sorted arrays (caller holds the lock)."""
+        for band, buckets in enumerate(self._buckets):
+            if not buckets:
+                continue
+            keys = np.concatenate([self._sorted_keys[band], np.fromiter(buckets.keys(), dtype=np.uint64)])
+            rows = np.concatenate([self._sorted_rows[band], np.fromiter(buckets.values(), dtype=np.int64)])
+            order = np.argsort(keys, kind="stable")
+            self._sorted_keys[band], self._sorted_rows[band] = keys[order], rows[order]
+            buckets.clear()
+
+    def _verified(self, rows: np.ndarray, owners: np.ndarray, first_row: int, batch: _Shingles) -> np.ndarray:
+        """
+        Which (row, owner) pairs have an exact shingle Jaccard of threshold or
+        more. Rows from `first_row` on use the shingles of the batch being
+        added; older rows are shingled again from their text (caller holds the lock).
+        """
+        texts = self._texts
+        same = np.fromiter((texts[row] == texts[owner] for row, owner in zip(rows.tolist(), owners.tolist())),
+                           dtype=bool, count=len(rows))
+        check = np.flatnonzero(~same)
+        if not len(check):
+            return same
+
+        pair_rows = np.concatenate([rows[check], owners[check]])
+        in_batch = pair_rows >= first_row
+        older, inverse = np.unique(pair_rows[~in_batch], return_inverse=True)
+        older_values, older_lengths = shingle_hashes([tokenize(texts[row]) for row in older.tolist()], SHINGLE_SIZE)
+        sets = np.empty(len(pair_rows), dtype=np.int64)
+        sets[in_batch] = batch.codes[pair_rows[in_batch] - first_row]
+        sets[~in_batch] = len(batch.lengths) + inverse
+        similarity = set_jaccard(np.concatenate([batch.values, older_values]),
+                                 np.concatenate([batch.lengths, older_lengths]), sets[:len(check)], sets[len(check):])
+        same[check] = similarity >= self.threshold
+        return same
+
+    def _mark(self, rows: np.ndarray, originals: np.ndarray) -> None:
+        """Flag `rows` as duplicates of the reviews at `originals` (caller holds the lock)."""
+        for row, original in zip(rows.tolist(), originals.tolist()):
+            self.duplicate_of[int(self._review_ids[row])] = int(self._review_ids[original])
+        if len(rows):
+            self._flagged = None
+
+    def add_reviews(self, review_ids, texts) -> None:
+        """Bulk-add reviews newer than everything indexed so far, oldest first."""
+        review_ids = np.asarray(review_ids, dtype=np.int64)
+        if not len(review_ids):
+            return
+        texts = ["" if text is None or text != text else str(text) for text in texts]
+        shingles = _text_shingles(texts)
+        signatures = minhash_signatures(shingles.values, shingles.lengths, _PERMUTATIONS)[shingles.codes]
+        long_enough = shingles.long_enough[shingles.codes]
+        keys = _band_keys(signatures)
+
+        with self._lock:
+            self._flush()
+            rows = self._append(review_ids, signatures, texts)
+            eligible = np.flatnonzero(long_enough)
+            batch_rows = rows[eligible]
+            # Candidate pairs: position in `eligible` and the bucket owner's row
+            candidates, candidate_owners = [], []
+
+            for band in range(BANDS + 1):
+                bucket = keys[eligible, band]
+                known_keys, known_rows = self._sorted_keys[band], self._sorted_rows[band]
+                if len(known_keys):
+                    at = np.minimum(np.searchsorted(known_keys, bucket), len(known_keys) - 1)
+                    known, known_owners = known_keys[at] == bucket, known_rows[at]
+                else:
+                    known, known_owners = np.zeros(len(bucket), dtype=bool), -1
+
+                # Owner: the earliest indexed review in the bucket, else the first of this batch
+                unique_keys, first, inverse = np.unique(bucket, return_index=True, return_inverse=True)
+                owners = np.where(known, known_owners, batch_rows[first][inverse])
+
+                # Compare with the owner unless it is the review itself
+                candidate = np.flatnonzero(owners != batch_rows)
+                estimate = (self._signatures[owners[candidate]] == signatures[eligible[candidate]]).mean(axis=1)
+                close = candidate[estimate >= self.threshold - ESTIMATE_MARGIN]
+                candidates.append(close)
+                candidate_owners.append(owners[close])
+
+                # New buckets are owned by the first review of this batch that hashed into them
+                fresh = ~np.isin(unique_keys, known_keys)
+                merged_keys = np.concatenate([known_keys, unique_keys[fresh]])
+                merged_rows = np.concatenate([known_rows, batch_rows[first][fresh]])
+                order = np.argsort(merged_keys, kind="stable")
+                self._sorted_keys[band], self._sorted_rows[band] = merged_keys[order], merged_rows[order]
+
+            # Earliest owner per review that passes the exact check; sorting the
+            # (position, owner) keys puts each position's earliest owner first
+            pairs = np.unique(np.concatenate(candidates) * self.size + np.concatenate(candidate_owners))
+            positions, owners = pairs // self.size, pairs % self.size
+            verified = self._verified(batch_rows[positions], owners, int(rows[0]), shingles)
+            positions, owners = positions[verified], owners[verified]
+            first = np.r_[True, positions[1:] != positions[:-1]] if len(positions) else np.zeros(0, dtype=bool)
+            best = np.full(len(eligible), -1, dtype=np.int64)
+            best[positions[first]] = owners[first]
+            flagged = best >= 0
+            self._mark(batch_rows[flagged], best[flagged])
+
+    def add(self, review: Dict) -> Optional[int]:
+        """Check one joined review (see data/ingest.py); returns the id it duplicates, if any."""
+        text = review.get("content") or ""
+        shingles = _text_shingles([text])
+        signatures = minhash_signatures(shingles.values, shingles.lengths, _PERMUTATIONS)
+        long_enough = shingles.long_enough
+        keys = _band_keys(signatures)[0].tolist()
+
+        with self._lock:
+            row = int(self._append(np.array([review["id"]]), signatures, [text])[0])
+            if not long_enough[0]:
+                return None
+            owners = set()
+            for band, key in enumerate(keys):
+                known_keys = self._sorted_keys[band]
+                at = int(np.searchsorted(known_keys, np.uint64(key)))
+                if at < len(known_keys) and int(known_keys[at]) == key:
+                    owner = int(self._sorted_rows[band][at])
+                else:
+                    owner = self._buckets[band].setdefault(key, row)
+                if owner != row and (self._signatures[owner] == signatures[0]).mean() >= \
+                        self.threshold - ESTIMATE_MARGIN:
+                    owners.add(owner)
+            owners = np.array(sorted(owners), dtype=np.int64)
+            verified = owners[self._verified(np.full(len(owners), row), owners, row, shingles)]
+            if not len(verified):
+                return None
+            self._mark(np.array([row]), verified[:1])
+            return self.duplicate_of[int(review["id"])]
+
+    def duplicate_ids(self) -> np.ndarray:
+        """Ids of all flagged reviews (sorted)."""
+        with self._lock:
+            if self._flagged is None:
+                self._flagged = np.array(sorted(self.duplicate_of), dtype=np.int64)
+            return self._flagged
+
+    def is_duplicate(self, review_ids) -> np.ndarray:
+        """Boolean flag for each review id."""
+        return np.isin(np.asarray(review_ids, dtype=np.int64), self.duplicate_ids())
+
+    def duplicates(self) -> pd.DataFrame:
+        """Flagged reviews with the earlier review each one duplicates (review_id, duplicate_of)."""
+        with self._lock:
+            pairs = sorted(self.duplicate_of.items())
+        return pd.DataFrame(pairs, columns=["review_id", "duplicate_of"])
+
+
+def build_review_duplicates(data: Dict) -> ReviewDuplicates:
+    """Index a loadData()-shaped dataset."""
+    index = ReviewDuplicates()
+    reviews = pd.DataFrame(data.get("reviews", []))
+    content = pd.DataFrame(data.get("content", []))
+    if reviews.empty or content.empty or "content_id" not in reviews.columns:
+        return index
+
+    with phase("aggregation"):
+        merged = reviews.merge(content.rename(columns={"id": "content_id"})[["content_id", "content"]],
+                               on="content_id", how="left").sort_values("id", kind="stable")
+        index.add_reviews(merged["id"].to_numpy(), merged["content"].tolist())
+    return index
+
+
+@maintained_index
+def review_duplicates(data: Dict) -> ReviewDuplicates:
+    """The shared index for the current data snapshot (rebuilt when the data file changes)."""
+    return build_review_duplicates(data)
+
+
+def is_duplicate_review(review: Dict) -> bool:
+    """
+    Whether an ingested (joined) review was flagged. Indexes call this from
+    their own ingest subscriber; they import this module first, so its
+    subscriber is registered earlier and has already checked the review.
+    """
+    return int(review["id"]) in review_duplicates().duplicate_of
+
+
+def flag_duplicates(frame: pd.DataFrame, id_column: str = "id_review") -> pd.DataFrame:
+    """Add a boolean 'duplicate' column to a frame of reviews (review ids in `id_column`)."""
+    frame["duplicate"] = review_duplicates().is_duplicate(frame[id_column]) if not frame.empty else []
+    return frame
+
+
+def without_duplicates(frame: pd.DataFrame, id_column: str = "id") -> pd.DataFrame:
+    """The rows of a frame of reviews that are not flagged as duplicates."""
+    if frame.empty:
+        return frame
+    return frame[~review_duplicates().is_duplicate(frame[id_column])]
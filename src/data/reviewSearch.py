@@ -0,0 +1,355 @@
+"""Full-text search over review content using an SQLite FTS5 index.
+
+The search database is an SQLite copy of the loaded dataset (`loadData()`)
+with the tables of data_fixed.sql (menu_items, reviewers, ratings, content,
+reviews; ISO dates in reviews.time_stamp). It is written to a file in the
+cache directory (`configure_search_database`, PLATEMATE_SEARCH_DB_DIR),
+rebuilt when the data file changes and kept current by ingestion
+(data/ingest.py): every ingested review is inserted, and the triggers of
+`ensure_fts_index` add its text to the `content_fts` index. The committed
+data/restaurant_data.db is not touched.
+
+Under gunicorn the database built in the master is shared by the workers
+until a worker ingests a review; that worker then continues on its own copy,
+matching the per-worker in-memory data. Files of exited processes are
+removed at the next build.
+
+`search_reviews` runs a BM25-ranked MATCH query with optional dish and date
+filters; it is used by the AI assistant and by the dashboard review search
+box. `count_matches` counts the matching reviews.
+"""
+
+import glob
+import os
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+
+from data.ingest import maintained_index
+from observability.metrics import phase
+
+
+_search_db_dir = os.getenv("PLATEMATE_SEARCH_DB_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "search"
+)
+
+_TABLES_DDL = [
+    "CREATE TABLE reviewers (id INTEGER PRIMARY KEY)",
+    "CREATE TABLE menu_items (id INTEGER PRIMARY KEY, name TEXT NOT NULL)",
+    """CREATE TABLE ratings (
+        id INTEGER PRIMARY KEY, portion INTEGER, taste INTEGER, value INTEGER, overall INTEGER,
+        return_customer INTEGER
+    )""",
+    "CREATE TABLE content (id INTEGER PRIMARY KEY, content TEXT NOT NULL)",
+    """CREATE TABLE reviews (
+        id INTEGER PRIMARY KEY, rating_id INTEGER, content_id INTEGER, reviewer_id INTEGER,
+        time_stamp DATE, menu_item_id INTEGER
+    )""",
+]
+
+# Appended to the schema the LLM sees so generated SQL can use the index
+FTS_SCHEMA = """
+-- Full-text index over content.content (rowid = content.id).
+-- Use `content_fts MATCH 'word'` instead of LIKE '%word%', ordered by bm25(content_fts).
+CREATE VIRTUAL TABLE content_fts USING fts5(content, content='content', content_rowid='id');
+"""
+
+_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS content_fts USING fts5(
+        content, content='content', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS content_fts_ai AFTER INSERT ON content BEGIN
+        INSERT INTO content_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS content_fts_ad AFTER DELETE ON content BEGIN
+        INSERT INTO content_fts(content_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS content_fts_au AFTER UPDATE ON content BEGIN
+        INSERT INTO content_fts(content_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO content_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    # Joins from the index back to reviews, and the date filter, use these
+    "CREATE INDEX IF NOT EXISTS idx_reviews_content_id ON reviews(content_id)",
+    "CREATE INDEX IF NOT EXISTS idx_reviews_time_stamp ON reviews(time_stamp)",
+]
+
+
+def ensure_fts_index(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Create the FTS5 index and sync triggers if missing, backfilling existing content."""
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='content_fts'")
+    created = cur.fetchone() is None
+
+    for statement in _FTS_DDL:
+        cur.execute(statement)
+
+    if created:
+        # External-content tables start empty; index whatever is already in `content`
+        cur.execute("INSERT INTO content_fts(content_fts) VALUES ('rebuild')")
+
+    conn.commit()
+    return conn
+
+
+def configure_search_database(directory: str) -> None:
+    """Keep the search database files in `directory` (from the next build on)."""
+    global _search_db_dir
+    _search_db_dir = directory
+
+
+def _database_path(pid: int) -> str:
+    return os.path.join(_search_db_dir, f"reviews_{pid}.db")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _remove_database(path: str) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_exited_databases() -> None:
+    for path in glob.glob(os.path.join(_search_db_dir, "reviews_*.db")):
+        pid = os.path.basename(path)[len("reviews_"):-len(".db")]
+        if pid.isdigit() and not _pid_alive(int(pid)):
+            _remove_database(path)
+
+
+def _iso_dates(timestamps) -> List[Optional[str]]:
+    """Dataset timestamps (8/1/2023) as ISO dates (2023-08-01), None where unparseable."""
+    parsed = pd.to_datetime(pd.Series(timestamps, dtype=object), errors="coerce")
+    return [None if pd.isna(day) else day for day in parsed.dt.strftime("%Y-%m-%d")]
+
+
+class ReviewDatabase:
+    """The SQLite file for one data snapshot; `add` inserts ingested reviews."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def _own_copy(self) -> None:
+        """After a fork, copy the database before the first write (caller holds the lock)."""
+        if self._pid == os.getpid():
+            return
+        path = _database_path(os.getpid())
+        with closing(sqlite3.connect(self.path)) as source, closing(sqlite3.connect(path)) as copy:
+            source.backup(copy)
+        self.path, self._pid = path, os.getpid()
+
+    def add(self, review: Dict) -> None:
+        """Insert one joined review (see data/ingest.py); the triggers index its text."""
+        with self._lock:
+            self._own_copy()
+            with closing(self.connect()) as conn, conn:
+                conn.execute("INSERT OR IGNORE INTO reviewers (id) VALUES (?)", (review["reviewer_id"],))
+                conn.execute(
+                    "INSERT OR IGNORE INTO ratings (id, portion, taste, value, overall, return_customer) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (review["rating_id"], review["portion"], review["taste"], review["value"],
+                     review["overall"], int(bool(review["return"]))),
+                )
+                conn.execute("INSERT OR IGNORE INTO content (id, content) VALUES (?, ?)",
+                             (review["content_id"], review.get("content") or ""))
+                conn.execute(
+                    "INSERT OR IGNORE INTO reviews (id, rating_id, content_id, reviewer_id, time_stamp, menu_item_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (review["id"], review["rating_id"], review["content_id"], review["reviewer_id"],
+                     _iso_dates([review.get("timestamp")])[0], review["menu_item_id"]),
+                )
+
+
+def build_review_database(data: Dict, path: Optional[str] = None) -> ReviewDatabase:
+    """Write a loadData()-shaped dataset to an SQLite file with the FTS index (default: this process's file)."""
+    path = path or _database_path(os.getpid())
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    _remove_exited_databases()
+    building = f"{path}.building"
+    _remove_database(building)
+
+    reviews = data.get("reviews", [])
+    with phase("aggregation"), closing(sqlite3.connect(building)) as conn:
+        for statement in _TABLES_DDL:
+            conn.execute(statement)
+        conn.executemany("INSERT INTO reviewers (id) VALUES (?)", ((row["id"],) for row in data.get("reviewers", [])))
+        conn.executemany("INSERT INTO menu_items (id, name) VALUES (?, ?)",
+                         ((row["id"], row["name"]) for row in data.get("menuItems", [])))
+        conn.executemany(
+            "INSERT INTO ratings (id, portion, taste, value, overall, return_customer) VALUES (?, ?, ?, ?, ?, ?)",
+            ((row["id"], row.get("portion"), row.get("taste"), row.get("value"), row.get("overall"),
+              None if row.get("return") is None else int(bool(row["return"]))) for row in data.get("ratings", [])),
+        )
+        conn.executemany("INSERT INTO content (id, content) VALUES (?, ?)",
+                         ((row["id"], row.get("content") or "") for row in data.get("content", [])))
+        dates = _iso_dates([row.get("timestamp") for row in reviews])
+        conn.executemany(
+            "INSERT INTO reviews (id, rating_id, content_id, reviewer_id, time_stamp, menu_item_id) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ((row["id"], row.get("rating_id"), row.get("content_id"), row.get("reviewer_id"), day,
+              row.get("menu_item_id")) for row, day in zip(reviews, dates)),
+        )
+        conn.commit()
+        ensure_fts_index(conn)
+        # Readers (search requests) don't block the writes of ingestion
+        conn.execute("PRAGMA journal_mode=WAL")
+    os.replace(building, path)
+    return ReviewDatabase(path)
+
+
+@maintained_index
+def review_database(data: Dict) -> ReviewDatabase:
+    """The shared search database for the current data snapshot (rebuilt when the data file changes)."""
+    return build_review_database(data)
+
+
+def connect(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """Open the search database, or the SQLite file at `db_path` with the FTS index added."""
+    if db_path is None:
+        return review_database().connect()
+    return ensure_fts_index(sqlite3.connect(db_path))
+
+
+def to_fts_query(text: str) -> str:
+    """Turn free text into a safe FTS5 query.
+
+    Every word must appear (implicit AND); "or" between words gives
+    alternatives, e.g. "salty or cold" matches either word and "too salty or
+    cold" is ("too" AND "salty") OR "cold". Words are quoted so user input
+    can't inject FTS5 syntax; a trailing `*` on a word is kept as a prefix
+    match (e.g. `salt*`).
+    """
+    alternatives = []
+    for part in re.split(r"\bor\b", text or "", flags=re.IGNORECASE):
+        terms = [f'"{word}"{star}' for word, star in re.findall(r"(\w+)(\*?)", part)]
+        if terms:
+            alternatives.append(" ".join(terms))
+    if len(alternatives) > 1:
+        return " OR ".join(f"({terms})" for terms in alternatives)
+    return alternatives[0] if alternatives else ""
+
+
+def _filters(query, dish, start_date, end_date) -> Tuple[List[str], list]:
+    """WHERE conditions and parameters shared by the search and count queries."""
+    where = ["content_fts MATCH ?"]
+    params = [to_fts_query(query)]
+    if dish:
+        where.append("m.name = ?")
+        params.append(dish)
+    if start_date:
+        where.append("rv.time_stamp >= ?")
+        params.append(str(start_date)[:10])
+    if end_date:
+        where.append("rv.time_stamp <= ?")
+        params.append(str(end_date)[:10])
+    return where, params
+
+
+def build_count_sql(
+    query: str,
+    dish: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> Tuple[str, tuple]:
+    """Return (sql, params) counting the reviews a search matches (one row, column review_count)."""
+    where, params = _filters(query, dish, start_date, end_date)
+    sql = (
+        "SELECT COUNT(*) AS review_count\n"
+        "FROM content_fts\n"
+        "JOIN reviews rv ON rv.content_id = content_fts.rowid\n"
+        "JOIN menu_items m ON m.id = rv.menu_item_id\n"
+        f"WHERE {' AND '.join(where)};"
+    )
+    return sql, tuple(params)
+
+
+def build_search_sql(
+    query: str,
+    dish: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: int = 20,
+) -> Tuple[str, tuple]:
+    """Return (sql, params) for a ranked search; dates are inclusive 'YYYY-MM-DD' strings."""
+    where, params = _filters(query, dish, start_date, end_date)
+    params.append(int(limit))
+
+    sql = (
+        "SELECT rv.id AS review_id, m.name AS dish, rv.time_stamp, r.overall,\n"
+        "       snippet(content_fts, 0, '**', '**', '…', 16) AS snippet,\n"
+        "       ROUND(bm25(content_fts), 3) AS score\n"
+        "FROM content_fts\n"
+        "JOIN reviews rv ON rv.content_id = content_fts.rowid\n"
+        "JOIN ratings r ON r.id = rv.rating_id\n"
+        "JOIN menu_items m ON m.id = rv.menu_item_id\n"
+        f"WHERE {' AND '.join(where)}\n"
+        "ORDER BY score\n"
+        "LIMIT ?;"
+    )
+    return sql, tuple(params)
+
+
+def search_reviews(
+    query: str,
+    dish: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: int = 20,
+    conn: Optional[sqlite3.Connection] = None,
+) -> pd.DataFrame:
+    """Search review text, best matches first (lower BM25 score = more relevant).
+
+    Returns a DataFrame with review_id, dish, time_stamp, overall, snippet, score.
+    """
+    columns = ["review_id", "dish", "time_stamp", "overall", "snippet", "score"]
+    if not to_fts_query(query):
+        return pd.DataFrame(columns=columns)
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+    try:
+        sql, params = build_search_sql(query, dish, start_date, end_date, limit)
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def count_matches(
+    query: str,
+    dish: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """Number of reviews whose text matches `query` (same filters as search_reviews)."""
+    if not to_fts_query(query):
+        return 0
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+    try:
+        sql, params = build_count_sql(query, dish, start_date, end_date)
+        return int(conn.execute(sql, params).fetchone()[0])
+    finally:
+        if own_conn:
+            conn.close()
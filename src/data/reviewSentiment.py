@@ -0,0 +1,94 @@
+"""TextBlob polarity of every review text, computed once per data snapshot.
+
+TextBlob runs in Python, one text at a time, so it is the slowest step of any
+sentiment view. `review_sentiment()` scores each distinct text of the loaded
+dataset once (repeated texts share one call) and keeps the polarities by
+content id. The dish similarity index and the dish sentiment chart both read
+them from here instead of re-running TextBlob. Ingested reviews
+(data/ingest.py) are scored one at a time as they arrive.
+
+`wsgi.py` builds the index in the gunicorn master, so no request pays for it.
+"""
+
+import threading
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from data.ingest import maintained_index
+from observability.metrics import phase
+
+SENTIMENT_LABELS = ["Positive", "Neutral", "Negative"]
+
+
+def polarity_of(texts) -> np.ndarray:
+    """TextBlob polarity (-1 to 1) of each text, scoring every distinct text once."""
+    from textblob import TextBlob
+    codes, unique = pd.factorize(pd.Series(texts, dtype=object).fillna("").astype(str))
+    scores = np.array([TextBlob(text).sentiment.polarity for text in unique], dtype=float)
+    return scores[codes] if len(codes) else np.empty(0)
+
+
+def sentiment_bins(polarity) -> np.ndarray:
+    """Index into SENTIMENT_LABELS: (-1, -0.2] negative, (-0.2, 0.2] neutral, (0.2, 1] positive."""
+    polarity = np.asarray(polarity, dtype=float)
+    return np.where(polarity > 0.2, 0, np.where(polarity > -0.2, 1, 2))
+
+
+class ReviewSentiment:
+    """Polarity by content id (sorted arrays; ingested texts are queued and merged on the next lookup)."""
+
+    def __init__(self, content_ids=(), polarity=()):
+        self._lock = threading.Lock()
+        self._pending: List = []
+        ids = np.asarray(content_ids, dtype=np.int64)
+        order = np.argsort(ids, kind="stable")
+        self.content_ids = ids[order]
+        self.polarity = np.asarray(polarity, dtype=float)[order]
+
+    def add(self, review: Dict) -> None:
+        """Score one joined review's text (see data/ingest.py)."""
+        score = float(polarity_of([review.get("content") or ""])[0])
+        with self._lock:
+            self._pending.append((int(review["content_id"]), score))
+
+    def _flush(self) -> None:
+        """Merge queued scores into the sorted arrays (caller holds the lock)."""
+        if not self._pending:
+            return
+        ids, scores = (np.array(column) for column in zip(*self._pending))
+        self._pending = []
+        order = np.argsort(ids, kind="stable")
+        at = np.searchsorted(self.content_ids, ids[order])
+        self.content_ids = np.insert(self.content_ids, at, ids[order].astype(np.int64))
+        self.polarity = np.insert(self.polarity, at, scores[order].astype(float))
+
+    def polarities(self, content_ids) -> np.ndarray:
+        """Polarity for each content id; 0 (neutral, like an empty text) for ids without a text."""
+        ids = np.asarray(content_ids, dtype=np.int64)
+        with self._lock:
+            self._flush()
+            known_ids, polarity = self.content_ids, self.polarity
+        if not len(known_ids):
+            return np.zeros(len(ids))
+        at = np.minimum(np.searchsorted(known_ids, ids), len(known_ids) - 1)
+        return np.where(known_ids[at] == ids, polarity[at], 0.0)
+
+    def labels(self, content_ids) -> np.ndarray:
+        """sentiment_bins() of polarities(content_ids)."""
+        return sentiment_bins(self.polarities(content_ids))
+
+
+def build_review_sentiment(data: Dict) -> ReviewSentiment:
+    """Score every content row of a loadData()-shaped dataset."""
+    content = data.get("content", [])
+    with phase("aggregation"):
+        ids = [row["id"] for row in content]
+        return ReviewSentiment(ids, polarity_of([row.get("content") for row in content]))
+
+
+@maintained_index
+def review_sentiment(data: Dict) -> ReviewSentiment:
+    """The shared polarity index for the current data snapshot (rebuilt when the data file changes)."""
+    return build_review_sentiment(data)
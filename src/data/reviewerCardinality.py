@@ -0,0 +1,335 @@
+"""Distinct and repeat reviewer counts for any dish or date range, without rescanning reviews.
+
+Every slice (one menu item, one day, one menu item on one day) keeps two
+`DistinctCounter`s: all of the slice's reviewers, and those of them who are repeat reviewers (2+ reviews
+overall). A counter holds the exact set of reviewer hashes while it is small
+and switches to a HyperLogLog sketch (about 1.6% standard error at the
+default precision) once it grows past EXACT_LIMIT. Counters merge, so a
+month or a KPI period is the union of its days, and a dish over a date range
+the union of that dish's days.
+
+Compact per-reviewer arrays (review count, and where a one-time reviewer's
+only review fell) let an ingested review promote a reviewer to "repeat" in
+the slices of their first review as well as the current one. All-time totals
+come straight from those arrays and are always exact.
+
+`reviewer_cardinality()` returns the shared instance for the loaded dataset,
+kept current by `data/ingest.py`.
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from data.ingest import maintained_index
+from observability.metrics import phase
+
+HLL_PRECISION = 12  # 4096 one-byte registers
+EXACT_LIMIT = 512  # an exact set of this many 8-byte hashes is as big as a sketch
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def hash_ids(ids) -> np.ndarray:
+    """64-bit splitmix64 hashes of integer ids."""
+    x = np.asarray(ids, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class HyperLogLog:
+    """HyperLogLog cardinality sketch over 64-bit hashes."""
+
+    def __init__(self, precision: int = HLL_PRECISION, registers: Optional[np.ndarray] = None):
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not hashes.size:
+            return
+        rest_bits = 64 - self.precision
+        index = (hashes >> np.uint64(rest_bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << rest_bits) - 1)
+        # rest fits in a float64 mantissa, so frexp's exponent is its bit length
+        rank = (rest_bits - np.frexp(rest.astype(np.float64))[1] + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def count(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * np.log(m / zeros)
+        return float(estimate)
+
+
+class DistinctCounter:
+    """Distinct count of hashed ids: an exact set while small, a HyperLogLog once large."""
+
+    __slots__ = ("_exact", "_sketch")
+
+    def __init__(self, hashes: Optional[np.ndarray] = None):
+        self._exact = np.empty(0, dtype=np.uint64)
+        self._sketch = None
+        if hashes is not None:
+            self.add_hashes(hashes)
+
+    @classmethod
+    def from_unique(cls, hashes: np.ndarray) -> "DistinctCounter":
+        """Counter over already sorted, distinct hashes (skips the set union while they fit)."""
+        if len(hashes) > EXACT_LIMIT:
+            return cls(hashes)
+        counter = cls()
+        counter._exact = hashes
+        return counter
+
+    @property
+    def is_exact(self) -> bool:
+        return self._sketch is None
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if self._sketch is not None:
+            self._sketch.add_hashes(hashes)
+            return
+        self._exact = np.union1d(self._exact, hashes)
+        if len(self._exact) > EXACT_LIMIT:
+            self._sketch = HyperLogLog()
+            self._sketch.add_hashes(self._exact)
+            self._exact = None
+
+    def merge(self, other: "DistinctCounter") -> "DistinctCounter":
+        merged = DistinctCounter()
+        if self._sketch is None and other._sketch is None:
+            merged.add_hashes(np.union1d(self._exact, other._exact))
+        elif self._sketch is not None and other._sketch is not None:
+            merged._exact, merged._sketch = None, self._sketch.merge(other._sketch)
+        else:
+            sketch, exact = (self, other) if self._sketch is not None else (other, self)
+            merged._exact, merged._sketch = None, HyperLogLog(registers=sketch._sketch.registers.copy())
+            merged._sketch.add_hashes(exact._exact)
+        return merged
+
+    def count(self) -> int:
+        return len(self._exact) if self._sketch is None else int(round(self._sketch.count()))
+
+
+def _union(counters: Iterable[DistinctCounter]) -> DistinctCounter:
+    result = DistinctCounter()
+    for counter in counters:
+        result = result.merge(counter)
+    return result
+
+
+def _day_number(when) -> int:
+    return int((np.datetime64(pd.Timestamp(when).date(), "D") - _EPOCH).astype(np.int64))
+
+
+def _grouped_counters(keys: np.ndarray, hashes: np.ndarray) -> Dict[int, DistinctCounter]:
+    """One DistinctCounter per distinct key, from parallel key/hash arrays."""
+    if not len(keys):
+        return {}
+    order = np.lexsort((hashes, keys))
+    keys, hashes = keys[order], hashes[order]
+    fresh = np.r_[True, (keys[1:] != keys[:-1]) | (hashes[1:] != hashes[:-1])]
+    keys, hashes = keys[fresh], hashes[fresh]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)]
+    return {int(keys[s]): DistinctCounter.from_unique(hashes[s:e]) for s, e in zip(starts, ends)}
+
+
+def _dish_day_counters(dishes: np.ndarray, days: np.ndarray, hashes: np.ndarray) -> Dict[int, Dict[int, DistinctCounter]]:
+    """One DistinctCounter per (menu item, day), nested as dish -> day -> counter."""
+    nested = {}
+    for key, counter in _grouped_counters((dishes << 32) | days, hashes).items():
+        nested.setdefault(key >> 32, {})[key & 0xFFFFFFFF] = counter
+    return nested
+
+
+class ReviewerCardinality:
+    """Unique / one-time / repeat reviewer counts per menu item, per day range and overall."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Per reviewer id: review count, and the slices of the first review (-1 = none)
+        self._counts = np.zeros(0, dtype=np.uint32)
+        self._first_dish = np.zeros(0, dtype=np.int64)
+        self._first_day = np.zeros(0, dtype=np.int64)
+        self._unique = 0
+        self._repeat = 0
+        # slice kind -> key -> counter, for all reviewers and for repeat reviewers;
+        # "dish_day" is nested as dish -> day -> counter
+        self._all = {"dish": {}, "day": {}, "dish_day": {}}
+        self._repeaters = {"dish": {}, "day": {}, "dish_day": {}}
+
+    def _grow(self, size: int) -> None:
+        if size <= len(self._counts):
+            return
+        size = max(size, 2 * len(self._counts))
+        grow = size - len(self._counts)
+        self._counts = np.r_[self._counts, np.zeros(grow, dtype=np.uint32)]
+        self._first_dish = np.r_[self._first_dish, np.full(grow, -1, dtype=np.int64)]
+        self._first_day = np.r_[self._first_day, np.full(grow, -1, dtype=np.int64)]
+
+    def _add_to(self, counters: Dict, kind: str, key: int, hashes: np.ndarray) -> None:
+        if key < 0:
+            return
+        counters[kind].setdefault(key, DistinctCounter()).add_hashes(hashes)
+
+    def _add_to_dish_day(self, counters: Dict, dish: int, day: int, hashes: np.ndarray) -> None:
+        if dish < 0 or day < 0:
+            return
+        counters["dish_day"].setdefault(dish, {}).setdefault(day, DistinctCounter()).add_hashes(hashes)
+
+    def add_reviews(self, reviewer_ids, menu_item_ids, timestamps) -> None:
+        """Bulk-load reviews (parallel arrays; unparseable timestamps only count towards dish and overall)."""
+        reviewer_ids = np.asarray(reviewer_ids, dtype=np.int64)
+        dishes = np.asarray(menu_item_ids, dtype=np.int64)
+        parsed = pd.to_datetime(pd.Series(timestamps), errors="coerce")
+        days = np.where(parsed.notna(), (parsed.to_numpy(dtype="datetime64[D]") - _EPOCH).astype(np.int64), -1)
+        if not len(reviewer_ids):
+            return
+
+        with self._lock:
+            if self._unique:
+                # Already populated: count one review at a time
+                for reviewer, dish, day in zip(reviewer_ids, dishes, days):
+                    self._add_one(int(reviewer), int(dish), int(day))
+                return
+
+            self._grow(int(reviewer_ids.max()) + 1)
+            self._counts = np.bincount(reviewer_ids, minlength=len(self._counts)).astype(np.uint32)
+            # A one-time reviewer's only review is their first; later writes don't matter for repeaters
+            self._first_dish[reviewer_ids] = dishes
+            self._first_day[reviewer_ids] = days
+            self._unique = int(np.count_nonzero(self._counts))
+            self._repeat = int(np.count_nonzero(self._counts >= 2))
+
+            hashes = hash_ids(reviewer_ids)
+            repeat = self._counts[reviewer_ids] >= 2
+            dated = days >= 0
+            self._all["dish"] = _grouped_counters(dishes, hashes)
+            self._all["day"] = _grouped_counters(days[dated], hashes[dated])
+            self._repeaters["dish"] = _grouped_counters(dishes[repeat], hashes[repeat])
+            self._repeaters["day"] = _grouped_counters(days[dated & repeat], hashes[dated & repeat])
+            self._all["dish_day"] = _dish_day_counters(dishes[dated], days[dated], hashes[dated])
+            both = dated & repeat
+            self._repeaters["dish_day"] = _dish_day_counters(dishes[both], days[both], hashes[both])
+
+    def _add_one(self, reviewer: int, dish: int, day: int) -> None:
+        self._grow(reviewer + 1)
+        hashes = hash_ids([reviewer])
+        self._add_to(self._all, "dish", dish, hashes)
+        self._add_to(self._all, "day", day, hashes)
+        self._add_to_dish_day(self._all, dish, day, hashes)
+
+        self._counts[reviewer] += 1
+        count = int(self._counts[reviewer])
+        if count == 1:
+            self._unique += 1
+            self._first_dish[reviewer], self._first_day[reviewer] = dish, day
+            return
+        if count == 2:
+            # Newly repeat: also counts as a repeater where their first review was
+            self._repeat += 1
+            self._add_to(self._repeaters, "dish", int(self._first_dish[reviewer]), hashes)
+            self._add_to(self._repeaters, "day", int(self._first_day[reviewer]), hashes)
+            self._add_to_dish_day(self._repeaters, int(self._first_dish[reviewer]), int(self._first_day[reviewer]),
+                                  hashes)
+        self._add_to(self._repeaters, "dish", dish, hashes)
+        self._add_to(self._repeaters, "day", day, hashes)
+        self._add_to_dish_day(self._repeaters, dish, day, hashes)
+
+    def add(self, review: Dict) -> None:
+        """Count one joined review (see data/ingest.py)."""
+        day = _day_number(review["timestamp"]) if review.get("timestamp") is not None else -1
+        with self._lock:
+            self._add_one(int(review["reviewer_id"]), int(review["menu_item_id"]), day)
+
+    def diversity(self, menu_item_id: Optional[int] = None, start: Optional[date] = None,
+                  end: Optional[date] = None) -> Dict:
+        """
+        Unique, one-time and repeat reviewer counts for one menu item, for the
+        days from `start` to `end` (inclusive, either may be open), for one
+        menu item over those days, or overall. A repeat reviewer has 2+ reviews
+        overall. `exact` is False when a sketch was involved.
+        """
+        dated = start is not None or end is not None
+        low = _day_number(start) if start is not None else -1
+        high = _day_number(end) if end is not None else np.iinfo(np.int64).max
+
+        with self._lock:
+            if menu_item_id is None and not dated:
+                unique, repeat, exact = self._unique, self._repeat, True
+            else:
+                if menu_item_id is not None and not dated:
+                    dish = int(menu_item_id)
+                    everyone = self._all["dish"].get(dish, DistinctCounter())
+                    repeaters = self._repeaters["dish"].get(dish, DistinctCounter())
+                else:
+                    if menu_item_id is None:
+                        all_days, repeater_days = self._all["day"], self._repeaters["day"]
+                    else:
+                        all_days = self._all["dish_day"].get(int(menu_item_id), {})
+                        repeater_days = self._repeaters["dish_day"].get(int(menu_item_id), {})
+                    everyone = _union(counter for day, counter in all_days.items() if low <= day <= high)
+                    repeaters = _union(counter for day, counter in repeater_days.items() if low <= day <= high)
+                unique, repeat = everyone.count(), repeaters.count()
+                exact = everyone.is_exact and repeaters.is_exact
+
+        repeat = min(repeat, unique)
+        return {
+            "unique": unique,
+            "one_time": unique - repeat,
+            "repeat": repeat,
+            "repeat_share": repeat / unique if unique else 0.0,
+            "exact": exact,
+        }
+
+    def diversity_for_month(self, month: str, menu_item_id: Optional[int] = None) -> Dict:
+        """diversity() for a calendar month given as YYYY-MM (optionally for one menu item)."""
+        first = pd.Period(month, freq="M")
+        return self.diversity(menu_item_id, start=first.start_time.date(), end=first.end_time.date())
+
+    def diversity_for_period(self, period: str = "overall", today: Optional[datetime] = None,
+                             menu_item_id: Optional[int] = None) -> Dict:
+        """diversity() for a KPI period: "overall", "month" (last 30 days) or "week" (last 7 days)."""
+        if period == "overall":
+            return self.diversity(menu_item_id)
+        days = {"month": 30, "week": 7}.get(period)
+        if days is None:
+            raise ValueError(f"Unknown period: {period}")
+        today = today or datetime.now()
+        return self.diversity(menu_item_id, start=(today - timedelta(days=days)).date(), end=today.date())
+
+
+def build_reviewer_cardinality(data: Dict) -> ReviewerCardinality:
+    """Index a loadData()-shaped dataset."""
+    index = ReviewerCardinality()
+    reviews = data.get("reviews", [])
+    if reviews:
+        with phase("aggregation"):
+            frame = pd.DataFrame(reviews, columns=["reviewer_id", "menu_item_id", "timestamp"])
+            index.add_reviews(frame["reviewer_id"].to_numpy(), frame["menu_item_id"].to_numpy(),
+                              frame["timestamp"])
+    return index
+
+
+@maintained_index
+def reviewer_cardinality(data: Dict) -> ReviewerCardinality:
+    """The shared index for the current data snapshot (rebuilt when the data file changes)."""
+    return build_reviewer_cardinality(data)
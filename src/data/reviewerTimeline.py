@@ -0,0 +1,198 @@
+"""Reviewer timeline index and cohort retention.
+
+`ReviewerTimeline` keeps every dated review sorted by (reviewer_id, day) in
+flat NumPy arrays, with `offsets` marking where each reviewer's reviews
+start, so one reviewer's history is a slice and whole-population questions
+are vectorized passes over the arrays.
+
+`ReviewerTimeline.cohorts()` is the cohort engine. In one pass it computes:
+- monthly acquisition cohorts (month of each reviewer's first review)
+- how many of each cohort reviewed again 0, 1, 2, ... months later (the
+  retention matrix)
+- the days between consecutive visits (distinct review days) of every reviewer
+
+The result is cached until a new review arrives. Reviews ingested through
+`data/ingest.py` are buffered and merged into the sorted arrays on the next
+query.
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data.ingest import maintained_index
+from observability.metrics import phase
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+_DAY_BITS = 32  # sort key = reviewer_id << 32 | day
+
+# Inter-visit interval buckets in days (upper bounds, inclusive)
+INTERVAL_BUCKETS = [(7, "≤ 1 week"), (30, "≤ 1 month"), (90, "≤ 3 months"), (180, "≤ 6 months"), (None, "> 6 months")]
+
+
+def _month_of_day(days: np.ndarray) -> np.ndarray:
+    """Months since 1970-01 for day numbers since 1970-01-01."""
+    return (days.astype("datetime64[D]").astype("datetime64[M]")).astype(np.int64)
+
+
+def month_label(month: int) -> str:
+    return str(np.datetime64(int(month), "M"))
+
+
+class Cohorts:
+    """
+    Cohort matrices for one timeline snapshot.
+
+    months[i] is cohort i's acquisition month (YYYY-MM) and sizes[i] its number
+    of new reviewers. active[i, k] counts cohort i's reviewers with a review k
+    months after acquisition; retention is active / sizes, NaN where month i + k
+    lies beyond the data. interval_days holds the gap between every pair of
+    consecutive visit days of the same reviewer.
+    """
+
+    def __init__(self, months: List[str], sizes: np.ndarray, active: np.ndarray, retention: np.ndarray,
+                 interval_days: np.ndarray):
+        self.months = months
+        self.sizes = sizes
+        self.active = active
+        self.retention = retention
+        self.interval_days = interval_days
+
+    def curve(self) -> np.ndarray:
+        """Share of reviewers active k months after acquisition, over every cohort observable at k."""
+        observable = ~np.isnan(self.retention)
+        weights = np.where(observable, self.sizes[:, None], 0)
+        totals = weights.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(totals > 0, np.where(observable, self.active, 0).sum(axis=0) / totals, np.nan)
+
+    def interval_histogram(self) -> Dict[str, int]:
+        """Number of return visits per INTERVAL_BUCKETS bucket."""
+        counts, low = {}, 0
+        for high, label in INTERVAL_BUCKETS:
+            upper = np.inf if high is None else high
+            counts[label] = int(np.count_nonzero((self.interval_days > low) & (self.interval_days <= upper)))
+            low = upper
+        return counts
+
+    def median_interval(self) -> Optional[float]:
+        return float(np.median(self.interval_days)) if len(self.interval_days) else None
+
+
+class ReviewerTimeline:
+    """Dated reviews sorted by (reviewer_id, day) with per-reviewer offsets."""
+
+    def __init__(self, reviewer_ids=(), days=(), menu_item_ids=()):
+        self._lock = threading.Lock()
+        self._pending: List = []
+        self._cohorts: Optional[Cohorts] = None
+        self._set(np.asarray(reviewer_ids, dtype=np.int64), np.asarray(days, dtype=np.int64),
+                  np.asarray(menu_item_ids, dtype=np.int64))
+
+    def _set(self, reviewers: np.ndarray, days: np.ndarray, dishes: np.ndarray) -> None:
+        keys = (reviewers << _DAY_BITS) | days
+        order = np.argsort(keys, kind="stable")
+        self._keys, self.reviewer, self.day, self.dish = keys[order], reviewers[order], days[order], dishes[order]
+        self._reindex()
+
+    def _reindex(self) -> None:
+        starts = np.flatnonzero(np.r_[True, self.reviewer[1:] != self.reviewer[:-1]]) if len(self.reviewer) else \
+            np.empty(0, dtype=np.int64)
+        self.reviewer_ids = self.reviewer[starts]
+        self.offsets = np.r_[starts, len(self.reviewer)].astype(np.int64)
+
+    def add(self, review: Dict) -> None:
+        """Queue one joined review (see data/ingest.py); it is merged in on the next query."""
+        if review.get("timestamp") is None or pd.isna(review["timestamp"]):
+            return
+        day = int((np.datetime64(pd.Timestamp(review["timestamp"]).date(), "D") - _EPOCH).astype(np.int64))
+        with self._lock:
+            self._pending.append((int(review["reviewer_id"]), day, int(review["menu_item_id"])))
+            self._cohorts = None
+
+    def _flush(self) -> None:
+        """Insert queued reviews into the sorted arrays (caller holds the lock)."""
+        if not self._pending:
+            return
+        reviewers, days, dishes = (np.array(column, dtype=np.int64) for column in zip(*self._pending))
+        self._pending = []
+        keys = (reviewers << _DAY_BITS) | days
+        order = np.argsort(keys, kind="stable")
+        at = np.searchsorted(self._keys, keys[order], side="right")
+        self._keys = np.insert(self._keys, at, keys[order])
+        self.reviewer = np.insert(self.reviewer, at, reviewers[order])
+        self.day = np.insert(self.day, at, days[order])
+        self.dish = np.insert(self.dish, at, dishes[order])
+        self._reindex()
+
+    def history(self, reviewer_id: int) -> pd.DataFrame:
+        """One reviewer's reviews, oldest first (date, menu_item_id)."""
+        with self._lock:
+            self._flush()
+            i = np.searchsorted(self.reviewer_ids, reviewer_id)
+            if i == len(self.reviewer_ids) or self.reviewer_ids[i] != reviewer_id:
+                return pd.DataFrame({"date": pd.to_datetime([]), "menu_item_id": []})
+            rows = slice(self.offsets[i], self.offsets[i + 1])
+            return pd.DataFrame({"date": self.day[rows].astype("datetime64[D]"), "menu_item_id": self.dish[rows]})
+
+    def cohorts(self) -> Cohorts:
+        """Cohort matrices and inter-visit intervals, cached until the next ingested review."""
+        with self._lock:
+            self._flush()
+            if self._cohorts is None:
+                with phase("aggregation"):
+                    self._cohorts = self._compute_cohorts()
+            return self._cohorts
+
+    def _compute_cohorts(self) -> Cohorts:
+        if not len(self.reviewer):
+            empty = np.zeros((0, 0))
+            return Cohorts([], np.zeros(0, dtype=np.int64), empty, empty, np.zeros(0, dtype=np.int64))
+
+        counts = np.diff(self.offsets)
+        month = _month_of_day(self.day)
+        first_month = np.repeat(month[self.offsets[:-1]], counts)
+        since = month - first_month
+
+        # Rows are in (reviewer, day) order, so repeats of a (reviewer, months-since) pair are adjacent
+        new_pair = np.r_[True, (self.reviewer[1:] != self.reviewer[:-1]) | (since[1:] != since[:-1])]
+        base = month.min()
+        last = month.max()
+        n_months = int(last - base) + 1
+        cohort_index = first_month[new_pair] - base
+        active = np.bincount(cohort_index * n_months + since[new_pair], minlength=n_months * n_months)
+        active = active.reshape(n_months, n_months)
+        sizes = active[:, 0].copy()
+
+        # Month i + k is observable only up to the last month with data
+        horizon = (n_months - 1 - np.arange(n_months))[:, None]
+        observable = (np.arange(n_months)[None, :] <= horizon) & (sizes[:, None] > 0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            retention = np.where(observable, active / np.maximum(sizes, 1)[:, None], np.nan)
+
+        # Gaps between consecutive distinct visit days of the same reviewer
+        same_reviewer = self.reviewer[1:] == self.reviewer[:-1]
+        gaps = np.diff(self.day)[same_reviewer]
+        interval_days = gaps[gaps > 0]
+
+        keep = sizes > 0
+        months = [month_label(base + i) for i in np.flatnonzero(keep)]
+        return Cohorts(months, sizes[keep], active[keep], retention[keep], interval_days)
+
+
+def build_reviewer_timeline(data: Dict) -> ReviewerTimeline:
+    """Index the dated reviews of a loadData()-shaped dataset."""
+    frame = pd.DataFrame(data.get("reviews", []), columns=["reviewer_id", "menu_item_id", "timestamp"])
+    with phase("aggregation"):
+        dates = pd.to_datetime(frame["timestamp"], errors="coerce")
+        dated = dates.notna().to_numpy()
+        days = (dates[dated].to_numpy(dtype="datetime64[D]") - _EPOCH).astype(np.int64)
+        return ReviewerTimeline(frame["reviewer_id"].to_numpy()[dated], days, frame["menu_item_id"].to_numpy()[dated])
+
+
+@maintained_index
+def reviewer_timeline(data: Dict) -> ReviewerTimeline:
+    """The shared index for the current data snapshot (rebuilt when the data file changes)."""
+    return build_reviewer_timeline(data)
@@ -0,0 +1,417 @@
+"""Vectorized synthetic review data at any scale, in the mockData.json schema.
+
+Generates reviewers, menuItems, ratings, content and reviews with realistic
+skew and referential integrity:
+
+- dish popularity follows a Zipf law (a few dishes get most reviews)
+- reviewer activity is heavy-tailed, so many customers review repeatedly
+- review volume has yearly seasonality, weekend peaks and gradual growth
+- each dish has its own quality level; taste/portion/value scatter around
+  the overall rating and `return` follows the overall rating
+
+Reviews are produced in fixed-size chunks from a seeded NumPy generator and
+written straight to JSON, a SQL dump (same schema as data_fixed.sql) or
+Parquet, so 1M+ reviews never have to be held in memory at once.
+
+Usage (from src/):
+    python -m data.syntheticData --reviews 1000000 --formats json sql parquet --out-dir /tmp/platemate
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+
+
+DISH_BASES = [
+    "Margherita Pizza", "Pepperoni Pizza", "BBQ Chicken Pizza", "Caesar Salad", "Greek Salad",
+    "Cheeseburger", "Bacon Double Burger", "Veggie Burger", "French Fries", "Sweet Potato Fries",
+    "Onion Rings", "Chicken Alfredo Pasta", "Spaghetti Bolognese", "Mac and Cheese", "Buffalo Chicken Wrap",
+    "Fish Tacos", "Loaded Nachos", "Garlic Bread", "Chicken Tenders", "Tomato Soup",
+    "Club Sandwich", "Chocolate Brownie", "Cheesecake", "Ice Cream Sundae", "Apple Pie",
+]
+DISH_STYLES = ["", "Spicy", "Classic", "Smoked", "Truffle", "Grilled", "Crispy", "Vegan", "Deluxe", "Mini"]
+
+_OPENERS = {
+    "neg": ["Really disappointed with the", "Not impressed by the", "I regret ordering the", "The"],
+    "mid": ["The", "Tried the", "Had the", "Ordered the"],
+    "pos": ["Absolutely loved the", "The", "Can't get enough of the", "Highly recommend the"],
+}
+_TASTE = {
+    "neg": ["It was bland and a bit cold.", "Way too salty and greasy.", "It tasted stale."],
+    "mid": ["The flavor was decent but nothing special.", "Taste was okay, a little under-seasoned.", "It was fine."],
+    "pos": ["Incredible flavor and perfectly cooked.", "Fresh, hot and delicious.", "The seasoning was spot on."],
+}
+_PORTION = {
+    "neg": ["The portion was tiny.", "Small portion for the price.", "Barely enough to share."],
+    "mid": ["Portion size was average.", "A fair amount of food.", "Portion was okay."],
+    "pos": ["Huge portion, I had leftovers.", "Generous serving.", "Plenty of food."],
+}
+_VALUE = {
+    "neg": ["Overpriced and not worth it.", "Way too expensive for what you get.", "Not coming back."],
+    "mid": ["Price is fair.", "Reasonable value.", "Might order again."],
+    "pos": ["Great value for money!", "Worth every penny.", "Will definitely be back!"],
+}
+
+
+def _band(scores: np.ndarray) -> np.ndarray:
+    """Map 1-5 ratings to 0 (negative), 1 (neutral) or 2 (positive)."""
+    return np.digitize(scores, [2.5, 3.5])
+
+
+def menu_item_names(n_dishes: int) -> List[str]:
+    """Unique, readable dish names (style x base, numbered once the combinations run out)."""
+    names = []
+    for i in range(n_dishes):
+        base = DISH_BASES[i % len(DISH_BASES)]
+        style = DISH_STYLES[(i // len(DISH_BASES)) % len(DISH_STYLES)]
+        cycle = i // (len(DISH_BASES) * len(DISH_STYLES))
+        name = f"{style} {base}".strip()
+        names.append(f"{name} #{cycle + 1}" if cycle else name)
+    return names
+
+
+def _zipf_weights(n: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _day_weights(days: np.ndarray) -> np.ndarray:
+    """Relative review volume per day: growth trend x yearly season x weekend peak."""
+    as_dates = days.astype("datetime64[D]")
+    day_of_year = (as_dates - as_dates.astype("datetime64[Y]")).astype(int)
+    weekday = (as_dates.astype(int) + 3) % 7  # 0 = Monday (1970-01-01 was a Thursday)
+
+    growth = np.linspace(1.0, 2.0, len(days))
+    season = 1.0 + 0.3 * np.sin(2 * np.pi * (day_of_year - 80) / 365.25)  # summer peak
+    weekend = np.where(weekday >= 4, 1.4, 1.0)  # Fri-Sun
+    weights = growth * season * weekend
+    return weights / weights.sum()
+
+
+class SyntheticDataset:
+    """
+    Seeded description of a synthetic dataset; reviews are generated lazily in chunks.
+
+    Args:
+        n_reviews: Number of reviews (and ratings / content rows)
+        n_dishes: Number of menu items
+        dish_names: Optional explicit menu item names (overrides n_dishes)
+        n_reviewers: Number of reviewers (default: ~45% of reviews, so many reviewers repeat)
+        seed: Seed for reproducible output
+        start / end: Review date range (inclusive, ISO strings)
+        chunk_size: Reviews generated per chunk
+    """
+
+    def __init__(self, n_reviews: int, n_dishes: int = 25, n_reviewers: Optional[int] = None, seed: int = 42,
+                 start: str = "2023-08-01", end: str = "2025-12-31", chunk_size: int = 100_000,
+                 dish_names: Optional[List[str]] = None):
+        self.n_reviews = int(n_reviews)
+        self.n_dishes = len(dish_names) if dish_names else int(n_dishes)
+        self.n_reviewers = int(n_reviewers or max(1, round(self.n_reviews * 0.45)))
+        self.seed = seed
+        self.chunk_size = int(chunk_size)
+
+        rng = np.random.default_rng(seed)
+        self.dish_names = list(dish_names) if dish_names else menu_item_names(self.n_dishes)
+        # Popularity rank is shuffled so the most popular dish isn't always dish #1
+        self.dish_popularity = rng.permutation(_zipf_weights(self.n_dishes, 1.1))
+        self.dish_quality = np.clip(rng.normal(3.6, 0.6, self.n_dishes), 1.5, 4.8)
+        self.reviewer_activity = rng.permutation(_zipf_weights(self.n_reviewers, 0.8))
+
+        self.days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+        self.day_weights = _day_weights(self.days)
+        day_dates = self.days.astype(object)
+        self.day_mdy = np.array([f"{d.month}/{d.day}/{d.year}" for d in day_dates], dtype=object)
+        self.day_iso = np.array([d.isoformat() for d in day_dates], dtype=object)
+
+    def chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield dicts of column arrays, `chunk_size` reviews at a time, ids continuing across chunks."""
+        seeds = np.random.SeedSequence(self.seed).spawn((self.n_reviews + self.chunk_size - 1) // self.chunk_size)
+        for index, chunk_seed in enumerate(seeds):
+            start = index * self.chunk_size
+            size = min(self.chunk_size, self.n_reviews - start)
+            yield self._chunk(np.random.default_rng(chunk_seed), start, size)
+
+    def _chunk(self, rng, start: int, size: int) -> Dict[str, np.ndarray]:
+        ids = np.arange(start + 1, start + size + 1)
+        dish = rng.choice(self.n_dishes, size=size, p=self.dish_popularity)
+        reviewer = rng.choice(self.n_reviewers, size=size, p=self.reviewer_activity) + 1
+        day = rng.choice(len(self.days), size=size, p=self.day_weights)
+
+        overall = np.clip(np.rint(rng.normal(self.dish_quality[dish], 0.9)), 1, 5).astype(np.int8)
+        taste, portion, value = (
+            np.clip(np.rint(overall + rng.normal(0, 0.7, size)), 1, 5).astype(np.int8) for _ in range(3)
+        )
+        would_return = rng.random(size) < np.array([0.05, 0.15, 0.45, 0.8, 0.95])[overall - 1]
+
+        return {
+            "id": ids,
+            "menu_item_id": dish + 1,
+            "reviewer_id": reviewer,
+            "day": day,
+            "portion": portion,
+            "taste": taste,
+            "value": value,
+            "overall": overall,
+            "return": would_return,
+            "content": self._content(rng, dish, overall, taste, portion, value),
+        }
+
+    def _content(self, rng, dish, overall, taste, portion, value) -> np.ndarray:
+        bands = ("neg", "mid", "pos")
+        parts = []
+        for bank, scores in ((_OPENERS, overall), (_TASTE, taste), (_PORTION, portion), (_VALUE, value)):
+            band = _band(scores)
+            phrase_index = rng.integers(0, 3, size=len(scores))
+            table = np.array([bank[b][:3] for b in bands], dtype=object)
+            parts.append(table[band, phrase_index])
+
+        names = np.array(self.dish_names, dtype=object)[dish]
+        return parts[0] + " " + np.char.lower(names.astype(str)).astype(object) + ". " \
+            + parts[1] + " " + parts[2] + " " + parts[3]
+
+    def to_frame(self):
+        """All reviews as one joined pandas DataFrame (only sensible for in-memory sizes)."""
+        import pandas as pd
+
+        names = np.array(self.dish_names, dtype=object)
+        frames = [
+            pd.DataFrame({
+                "id": chunk["id"],
+                "reviewer_id": chunk["reviewer_id"],
+                "menu_item_id": chunk["menu_item_id"],
+                "name": names[chunk["menu_item_id"] - 1],
+                "date": self.days[chunk["day"]],
+                "portion": chunk["portion"],
+                "taste": chunk["taste"],
+                "value": chunk["value"],
+                "overall": chunk["overall"],
+                "return": chunk["return"],
+                "content": chunk["content"],
+            })
+            for chunk in self.chunks()
+        ]
+        return pd.concat(frames, ignore_index=True)
+
+    def reviewers(self) -> List[int]:
+        return list(range(1, self.n_reviewers + 1))
+
+    def menu_items(self) -> List[Dict]:
+        return [{"id": i + 1, "name": name} for i, name in enumerate(self.dish_names)]
+
+
+# ------------------------------
+# Streaming writers
+# ------------------------------
+
+def _stitch(out, parts: List[str]):
+    for part in parts:
+        with open(part, "r") as f:
+            shutil.copyfileobj(f, out)
+
+
+def write_json(dataset: SyntheticDataset, path: str) -> str:
+    """Write the dataset as mockData.json-style JSON without holding all rows in memory."""
+    tmp_dir = tempfile.mkdtemp(prefix="platemate-json-")
+    parts = {name: os.path.join(tmp_dir, name) for name in ("ratings", "content", "reviews")}
+    try:
+        files = {name: open(p, "w") for name, p in parts.items()}
+        first = True
+        for chunk in dataset.chunks():
+            sep = "" if first else ",\n"
+            first = False
+            files["ratings"].write(sep + ",\n".join(
+                f'{{"id": {i}, "portion": {p}, "taste": {t}, "value": {v}, "overall": {o}, "return": {"true" if r else "false"}}}'
+                for i, p, t, v, o, r in zip(chunk["id"], chunk["portion"], chunk["taste"], chunk["value"],
+                                            chunk["overall"], chunk["return"])
+            ))
+            files["content"].write(sep + ",\n".join(
+                f'{{"id": {i}, "content": {json.dumps(c)}}}' for i, c in zip(chunk["id"], chunk["content"])
+            ))
+            files["reviews"].write(sep + ",\n".join(
+                f'{{"id": {i}, "rating_id": {i}, "content_id": {i}, "reviewer_id": {r}, '
+                f'"timestamp": "{ts}", "menu_item_id": {m}}}'
+                for i, r, ts, m in zip(chunk["id"], chunk["reviewer_id"], dataset.day_mdy[chunk["day"]],
+                                       chunk["menu_item_id"])
+            ))
+        for f in files.values():
+            f.close()
+
+        with open(path, "w") as out:
+            out.write('{\n"reviewers": [\n')
+            out.write(",\n".join(f'{{"id": {i}}}' for i in dataset.reviewers()))
+            out.write('\n],\n"menuItems": [\n')
+            out.write(",\n".join(json.dumps(item) for item in dataset.menu_items()))
+            for name in ("ratings", "content", "reviews"):
+                out.write(f'\n],\n"{name}": [\n')
+                _stitch(out, [parts[name]])
+            out.write("\n]\n}\n")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return path
+
+
+_SQL_HEADER = """CREATE DATABASE IF NOT EXISTS restaurant_db;
+USE restaurant_db;
+
+DROP TABLE IF EXISTS reviews;
+DROP TABLE IF EXISTS reviewers;
+DROP TABLE IF EXISTS menu_items;
+DROP TABLE IF EXISTS ratings;
+DROP TABLE IF EXISTS content;
+
+CREATE TABLE reviewers (
+    id INT PRIMARY KEY
+);
+
+CREATE TABLE menu_items (
+    id INT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL
+);
+
+CREATE TABLE ratings (
+    id INT PRIMARY KEY,
+    portion INT,
+    taste INT,
+    value INT,
+    overall INT,
+    return_customer BOOLEAN
+);
+
+CREATE TABLE content (
+    id INT PRIMARY KEY,
+    content TEXT NOT NULL
+);
+
+CREATE TABLE reviews (
+    id INT PRIMARY KEY,
+    rating_id INT,
+    content_id INT,
+    reviewer_id INT,
+    time_stamp DATE,
+    menu_item_id INT,
+    FOREIGN KEY (rating_id) REFERENCES ratings(id),
+    FOREIGN KEY (content_id) REFERENCES content(id),
+    FOREIGN KEY (reviewer_id) REFERENCES reviewers(id),
+    FOREIGN KEY (menu_item_id) REFERENCES menu_items(id)
+);
+"""
+
+
+def _sql_str(text: str) -> str:
+    return "'" + str(text).replace("'", "''") + "'"
+
+
+def _insert(table: str, columns: str, rows: List[str]) -> str:
+    return f"INSERT INTO {table} ({columns}) VALUES\n" + ",\n".join(rows) + ";\n\n"
+
+
+def write_sql(dataset: SyntheticDataset, path: str, rows_per_insert: int = 5000) -> str:
+    """Write a SQL dump with the same schema as data_fixed.sql (loadable by llm.load_sql_db)."""
+    tmp_dir = tempfile.mkdtemp(prefix="platemate-sql-")
+    parts = {name: os.path.join(tmp_dir, name) for name in ("ratings", "content", "reviews")}
+    try:
+        files = {name: open(p, "w") for name, p in parts.items()}
+        for chunk in dataset.chunks():
+            for lo in range(0, len(chunk["id"]), rows_per_insert):
+                sl = slice(lo, lo + rows_per_insert)
+                files["ratings"].write(_insert("ratings", "id, portion, taste, value, overall, return_customer", [
+                    f"({i}, {p}, {t}, {v}, {o}, {'TRUE' if r else 'FALSE'})"
+                    for i, p, t, v, o, r in zip(chunk["id"][sl], chunk["portion"][sl], chunk["taste"][sl],
+                                                chunk["value"][sl], chunk["overall"][sl], chunk["return"][sl])
+                ]))
+                files["content"].write(_insert("content", "id, content", [
+                    f"({i}, {_sql_str(c)})" for i, c in zip(chunk["id"][sl], chunk["content"][sl])
+                ]))
+                files["reviews"].write(_insert(
+                    "reviews", "id, rating_id, content_id, reviewer_id, time_stamp, menu_item_id", [
+                        f"({i}, {i}, {i}, {r}, '{ts}', {m})"
+                        for i, r, ts, m in zip(chunk["id"][sl], chunk["reviewer_id"][sl],
+                                               dataset.day_iso[chunk["day"][sl]], chunk["menu_item_id"][sl])
+                    ]))
+        for f in files.values():
+            f.close()
+
+        with open(path, "w") as out:
+            out.write(_SQL_HEADER + "\n")
+            reviewers = dataset.reviewers()
+            for lo in range(0, len(reviewers), rows_per_insert):
+                out.write(_insert("reviewers", "id", [f"({i})" for i in reviewers[lo:lo + rows_per_insert]]))
+            out.write(_insert("menu_items", "id, name", [
+                f"({item['id']}, {_sql_str(item['name'])})" for item in dataset.menu_items()
+            ]))
+            _stitch(out, [parts["ratings"], parts["content"], parts["reviews"]])
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return path
+
+
+def write_parquet(dataset: SyntheticDataset, out_dir: str) -> str:
+    """Write one Parquet file per collection (row group per chunk). Requires pyarrow."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from e
+
+    os.makedirs(out_dir, exist_ok=True)
+    pq.write_table(pa.table({"id": np.arange(1, dataset.n_reviewers + 1)}), os.path.join(out_dir, "reviewers.parquet"))
+    pq.write_table(
+        pa.table({"id": np.arange(1, dataset.n_dishes + 1), "name": dataset.dish_names}),
+        os.path.join(out_dir, "menuItems.parquet"),
+    )
+
+    writers = {}
+    try:
+        for chunk in dataset.chunks():
+            tables = {
+                "ratings": pa.table({key: chunk[key] for key in ("id", "portion", "taste", "value", "overall", "return")}),
+                "content": pa.table({"id": chunk["id"], "content": chunk["content"].astype(str)}),
+                "reviews": pa.table({
+                    "id": chunk["id"],
+                    "rating_id": chunk["id"],
+                    "content_id": chunk["id"],
+                    "reviewer_id": chunk["reviewer_id"],
+                    "timestamp": dataset.days[chunk["day"]],
+                    "menu_item_id": chunk["menu_item_id"],
+                }),
+            }
+            for name, table in tables.items():
+                if name not in writers:
+                    writers[name] = pq.ParquetWriter(os.path.join(out_dir, f"{name}.parquet"), table.schema)
+                writers[name].write_table(table)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return out_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Platemate review dataset.")
+    parser.add_argument("--reviews", type=int, default=100_000)
+    parser.add_argument("--dishes", type=int, default=25)
+    parser.add_argument("--reviewers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--formats", nargs="+", default=["json"], choices=["json", "sql", "parquet"])
+    parser.add_argument("--out-dir", default=".")
+    args = parser.parse_args(argv)
+
+    dataset = SyntheticDataset(args.reviews, n_dishes=args.dishes, n_reviewers=args.reviewers,
+                               seed=args.seed, chunk_size=args.chunk_size)
+    os.makedirs(args.out_dir, exist_ok=True)
+    stem = f"synthetic_{args.reviews}"
+    if "json" in args.formats:
+        print(write_json(dataset, os.path.join(args.out_dir, f"{stem}.json")))
+    if "sql" in args.formats:
+        print(write_sql(dataset, os.path.join(args.out_dir, f"{stem}.sql")))
+    if "parquet" in args.formats:
+        print(write_parquet(dataset, os.path.join(args.out_dir, f"{stem}_parquet")))
+
+
+if __name__ == "__main__":
+    main()
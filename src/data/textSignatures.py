@@ -0,0 +1,148 @@
+"""Text helpers shared by the review text features (comment selection, dedup).
+
+Provides a simple word tokenizer, word shingling and MinHash signatures so
+near-identical review texts can be compared without pairwise set operations,
+plus an exact Jaccard similarity for checking the candidate pairs they find.
+"""
+
+import re
+import zlib
+from typing import Iterable, List, Set
+import numpy as np
+
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+# Mersenne prime used for the universal hash family h(x) = (a*x + b) mod p
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_FNV_PRIME = np.uint64(0x100000001B3)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens (apostrophes kept, e.g. "wasn't")."""
+    return _WORD_RE.findall(str(text).lower())
+
+
+def shingles(tokens: List[str], k: int = 3) -> Set[int]:
+    """Return the set of hashed k-word shingles (falls back to single words for short texts)."""
+    if len(tokens) < k:
+        grams = tokens
+    else:
+        grams = [" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)]
+    return {zlib.crc32(g.encode("utf-8")) for g in grams}
+
+
+def minhash_permutations(num_perm: int = 64, seed: int = 1):
+    """Random (a, b) coefficients for `num_perm` hash functions."""
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+    b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signature(shingle_set: Iterable[int], permutations) -> np.ndarray:
+    """MinHash signature (uint32 array of length num_perm) for one shingle set."""
+    a, b = permutations
+    values = np.fromiter(shingle_set, dtype=np.uint64)
+    if values.size == 0:
+        return np.full(a.shape[0], _MAX_HASH, dtype=np.uint32)
+    # (num_values, num_perm) hash table, minimum over values per permutation
+    hashed = (values[:, None] * a[None, :] + b[None, :]) % np.uint64(_MERSENNE_PRIME)
+    return (hashed & np.uint64(_MAX_HASH)).min(axis=0).astype(np.uint32)
+
+
+def estimate_jaccard(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity = fraction of matching MinHash slots."""
+    return float(np.mean(sig_a == sig_b))
+
+
+
+def shingle_hashes(token_lists: List[List[str]], k: int = 3):
+    """
+    Hashed k-word shingles of many token lists at once, for minhash_signatures().
+
+    Returns (values, lengths): the shingle hashes of every list back to back
+    and how many belong to each list. Lists shorter than k contribute their
+    words, as in shingles(). The hashes come from per-word CRC32s mixed with
+    array arithmetic, so they differ from shingles() values; repeated
+    shingles are kept (MinHash only takes minima).
+    """
+    lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+    vocab = {}
+    codes = np.fromiter((vocab.setdefault(token, len(vocab)) for tokens in token_lists for token in tokens),
+                        dtype=np.int64, count=int(lengths.sum()))
+    word_hashes = np.fromiter((zlib.crc32(word.encode("utf-8")) for word in vocab), dtype=np.uint64,
+                              count=len(vocab))[codes]
+    docs = np.repeat(np.arange(len(token_lists)), lengths)
+
+    # Shingle starting at each position (valid where all k words are in the same list)
+    mixed = word_hashes.copy()
+    valid = np.ones(len(mixed), dtype=bool)
+    for offset in range(1, k):
+        mixed[:-offset] = (mixed[:-offset] * _FNV_PRIME) ^ word_hashes[offset:]
+        valid[:-offset] &= docs[offset:] == docs[:-offset]
+        valid[-offset:] = False
+    short = (lengths < k)[docs]
+    values = np.where(short, word_hashes, mixed & np.uint64(_MAX_HASH))
+    keep = valid | short
+    return values[keep], np.bincount(docs[keep], minlength=len(token_lists))
+
+
+def minhash_signatures(values: np.ndarray, lengths: np.ndarray, permutations, chunk_size: int = 1 << 16) -> np.ndarray:
+    """
+    MinHash signatures for many shingle sets at once, given as back-to-back
+    hash `values` with `lengths` per set (see shingle_hashes). Returns an
+    (n, num_perm) uint32 array; row i equals minhash_signature() of set i.
+    Values are hashed in chunks of about `chunk_size` to bound memory.
+    """
+    a, b = permutations
+    lengths = np.asarray(lengths, dtype=np.int64)
+    signatures = np.full((len(lengths), a.shape[0]), _MAX_HASH, dtype=np.uint32)
+    docs = np.flatnonzero(lengths)
+    if not len(docs):
+        return signatures
+
+    values = np.asarray(values, dtype=np.uint64)
+    offsets = np.concatenate([[0], np.cumsum(lengths[docs])])
+    # Set boundaries closest to every chunk_size values (each chunk holds at least one set)
+    cuts = np.unique(np.concatenate([[0], np.searchsorted(offsets, np.arange(chunk_size, offsets[-1], chunk_size)),
+                                     [len(docs)]]))
+    for low, high in zip(cuts[:-1], cuts[1:]):
+        chunk = values[offsets[low]:offsets[high]]
+        hashed = (chunk[:, None] * a[None, :] + b[None, :]) % np.uint64(_MERSENNE_PRIME)
+        minima = np.minimum.reduceat(hashed & np.uint64(_MAX_HASH), offsets[low:high] - offsets[low], axis=0)
+        signatures[docs[low:high]] = minima.astype(np.uint32)
+    return signatures
+
+
+def set_jaccard(values: np.ndarray, lengths: np.ndarray, left, right) -> np.ndarray:
+    """
+    Exact Jaccard similarity of sets left[i] and right[i], for sets of 32-bit
+    hashes given as back-to-back `values` with `lengths` per set (see
+    shingle_hashes). Two empty sets have similarity 0.
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    left, right = np.asarray(left, dtype=np.int64), np.asarray(right, dtype=np.int64)
+    values = np.asarray(values, dtype=np.uint64)
+    low_bits = np.uint64(_MAX_HASH)
+
+    # Distinct values of every set: (set << 32 | value) keys, sorted and deduplicated
+    keys = np.unique((np.repeat(np.arange(len(lengths), dtype=np.uint64), lengths) << np.uint64(32)) | values)
+    sizes = np.bincount((keys >> np.uint64(32)).astype(np.int64), minlength=len(lengths))
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    values = keys & low_bits
+
+    # Both sides of every pair back to back, keyed by the pair number
+    sets = np.concatenate([left, right])
+    counts = sizes[sets]
+    positions = np.repeat(offsets[sets] - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts) + \
+        np.arange(int(counts.sum()))
+    pairs = np.repeat(np.tile(np.arange(len(left), dtype=np.uint64), 2), counts)
+    gathered = np.sort((pairs << np.uint64(32)) | values[positions])
+
+    # A value shared by both sides of a pair appears twice in a row once sorted
+    shared = gathered[1:][gathered[1:] == gathered[:-1]]
+    intersection = np.bincount((shared >> np.uint64(32)).astype(np.int64), minlength=len(left))
+    union = sizes[left] + sizes[right] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1), 0.0)
@@ -0,0 +1,69 @@
+"""
+Gunicorn configuration for the dashboard.
+
+    cd src && gunicorn -c gunicorn.conf.py wsgi:application
+
+Environment:
+    PORT / PLATEMATE_BIND        listen address (default 0.0.0.0:8050)
+    PLATEMATE_WORKERS            worker processes (default: number of CPUs)
+    PLATEMATE_THREADS            threads per worker (default 4)
+    PLATEMATE_TIMEOUT            worker timeout in seconds (default 120)
+    PLATEMATE_RELOAD_INTERVAL    seconds between data-file checks, 0 disables (default 5)
+
+Data reloads: the app is preloaded in the master, so a plain HUP would fork
+new workers from the same stale snapshot. Instead a watcher thread in the
+master polls the data file, and when it changes sends USR2 to the master.
+Gunicorn then starts a new master (which preloads the new data) next to the
+old one. Once the new master is ready it sends TERM to the old master, which
+finishes in-flight requests and exits. The listening socket is inherited, so
+no connections are refused.
+"""
+
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+bind = os.getenv("PLATEMATE_BIND", f"0.0.0.0:{os.getenv('PORT', '8050')}")
+workers = int(os.getenv("PLATEMATE_WORKERS", multiprocessing.cpu_count()))
+threads = int(os.getenv("PLATEMATE_THREADS", "4"))
+worker_class = "gthread"
+timeout = int(os.getenv("PLATEMATE_TIMEOUT", "120"))
+graceful_timeout = 30
+preload_app = True
+
+RELOAD_INTERVAL = float(os.getenv("PLATEMATE_RELOAD_INTERVAL", "5"))
+
+
+def on_starting(server):
+    # Metrics snapshot files from a previous run would be merged into /metrics
+    if not os.getenv("GUNICORN_PID"):  # not a USR2 re-exec: the old master's workers are still reporting
+        from observability import metrics
+        metrics.clear_metrics_dir()
+
+
+def when_ready(server):
+    # Started by USR2 from an older master: take over by stopping it gracefully
+    if server.master_pid:
+        server.log.info("New data snapshot is serving; stopping old master %s", server.master_pid)
+        os.kill(server.master_pid, signal.SIGTERM)
+
+    if RELOAD_INTERVAL > 0:
+        threading.Thread(target=_watch_data_file, args=(server,), name="data-watcher", daemon=True).start()
+
+
+def _watch_data_file(server):
+    from data.loadData import data_version
+
+    current = data_version()
+    while True:
+        time.sleep(RELOAD_INTERVAL)
+        try:
+            latest = data_version()
+        except OSError:
+            continue  # file is being replaced; check again next round
+        if latest != current:
+            server.log.info("Data file %s changed; re-executing master to reload", latest[0])
+            os.kill(os.getpid(), signal.SIGUSR2)
+            return
@@ -0,0 +1,490 @@
+"""
+Callback latency metrics for the Dash app, exported in Prometheus text format.
+
+Wrap a callback with @timed_callback (below the Dash @callback decorator) to
+record its duration, outcome and a per-phase breakdown. Code inside the
+callback marks phases with `with phase("aggregation"):`; loadData() marks
+"data_load" itself. Time outside any phase is reported under the callback's
+`remainder` phase ("other" unless the decorator says e.g. "figure_build"), and the
+time Dash spends after the callback returns (JSON-encoding the response) is
+reported as "serialization" by the Flask request hooks installed by init_app().
+
+init_app() also adds a /metrics route to the Flask server. Histograms and
+counters live in process memory; when a metrics directory is configured
+(PLATEMATE_METRICS_DIR) every process also writes its snapshot to
+<dir>/metrics_<pid>.json and /metrics merges all of them. That way background
+callbacks (which run in child processes) and multiple gunicorn workers show up
+in one scrape. Snapshots are written at most every PLATEMATE_METRICS_FLUSH_S
+seconds (default 5) per process, plus on a process's first record and at exit.
+Files of processes that have exited are folded into one archive per server
+run, so counts from finished background jobs are kept without one file per
+job. Files are tagged with the run (the process that called configure(), e.g.
+the gunicorn master with preload_app); files from other runs are not merged,
+and are deleted once that run's process is gone. clear_metrics_dir() empties
+the directory when the server starts.
+
+Callbacks slower than PLATEMATE_SLOW_CALLBACK_MS (default 1000, 0 disables)
+are logged with their phase breakdown. Timed callbacks can also be profiled
+on demand, see observability/profiling.py.
+"""
+
+import atexit
+import fcntl
+import glob
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+from dash.exceptions import PreventUpdate
+from observability.profiling import profiled
+
+
+# Upper bounds (seconds) of the callback histogram buckets
+CALLBACK_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf"))
+
+SLOW_CALLBACK_MS = float(os.getenv("PLATEMATE_SLOW_CALLBACK_MS", "1000"))
+FLUSH_INTERVAL = float(os.getenv("PLATEMATE_METRICS_FLUSH_S", "5"))
+
+DASH_UPDATE_PATH = "/_dash-update-component"
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(str(labels[label]) for label in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return {json.dumps(key): value for key, value in self._values.items()}
+
+
+class Histogram:
+    """Fixed-bucket histogram with labels (per-bucket counts, cumulated when exported)."""
+
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=CALLBACK_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[label]) for label in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                json.dumps(key): {"counts": list(s["counts"]), "sum": s["sum"], "count": s["count"]}
+                for key, s in self._values.items()
+            }
+
+
+CALLBACK_SECONDS = Histogram(
+    "platemate_callback_duration_seconds", "Time spent inside Dash callbacks.", ("callback",))
+PHASE_SECONDS = Histogram(
+    "platemate_callback_phase_seconds",
+    "Callback time by phase (data_load, aggregation, figure_build, llm, other, serialization).",
+    ("callback", "phase"))
+CALLBACK_CALLS = Counter(
+    "platemate_callback_calls_total", "Dash callback invocations by outcome.", ("callback", "status"))
+SLOW_CALLBACKS = Counter(
+    "platemate_slow_callbacks_total", "Callbacks slower than PLATEMATE_SLOW_CALLBACK_MS.", ("callback",))
+
+METRICS = [CALLBACK_SECONDS, PHASE_SECONDS, CALLBACK_CALLS, SLOW_CALLBACKS]
+
+
+def _reset_after_fork():
+    # A forked child (background callback job, gunicorn worker) starts from a copy of
+    # the parent's counts; drop them so the merged scrape doesn't count them twice.
+    for metric in METRICS:
+        metric._lock = threading.Lock()
+        metric._values = {}
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# ----------------------------
+# Phases
+# ----------------------------
+_local = threading.local()
+
+
+class _CallbackTimer:
+    def __init__(self):
+        self.phases = {}
+        self.stack = []  # [phase name, start of its current slice]
+        self.status = None  # set by set_callback_status()
+
+
+def set_callback_status(status):
+    """
+    Override the status label of the running timed callback, e.g. "error" for a
+    callback that catches its exception and renders an error message instead.
+    """
+    timer = getattr(_local, "timer", None)
+    if timer is not None:
+        timer.status = status
+
+
+@contextmanager
+def phase(name):
+    """
+    Attribute the enclosed time to `name` in the running callback's breakdown.
+
+    Phases are exclusive: a nested phase pauses the enclosing one. Outside a
+    timed callback this does nothing beyond the context-manager call.
+    """
+    timer = getattr(_local, "timer", None)
+    if timer is None:
+        yield
+        return
+
+    now = time.perf_counter()
+    if timer.stack:
+        parent = timer.stack[-1]
+        timer.phases[parent[0]] = timer.phases.get(parent[0], 0.0) + now - parent[1]
+    timer.stack.append([name, now])
+    try:
+        yield
+    finally:
+        now = time.perf_counter()
+        _, start = timer.stack.pop()
+        timer.phases[name] = timer.phases.get(name, 0.0) + now - start
+        if timer.stack:
+            timer.stack[-1][1] = now
+
+
+def timed_callback(func=None, *, name=None, remainder="other"):
+    """
+    Decorator recording duration, status and phase breakdown of a Dash callback.
+
+    Args:
+        name: Metric label for the callback (defaults to the function name)
+        remainder: Phase that time outside every explicit phase() is attributed to
+    """
+
+    def decorate(func):
+        callback_name = name or func.__name__
+        # Opt-in cProfile/sampling wrapper; returns func unchanged unless PLATEMATE_PROFILE is set
+        func = profiled(func, callback_name)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            outer = getattr(_local, "timer", None)
+            timer = _local.timer = _CallbackTimer()
+            status = "ok"
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except PreventUpdate:
+                status = "prevented"
+                raise
+            except Exception:
+                status = "error"
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                _local.timer = outer
+                _record_callback(callback_name, elapsed, timer.phases, timer.status or status, remainder)
+
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
+
+
+def _record_callback(callback_name, elapsed, phases, status, remainder="other"):
+    phases = dict(phases)
+    phases[remainder] = phases.get(remainder, 0.0) + max(elapsed - sum(phases.values()), 0.0)
+
+    CALLBACK_SECONDS.observe(elapsed, callback=callback_name)
+    CALLBACK_CALLS.inc(callback=callback_name, status=status)
+    for phase_name, seconds in phases.items():
+        PHASE_SECONDS.observe(seconds, callback=callback_name, phase=phase_name)
+
+    if SLOW_CALLBACK_MS and elapsed * 1000 >= SLOW_CALLBACK_MS:
+        SLOW_CALLBACKS.inc(callback=callback_name)
+        breakdown = ", ".join(f"{p}={s * 1000:.0f}ms" for p, s in sorted(phases.items(), key=lambda kv: -kv[1]))
+        print(f"Slow callback '{callback_name}': {elapsed * 1000:.0f}ms ({breakdown}) [{status}]")
+
+    # Remember the callback time so the after_request hook can derive serialization time
+    from flask import g, has_request_context
+    if has_request_context():
+        g.platemate_callback = (callback_name, elapsed)
+
+    flush()
+
+
+# ----------------------------
+# Multi-process snapshots
+# ----------------------------
+_metrics_dir = None
+# Server run the snapshot files belong to: "<pid>-<start ns>" of the process that called configure()
+_run = None
+_last_flush = float("-inf")
+_EXITED_PREFIX = "metrics_exited_"
+
+
+def configure(metrics_dir=None):
+    """Enable per-process snapshot files in `metrics_dir` (defaults to PLATEMATE_METRICS_DIR)."""
+    global _metrics_dir, _run
+    metrics_dir = metrics_dir or os.getenv("PLATEMATE_METRICS_DIR")
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+    _metrics_dir = metrics_dir
+    _run = f"{os.getpid()}-{time.time_ns()}"
+
+
+def clear_metrics_dir(metrics_dir=None):
+    """Delete snapshot files left by a previous server run."""
+    metrics_dir = metrics_dir or _metrics_dir or os.getenv("PLATEMATE_METRICS_DIR")
+    if metrics_dir:
+        for path in glob.glob(os.path.join(metrics_dir, "metrics_*.json")):
+            os.remove(path)
+
+
+def _reset_flush_after_fork():
+    # A new process writes its first record right away (background jobs often record only one)
+    global _last_flush
+    _last_flush = float("-inf")
+
+
+os.register_at_fork(after_in_child=_reset_flush_after_fork)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _run_alive(run):
+    return _pid_alive(int(run.split("-", 1)[0]))
+
+
+def _snapshot():
+    snapshot = {
+        metric.name: {"buckets": getattr(metric, "buckets", None), "values": metric.snapshot()}
+        for metric in METRICS
+    }
+
+    # LLM call latency from the shared client, if this process made any calls
+    client = sys.modules.get("components.ai.client")
+    if client is not None:
+        histogram, errors = {}, {}
+        for call_site, snap in client.latency_snapshot().items():
+            cumulative = [count for _, count in snap["buckets"]]
+            counts = [c - p for c, p in zip(cumulative, [0] + cumulative[:-1])]
+            histogram[json.dumps([call_site])] = {"counts": counts, "sum": snap["sum"], "count": snap["count"]}
+            errors[json.dumps([call_site])] = float(snap["errors"])
+        snapshot["platemate_llm_call_seconds"] = {"buckets": list(client.LATENCY_BUCKETS), "values": histogram}
+        snapshot["platemate_llm_call_errors_total"] = {"buckets": None, "values": errors}
+
+    return snapshot
+
+
+def _write(path, snapshot):
+    fd, tmp_path = tempfile.mkstemp(dir=_metrics_dir, prefix=".metrics_")
+    with os.fdopen(fd, "w") as f:
+        json.dump({"run": _run, "metrics": snapshot}, f)
+    os.replace(tmp_path, path)
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None  # a process exited or is mid-write; its next flush will be picked up
+
+
+def flush(force=False):
+    """
+    Write this process's snapshot to the metrics directory (no-op without one).
+    Unless `force`d, at most once every FLUSH_INTERVAL seconds.
+    """
+    global _last_flush
+    if not _metrics_dir:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < FLUSH_INTERVAL:
+        return
+    _last_flush = now
+    _write(os.path.join(_metrics_dir, f"metrics_{os.getpid()}.json"), _snapshot())
+
+
+atexit.register(lambda: flush(force=True))
+
+
+def _fold_exited():
+    """
+    Merge the snapshots of exited processes of this run into the run's archive
+    and delete them; delete files of other runs whose process is gone.
+    """
+    with open(os.path.join(_metrics_dir, ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        archive_path = os.path.join(_metrics_dir, f"{_EXITED_PREFIX}{_run}.json")
+        exited = []
+        for path in glob.glob(os.path.join(_metrics_dir, "metrics_*.json")):
+            name = os.path.basename(path)[:-len(".json")]
+            if name.startswith(_EXITED_PREFIX):
+                run = name[len(_EXITED_PREFIX):]
+                if run != _run and not _run_alive(run):
+                    os.remove(path)
+                continue
+            pid = name[len("metrics_"):]
+            if not pid.isdigit() or _pid_alive(int(pid)):
+                continue
+            snapshot = _read(path)
+            if snapshot is not None and snapshot.get("run") == _run:
+                exited.append(snapshot["metrics"])
+            os.remove(path)
+
+        if exited:
+            archive = _read(archive_path)
+            _write(archive_path, _merge(([archive["metrics"]] if archive else []) + exited))
+
+
+def _merge(snapshots):
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {"buckets": metric["buckets"], "values": {}})
+            for key, value in metric["values"].items():
+                if metric["buckets"] is None:
+                    target["values"][key] = target["values"].get(key, 0.0) + value
+                elif key not in target["values"]:
+                    target["values"][key] = {"counts": list(value["counts"]), "sum": value["sum"], "count": value["count"]}
+                else:
+                    series = target["values"][key]
+                    series["counts"] = [a + b for a, b in zip(series["counts"], value["counts"])]
+                    series["sum"] += value["sum"]
+                    series["count"] += value["count"]
+    return merged
+
+
+def collect():
+    """Merged snapshot of every process of this run writing to the metrics directory (or just this one)."""
+    if not _metrics_dir:
+        return _snapshot()
+
+    flush(force=True)
+    _fold_exited()
+    snapshots = []
+    for path in glob.glob(os.path.join(_metrics_dir, "metrics_*.json")):
+        snapshot = _read(path)
+        if snapshot is not None and snapshot.get("run") == _run:
+            snapshots.append(snapshot["metrics"])
+    return _merge(snapshots)
+
+
+# ----------------------------
+# Prometheus exposition
+# ----------------------------
+_HELP = {
+    **{metric.name: (metric.type, metric.help, metric.labelnames) for metric in METRICS},
+    "platemate_llm_call_seconds": ("histogram", "LLM call latency by call site.", ("call_site",)),
+    "platemate_llm_call_errors_total": ("counter", "Failed LLM calls by call site.", ("call_site",)),
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, json.loads(key)))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def render_prometheus(snapshot=None):
+    """Render a (merged) snapshot in the Prometheus text exposition format."""
+    snapshot = collect() if snapshot is None else snapshot
+    lines = []
+    for name, metric in sorted(snapshot.items()):
+        metric_type, help_text, labelnames = _HELP.get(name, ("untyped", "", ()))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for key, value in sorted(metric["values"].items()):
+            if metric["buckets"] is None:
+                lines.append(f"{name}{_labels(labelnames, key)} {value}")
+                continue
+            running = 0
+            for bound, count in zip(metric["buckets"], value["counts"]):
+                running += count
+                lines.append(f"{name}_bucket{_labels(labelnames, key, ('le', _format_bound(bound)))} {running}")
+            lines.append(f"{name}_sum{_labels(labelnames, key)} {value['sum']}")
+            lines.append(f"{name}_count{_labels(labelnames, key)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------
+# Flask integration
+# ----------------------------
+def init_app(app, metrics_dir=None):
+    """Install the serialization-timing hooks and the /metrics route on a Dash app's Flask server."""
+    from flask import Response, g, request
+
+    configure(metrics_dir)
+    server = app.server
+
+    @server.before_request
+    def _start_request_timer():
+        if request.path.endswith(DASH_UPDATE_PATH):
+            g.platemate_request_start = time.perf_counter()
+
+    @server.after_request
+    def _record_serialization(response):
+        start = g.pop("platemate_request_start", None)
+        callback = g.pop("platemate_callback", None)
+        if start is not None and callback is not None:
+            callback_name, callback_seconds = callback
+            serialization = max(time.perf_counter() - start - callback_seconds, 0.0)
+            PHASE_SECONDS.observe(serialization, callback=callback_name, phase="serialization")
+            flush()
+        return response
+
+    @server.route("/metrics")
+    def _metrics():
+        return Response(render_prometheus(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,351 @@
+"""
+Opt-in profiling of live Dash callbacks.
+
+Controlled by PLATEMATE_PROFILE, read when callbacks are registered:
+
+    unset / "off"   disabled: callbacks are not wrapped and no routes exist (zero overhead)
+    "header"        profile a request when it sends `X-Platemate-Profile: <admin token>`
+    "all"           profile every timed callback
+    "a,b"           always profile callbacks a and b (the header works too)
+
+PLATEMATE_PROFILER picks the profiler: "cprofile" (default, deterministic) or
+"sampling" (a stack sampler thread with lower overhead on long callbacks such
+as process_question). cProfile profiles one callback at a time; a callback
+that starts while another is being cProfiled runs unprofiled. Profiles are stored in PLATEMATE_PROFILE_DIR as
+<profile id>.pstats or .collapsed plus a .json summary; the id is generated
+by the server (a random hex id and the callback name) and returned in the
+X-Platemate-Profile-Id response header. Only the newest
+PLATEMATE_PROFILE_KEEP profiles (default 50) are kept.
+
+The header mode and the admin routes need PLATEMATE_ADMIN_TOKEN: without it
+neither is enabled, so clients cannot trigger profiling or read profiles.
+The token is sent as X-Platemate-Admin-Token or ?token=:
+
+    /admin/profiles                 JSON list of recent profiles
+    /admin/profiles/<id>.pstats     raw pstats file (cProfile only), for snakeviz / pstats
+    /admin/profiles/<id>.collapsed  collapsed stacks for flamegraph.pl / speedscope
+    /admin/profiles/<id>.txt        top functions by cumulative time
+
+Background callbacks run without a request, so only the env modes apply to them.
+"""
+
+import cProfile
+import glob
+import hmac
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from functools import wraps
+
+
+PROFILE_HEADER = "X-Platemate-Profile"
+PROFILE_ID_HEADER = "X-Platemate-Profile-Id"
+ADMIN_TOKEN_HEADER = "X-Platemate-Admin-Token"
+
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples in "sampling" mode
+
+_SAFE_ID = re.compile(r"[^A-Za-z0-9_.-]")
+
+_profile_dir = None
+
+# cProfile is one process-wide tool on Python 3.12+ (a second enable() raises
+# ValueError), so only one callback is cProfiled at a time; the others run unprofiled
+_cprofile_lock = threading.Lock()
+
+
+def _mode():
+    return os.getenv("PLATEMATE_PROFILE", "off").strip()
+
+
+def enabled() -> bool:
+    return _mode().lower() not in ("", "off", "0", "false", "no")
+
+
+def _always_profiled(callback_name) -> bool:
+    mode = _mode()
+    if mode.lower() == "all":
+        return True
+    return callback_name in {name.strip() for name in mode.split(",")}
+
+
+def _header_requested() -> bool:
+    from flask import has_request_context, request
+
+    if not has_request_context():
+        return False
+    value = request.headers.get(PROFILE_HEADER)
+    if not value:
+        return False
+    token = _admin_token()
+    # The header has to carry the admin token; without one the header mode is off
+    return bool(token) and hmac.compare_digest(value, token)
+
+
+def _admin_token() -> str:
+    return os.getenv("PLATEMATE_ADMIN_TOKEN", "")
+
+
+# ----------------------------
+# Profilers
+# ----------------------------
+class _StackSampler:
+    """Samples one thread's Python stack at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts = defaultdict(int)
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="platemate-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.counts.items()))
+
+
+def _label(func) -> str:
+    filename, lineno, name = func
+    if filename == "~":  # builtins
+        return name
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def pstats_to_collapsed(stats: pstats.Stats, max_depth=60, min_seconds=1e-5) -> str:
+    """
+    Approximate collapsed stacks (weights in microseconds) from a cProfile call graph.
+
+    cProfile only records caller -> callee edges, so each callee's time is split
+    between its callers in proportion to the cumulative time of each edge.
+    """
+    entries = stats.stats
+    children = defaultdict(list)
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            children[caller].append((func, edge[3]))
+
+    weights = defaultdict(float)
+
+    def walk(func, stack, fraction):
+        _, _, own_time, cumulative, _ = entries[func]
+        stack = stack + [_label(func)]
+        if own_time * fraction > 0:
+            weights[";".join(stack)] += own_time * fraction
+        if len(stack) >= max_depth:
+            return
+        for child, edge_time in children.get(func, ()):
+            child_cumulative = entries[child][3]
+            share = fraction * edge_time / child_cumulative if child_cumulative else 0.0
+            if share * child_cumulative < min_seconds or _label(child) in stack:
+                continue
+            walk(child, stack, share)
+
+    for func, (_, _, _, _, callers) in entries.items():
+        if not callers:
+            walk(func, [], 1.0)
+
+    return "".join(
+        f"{stack} {round(seconds * 1e6)}\n" for stack, seconds in sorted(weights.items()) if seconds >= 1e-6
+    )
+
+
+# ----------------------------
+# Wrapping callbacks
+# ----------------------------
+def profiled(func, name=None):
+    """Wrap a callback so it is profiled when PLATEMATE_PROFILE (or the request header) asks for it."""
+    if not enabled():
+        return func
+
+    callback_name = name or func.__name__
+    always = _always_profiled(callback_name)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not (always or _header_requested()):
+            return func(*args, **kwargs)
+        return _run_profiled(func, callback_name, args, kwargs)
+
+    return wrapper
+
+
+def _run_profiled(func, callback_name, args, kwargs):
+    sampling = os.getenv("PLATEMATE_PROFILER", "cprofile").lower() == "sampling"
+    if sampling:
+        profiler = _StackSampler()
+        profiler.start()
+    else:
+        if not _cprofile_lock.acquire(blocking=False):
+            print(f"Profiling: {callback_name} ran unprofiled, another callback is being profiled")
+            return func(*args, **kwargs)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as exc:
+            # Another profiling tool (debugger, coverage) is already active
+            _cprofile_lock.release()
+            print(f"Profiling: {callback_name} ran unprofiled ({exc})")
+            return func(*args, **kwargs)
+    status = "ok"
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        if sampling:
+            profiler.stop()
+        else:
+            profiler.disable()
+            _cprofile_lock.release()
+        _save_profile(profiler, callback_name, time.perf_counter() - start, status)
+
+
+def _save_profile(profiler, callback_name, seconds, status):
+    profile_dir = _profile_dir or os.getenv("PLATEMATE_PROFILE_DIR")
+    if not profile_dir:
+        return
+    os.makedirs(profile_dir, exist_ok=True)
+
+    profile_id = f"{uuid.uuid4().hex[:16]}-{_SAFE_ID.sub('_', callback_name)}"
+    if isinstance(profiler, _StackSampler):
+        profiler_name, fmt = "sampling", "collapsed"
+        with open(os.path.join(profile_dir, f"{profile_id}.collapsed"), "w") as f:
+            f.write(profiler.collapsed())
+    else:
+        profiler_name, fmt = "cprofile", "pstats"
+        profiler.dump_stats(os.path.join(profile_dir, f"{profile_id}.pstats"))
+
+    summary = {
+        "id": profile_id,
+        "callback": callback_name,
+        "created": time.time(),
+        "duration_ms": round(seconds * 1000, 1),
+        "status": status,
+        "profiler": profiler_name,
+        "format": fmt,
+        "pid": os.getpid(),
+    }
+    with open(os.path.join(profile_dir, f"{profile_id}.json"), "w") as f:
+        json.dump(summary, f)
+
+    from flask import g, has_request_context
+    if has_request_context():
+        g.platemate_profile_id = profile_id
+
+    _prune(profile_dir)
+
+
+def _prune(profile_dir):
+    keep = int(os.getenv("PLATEMATE_PROFILE_KEEP", "50"))
+    summaries = sorted(glob.glob(os.path.join(profile_dir, "*.json")), key=os.path.getmtime, reverse=True)
+    for path in summaries[keep:]:
+        stem = path[: -len(".json")]
+        for suffix in (".json", ".pstats", ".collapsed"):
+            try:
+                os.remove(stem + suffix)
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(profile_dir=None):
+    """Summaries of stored profiles, newest first."""
+    profile_dir = profile_dir or _profile_dir
+    summaries = []
+    for path in glob.glob(os.path.join(profile_dir, "*.json")):
+        try:
+            with open(path) as f:
+                summaries.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(summaries, key=lambda s: s["created"], reverse=True)
+
+
+# ----------------------------
+# Flask integration
+# ----------------------------
+def init_app(app, profile_dir=None):
+    """
+    Add the profile-id response header and the /admin/profiles routes (only when
+    profiling is enabled and PLATEMATE_ADMIN_TOKEN is set).
+    """
+    global _profile_dir
+    if not enabled():
+        return
+
+    from flask import Response, abort, g, jsonify, request, send_file
+
+    _profile_dir = profile_dir or os.getenv("PLATEMATE_PROFILE_DIR")
+    os.makedirs(_profile_dir, exist_ok=True)
+    server = app.server
+
+    if not _admin_token():
+        print("Profiling: PLATEMATE_ADMIN_TOKEN is not set, /admin/profiles and the "
+              f"{PROFILE_HEADER} header are disabled")
+        return
+
+    def _authorize():
+        supplied = request.headers.get(ADMIN_TOKEN_HEADER) or request.args.get("token") or ""
+        if not hmac.compare_digest(supplied, _admin_token()):
+            abort(403)
+
+    @server.after_request
+    def _add_profile_id(response):
+        profile_id = g.pop("platemate_profile_id", None)
+        if profile_id:
+            response.headers[PROFILE_ID_HEADER] = profile_id
+        return response
+
+    @server.route("/admin/profiles")
+    def _list_profiles():
+        _authorize()
+        return jsonify(list_profiles())
+
+    @server.route("/admin/profiles/<profile_id>.<fmt>")
+    def _download_profile(profile_id, fmt):
+        _authorize()
+        if _SAFE_ID.search(profile_id):
+            abort(404)
+        stem = os.path.join(_profile_dir, profile_id)
+
+        if fmt == "pstats" and os.path.exists(stem + ".pstats"):
+            return send_file(stem + ".pstats", mimetype="application/octet-stream",
+                             as_attachment=True, download_name=f"{profile_id}.pstats")
+
+        if fmt == "collapsed":
+            if os.path.exists(stem + ".collapsed"):
+                return send_file(stem + ".collapsed", mimetype="text/plain")
+            if os.path.exists(stem + ".pstats"):
+                return Response(pstats_to_collapsed(pstats.Stats(stem + ".pstats")), mimetype="text/plain")
+
+        if fmt == "txt" and os.path.exists(stem + ".pstats"):
+            out = io.StringIO()
+            stats = pstats.Stats(stem + ".pstats", stream=out)
+            stats.sort_stats("cumulative").print_stats(int(request.args.get("top", 40)))
+            return Response(out.getvalue(), mimetype="text/plain")
+
+        abort(404)
@@ -2,7 +2,8 @@
 import dash
 from dash import html, dcc, callback, Input, Output, State
 import dash_bootstrap_components as dbc
-from components.ai.llm import rag_answer
+from components.ai.llm import rag_answer_stream
+from observability.metrics import set_callback_status, timed_callback
 import pandas as pd
 import os
 
@@ -85,28 +86,115 @@ layout = html.Div(
                     ],
                 ),
 
-                # Loading indicator
-                dcc.Loading(
-                    id="loading",
-                    type="circle",
-                    children=[
-                        # Results container
-                        html.Div(id="results-container"),
-                    ],
-                ),
+                # Live progress (SQL → table → streamed answer) while the question runs
+                html.Div(id="results-progress", style={"display": "none"}),
+
+                # Final results container
+                html.Div(id="results-container"),
             ],
         ),
     ],
 )
 
 
+def _question_block(question):
+    return html.Div(
+        style={
+            "backgroundColor": "#e3f2fd",
+            "borderRadius": "8px",
+            "padding": "20px",
+            "marginBottom": "20px",
+        },
+        children=[
+            html.H4("❓ Your Question:", style={"color": "#1976d2", "marginBottom": "10px"}),
+            html.P(question, style={"fontSize": "16px", "marginBottom": "0"}),
+        ],
+    )
+
+
+def _sql_block(sql_query):
+    return html.Div(
+        style={
+            "backgroundColor": "#ffffff",
+            "borderRadius": "12px",
+            "padding": "20px 30px",
+            "boxShadow": "0 2px 8px rgba(0,0,0,0.1)",
+            "marginBottom": "20px",
+        },
+        children=[
+            html.H5("🧮 Generated SQL", style={"color": "#2c3e50", "marginBottom": "10px"}),
+            dcc.Markdown(f"```sql\n{sql_query}\n```"),
+        ],
+    )
+
+
+def _table_block(df, max_rows=50):
+    return html.Div(
+        style={
+            "backgroundColor": "#ffffff",
+            "borderRadius": "12px",
+            "padding": "20px 30px",
+            "boxShadow": "0 2px 8px rgba(0,0,0,0.1)",
+            "marginBottom": "20px",
+            "overflowX": "auto",
+        },
+        children=[
+            html.H5(f"📋 Query Results ({len(df)} rows)", style={"color": "#2c3e50", "marginBottom": "10px"}),
+            dbc.Table.from_dataframe(df.head(max_rows), striped=True, bordered=False, hover=True, size="sm"),
+        ],
+    )
+
+
+def _answer_block(answer, pending=False):
+    return html.Div(
+        style={
+            "backgroundColor": "#ffffff",
+            "borderRadius": "12px",
+            "padding": "30px",
+            "boxShadow": "0 2px 8px rgba(0,0,0,0.1)",
+        },
+        children=[
+            html.H4("💡 AI Answer:", style={"color": "#2c3e50", "marginBottom": "20px"}),
+            dcc.Markdown(
+                answer + (" ▌" if pending else ""),
+                style={
+                    "fontSize": "16px",
+                    "lineHeight": "1.6",
+                    "color": "#34495e",
+                },
+            ),
+        ],
+    )
+
+
+def _render_results(question, sql_query=None, df=None, answer=None, pending=False):
+    """Build the results view from whatever stages have completed so far."""
+    children = [_question_block(question)]
+    if sql_query is not None:
+        children.append(_sql_block(sql_query))
+    if df is not None:
+        children.append(_table_block(df))
+    if answer is not None or pending:
+        children.append(_answer_block(answer or "", pending=pending))
+    return html.Div(children)
+
+
 @callback(
     Output("results-container", "children"),
     Input("submit-button", "n_clicks"),
     State("question-input", "value"),
+    background=True,
+    progress=Output("results-progress", "children"),
+    running=[
+        (Output("submit-button", "disabled"), True, False),
+        (Output("results-progress", "style"), {"display": "block"}, {"display": "none"}),
+        (Output("results-container", "style"), {"display": "none"}, {"display": "block"}),
+    ],
+    interval=250,
     prevent_initial_call=True,
 )
-def process_question(n_clicks, question):
+@timed_callback
+def process_question(set_progress, n_clicks, question):
     if not question or question.strip() == "":
         return html.Div(
             style={
@@ -130,53 +218,23 @@ def process_question(n_clicks, question):
         sql_file = os.path.join(current_dir, "../data/data_fixed.sql")
         sql_file = os.path.abspath(sql_file)
 
-        # Call the RAG pipeline
-        answer = rag_answer(question, sql_file, api_key)
-
-        # Parse the printed output to extract SQL and results
-        # (This is a simple approach - in production you'd want to modify llm.py to return structured data)
-
-        # Create results display
-        results = html.Div([
-            # Question display
-            html.Div(
-                style={
-                    "backgroundColor": "#e3f2fd",
-                    "borderRadius": "8px",
-                    "padding": "20px",
-                    "marginBottom": "20px",
-                },
-                children=[
-                    html.H4("❓ Your Question:", style={"color": "#1976d2", "marginBottom": "10px"}),
-                    html.P(question, style={"fontSize": "16px", "marginBottom": "0"}),
-                ],
-            ),
-
-            # Answer display
-            html.Div(
-                style={
-                    "backgroundColor": "#ffffff",
-                    "borderRadius": "12px",
-                    "padding": "30px",
-                    "boxShadow": "0 2px 8px rgba(0,0,0,0.1)",
-                },
-                children=[
-                    html.H4("💡 AI Answer:", style={"color": "#2c3e50", "marginBottom": "20px"}),
-                    dcc.Markdown(
-                        answer,
-                        style={
-                            "fontSize": "16px",
-                            "lineHeight": "1.6",
-                            "color": "#34495e",
-                        },
-                    ),
-                ],
-            ),
-        ])
+        # Stream the RAG pipeline: show each stage as soon as it is ready
+        sql_query, df, answer = None, None, ""
+        set_progress(_render_results(question, pending=True))
+        for stage, payload in rag_answer_stream(question, sql_file, api_key):
+            if stage == "sql":
+                sql_query = payload
+            elif stage == "table":
+                df = payload
+            elif stage == "answer":
+                answer += payload
+            set_progress(_render_results(question, sql_query, df, answer, pending=True))
 
-        return results
+        return _render_results(question, sql_query, df, answer)
 
     except Exception as e:
+        # Rendered as a message, so the metrics wrapper never sees the exception
+        set_callback_status("error")
         return html.Div(
             style={
                 "backgroundColor": "#f8d7da",
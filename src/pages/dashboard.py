@@ -21,6 +21,13 @@ from components.customerSatisfactionMetrics.monthlyTastePortionValue import (
 from components.customerSatisfactionMetrics.customer_return import (
     create_customer_return_chart,
 )
+from components.customerSatisfactionMetrics.cohortRetention import (
+    create_cohort_retention_chart,
+)
+from components.customerSatisfactionMetrics.ratingDistribution import (
+    create_rating_distribution_chart,
+    year_options,
+)
 from components.operationalMetrics.lastTenReviews import (
     create_last_ten_reviews_table,
 )
@@ -36,9 +43,25 @@ from components.operationalMetrics.OvertimeRating import (
 from components.operationalMetrics.UniqueIndex import (
     create_reviewer_diversity_chart,
 )
+
+from components.operationalMetrics.ratingAlerts import (
+    create_rating_alerts_panel,
+)
+
+from components.operationalMetrics.reviewSearchBox import (
+    create_review_search_box,
+    create_review_search_results,
+)
+from data.reviewSearch import search_reviews
+from data.ingest import snapshot_id
+from components.figureEncoding import compact_figure
+from observability.metrics import phase, timed_callback
 # Register the page
 dash.register_page(__name__, path="/", name="Dashboard")
 
+# How often open dashboards check for ingested reviews
+DATA_REFRESH_MS = 60_000
+
 # Load static figures (you can later move them to callbacks if needed)
 recent_reviews_fig, reviews_line_fig = create_review_charts()
 monthly_rating_fig = create_monthly_mean_rating_chart()
@@ -48,12 +71,18 @@ last_10_reviews_table = create_last_ten_reviews_table()
 category_kpi_fig = create_category_kpi_cards()
 average_rating_fig = create_average_rating_over_time()
 unique_customer_index_fig = create_reviewer_diversity_chart()
+cohort_retention_fig = create_cohort_retention_chart()
+rating_distribution_fig = create_rating_distribution_chart()
+# The data the figures above were built from; refresh_figures rebuilds them once it changes
+figures_snapshot = snapshot_id()
 
 # Define page layout
 # Define page layout
 layout = html.Div(
     className="app-container",
     children=[
+        dcc.Store(id="dashboard-snapshot", data=figures_snapshot),
+        dcc.Interval(id="dashboard-refresh", interval=DATA_REFRESH_MS),
         # Header
         html.Div(
             className="header",
@@ -159,6 +188,12 @@ layout = html.Div(
                     },
                 ),
 
+                # Rating Alerts
+                html.Div(
+                    className="chart-wrapper",
+                    children=[create_rating_alerts_panel()],
+                ),
+
                 # KPI Cards
                 html.Div(
                     className="chart-wrapper",
@@ -187,7 +222,7 @@ layout = html.Div(
                     children=[
                         dcc.Graph(
                             id="average-rating-over-time",
-                            figure=average_rating_fig,
+                            figure=compact_figure(average_rating_fig),
                             config={"displayModeBar": False},
                         )
                     ],
@@ -204,6 +239,37 @@ layout = html.Div(
                         )
                     ],
                 ),
+
+                # Cohort Retention
+                html.Div(
+                    className="chart-wrapper",
+                    children=[
+                        dcc.Graph(
+                            id="cohort-retention-chart",
+                            figure=compact_figure(cohort_retention_fig),
+                            config={"displayModeBar": False},
+                        )
+                    ],
+                ),
+
+                # Rating Distribution
+                html.Div(
+                    className="chart-wrapper",
+                    children=[
+                        dcc.Dropdown(
+                            id="rating-distribution-year",
+                            options=year_options(),
+                            value="all",
+                            clearable=False,
+                            style={"width": "170px", "margin": "8px auto"}
+                        ),
+                        dcc.Graph(
+                            id="rating-distribution-chart",
+                            figure=rating_distribution_fig,
+                            config={"displayModeBar": False},
+                        )
+                    ],
+                ),
             ],
         ),
 
@@ -226,7 +292,7 @@ layout = html.Div(
                     children=[
                         dcc.Graph(
                             id="reviews-over-time",
-                            figure=reviews_line_fig,
+                            figure=compact_figure(reviews_line_fig),
                             config={"displayModeBar": False},
                         )
                     ],
@@ -254,6 +320,16 @@ layout = html.Div(
                 #     ],
                 # ),
 
+                html.Div(
+                    className="chart-wrapper",
+                    style={
+                        "marginTop": "20px",
+                    },
+                    children=[
+                        create_review_search_box()
+                    ],
+                ),
+
                 html.Div(
                     className="chart-wrapper",
                     style={
@@ -273,9 +349,11 @@ layout = html.Div(
 )
 
 # Register callback for tab interaction (must use dash.get_app() when using pages)
-from dash import callback, Output, Input
+from dash import callback, Output, Input, State
+from dash.exceptions import PreventUpdate
 
 @callback(Output("dish-cards-container", "children"), Input("dish-tabs", "value"))
+@timed_callback(remainder="figure_build")
 def update_dish_cards(tab_value):
     if tab_value == "top":
         dishes = get_top_rated_dishes(5)
@@ -284,8 +362,89 @@ def update_dish_cards(tab_value):
 
     return [create_dish_card(d, rank=i + 1) for i, d in enumerate(dishes)]
 
+# The layout already holds the "overall" cards; period changes only patch values, colors and title
 @callback(Output("category-kpi-cards", "figure"),
-          Input("period-dropdown", "value")) 
+          Input("period-dropdown", "value"),
+          prevent_initial_call=True)
+@timed_callback(remainder="figure_build")
 def update_kpi_chart(period):
-    from components.customerSatisfactionMetrics.CategoryKPI import create_category_kpi_cards
-    return create_category_kpi_cards(period)
+    from components.customerSatisfactionMetrics.CategoryKPI import create_category_kpi_patch
+    return create_category_kpi_patch(period)
+
+# The reviewer diversity chart follows the same period selector
+@callback(Output("unique-customer-index-chart", "figure"),
+          Input("period-dropdown", "value"),
+          prevent_initial_call=True)
+@timed_callback(remainder="figure_build")
+def update_reviewer_diversity(period):
+    from components.operationalMetrics.UniqueIndex import create_reviewer_diversity_patch
+    return create_reviewer_diversity_patch(period)
+
+# Year changes patch the rating distribution bars in place
+@callback(Output("rating-distribution-chart", "figure"),
+          Input("rating-distribution-year", "value"),
+          prevent_initial_call=True)
+@timed_callback(remainder="figure_build")
+def update_rating_distribution(year):
+    from components.customerSatisfactionMetrics.ratingDistribution import create_rating_distribution_patch
+    return create_rating_distribution_patch(year)
+
+# Picks up alerts raised by reviews ingested since the page was built
+@callback(Output("rating-alerts-list", "children"),
+          Input("rating-alerts-refresh", "n_intervals"),
+          prevent_initial_call=True)
+@timed_callback(remainder="figure_build")
+def update_rating_alerts(n_intervals):
+    from components.operationalMetrics.ratingAlerts import create_rating_alerts_list
+    return create_rating_alerts_list()
+
+@callback(Output("review-search-results", "children"),
+          Input("review-search-input", "value"),
+          Input("review-search-dish", "value"),
+          Input("review-search-dates", "start_date"),
+          Input("review-search-dates", "end_date"))
+@timed_callback(remainder="figure_build")
+def update_review_search(query, dish, start_date, end_date):
+    if not query or not query.strip():
+        return None
+    with phase("aggregation"):
+        results = search_reviews(query, dish=dish, start_date=start_date, end_date=end_date, limit=20)
+    return create_review_search_results(results, query)
+
+
+# Figures built once at import (and the last refresh) go stale as reviews are ingested:
+# on page load and every DATA_REFRESH_MS, rebuild them if the data changed since
+@callback(Output("dashboard-snapshot", "data"),
+          Output("performance-chart", "figure"),
+          Output("category-kpi-cards", "figure", allow_duplicate=True),
+          Output("average-rating-over-time", "figure"),
+          Output("unique-customer-index-chart", "figure", allow_duplicate=True),
+          Output("cohort-retention-chart", "figure"),
+          Output("rating-distribution-year", "options"),
+          Output("rating-distribution-chart", "figure", allow_duplicate=True),
+          Output("reviews-over-time", "figure"),
+          Output("last-ten-reviews", "figure"),
+          Input("dashboard-refresh", "n_intervals"),
+          State("dashboard-snapshot", "data"),
+          State("period-dropdown", "value"),
+          State("rating-distribution-year", "value"),
+          prevent_initial_call="initial_duplicate")
+@timed_callback(remainder="figure_build")
+def refresh_figures(n_intervals, shown_snapshot, period, year):
+    current = snapshot_id()
+    if current == shown_snapshot:
+        raise PreventUpdate
+
+    _, reviews_line = create_review_charts()
+    return (
+        current,
+        create_performance_chart(),
+        create_category_kpi_cards(period),
+        compact_figure(create_average_rating_over_time()),
+        create_reviewer_diversity_chart(period),
+        compact_figure(create_cohort_retention_chart()),
+        year_options(),
+        create_rating_distribution_chart(None if year in (None, "all") else int(year)),
+        compact_figure(reviews_line),
+        create_last_ten_reviews_table(),
+    )
@@ -2,7 +2,10 @@ import dash
 from dash import dcc, html, Input, Output, State
 import pandas as pd
 import os
-from data.loadData import loadData
+from data.loadData import loadData, cached_on_data
+from data.reviewDuplicates import without_duplicates
+from components.figureEncoding import compact_figure
+from observability.metrics import phase, timed_callback
 
 # Import dish insights
 
@@ -11,25 +14,33 @@ from components.dishStats.dishCategoryBreakdown import create_dish_category_brea
 from components.dishStats.dishSentiment import create_dish_sentiment_chart
 from components.dishStats.dishOrdersOverTime import create_dish_orders_over_time
 from components.dishStats.dishCustomerReturn import create_dish_customer_return_chart
+from components.dishStats.dishPairings import create_dish_pairings_chart
+from components.dishStats.similarDishes import create_similar_dishes_panel
+from components.dishStats.dishAspects import create_dish_aspects_chart
+from components.customerSatisfactionMetrics.ratingDistribution import create_rating_distribution_chart
 from components.dishStats.dishAISuggestions import generate_dish_suggestions, create_suggestion_card
 
 dash.register_page(__name__, path="/dish-stats", name="Dish Analytics")
 
-# Load data once
-# Load data once
-data = loadData()
-reviews_df = pd.DataFrame(data["reviews"])
-ratings_df = pd.DataFrame(data["ratings"])
-menu_df = pd.DataFrame(data["menuItems"])
-content_df = pd.DataFrame(data["content"]) 
-
-# Merge reviews with ratings and menu
-merged_df = (
-    reviews_df
-    .merge(ratings_df, left_on="rating_id", right_on="id", suffixes=("_review", "_rating"))
-    .merge(menu_df, left_on="menu_item_id", right_on="id", suffixes=("", "_menu"))
-    .merge(content_df, left_on="content_id", right_on="id", suffixes=("", "_content"))
-)
+@cached_on_data
+def _dish_frame():
+    """Reviews merged with ratings, menu and content; rebuilt when the data changes or a review is ingested."""
+    data = loadData()
+    reviews_df = pd.DataFrame(data["reviews"])
+    ratings_df = pd.DataFrame(data["ratings"])
+    menu_df = pd.DataFrame(data["menuItems"])
+    content_df = pd.DataFrame(data["content"])
+
+    # Merge reviews with ratings and menu
+    return (
+        reviews_df
+        .merge(ratings_df, left_on="rating_id", right_on="id", suffixes=("_review", "_rating"))
+        .merge(menu_df, left_on="menu_item_id", right_on="id", suffixes=("", "_menu"))
+        .merge(content_df, left_on="content_id", right_on="id", suffixes=("", "_content"))
+    )
+
+
+merged_df = _dish_frame()
 
 
 layout = html.Div(
@@ -71,22 +82,33 @@ layout = html.Div(
     State("dish-dropdown", "value"),
     prevent_initial_call=True
 )
+@timed_callback
 def update_dish_insights(n_clicks, dish_name):
     if not dish_name:
         return html.P("Please select a dish to view insights.", style={"textAlign": "center", "color": "gray"})
 
-    filtered = merged_df[merged_df["name"] == dish_name]
+    with phase("aggregation"):
+        # Near-duplicate reviews would skew the charts and repeat in the AI prompt
+        merged = _dish_frame()
+        filtered = without_duplicates(merged[merged["name"] == dish_name], id_column="id_review")
 
     # Generate charts
-    pie_fig = create_dish_overall_pie(filtered, dish_name)
-    category_fig = create_dish_category_breakdown(filtered, dish_name)
-    sentiment_fig = create_dish_sentiment_chart(filtered, dish_name)
-    orders_fig = create_dish_orders_over_time(filtered, dish_name)
-    returning_fig = create_dish_customer_return_chart(filtered, dish_name)
+    with phase("figure_build"):
+        menu_item_id = int(filtered["menu_item_id"].iloc[0]) if not filtered.empty else None
+        pie_fig = create_dish_overall_pie(filtered, dish_name, menu_item_id)
+        distribution_fig = create_rating_distribution_chart(menu_item_id=menu_item_id)
+        category_fig = create_dish_category_breakdown(filtered, dish_name)
+        sentiment_fig = create_dish_sentiment_chart(filtered, dish_name)
+        aspects_fig = create_dish_aspects_chart(filtered, dish_name)
+        orders_fig = create_dish_orders_over_time(filtered, dish_name)
+        returning_fig = create_dish_customer_return_chart(filtered, dish_name)
+        pairings_fig = create_dish_pairings_chart(filtered, dish_name)
+        similar_panel = create_similar_dishes_panel(filtered, dish_name)
 
     # Generate AI suggestions
     api_key = os.getenv("GEMINI_API_KEY")
-    suggestions = generate_dish_suggestions(dish_name, filtered, api_key)
+    with phase("llm"):
+        suggestions = generate_dish_suggestions(dish_name, filtered, api_key)
 
     return html.Div(
         [
@@ -132,9 +154,13 @@ def update_dish_insights(n_clicks, dish_name):
             # Existing charts
             html.H3("📊 Performance Charts", style={"marginTop": "40px", "marginBottom": "20px", "color": "#2c3e50"}),
             dcc.Graph(figure=pie_fig, style={"height": "500px"}),
+            dcc.Graph(figure=distribution_fig, style={"height": "450px"}),
             dcc.Graph(figure=category_fig, style={"height": "500px"}),
             dcc.Graph(figure=sentiment_fig, style={"height": "500px"}),
-            dcc.Graph(figure=orders_fig, style={"height": "500px"}),
+            dcc.Graph(figure=aspects_fig, style={"height": "500px"}),
+            dcc.Graph(figure=compact_figure(orders_fig), style={"height": "500px"}),
             dcc.Graph(figure=returning_fig, style={"height": "500px"}),
+            dcc.Graph(figure=pairings_fig, style={"height": "500px"}),
+            similar_panel,
         ]
     )
@@ -0,0 +1,20 @@
+import pytest
+
+from data.ingest import drop_indexes
+from data.loadData import clear_cache
+from data.ratingAlerts import configure_alert_log
+from data.reviewSearch import configure_search_database
+
+
+@pytest.fixture(autouse=True)
+def fresh_data(tmp_path, monkeypatch):
+    """Every test starts from the data file, with its search database and alert log under tmp_path."""
+    monkeypatch.delenv("PLATEMATE_FAKE_LLM", raising=False)
+    configure_search_database(str(tmp_path / "search"))
+    configure_alert_log(None)
+    clear_cache()
+    drop_indexes()
+    yield
+    # Ingested reviews live in the loaded dataset; don't let them leak into the next test
+    clear_cache()
+    drop_indexes()
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from components.dishStats import commentSelection
+from components.dishStats.commentSelection import estimate_tokens, select_representative_comments
+
+
+def _reviews(n, **columns):
+    return pd.DataFrame({
+        "content": [f"Comment {i} about the {['crust', 'sauce', 'cheese', 'price'][i % 4]} number {i}" for i in range(n)],
+        "timestamp": pd.date_range("2024-01-01", periods=n, freq="D").astype(str),
+        **columns,
+    })
+
+
+def test_near_duplicates_are_skipped_and_the_budget_is_kept():
+    reviews = pd.concat([
+        _reviews(20, overall=[1, 5] * 10),
+        pd.DataFrame({
+            "content": ["The crust was burnt and the sauce was cold tonight",
+                        "The crust was burnt and the sauce was cold tonight!"],
+            "timestamp": ["2025-01-01", "2025-01-02"],
+            "overall": [1, 1],
+        }),
+    ], ignore_index=True)
+
+    selected = select_representative_comments(reviews, token_budget=100)
+
+    assert selected["content"].map(estimate_tokens).sum() <= 100
+    burnt = selected["content"].str.startswith("The crust was burnt")
+    assert burnt.sum() == 1
+    # Newest, most extreme comment is picked first
+    assert selected.iloc[0]["content"].startswith("The crust was burnt")
+
+
+def test_without_ratings_only_the_candidate_pool_is_sentiment_scored(monkeypatch):
+    scored = []
+
+    def fake_extremity(df):
+        scored.append(len(df))
+        return np.full(len(df), 0.5)
+
+    monkeypatch.setattr(commentSelection, "_extremity_scores", fake_extremity)
+    selected = select_representative_comments(_reviews(500), candidate_pool=50)
+
+    assert scored == [50]
+    # The pool is the newest comments
+    assert selected["timestamp"].min() >= _reviews(500)["timestamp"].iloc[-50]
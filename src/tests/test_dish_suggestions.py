@@ -0,0 +1,48 @@
+import json
+import re
+
+import pandas as pd
+import pytest
+
+from components.ai.fake_llm import FAKE_SUGGESTIONS, FakeGenerativeModel
+from components.dishStats.dishAISuggestions import generate_menu_suggestions, validate_suggestions
+
+DISHES = ["Fries", "Pizza", "Salad"]
+
+
+class OneMalformedDish(FakeGenerativeModel):
+    """Answers every batch, but gives `bad_dish` an unknown category on the first request."""
+
+    def __init__(self, bad_dish):
+        super().__init__()
+        self.bad_dish = bad_dish
+
+    def _respond(self, prompt):
+        response = json.loads(super()._respond(prompt))
+        if len(self.prompts) == 1:
+            response[self.bad_dish] = [dict(FAKE_SUGGESTIONS[0], category="dessert")] + FAKE_SUGGESTIONS[1:]
+        return json.dumps(response)
+
+
+def _requested_dishes(prompt):
+    return json.loads("[" + re.search(r"keys are exactly these dish names:\n\[(.*)\]", prompt).group(1) + "]")
+
+
+def test_only_the_malformed_dish_is_retried():
+    reviews = pd.DataFrame({
+        "name": [name for name in DISHES for _ in range(2)],
+        "content": [f"{name} review {i}, {'great' if i else 'cold'}" for name in DISHES for i in range(2)],
+        "overall": [5, 2] * len(DISHES),
+    })
+    fake = OneMalformedDish("Pizza")
+
+    suggestions = generate_menu_suggestions(reviews, model=fake)
+
+    assert [_requested_dishes(prompt) for prompt in fake.prompts] == [DISHES, ["Pizza"]]
+    assert suggestions == {name: FAKE_SUGGESTIONS for name in DISHES}
+
+
+def test_category_must_be_one_the_prompt_allows():
+    validate_suggestions(FAKE_SUGGESTIONS)
+    with pytest.raises(ValueError, match="category"):
+        validate_suggestions(FAKE_SUGGESTIONS[:2] + [dict(FAKE_SUGGESTIONS[2], category="dessert")])
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.downsampling import downsample_frame, downsample_indices, lttb_indices, minmax_indices
+
+
+def _series(n=10_000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=float)
+    y = np.sin(x / 500) + rng.normal(0, 0.1, n)
+    y[n * 43 // 100] = 25.0  # a spike the chart must not lose
+    return x, y
+
+
+def test_lttb_keeps_the_ends_and_the_spike():
+    x, y = _series()
+    keep = lttb_indices(x, y, 500)
+
+    assert len(keep) == 500
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert 4300 in keep
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    x, y = _series()
+    keep = minmax_indices(y, 202)
+
+    assert len(keep) <= 202
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert y[keep].max() == y.max() and y[keep].min() == y.min()
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_short_series_are_untouched(method):
+    x, y = _series(100)
+    assert list(downsample_indices(x, y, max_points=200, method=method)) == list(range(100))
+
+
+def test_gaps_are_dropped_once_thinned():
+    x, y = _series()
+    y[::7] = np.nan
+    keep = downsample_indices(x, y, max_points=300)
+    assert len(keep) == 300 and np.isfinite(y[keep]).all()
+
+
+def test_unknown_method_is_rejected():
+    x, y = _series()
+    with pytest.raises(ValueError):
+        downsample_indices(x, y, max_points=100, method="random")
+
+
+def test_downsample_frame_keeps_columns_and_dates():
+    x, y = _series()
+    df = pd.DataFrame({"date": pd.date_range("2020-01-01", periods=len(y), freq="h"), "value": y, "label": "a"})
+    small = downsample_frame(df, "date", "value", max_points=400)
+
+    assert len(small) == 400
+    assert list(small.columns) == ["date", "value", "label"]
+    assert small["date"].is_monotonic_increasing
+    assert small["value"].max() == df["value"].max()
+    short = df.head(50)
+    assert downsample_frame(short, "date", "value", max_points=400) is short
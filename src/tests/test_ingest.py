@@ -0,0 +1,160 @@
+"""Every maintained index, updated review by review, must equal a rebuild over the same data."""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.ingest import drop_indexes, ingest_review
+from data.loadData import cached_on_data, loadData
+from data.dishPairings import dish_cooccurrence
+from data.dishSimilarity import dish_similarity
+from data.ratingAlerts import rating_alerts
+from data.ratingCube import DIMENSIONS, rating_cube
+from data.ratingTrends import rating_trends
+from data.recentReviews import recent_reviews
+from data.reviewAspects import review_aspects
+from data.reviewDuplicates import review_duplicates
+from data.reviewSearch import count_matches, review_database, search_reviews
+from data.reviewSentiment import review_sentiment
+from data.reviewerCardinality import reviewer_cardinality
+from data.reviewerTimeline import reviewer_timeline
+
+
+def _content_of(review_index):
+    data = loadData()
+    contents = {row["id"]: row["content"] for row in data["content"]}
+    return contents[data["reviews"][review_index]["content_id"]]
+
+
+def _ingest_batch():
+    """Reviews after the last one in the data: new days, months and a year, a new reviewer and a duplicate."""
+    copied = _content_of(5)
+    reviews = [
+        (3, 1, (5, 5, 4, 5, True), "Huge portion and really tasty, the sauce was great.", datetime(2025, 12, 22)),
+        (3, 2, (2, 1, 2, 1, False), "Cold and far too salty, the crust was burnt.", datetime(2025, 12, 22)),
+        (356, 1, (4, 4, 4, 4, True), "Solid burger, fair price.", datetime(2025, 12, 28)),
+        (356, 7, (3, 3, 2, 3, False), copied, datetime(2026, 1, 3)),
+        (12, 1, (1, 1, 1, 1, False), "Overpriced, bland and tiny.", datetime(2026, 1, 3)),
+        (40, 4, (4, 5, 4, 4, True), "", datetime(2026, 2, 14)),
+    ]
+    # A run of bad ratings for the best-rated dish, to raise alerts
+    complaints = ["Cold again.", "Soggy bun, sent it back.", "Tiny patty for the price.", "Burnt edges everywhere.",
+                  "Waited forty minutes for this.", "Tasted stale and dry.", "Cheese was rubbery.", "Not worth it."]
+    reviews += [(100 + i, 1, (1, 1, 1, 1, False), text, datetime(2026, 3, 1 + i)) for i, text in enumerate(complaints)]
+    for reviewer_id, menu_item_id, (portion, taste, value, overall, returning), content, when in reviews:
+        ingest_review(reviewer_id, menu_item_id,
+                      {"portion": portion, "taste": taste, "value": value, "overall": overall, "return": returning},
+                      content, when)
+
+
+def _dish_ids():
+    return [item["id"] for item in loadData()["menuItems"]]
+
+
+VIEWS = {
+    "rating_cube": lambda: [
+        rating_cube().histogram(dimension, dish, start, end).counts
+        for dimension in DIMENSIONS
+        for dish in (None, 1, 2, 7)
+        for start, end in ((None, None), ("2025-12", "2026-03"), ("2026-01", None))
+    ] + [rating_cube().months, rating_cube().years],
+    "rating_trends": lambda: [rating_trends().series(dish) for dish in (None, 1, 2, 4)]
+    + [rating_trends().latest(dish) for dish in (None, 1)],
+    "rating_alerts": lambda: [rating_alerts().active_alerts(), rating_alerts().recent(20)],
+    "review_duplicates": lambda: [review_duplicates().duplicates()],
+    "recent_reviews": lambda: [recent_reviews().latest_frame(n, dish) for n, dish in ((None, None), (5, 1), (5, 2))],
+    "reviewer_timeline": lambda: [reviewer_timeline().history(reviewer) for reviewer in (3, 356, 40)]
+    + [vars(reviewer_timeline().cohorts())],
+    "reviewer_cardinality": lambda: [
+        reviewer_cardinality().diversity(dish, start, end)
+        for dish in (None, 1, 2)
+        for start, end in ((None, None), (datetime(2025, 12, 1), datetime(2026, 3, 31)))
+    ],
+    "review_aspects": lambda: [review_aspects().top_aspects(dish, n=20) for dish in (None, 1, 2)]
+    + [review_aspects().top_terms(None, n=30), review_aspects().aspect_trend(2)]
+    + [review_aspects().mentions(term) for term in ("cold", "salty", "portion")],
+    "dish_cooccurrence": lambda: [dish_cooccurrence().pairings(dish, min_together=1) for dish in (1, 2, 7)],
+    "dish_similarity": lambda: [dish_similarity().similar(dish) for dish in _dish_ids()],
+    "review_sentiment": lambda: [review_sentiment().polarities([row["id"] for row in loadData()["content"]])],
+    "review_database": lambda: [search_reviews(query, limit=50) for query in ("cold", "salty or burnt", "portion")]
+    + [count_matches(query) for query in ("cold", "great", "bland")],
+}
+INDEXES = {
+    "rating_cube": rating_cube, "rating_trends": rating_trends, "rating_alerts": rating_alerts,
+    "review_duplicates": review_duplicates, "recent_reviews": recent_reviews,
+    "reviewer_timeline": reviewer_timeline, "reviewer_cardinality": reviewer_cardinality,
+    "review_aspects": review_aspects, "dish_cooccurrence": dish_cooccurrence,
+    "dish_similarity": dish_similarity, "review_database": review_database, "review_sentiment": review_sentiment,
+}
+
+
+def assert_same(maintained, rebuilt, path="view"):
+    if isinstance(maintained, pd.DataFrame):
+        pd.testing.assert_frame_equal(maintained.reset_index(drop=True), rebuilt.reset_index(drop=True),
+                                      check_dtype=False, obj=path)
+    elif isinstance(maintained, (np.ndarray, float, np.floating)):
+        np.testing.assert_allclose(maintained, rebuilt, rtol=1e-9, atol=1e-12, err_msg=path)
+    elif isinstance(maintained, dict):
+        assert maintained.keys() == rebuilt.keys(), path
+        for key in maintained:
+            assert_same(maintained[key], rebuilt[key], f"{path}[{key!r}]")
+    elif isinstance(maintained, (list, tuple)):
+        assert len(maintained) == len(rebuilt), path
+        for i, (left, right) in enumerate(zip(maintained, rebuilt)):
+            assert_same(left, right, f"{path}[{i}]")
+    else:
+        assert maintained == rebuilt, path
+
+
+@pytest.mark.parametrize("name", sorted(VIEWS))
+def test_ingested_reviews_match_a_rebuild(name):
+    # Build every index first, so each one is maintained (not built after the fact)
+    for index in INDEXES.values():
+        index()
+    before = VIEWS[name]()
+
+    _ingest_batch()
+    maintained = VIEWS[name]()
+
+    drop_indexes()
+    rebuilt = VIEWS[name]()
+
+    assert_same(maintained, rebuilt, name)
+    with pytest.raises(AssertionError):
+        # The batch changes every index (otherwise this test would prove nothing)
+        assert_same(before, maintained, name)
+
+
+def test_duplicate_text_is_flagged_when_ingested():
+    original_id = loadData()["reviews"][5]["id"]
+    review = ingest_review(356, 7, {"portion": 3, "taste": 3, "value": 2, "overall": 3, "return": False},
+                           _content_of(5), datetime(2026, 1, 3))
+
+    assert review_duplicates().duplicate_of[review["id"]] == original_id
+
+
+def test_ingest_rejects_unknown_dishes_and_missing_ratings():
+    with pytest.raises(ValueError, match="Unknown menu item"):
+        ingest_review(1, 999_999, {"portion": 3, "taste": 3, "value": 3, "overall": 3, "return": True})
+    with pytest.raises(ValueError, match="Missing rating fields: return"):
+        ingest_review(1, 1, {"portion": 3, "taste": 3, "value": 3, "overall": 3})
+
+
+def test_aggregate_computed_during_an_ingest_is_not_cached():
+    calls = []
+
+    @cached_on_data
+    def review_count():
+        count = len(loadData()["reviews"])
+        if not calls:
+            # A review lands while the first computation is still running
+            ingest_review(1, 1, {"portion": 3, "taste": 3, "value": 3, "overall": 3, "return": True})
+        calls.append(count)
+        return count
+
+    stale = review_count()
+    assert review_count() == stale + 1
+    assert review_count() == stale + 1
+    assert len(calls) == 2
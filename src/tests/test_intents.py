@@ -0,0 +1,75 @@
+import pytest
+
+from components.ai import llm
+from components.ai.intents import MAX_COUNT, _extract_count, answer_intent, match_intent
+
+DISHES = ["Margherita Pizza", "Fries"]
+
+
+@pytest.mark.parametrize("question, count", [
+    ("top 5 dishes", 5),
+    ("show the 3 best dishes", 3),
+    ("best three dishes", 3),
+    ("what are the 10 most reviewed dishes", 10),
+    ("worst 0 items", 1),
+    ("top 500 dishes", MAX_COUNT),
+])
+def test_count_next_to_the_ranking_phrase(question, count):
+    assert _extract_count(question) == count
+
+
+@pytest.mark.parametrize("question", [
+    "top dishes in 2024",
+    "reviews mentioning 5 stars",
+    "top dishes rated 4 or more",
+])
+def test_numbers_elsewhere_are_not_a_count(question):
+    assert _extract_count(question, default=7) == 7
+
+
+def test_intent_limit_comes_from_the_count_phrase():
+    intent = match_intent("What are the 3 highest rated dishes?")
+    assert intent["name"] == "top_dishes"
+    assert intent["params"] == (3,)
+
+
+@pytest.mark.parametrize("question, name, params", [
+    ("What are the top 3 dishes by taste rating?", "top_dishes", (3,)),
+    ("What is the worst rated dish?", "bottom_dishes", (1,)),
+    ("Which dishes have the most reviews?", "most_reviewed_dishes", (5,)),
+    ("What are the least reviewed dishes?", "least_reviewed_dishes", (5,)),
+    ("What is the average rating by category?", "category_averages", ()),
+    ("How many reviews per month?", "reviews_by_month", ()),
+    ("What is the return customer rate?", "return_rate", ()),
+    ("Would customers return for the Margherita Pizza?", "return_rate", ("Margherita Pizza",)),
+    ("Show reviews mentioning cold fries", "review_search", ('"cold" "fries"', 20)),
+    ("How many reviews mention burnt?", "review_search_count", ('"burnt"',)),
+])
+def test_common_questions_match_a_prebuilt_intent(question, name, params):
+    intent = match_intent(question, DISHES)
+    assert (intent["name"], intent["params"]) == (name, params)
+
+
+@pytest.mark.parametrize("question", [
+    "Which dishes got the best ratings last year?",
+    "Why is the pizza rated badly?",
+    "Would customers return for the mystery dish?",
+    "Which reviews mention cold per month?",
+    "Hello",
+    "",
+])
+def test_other_questions_fall_through_to_the_llm(question):
+    assert match_intent(question, DISHES) is None
+
+
+def test_intent_sql_runs_against_the_review_database():
+    conn = llm.connect()
+    try:
+        for question in ["What are the top 3 dishes by taste rating?", "Which dishes have the most reviews?",
+                         "What is the average rating by category?", "How many reviews per month?",
+                         "What is the return customer rate?", "How many reviews mention cold?"]:
+            intent = match_intent(question, llm.dish_names(conn))
+            answer = answer_intent(intent, llm.run_sql(conn, intent["sql"], intent["params"]))
+            assert answer and "no review data" not in answer
+    finally:
+        conn.close()
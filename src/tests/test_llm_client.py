@@ -0,0 +1,173 @@
+import threading
+
+import pytest
+
+from components.ai.client import CircuitBreaker, CircuitOpenError, LLMClient, LLMTimeoutError, latency_histogram
+from components.ai.fake_llm import FakeGenerativeModel
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class BlockingModel(FakeGenerativeModel):
+    """Blocks every call until `release` is set."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.release = threading.Event()
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.release.wait(5)
+        return super().generate_content(prompt, stream=stream, **kwargs)
+
+
+def make_client(backend, **kwargs):
+    kwargs.setdefault("sleep", lambda seconds: None)
+    return LLMClient(backend, **kwargs)
+
+
+def test_transient_errors_are_retried():
+    fake = FakeGenerativeModel(errors=[TimeoutError("slow"), ConnectionError("reset")])
+    client = make_client(fake, max_retries=2)
+
+    assert client.generate_content("hello").text
+    assert len(fake.prompts) == 3
+
+
+def test_retries_stop_after_max_retries():
+    fake = FakeGenerativeModel(errors=[ConnectionError("reset")] * 3)
+    client = make_client(fake, max_retries=1)
+
+    with pytest.raises(ConnectionError):
+        client.generate_content("hello")
+    assert len(fake.prompts) == 2
+
+
+def test_other_errors_are_not_retried():
+    fake = FakeGenerativeModel(errors=[ValueError("bad request")])
+    client = make_client(fake, max_retries=2)
+
+    with pytest.raises(ValueError):
+        client.generate_content("hello")
+    assert len(fake.prompts) == 1
+
+
+def test_timeout_stops_waiting_for_the_backend():
+    backend = BlockingModel()
+    client = make_client(backend, timeout=0.05, max_retries=0)
+    try:
+        with pytest.raises(LLMTimeoutError):
+            client.generate_content("hello")
+    finally:
+        backend.release.set()
+
+
+def test_abandoned_call_keeps_its_slot_until_the_backend_returns():
+    backend = BlockingModel()
+    client = make_client(backend, timeout=0.05, max_retries=0, max_concurrency=1)
+    try:
+        with pytest.raises(LLMTimeoutError):
+            client.generate_content("first")
+        # The first call is still running, so the only slot is taken
+        with pytest.raises(LLMTimeoutError, match="No free LLM slot"):
+            client.generate_content("second")
+    finally:
+        backend.release.set()
+
+
+def test_streaming_timeout_applies_per_chunk():
+    backend = FakeGenerativeModel(latency=0.2, chunk_size=1)
+    client = make_client(backend, timeout=0.05, max_retries=0)
+
+    with pytest.raises(LLMTimeoutError):
+        list(client.generate_content("hello", stream=True))
+
+
+def test_breaker_opens_at_the_failure_threshold():
+    breaker = CircuitBreaker(failure_threshold=0.5, window=4, min_calls=4, clock=FakeClock())
+    for success in (True, False, True):
+        breaker.record(success)
+    assert breaker.state == "closed"
+
+    breaker.record(False)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_lets_one_trial_call_through_after_the_cooldown():
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=1, cooldown=30.0, clock=clock)
+    breaker.record(False)
+
+    clock.now = 30.0
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record(False)
+    assert breaker.state == "open"
+
+    clock.now = 60.0
+    breaker.before_call()
+    breaker.record(True)
+    assert breaker.state == "closed"
+
+
+def test_open_breaker_fails_fast_without_calling_the_backend():
+    fake = FakeGenerativeModel(errors=[ConnectionError("reset")] * 2)
+    client = make_client(fake, max_retries=0, breaker=CircuitBreaker(min_calls=2, clock=FakeClock()))
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            client.generate_content("hello")
+
+    with pytest.raises(CircuitOpenError):
+        client.generate_content("hello")
+    assert len(fake.prompts) == 2
+
+
+class StallsMidStream(FakeGenerativeModel):
+    """Streams the first chunk, then raises on the next one."""
+
+    def _stream(self, text):
+        chunks = super()._stream(text)
+        yield next(chunks)
+        raise ConnectionError("stream reset")
+
+
+def test_mid_stream_failure_counts_against_the_breaker():
+    client = make_client(StallsMidStream(chunk_size=1), max_retries=0,
+                         breaker=CircuitBreaker(min_calls=2, clock=FakeClock()))
+    for _ in range(2):
+        stream = client.generate_content("hello", stream=True, call_site="mid_stream")
+        assert next(stream).text
+        with pytest.raises(ConnectionError):
+            list(stream)
+
+    assert client.breaker.state == "open"
+    assert latency_histogram("mid_stream").snapshot()["errors"] == 2
+
+
+def test_stream_outcome_is_recorded_once_it_finishes():
+    client = make_client(FakeGenerativeModel(chunk_size=1))
+    histogram = latency_histogram("whole_stream")
+    before = histogram.snapshot()["count"]
+
+    stream = client.generate_content("hello there", stream=True, call_site="whole_stream")
+    next(stream)
+    assert histogram.snapshot()["count"] == before
+    list(stream)
+    assert histogram.snapshot()["count"] == before + 1
+
+    # Closing a stream early is not a backend failure
+    stream = client.generate_content("hello there", stream=True, call_site="whole_stream")
+    next(stream)
+    stream.close()
+    snapshot = histogram.snapshot()
+    assert (snapshot["count"], snapshot["errors"]) == (before + 2, 0)
@@ -0,0 +1,83 @@
+import os
+import sqlite3
+
+import pytest
+
+from components.ai import llm
+from components.ai.fake_llm import FAKE_SQL, FakeGenerativeModel
+from components.ai.llm import rag_answer, rag_answer_stream
+
+SQL_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "data_fixed.sql")
+
+# Not one of the prebuilt intents, so it goes through both LLM calls
+QUESTION = "Which dish should the kitchen look at first?"
+
+
+def test_stream_yields_sql_then_table_then_answer_chunks():
+    fake = FakeGenerativeModel(chunk_size=2)
+    stages = list(rag_answer_stream(QUESTION, SQL_FILE, None, model=fake))
+
+    assert [stage for stage, _ in stages[:2]] == ["sql", "table"]
+    assert stages[0][1] == FAKE_SQL.strip("`").removeprefix("sql").strip()
+    assert len(stages[1][1]) == 5
+
+    chunks = [payload for stage, payload in stages[2:]]
+    assert all(stage == "answer" for stage, _ in stages[2:])
+    assert len(chunks) > 1
+    assert len(fake.prompts) == 2
+
+    # The streamed chunks add up to the answer the non-streaming pipeline returns
+    assert "".join(chunks) == rag_answer(QUESTION, SQL_FILE, None, model=FakeGenerativeModel())
+
+
+def test_stream_answers_prebuilt_intents_without_the_llm():
+    fake = FakeGenerativeModel()
+    stages = dict(rag_answer_stream("What are the top 3 dishes by taste rating?", SQL_FILE, None, model=fake))
+
+    assert stages["sql"].startswith("-- answered locally (intent: top_dishes)")
+    assert len(stages["table"]) == 3
+    assert stages["answer"].startswith("Here are the 3 highest-rated dishes by average taste rating")
+    assert fake.prompts == []
+
+
+def test_stream_retries_before_the_first_chunk():
+    fake = FakeGenerativeModel(errors=[ConnectionError("reset"), ConnectionError("reset")])
+    stages = list(rag_answer_stream(QUESTION, SQL_FILE, None, model=fake))
+
+    # Both errors were spent on the SQL call, which was retried; the answer still streamed
+    assert any(stage == "answer" for stage, _ in stages)
+    assert len(fake.prompts) == 4
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Connections the pipeline opens."""
+    connections = []
+
+    def open_review_db(sql_file, db_path=None):
+        connections.append(llm.connect())
+        return connections[-1]
+
+    monkeypatch.setattr(llm, "open_review_db", open_review_db)
+    return connections
+
+
+def _is_closed(conn):
+    try:
+        conn.execute("SELECT 1")
+    except sqlite3.ProgrammingError:
+        return True
+    return False
+
+
+def test_connection_is_closed_when_the_consumer_stops_early(opened):
+    stream = rag_answer_stream(QUESTION, SQL_FILE, None, model=FakeGenerativeModel())
+    assert next(stream)[0] == "sql"
+    stream.close()
+    assert _is_closed(opened[0])
+
+
+def test_connection_is_closed_after_every_question(opened):
+    list(rag_answer_stream(QUESTION, SQL_FILE, None, model=FakeGenerativeModel()))
+    rag_answer("What are the top 3 dishes by taste rating?", SQL_FILE, None, model=FakeGenerativeModel())
+    assert len(opened) == 2 and all(_is_closed(conn) for conn in opened)
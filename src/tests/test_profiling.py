@@ -0,0 +1,42 @@
+import threading
+
+from observability import profiling
+
+
+def test_concurrent_callbacks_are_profiled_one_at_a_time(monkeypatch, tmp_path):
+    monkeypatch.setenv("PLATEMATE_PROFILE", "all")
+    monkeypatch.setenv("PLATEMATE_PROFILE_DIR", str(tmp_path))
+    monkeypatch.delenv("PLATEMATE_PROFILER", raising=False)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "slow"
+
+    results = {}
+    thread = threading.Thread(target=lambda: results.update(slow=profiling.profiled(slow)()))
+    thread.start()
+    started.wait(5)
+    # Runs while `slow` holds the profiler: unprofiled instead of raising
+    results["fast"] = profiling.profiled(lambda: "fast", name="fast")()
+    release.set()
+    thread.join(5)
+
+    assert results == {"slow": "slow", "fast": "fast"}
+    assert [profile["callback"] for profile in profiling.list_profiles(str(tmp_path))] == ["slow"]
+
+
+def test_callback_runs_unprofiled_when_another_profiler_is_active(monkeypatch, tmp_path):
+    monkeypatch.setenv("PLATEMATE_PROFILE", "all")
+    monkeypatch.setenv("PLATEMATE_PROFILE_DIR", str(tmp_path))
+
+    class ActiveProfiler:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiling.cProfile, "Profile", ActiveProfiler)
+    assert profiling.profiled(lambda: 42, name="answer")() == 42
+    assert profiling.list_profiles(str(tmp_path)) == []
+    # The lock was released, so the next callback can be profiled again
+    assert not profiling._cprofile_lock.locked()
@@ -0,0 +1,75 @@
+import json
+
+import pandas as pd
+import pytest
+
+from data import ratingAlerts
+from data.ratingAlerts import DIMENSIONS, WARMUP_REVIEWS, RatingAlerts, configure_alert_log
+
+STEADY = [5, 4] * 20
+DROP = [1] * 10
+RECOVERY = [5] * 60
+
+
+def _reviews(overall, start="2024-01-01"):
+    """Reviews of dish 1, one a day; taste/portion/value stay steady so only 'overall' moves."""
+    days = pd.date_range(start, periods=len(overall), freq="D")
+    return [
+        {"id": 100_000 + i, "menu_item_id": 1, "timestamp": str(day), "overall": rating,
+         "taste": 4, "portion": 4, "value": 4}
+        for i, (day, rating) in enumerate(zip(days, overall))
+    ]
+
+
+def _add_all(detector, reviews):
+    return [alert for review in reviews for alert in detector.add(review)]
+
+
+def test_a_drop_starts_one_alert_until_it_clears():
+    detector = RatingAlerts([1, 2], {1: "Fries"})
+    assert _add_all(detector, _reviews(STEADY)) == []
+
+    alerts = _add_all(detector, _reviews(STEADY + DROP)[len(STEADY):])
+    assert [(alert["name"], alert["dimension"]) for alert in alerts] == [("Fries", "overall")]
+    assert alerts[0]["recent"] < alerts[0]["baseline"] - 1
+    assert [alert["dimension"] for alert in detector.active_alerts()] == ["overall"]
+
+    # Still low: no second alert; recovered: the alert clears
+    assert _add_all(detector, _reviews(STEADY + DROP * 2)[len(STEADY + DROP):]) == []
+    assert _add_all(detector, _reviews(STEADY + DROP * 2 + RECOVERY)[len(STEADY + DROP * 2):]) == []
+    assert detector.active_alerts() == []
+    assert len(detector.recent()) == 1
+
+
+def test_no_alert_during_warm_up(monkeypatch):
+    # A threshold low enough for a short history to cross it
+    monkeypatch.setattr(ratingAlerts, "ALERT_SIGMAS", 1.5)
+    reviews = _reviews([5, 4] * 5 + [1] * (WARMUP_REVIEWS - 10))
+    detector = RatingAlerts([1])
+
+    assert _add_all(detector, reviews[:WARMUP_REVIEWS - 1]) == []
+    assert [alert["reviews"] for alert in detector.add(reviews[-1])] == [WARMUP_REVIEWS]
+
+
+def test_replay_matches_adding_reviews_one_by_one():
+    reviews = _reviews(STEADY + DROP + RECOVERY + DROP)
+    live = RatingAlerts([1])
+    live_alerts = _add_all(live, reviews)
+
+    replayed = RatingAlerts([1])
+    frame = pd.DataFrame(reviews).sample(frac=1, random_state=0)  # replay sorts by time itself
+    replayed.replay(frame["menu_item_id"], frame["timestamp"], frame[DIMENSIONS].to_numpy(dtype=float))
+
+    assert len(live_alerts) == 2
+    assert replayed.recent() == live.recent()
+    for state in ["slow_sum", "slow_weight", "deviation_sum", "fast_sum", "fast_weight", "active"]:
+        assert getattr(replayed, state) == pytest.approx(getattr(live, state))
+
+
+def test_alerts_are_appended_to_the_log(tmp_path):
+    log = tmp_path / "alerts" / "alerts.jsonl"
+    configure_alert_log(str(log))
+    _add_all(RatingAlerts([1]), _reviews(STEADY + DROP))
+
+    entries = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [(entry["menu_item_id"], entry["dimension"]) for entry in entries] == [(1, "overall")]
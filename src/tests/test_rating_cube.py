@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.loadData import loadData
+from data.ratingCube import DIMENSIONS, RatingCube, RatingDistribution, _month_number, rating_cube
+from data.reviewDuplicates import without_duplicates
+
+
+def test_distribution_statistics():
+    dist = RatingDistribution([1, 0, 2, 3, 4])  # ten reviews: 1, 3, 3, 4, 4, 4, 5, 5, 5, 5
+
+    assert dist.total == 10
+    assert dist.mean() == pytest.approx(3.9)
+    assert (dist.percentile(25), dist.median(), dist.percentile(75)) == (3, 4, 5)
+    assert dist.percentile(0) == 1 and dist.percentile(100) == 5
+    assert dist.share_at_least(4) == pytest.approx(0.7)
+    assert list(dist.shares()) == pytest.approx([0.1, 0, 0.2, 0.3, 0.4])
+
+
+def test_empty_distribution():
+    dist = RatingDistribution(np.zeros(5))
+    assert dist.summary() == {"reviews": 0, "mean": None, "median": None, "p25": None, "p75": None,
+                              "share_4plus": 0.0}
+
+
+def test_slices_sum_the_right_months_and_dishes():
+    cube = RatingCube([1, 2], _month_number("2024-01"), _month_number("2024-03"))
+    months = [_month_number(m) for m in ["2024-01", "2024-02", "2024-03"]] + [-1]
+    cube.add_reviews([1, 1, 2, 1], months, np.array([[5, 4, 3, 5], [1, 2, 3, 1], [3, 3, 3, 3], [4, 4, 4, 4]]))
+
+    assert list(cube.histogram("overall", 1).counts) == [1, 0, 0, 1, 1]  # the undated review counts all-time
+    assert list(cube.histogram("overall", 1, start="2024-01", end="2024-02").counts) == [1, 0, 0, 0, 1]
+    assert list(cube.histogram("taste", [1, 2], start="2024-03").counts) == [0, 0, 1, 0, 0]
+    assert cube.histogram("overall", 99).total == 0
+
+    # An ingested review outside the month axis grows it
+    cube.add({"id": 10_000, "menu_item_id": 2, "timestamp": "2024-06-15", **dict(zip(DIMENSIONS, [2, 2, 2, 2]))})
+    assert cube.months[-1] == "2024-06"
+    assert list(cube.histogram("value", 2, start="2024-04").counts) == [0, 1, 0, 0, 0]
+
+
+def test_cube_matches_the_review_frame():
+    data = loadData()
+    reviews = without_duplicates(pd.DataFrame(data["reviews"]))
+    merged = reviews.merge(pd.DataFrame(data["ratings"]), left_on="rating_id", right_on="id")
+    cube = rating_cube()
+
+    for dish_id, dish in merged.groupby("menu_item_id"):
+        for dimension in DIMENSIONS:
+            expected = np.bincount(dish[dimension].astype(int), minlength=6)[1:]
+            assert list(cube.histogram(dimension, dish_id).counts) == list(expected)
+
+    year = merged[pd.to_datetime(merged["timestamp"], errors="coerce").dt.year == 2024]
+    assert cube.histogram("overall", start="2024-01", end="2024-12").total == len(year)
@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+
+from data.reviewDuplicates import SHINGLE_SIZE, ReviewDuplicates
+from data.textSignatures import shingles, tokenize
+
+WORDS = ("pizza crust sauce cheese fries burger salad cold hot salty sweet crispy soggy fresh tasty bland "
+         "portion price value waiter service table quick slow friendly rude great awful lovely again never").split()
+
+
+def _corpus(n=400, copies=40, seed=3):
+    """n random reviews; `copies` of them are copied later verbatim or with one word changed
+    (which keeps the shingle Jaccard of a 60+ word text above 0.9)."""
+    rng = random.Random(seed)
+    texts = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(60, 80))) for _ in range(n)]
+    planted = {}
+    for i in range(copies):
+        original = rng.randrange(n)
+        words = texts[original].split()
+        if i % 2:
+            words[rng.randrange(len(words))] = "unusual"
+        planted[n + i] = original
+        texts.append(" ".join(words))
+    return texts, planted
+
+
+def _jaccard(a, b):
+    a, b = shingles(tokenize(a), SHINGLE_SIZE), shingles(tokenize(b), SHINGLE_SIZE)
+    return len(a & b) / len(a | b)
+
+
+def test_copies_are_flagged_and_point_at_the_first_review():
+    index = ReviewDuplicates()
+    text = "The crust was burnt and the sauce was cold when it arrived at our table"
+    index.add_reviews([1, 2, 3, 4, 5], [
+        text,
+        "Lovely fresh salad with a light dressing and plenty of crunchy vegetables",
+        text,
+        text + " again",
+        "Great!",
+    ])
+    index.add_reviews([6, 7], ["Great!", text.upper()])
+
+    assert index.duplicate_of == {3: 1, 4: 1, 7: 1}
+    assert list(index.is_duplicate([1, 2, 3, 4, 5, 6, 7])) == [False, False, True, True, False, False, True]
+
+
+def test_flags_match_the_exact_jaccard():
+    texts, planted = _corpus()
+    index = ReviewDuplicates()
+    index.add_reviews(np.arange(len(texts)), texts)
+
+    # Every planted copy is found, and every flag is a real near-duplicate of an earlier review
+    assert set(planted) <= set(index.duplicate_of)
+    for review, original in index.duplicate_of.items():
+        assert original < review
+        assert _jaccard(texts[review], texts[original]) >= index.threshold
+
+
+def test_ingesting_one_by_one_matches_the_bulk_build():
+    texts, _ = _corpus(seed=5)
+    bulk = ReviewDuplicates()
+    bulk.add_reviews(np.arange(len(texts)), texts)
+
+    live = ReviewDuplicates()
+    live.add_reviews(np.arange(200), texts[:200])
+    returned = {i: live.add({"id": i, "content": text}) for i, text in enumerate(texts[200:], start=200)}
+
+    assert live.duplicate_of == bulk.duplicate_of
+    assert {i: original for i, original in returned.items() if original is not None} == \
+        {i: original for i, original in bulk.duplicate_of.items() if i >= 200}
@@ -0,0 +1,28 @@
+import pytest
+
+from data.reviewSearch import count_matches, search_reviews, to_fts_query
+
+
+@pytest.mark.parametrize("text, query", [
+    ("salty", '"salty"'),
+    ("too salty", '"too" "salty"'),
+    ("salty or cold", '("salty") OR ("cold")'),
+    ("too salty OR cold", '("too" "salty") OR ("cold")'),
+    ("salt*", '"salt"*'),
+    # FTS5 syntax in user input is quoted away
+    ('cold" NEAR(fries) -burnt ^x', '"cold" "NEAR" "fries" "burnt" "x"'),
+    ("", ""),
+    ("?!", ""),
+    (None, ""),
+])
+def test_to_fts_query(text, query):
+    assert to_fts_query(text) == query
+
+
+def test_search_and_count_agree():
+    count = count_matches("cold")
+    results = search_reviews("cold", limit=1000)
+    assert count == len(results) > 0
+    assert results["score"].is_monotonic_increasing
+    assert count_matches("cold or salty") >= max(count, count_matches("salty"))
+    assert search_reviews("?!").empty and count_matches("?!") == 0
@@ -0,0 +1,88 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.reviewerCardinality import EXACT_LIMIT, DistinctCounter, HyperLogLog, ReviewerCardinality, hash_ids
+
+# Standard error of a HyperLogLog with 2**12 registers is 1.04 / sqrt(4096), about 1.6%
+STANDARD_ERROR = 1.04 / np.sqrt(1 << 12)
+
+
+@pytest.mark.parametrize("n", [100, 1_000, 10_000, 200_000])
+def test_hyperloglog_estimate_is_within_four_standard_errors(n):
+    sketch = HyperLogLog()
+    sketch.add_hashes(hash_ids(np.arange(n)))
+    assert abs(sketch.count() - n) <= 4 * STANDARD_ERROR * n
+
+
+def test_hyperloglog_ignores_repeats_and_merges_as_a_union():
+    left, right, both = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    left.add_hashes(hash_ids(np.arange(0, 30_000)))
+    left.add_hashes(hash_ids(np.arange(0, 30_000)))
+    right.add_hashes(hash_ids(np.arange(20_000, 50_000)))
+    both.add_hashes(hash_ids(np.arange(0, 50_000)))
+
+    assert left.merge(right).count() == both.count()
+    with pytest.raises(ValueError):
+        left.merge(HyperLogLog(precision=10))
+
+
+def test_distinct_counter_is_exact_until_the_limit():
+    counter = DistinctCounter(hash_ids(np.arange(EXACT_LIMIT)))
+    counter.add_hashes(hash_ids(np.arange(EXACT_LIMIT)))
+    assert counter.is_exact and counter.count() == EXACT_LIMIT
+
+    counter.add_hashes(hash_ids(np.arange(EXACT_LIMIT, 5_000)))
+    assert not counter.is_exact
+    assert abs(counter.count() - 5_000) <= 4 * STANDARD_ERROR * 5_000
+
+    # An exact counter merged into a sketch adds its ids to the sketch
+    merged = counter.merge(DistinctCounter(hash_ids(np.arange(5_000, 5_100))))
+    assert abs(merged.count() - 5_100) <= 4 * STANDARD_ERROR * 5_100
+
+
+def test_diversity_matches_a_full_scan():
+    rng = np.random.default_rng(7)
+    n = 5_000
+    reviews = pd.DataFrame({
+        "reviewer_id": rng.integers(0, 1_500, n),
+        "menu_item_id": rng.integers(1, 4, n),
+        "timestamp": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 120, n), unit="D"),
+    })
+    index = ReviewerCardinality()
+    index.add_reviews(reviews["reviewer_id"], reviews["menu_item_id"], reviews["timestamp"])
+    repeaters = set(reviews["reviewer_id"].value_counts().loc[lambda c: c >= 2].index)
+
+    def expected(frame):
+        unique = set(frame["reviewer_id"])
+        return len(unique), len(unique & repeaters)
+
+    overall = index.diversity()
+    assert overall["exact"] and (overall["unique"], overall["repeat"]) == expected(reviews)
+
+    february = reviews[reviews["timestamp"].dt.month == 2]
+    result = index.diversity_for_month("2024-02", menu_item_id=2)
+    unique, repeat = expected(february[february["menu_item_id"] == 2])
+    tolerance = 0 if result["exact"] else 4 * STANDARD_ERROR
+    assert abs(result["unique"] - unique) <= tolerance * unique
+    assert abs(result["repeat"] - repeat) <= tolerance * repeat
+
+    result = index.diversity(start=date(2024, 1, 1), end=date(2024, 4, 30))
+    unique, repeat = expected(reviews)
+    assert abs(result["unique"] - unique) <= 4 * STANDARD_ERROR * unique
+    assert abs(result["repeat"] - repeat) <= 4 * STANDARD_ERROR * repeat
+
+
+def test_a_second_review_makes_the_reviewer_repeat_in_both_slices():
+    index = ReviewerCardinality()
+    index.add_reviews([1, 2, 2], [10, 10, 11], pd.to_datetime(["2024-03-01", "2024-03-02", "2024-03-03"]))
+    assert index.diversity(10)["repeat"] == 1
+
+    index.add({"reviewer_id": 1, "menu_item_id": 11, "timestamp": "2024-04-01"})
+
+    dish = index.diversity(10)
+    assert (dish["unique"], dish["one_time"], dish["repeat"], dish["exact"]) == (2, 0, 2, True)
+    assert index.diversity_for_month("2024-03")["repeat"] == 2
+    assert index.diversity(11)["unique"] == 2
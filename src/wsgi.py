@@ -0,0 +1,38 @@
+"""
+Production WSGI entry point.
+
+Run from src/ with:
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+With preload_app (see gunicorn.conf.py) this module is imported once in the
+gunicorn master: the dataset is parsed, the cached aggregates are built and
+every page layout (which builds its figures at import time) is rendered
+before the workers are forked, so workers share all of it copy-on-write
+instead of each redoing the work.
+"""
+
+import gc
+
+from app import app, server
+from data.loadData import loadData
+from data.dishes import get_all_dishes
+from data.dishSimilarity import dish_similarity
+from components.charts import _merged_df_snapshot
+
+
+def preload():
+    """Parse the dataset and build the cached aggregates used by the callbacks."""
+    loadData()
+    get_all_dishes()
+    _merged_df_snapshot()
+    # Scores every review text with TextBlob (via data/reviewSentiment.py), too slow for a request
+    dish_similarity()
+
+
+preload()
+
+# Move everything loaded so far out of the cyclic GC's reach; otherwise the
+# first collection in each worker touches (and so copies) every shared page.
+gc.freeze()
+
+application = server
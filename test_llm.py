@@ -1,6 +1,6 @@
 import sys
-sys.path.append('src/components/ai')
-from llm import rag_answer
+sys.path.append('src')
+from components.ai.llm import rag_answer
 import os
 
 # Test the RAG pipeline